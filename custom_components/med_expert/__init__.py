@@ -12,18 +12,20 @@ from typing import TYPE_CHECKING
 
 from homeassistant.components import panel_custom
 from homeassistant.components.http import StaticPathConfig
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.helpers import config_validation as cv
 
 from .const import CONF_PROFILE_NAME, DOMAIN
-from .data import MedExpertData
+from .data import MedExpertData, MedExpertDomainData
 from .domain.models import Profile
 from .ha_services import async_register_services, async_unregister_services
 from .runtime.manager import ProfileManager
+from .runtime.scheduler import ReminderTimer
 from .store import ProfileRepository, ProfileStore
+from .websocket_api import async_register_websocket_commands
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import Event, HomeAssistant
 
     from .data import MedExpertConfigEntry
 
@@ -42,6 +44,9 @@ URL_BASE = f"/api/{DOMAIN}/www"
 
 async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
     """Set up the Med Expert component."""
+    # Commands the panel reads profiles and medications with
+    async_register_websocket_commands(hass)
+
     # Register frontend panel static path
     www_path = Path(__file__).parent / "www"
     if www_path.exists():
@@ -82,13 +87,11 @@ async def async_setup_entry(
     """
     _LOGGER.info("Setting up Med Expert profile: %s", entry.title)
 
-    # Initialize store
-    store = ProfileStore(hass)
-    repository = ProfileRepository(store)
-    await repository.async_load()
+    # Shared store - the file is only read once for all profiles
+    repository = await _async_get_repository(hass)
 
     # Get or create profile
-    profile = repository.get(entry.entry_id)
+    profile = await repository.async_get(entry.entry_id)
     if profile is None:
         # Create new profile for this entry
         profile_name = entry.data.get(CONF_PROFILE_NAME, entry.title)
@@ -103,12 +106,14 @@ async def async_setup_entry(
         await repository.async_add(profile)
         _LOGGER.info("Created new profile: %s", profile_name)
 
-    # Create manager
+    # Create manager; reminders of all profiles share one timer
+    domain_data: MedExpertDomainData = hass.data[DOMAIN]
     manager = ProfileManager(
         hass=hass,
         entry_id=entry.entry_id,
         profile=profile,
         repository=repository,
+        timer=domain_data.timer,
     )
 
     # Store runtime data
@@ -147,10 +152,44 @@ async def async_unload_entry(
     entries = hass.config_entries.async_entries(DOMAIN)
     if len(entries) <= 1:  # This entry is being unloaded
         async_unregister_services(hass)
+        domain_data: MedExpertDomainData | None = hass.data.pop(DOMAIN, None)
+        if domain_data is not None:
+            if domain_data.unsub_stop:
+                domain_data.unsub_stop()
+            domain_data.timer.cancel_all()
+            await domain_data.repository.async_flush()
 
     return unload_ok
 
 
+async def _async_get_repository(hass: HomeAssistant) -> ProfileRepository:
+    """
+    Get the repository shared by all config entries.
+
+    Created on first use and kept in hass.data[DOMAIN]; the underlying
+    store is loaded once no matter how many profiles are set up.
+    """
+    domain_data: MedExpertDomainData | None = hass.data.get(DOMAIN)
+    if domain_data is None:
+        repository = ProfileRepository(ProfileStore(hass))
+
+        async def _async_flush_on_stop(_event: Event) -> None:
+            """Write pending profile changes before Home Assistant stops."""
+            await repository.async_flush()
+
+        domain_data = MedExpertDomainData(
+            repository=repository,
+            timer=ReminderTimer(hass),
+            unsub_stop=hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, _async_flush_on_stop
+            ),
+        )
+        hass.data[DOMAIN] = domain_data
+
+    await domain_data.repository.async_ensure_loaded()
+    return domain_data.repository
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: MedExpertConfigEntry,
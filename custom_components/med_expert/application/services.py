@@ -8,12 +8,14 @@ Coordinates between domain models, repository, and providers.
 from __future__ import annotations
 
 from collections.abc import Awaitable, Callable
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, fields
 from datetime import date, datetime, timedelta
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from custom_components.med_expert.domain.models import (
     AdherenceStats,
+    CompiledSchedule,
     DosageForm,
     DosageFormInfo,
     DoseQuantity,
@@ -26,17 +28,26 @@ from custom_components.med_expert.domain.models import (
     Medication,
     MedicationRef,
     MedicationStatus,
+    Occurrence,
     Profile,
     ReminderPolicy,
     ScheduleKind,
     ScheduleSpec,
 )
 from custom_components.med_expert.domain.policies import compute_snooze_until
-from custom_components.med_expert.domain.schedule import compute_next_occurrence
+from custom_components.med_expert.domain.schedule import (
+    compute_next_occurrence,
+    compute_occurrences,
+)
 
 # Type alias for state change callback
 StateChangeCallback = Callable[[str, str], Awaitable[None]]
 
+# Log actions that account for a scheduled dose
+_HANDLED_ACTIONS = frozenset((LogAction.TAKEN, LogAction.SKIPPED, LogAction.MISSED))
+# Longest local day (DST fall-back), the reach of a same-day slot match
+_LONGEST_DAY = timedelta(hours=25)
+
 
 class MedicationServiceError(Exception):
     """Base exception for medication service errors."""
@@ -248,6 +259,81 @@ class UpdateNotificationSettingsCommand:
     message_template: str | None = None
 
 
+@dataclass
+class SetLogRetentionCommand:
+    """Command to set how long raw log records are kept."""
+
+    retention_days: int | None = None  # None keeps raw logs forever
+
+    def validate(self) -> None:
+        """Validate the command."""
+        if self.retention_days is not None and self.retention_days < 1:
+            msg = "Log retention must be at least 1 day"
+            raise ValidationError(msg)
+
+
+# Commands written to the command journal before they are applied, by
+# the name stored with each journal event
+JOURNALED_COMMANDS: dict[str, type] = {
+    "take": TakeCommand,
+    "prn_take": PRNTakeCommand,
+    "snooze": SnoozeCommand,
+    "skip": SkipCommand,
+    "refill": RefillCommand,
+    "replace_inhaler": ReplaceInhalerCommand,
+}
+
+
+def command_name(command: object) -> str:
+    """
+    Get the journal name of a command.
+
+    Args:
+        command: A command listed in JOURNALED_COMMANDS.
+
+    Returns:
+        The name stored with journal events.
+
+    """
+    for name, command_type in JOURNALED_COMMANDS.items():
+        if type(command) is command_type:
+            return name
+    msg = f"{type(command).__name__} is not journaled"
+    raise ValueError(msg)
+
+
+def command_to_dict(command: object) -> dict[str, Any]:
+    """Serialize a journaled command; datetimes become ISO strings."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in asdict(command).items()
+    }
+
+
+def command_from_dict(name: str, data: dict[str, Any]) -> object:
+    """
+    Deserialize a journaled command.
+
+    Args:
+        name: The journal name of the command.
+        data: Data produced by command_to_dict.
+
+    Returns:
+        The command.
+
+    """
+    command_type = JOURNALED_COMMANDS[name]
+    values = {}
+    for command_field in fields(command_type):
+        if command_field.name not in data:
+            continue
+        value = data[command_field.name]
+        if value is not None and str(command_field.type).startswith("datetime"):
+            value = datetime.fromisoformat(value)
+        values[command_field.name] = value
+    return command_type(**values)
+
+
 # ============================================================================
 # Application Service
 # ============================================================================
@@ -403,6 +489,7 @@ class MedicationService:
             schedule_dict = medication.schedule.to_dict()
             schedule_dict.update(command.schedule_updates)
             medication.schedule = ScheduleSpec.from_dict(schedule_dict)
+            medication.invalidate_compiled_schedule()
 
         # Update policy
         if command.policy_updates:
@@ -490,6 +577,25 @@ class MedicationService:
         """
         return profile.remove_medication(medication_id)
 
+    def apply_command(self, profile: Profile, command: object) -> None:
+        """
+        Apply a journaled command, as when replaying the command journal.
+
+        Args:
+            profile: The profile.
+            command: A command listed in JOURNALED_COMMANDS.
+
+        """
+        handlers: dict[type, Callable[[Profile, Any], object]] = {
+            TakeCommand: self.take,
+            PRNTakeCommand: self.prn_take,
+            SnoozeCommand: self.snooze,
+            SkipCommand: self.skip,
+            RefillCommand: self.refill,
+            ReplaceInhalerCommand: self.replace_inhaler,
+        }
+        handlers[type(command)](profile, command)
+
     def take(
         self,
         profile: Profile,
@@ -692,6 +798,7 @@ class MedicationService:
         log = LogRecord(
             action=LogAction.SNOOZED,
             taken_at=now,
+            medication_id=command.medication_id,
             scheduled_for=medication.state.next_due,
             dose=medication.state.next_dose,
             meta={"snooze_until": snooze_until.isoformat()},
@@ -739,6 +846,7 @@ class MedicationService:
         log = LogRecord(
             action=LogAction.SKIPPED,
             taken_at=now,
+            medication_id=command.medication_id,
             scheduled_for=medication.state.next_due,
             dose=medication.state.next_dose,
             slot_key=medication.state.next_slot_key,
@@ -748,7 +856,7 @@ class MedicationService:
         profile.add_log(log)
 
         # Update state - mark the scheduled slot as taken to move to next slot
-        # We use the scheduled time (not current time) so _is_same_slot_taken works
+        # We use the scheduled time (not current time) so the slot counts as taken
         if medication.state.next_due:
             medication.state.last_taken = medication.state.next_due
         else:
@@ -868,10 +976,57 @@ class MedicationService:
         if command.message_template is not None:
             settings.message_template = command.message_template
 
+    def set_log_retention(
+        self,
+        profile: Profile,
+        command: SetLogRetentionCommand,
+    ) -> None:
+        """
+        Set the log retention of a profile.
+
+        Args:
+            profile: The profile.
+            command: The set log retention command.
+
+        Raises:
+            ValidationError: If the retention is invalid.
+
+        """
+        command.validate()
+        profile.log_retention_days = command.retention_days
+
+    def apply_log_retention(self, profile: Profile) -> list[LogRecord]:
+        """
+        Archive raw log records older than the profile's retention window.
+
+        Records are rolled up into per-day aggregates on the profile.
+        The window is aligned to the start of the local day so that a
+        day is never split between raw records and aggregates.
+
+        Args:
+            profile: The profile.
+
+        Returns:
+            The archived raw log records.
+
+        """
+        if profile.log_retention_days is None:
+            return []
+
+        tz = ZoneInfo(profile.timezone)
+        now = self._get_now().astimezone(tz)
+        cutoff_day = now.date() - timedelta(days=profile.log_retention_days)
+        cutoff = datetime.combine(cutoff_day, datetime.min.time(), tzinfo=tz)
+        return profile.archive_logs_before(cutoff)
+
     def calculate_adherence_stats(self, profile: Profile) -> AdherenceStats:
         """
         Calculate adherence statistics for a profile.
 
+        Reads the profile's running adherence counters, so the cost does
+        not grow with the log history. Rates cover whole local days: today,
+        the last 7 days and the last 30 days.
+
         Args:
             profile: The profile.
 
@@ -880,40 +1035,35 @@ class MedicationService:
 
         """
         now = self._get_now()
+        today = now.astimezone(ZoneInfo(profile.timezone)).date()
+        tracker = profile.adherence_tracker
         stats = profile.adherence_stats
 
         # Calculate rates
-        stats.daily_rate = profile.calculate_adherence(days=1)
-        stats.weekly_rate = profile.calculate_adherence(days=7)
-        stats.monthly_rate = profile.calculate_adherence(days=30)
-
-        # Count totals (last 30 days)
-        cutoff = now - timedelta(days=30)
-        stats.total_taken = sum(
-            1
-            for log in profile.logs
-            if log.taken_at >= cutoff
-            and log.action in (LogAction.TAKEN, LogAction.PRN_TAKEN)
-        )
-        stats.total_missed = sum(
-            1
-            for log in profile.logs
-            if log.taken_at >= cutoff and log.action == LogAction.MISSED
-        )
-        stats.total_skipped = sum(
-            1
-            for log in profile.logs
-            if log.taken_at >= cutoff and log.action == LogAction.SKIPPED
+        stats.daily_rate = tracker.rate(today, 1)
+        stats.weekly_rate = tracker.rate(today, 7)
+        stats.monthly_rate = tracker.rate(today, 30)
+
+        # Count totals (last 30 days, including archived aggregates)
+        taken, skipped, missed = tracker.counts(today, 30)
+        stats.total_taken = taken
+        stats.total_missed = missed
+        stats.total_skipped = skipped
+
+        # Streak of days on which a medication was taken, only meaningful
+        # while there are scheduled medications
+        has_scheduled = any(
+            med.schedule.kind != ScheduleKind.AS_NEEDED and med.is_active
+            for med in profile.medications.values()
         )
-
-        # Calculate streak
-        stats.current_streak = self._calculate_current_streak(profile)
+        stats.current_streak = tracker.current_streak(today) if has_scheduled else 0
+        stats.last_streak_date = tracker.streak_end
         # Update longest streak - always maintain the maximum value seen
         stats.longest_streak = max(stats.longest_streak, stats.current_streak)
 
-        # Find most missed slot
-        stats.most_missed_slot = self._find_most_missed_slot(profile)
-        most_missed_med_id = self._find_most_missed_medication(profile)
+        # Find most missed slot and medication
+        stats.most_missed_slot = tracker.most_missed_slot()
+        most_missed_med_id = tracker.most_missed_medication_id()
         stats.most_missed_medication_id = most_missed_med_id
         if most_missed_med_id:
             med = profile.get_medication(most_missed_med_id)
@@ -923,77 +1073,180 @@ class MedicationService:
 
         return stats
 
-    def _calculate_current_streak(self, profile: Profile) -> int:
-        """Calculate the current consecutive days streak of taking all medications."""
-        if not profile.logs:
-            return 0
+    def backfill_missed_doses(
+        self,
+        profile: Profile,
+        max_window: timedelta,
+    ) -> list[LogRecord]:
+        """
+        Log the scheduled doses that passed without being handled.
 
-        today = self._get_now().date()
-        streak = 0
+        Run before the states are recomputed on startup: a medication's
+        stored next_due is the first dose not yet handled when Home
+        Assistant stopped. Every occurrence from there until the grace
+        period before now that has no TAKEN, SKIPPED or MISSED record is
+        logged as MISSED, so a restart or downtime does not improve the
+        adherence rates. Only the last max_window is looked at.
 
-        # Group logs by date and check if all scheduled meds were taken
-        scheduled_meds = [
-            med
-            for med in profile.medications.values()
-            if med.schedule.kind != ScheduleKind.AS_NEEDED and med.is_active
-        ]
+        Args:
+            profile: The profile.
+            max_window: The longest stretch of time backfilled.
 
-        if not scheduled_meds:
-            return 0
+        Returns:
+            The MISSED records added, oldest first.
 
-        for days_back in range(365):  # Max 1 year
-            check_date = today - timedelta(days=days_back)
-            logs_for_date = [
-                log
-                for log in profile.logs
-                if log.taken_at.date() == check_date and log.action == LogAction.TAKEN
-            ]
+        """
+        now = self._get_now()
+        missed = [
+            log
+            for medication in profile.medications.values()
+            for log in self._missed_dose_logs(profile, medication, now, max_window)
+        ]
+        missed.sort(key=lambda log: log.taken_at)
+        for log in missed:
+            profile.add_log(log)
+        return missed
 
-            # Check if all scheduled meds have at least one taken log
-            med_ids_taken = {
-                log.medication_id for log in logs_for_date if log.medication_id
-            }
+    def _missed_dose_logs(
+        self,
+        profile: Profile,
+        medication: Medication,
+        now: datetime,
+        max_window: timedelta,
+    ) -> list[LogRecord]:
+        """
+        Build MISSED records of a medication's unhandled doses.
 
-            # Simplified check: if any medication was taken, count the day
-            # A more sophisticated version would check against expected doses
-            if med_ids_taken:
-                streak += 1
-            else:
-                break
+        Args:
+            profile: The profile (for timezone and logs).
+            medication: The medication.
+            now: The current time.
+            max_window: The longest stretch of time backfilled.
 
-        return streak
+        Returns:
+            The MISSED records, oldest first.
 
-    def _find_most_missed_slot(self, profile: Profile) -> str | None:
-        """Find the time slot with the most missed doses."""
-        from collections import Counter
+        """
+        start = medication.state.next_due
+        if (
+            start is None
+            or not medication.is_active
+            or medication.schedule.kind == ScheduleKind.AS_NEEDED
+        ):
+            return []
+        start = max(start, now - max_window)
+        end = now - timedelta(minutes=medication.policy.grace_minutes)
+        compiled = medication.compiled_schedule(profile.timezone)
+        # The dose still pending once the state is recomputed can be taken
+        # late; it is not missed yet
+        pending, _ = compute_next_occurrence(
+            timezone=profile.timezone,
+            schedule=medication.schedule,
+            now=now,
+            last_taken=medication.state.last_taken,
+            snooze_until=medication.state.snooze_until,
+            policy=medication.policy,
+            compiled=compiled,
+        )
+        if pending is not None:
+            end = min(end, pending.scheduled_for)
+        if end <= start:
+            return []
 
-        missed_slots = [
-            log.slot_key
-            for log in profile.logs
-            if log.action == LogAction.MISSED and log.slot_key
+        if medication.schedule.kind in (ScheduleKind.INTERVAL, ScheduleKind.DEPOT):
+            occurrences = self._interval_occurrences(medication, compiled, start, end)
+        else:
+            occurrences = compute_occurrences(
+                medication.schedule, start, end, profile.timezone, compiled=compiled
+            )
+        if not occurrences:
+            return []
+
+        # Doses already accounted for, by time and by local day and slot
+        tz = compiled.tz
+        handled_at: set[datetime] = set()
+        handled_slots: set[tuple[date, str]] = set()
+        # A dose is handled by a record from its local day or taken after it
+        logs = profile.logs
+        for _, position in profile.medication_index.iter_between(
+            medication.medication_id, start - _LONGEST_DAY
+        ):
+            taken_at, action, scheduled_for, slot_key = logs.slot_summary(position)
+            if action not in _HANDLED_ACTIONS:
+                continue
+            if scheduled_for is not None:
+                handled_at.add(scheduled_for)
+            if slot_key is not None:
+                day = (scheduled_for or taken_at).astimezone(tz).date()
+                handled_slots.add((day, slot_key))
+
+        return [
+            LogRecord(
+                action=LogAction.MISSED,
+                taken_at=occurrence.scheduled_for,
+                medication_id=medication.medication_id,
+                scheduled_for=occurrence.scheduled_for,
+                dose=occurrence.dose,
+                slot_key=occurrence.slot_key,
+                meta={"backfilled": True},
+            )
+            for occurrence in occurrences
+            if occurrence.scheduled_for not in handled_at
+            and (occurrence.scheduled_for.astimezone(tz).date(), occurrence.slot_key)
+            not in handled_slots
         ]
 
-        if not missed_slots:
-            return None
-
-        counter = Counter(missed_slots)
-        return counter.most_common(1)[0][0]
+    def _interval_occurrences(
+        self,
+        medication: Medication,
+        compiled: CompiledSchedule,
+        start: datetime,
+        end: datetime,
+    ) -> list[Occurrence]:
+        """
+        Expand an interval schedule from its pending dose.
 
-    def _find_most_missed_medication(self, profile: Profile) -> str | None:
-        """Find the medication with the most missed doses."""
-        from collections import Counter
+        Interval doses count from the last dose taken, so the stored
+        next_due anchors the doses that followed it.
 
-        missed_meds = [
-            log.medication_id
-            for log in profile.logs
-            if log.action == LogAction.MISSED and log.medication_id
-        ]
+        Args:
+            medication: The medication.
+            compiled: The medication's compiled schedule.
+            start: Start of the range (inclusive).
+            end: End of the range (exclusive).
 
-        if not missed_meds:
-            return None
+        Returns:
+            The occurrences in the range, in chronological order.
 
-        counter = Counter(missed_meds)
-        return counter.most_common(1)[0][0]
+        """
+        schedule = medication.schedule
+        if not schedule.interval_minutes or schedule.default_dose is None:
+            return []
+        # Stored times have a fixed offset; step in the profile's timezone
+        # across DST changes, as the live schedule does
+        anchor = medication.state.next_due.astimezone(compiled.tz)
+        interval = timedelta(minutes=schedule.interval_minutes)
+        # Slot keys continue the offset of the pending dose
+        offset = (medication.state.next_slot_key or "").removeprefix("interval_")
+        base = int(offset) if offset.isdigit() else 0
+        # Wall-clock steps from the anchor, as the live schedule counts
+        start = start.astimezone(compiled.tz)
+        steps = max(0, -((anchor - start) // interval))
+        occurrences = []
+        due = anchor + steps * interval
+        while due < end:
+            if schedule.end_date and due.date() > schedule.end_date:
+                break
+            occurrences.append(
+                Occurrence(
+                    scheduled_for=due,
+                    dose=schedule.default_dose,
+                    slot_key=f"interval_{base + steps * schedule.interval_minutes}",
+                )
+            )
+            steps += 1
+            due = anchor + steps * interval
+        return occurrences
 
     def recompute_all_states(self, profile: Profile) -> None:
         """
@@ -1024,6 +1277,7 @@ class MedicationService:
             last_taken=medication.state.last_taken,
             snooze_until=medication.state.snooze_until,
             policy=medication.policy,
+            compiled=medication.compiled_schedule(profile.timezone),
         )
 
         if occurrence:
@@ -6,13 +6,13 @@ import logging
 from typing import TYPE_CHECKING
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .application.services import PRNTakeCommand, SnoozeCommand, TakeCommand
 from .const import DOMAIN
 from .domain.models import Medication, ScheduleKind
+from .entity_tracker import MedicationEntityTracker, medication_device_identifier
 from .runtime.manager import SIGNAL_MEDICATIONS_CHANGED
 
 if TYPE_CHECKING:
@@ -30,26 +30,18 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Med Expert buttons."""
-    manager = entry.runtime_data.manager
-
-    # Create buttons for existing medications
-    entities: list[ButtonEntity] = []
-    for medication in manager.get_all_medications().values():
-        entities.extend(_create_medication_buttons(entry, medication))
-
-    async_add_entities(entities)
-
-    # Listen for medication changes
-    @callback
-    def _handle_medications_changed() -> None:
-        """Handle medications added or removed."""
-        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+    # Create buttons for existing medications, then add and remove them as
+    # medications are added and removed
+    tracker = MedicationEntityTracker(
+        hass, entry, async_add_entities, _create_medication_buttons
+    )
+    tracker.async_sync()
 
     entry.async_on_unload(
         async_dispatcher_connect(
             hass,
             SIGNAL_MEDICATIONS_CHANGED.format(entry_id=entry.entry_id),
-            _handle_medications_changed,
+            tracker.async_sync,
         )
     )
 
@@ -93,7 +85,9 @@ class MedicationBaseButton(ButtonEntity):
 
         # Device info - group all entities for same medication
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{entry.entry_id}_{medication.medication_id}")},
+            identifiers={
+                medication_device_identifier(entry.entry_id, medication.medication_id)
+            },
             name=medication.display_name,
             manufacturer="Med Expert",
             model="Medication",
@@ -0,0 +1,147 @@
+"""
+Write-ahead command journal for med_expert.
+
+Dose commands (take, skip, refill, ...) are appended to this journal and
+flushed to disk before they change the in-memory profile. The profile
+document is written with a delay, so after a crash the journal holds the
+commands the stored profiles do not reflect yet; the store replays them
+on load. Events are dropped once a save of the store document covers
+them (a checkpoint).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import COMMAND_JOURNAL_FILE
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandJournal:
+    """
+    Append-only file of journaled command events.
+
+    Each event is a JSON object on its own line with the keys seq,
+    profile_id, command, at and data. All file access runs in the
+    executor; appends and checkpoints are serialized with a lock.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """
+        Initialize the journal.
+
+        Args:
+            hass: Home Assistant instance.
+
+        """
+        self._hass = hass
+        self._path = Path(hass.config.path(STORAGE_DIR, COMMAND_JOURNAL_FILE))
+        self._lock = asyncio.Lock()
+
+    async def async_load(self) -> list[dict[str, Any]]:
+        """
+        Load all events in the journal.
+
+        Returns:
+            Events in append order.
+
+        """
+        async with self._lock:
+            return await self._hass.async_add_executor_job(_read_events, self._path)
+
+    async def async_append(self, event: dict[str, Any]) -> None:
+        """
+        Append an event and wait until it is on disk.
+
+        Args:
+            event: The event to append.
+
+        """
+        async with self._lock:
+            await self._hass.async_add_executor_job(_append_event, self._path, event)
+
+    async def async_checkpoint(self, command_seqs: dict[str, int]) -> None:
+        """
+        Drop events that a written store document covers.
+
+        Args:
+            command_seqs: Last applied event sequence number per profile, as
+                written in the store document. Events of profiles that are
+                not listed are dropped as well.
+
+        """
+        async with self._lock:
+            await self._hass.async_add_executor_job(
+                _drop_events, self._path, command_seqs
+            )
+
+
+# ============================================================================
+# Blocking file helpers (run in the executor)
+# ============================================================================
+
+
+def _read_events(path: Path) -> list[dict[str, Any]]:
+    """Read the events of the journal, which may not exist."""
+    events: list[dict[str, Any]] = []
+    if not path.is_file():
+        return events
+    with path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle):
+            line = line.strip()  # noqa: PLW2901
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                # Torn write of the last event; it was never applied
+                _LOGGER.warning(
+                    "Skipping unreadable line %d in command journal %s",
+                    line_number + 1,
+                    path,
+                )
+    return events
+
+
+def _append_event(path: Path, event: dict[str, Any]) -> None:
+    """Append an event and fsync the journal."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _drop_events(path: Path, command_seqs: dict[str, int]) -> None:
+    """Rewrite the journal without the events covered by command_seqs."""
+    events = _read_events(path)
+    kept = [
+        event
+        for event in events
+        if event["profile_id"] in command_seqs
+        and event["seq"] > command_seqs[event["profile_id"]]
+    ]
+    if len(kept) == len(events):
+        return
+    if not kept:
+        path.unlink(missing_ok=True)
+        return
+
+    temp = path.with_suffix(".tmp")
+    with temp.open("w", encoding="utf-8") as handle:
+        for event in kept:
+            handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+    temp.replace(path)
@@ -38,11 +38,26 @@ SCHEDULE_AS_NEEDED: Final = "as_needed"
 # Store
 STORE_KEY: Final = "med_expert_data"
 STORE_VERSION: Final = 2  # Bumped for inventory/adherence/notification settings
+STORE_MINOR_VERSION: Final = 2  # Bumped when logs moved to the log journal
+
+# Log journal (append-only log segments, one directory per profile)
+LOG_JOURNAL_DIR: Final = "med_expert_logs"
+
+# Write-ahead journal of dose commands not yet checkpointed in the store
+COMMAND_JOURNAL_FILE: Final = "med_expert_commands.jsonl"
+
+# Seconds profile updates are coalesced before the store is written
+SAVE_DELAY_SECONDS: Final = 5
+
+# Days of missed doses logged at most when starting after downtime
+MISSED_BACKFILL_DAYS: Final = 7
 
 # Notification actions
 NOTIFICATION_ACTION_TAKEN: Final = "MED_EXPERT_TAKEN"
 NOTIFICATION_ACTION_SNOOZE: Final = "MED_EXPERT_SNOOZE"
 NOTIFICATION_ACTION_SKIP: Final = "MED_EXPERT_SKIP"
+NOTIFICATION_ACTION_TAKE_ALL: Final = "MED_EXPERT_TAKE_ALL"
+NOTIFICATION_ACTION_SNOOZE_ALL: Final = "MED_EXPERT_SNOOZE_ALL"
 
 # Event types
 EVENT_MOBILE_APP_NOTIFICATION_ACTION: Final = "mobile_app_notification_action"
@@ -6,9 +6,13 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.config_entries import ConfigEntry
 
     from .runtime.manager import ProfileManager
+    from .runtime.scheduler import ReminderTimer
+    from .store import ProfileRepository
 
 
 type MedExpertConfigEntry = ConfigEntry[MedExpertData]
@@ -19,3 +23,12 @@ class MedExpertData:
     """Data for the Med Expert integration."""
 
     manager: ProfileManager
+
+
+@dataclass
+class MedExpertDomainData:
+    """Data shared by all Med Expert config entries, kept in hass.data[DOMAIN]."""
+
+    repository: ProfileRepository
+    timer: ReminderTimer
+    unsub_stop: Callable[[], None] | None = None
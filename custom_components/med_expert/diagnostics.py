@@ -6,10 +6,12 @@ from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.diagnostics import async_redact_data
 
+from .const import DOMAIN
+
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
 
-    from .data import MedExpertConfigEntry
+    from .data import MedExpertConfigEntry, MedExpertDomainData
 
 # Keys to redact from diagnostics
 TO_REDACT = {
@@ -57,6 +59,9 @@ async def async_get_config_entry_diagnostics(
     log_stats = {
         "total_logs": len(profile.logs),
         "action_counts": {},
+        "retention_days": profile.log_retention_days,
+        "archived_aggregates": len(profile.log_aggregates),
+        "has_archived_logs": profile.logs_archived_before is not None,
     }
     for log in profile.logs:
         action = log.action.value
@@ -70,6 +75,25 @@ async def async_get_config_entry_diagnostics(
         kind = med.schedule.kind.value
         schedule_kinds[kind] = schedule_kinds.get(kind, 0) + 1
 
+    # Write coalescing of the shared repository
+    domain_data: MedExpertDomainData | None = hass.data.get(DOMAIN)
+    storage_stats = {}
+    if domain_data is not None:
+        storage_stats = {
+            "coalesced_writes": domain_data.repository.coalesced_writes,
+            "has_pending_write": domain_data.repository.is_dirty(manager.profile_id),
+        }
+
+    # Reminder events waiting on the timer shared by all profiles
+    timer_stats = {}
+    if domain_data is not None:
+        timer_stats = {
+            "pending_events": domain_data.timer.pending_count(manager.profile_id),
+            "pending_events_all_profiles": sum(
+                domain_data.timer.pending_counts().values()
+            ),
+        }
+
     diagnostics = {
         "profile": {
             "name": profile.name,
@@ -79,6 +103,8 @@ async def async_get_config_entry_diagnostics(
         "medications": medications_summary,
         "schedule_kind_distribution": schedule_kinds,
         "log_statistics": log_stats,
+        "storage": storage_stats,
+        "reminders": timer_stats,
         "entry": {
             "entry_id": entry.entry_id,
             "title": entry.title,
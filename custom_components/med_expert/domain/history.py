@@ -0,0 +1,215 @@
+"""
+Paginated queries over a profile's log records.
+
+Pure domain logic with no Home Assistant dependencies. Queries are
+answered from the profile's time and medication indexes: the time range
+and the medication are found by bisection, and pages are read lazily
+from there, so a page costs about its size no matter how long the
+history is. Records are only deserialized once they match.
+
+Pages continue from an opaque cursor naming the last record returned, by
+its time and by how many records of that same time were passed, so
+cursors stay valid while records are appended or archived.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from .models import LogAction
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .models import LogRecord, Profile
+
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 500
+
+_CURSOR_SEPARATOR = "|"
+_MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryQuery:
+    """Filters and paging of a history query."""
+
+    start: datetime | None = None  # inclusive, open if None
+    end: datetime | None = None  # exclusive, open if None
+    medication_id: str | None = None
+    actions: frozenset[LogAction] | None = None  # all actions if None
+    limit: int = DEFAULT_HISTORY_LIMIT
+    cursor: str | None = None
+    newest_first: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryPage:
+    """One page of a history query."""
+
+    records: list[LogRecord]
+    # Cursor of the next page, None on the last page
+    next_cursor: str | None
+
+
+def query_history(profile: Profile, query: HistoryQuery) -> HistoryPage:
+    """
+    Get one page of log records matching a query.
+
+    Args:
+        profile: The profile.
+        query: The query.
+
+    Returns:
+        The page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    """
+    start, end = query.start, query.end
+    skip = 0
+    cursor_time: datetime | None = None
+    if query.cursor:
+        cursor_time, skip = _decode_cursor(query.cursor)
+        # Continue at the cursor's time; records passed there are skipped
+        if query.newest_first:
+            cursor_end = cursor_time + _MICROSECOND
+            end = cursor_end if end is None else min(end, cursor_end)
+        else:
+            start = cursor_time if start is None else max(start, cursor_time)
+    cursor_timestamp = cursor_time.timestamp() if cursor_time else None
+
+    logs = profile.logs
+    records: list[LogRecord] = []
+    # Last candidate looked at, and how many candidates of its time were
+    # passed up to it
+    previous: tuple[int, int] | None = None
+    run_timestamp: float | None = None
+    run_count = 0
+    for timestamp, position in _candidates(profile, query, start, end):
+        if timestamp == run_timestamp:
+            run_count += 1
+        else:
+            run_timestamp, run_count = timestamp, 1
+        if timestamp == cursor_timestamp and run_count <= skip:
+            # Returned or passed on an earlier page
+            continue
+
+        if len(records) == query.limit:
+            # A full page, and more candidates after it
+            last_position, passed = previous
+            return HistoryPage(
+                records, _encode_cursor(logs.taken_at(last_position), passed)
+            )
+
+        if query.actions is None or logs.summary(position)[1] in query.actions:
+            records.append(logs[position])
+        previous = (position, run_count)
+
+    return HistoryPage(records, None)
+
+
+def count_history_by_day(profile: Profile, query: HistoryQuery) -> list[dict]:
+    """
+    Count the log records matching a query per local day and action.
+
+    Archived days count from their aggregates, so the counts cover the
+    whole history even after raw records were archived. Paging fields of
+    the query are ignored.
+
+    Args:
+        profile: The profile.
+        query: The query.
+
+    Returns:
+        One dictionary per day with records, oldest first, with the
+        count of every action.
+
+    """
+    tz = ZoneInfo(profile.timezone)
+    actions = query.actions if query.actions is not None else frozenset(LogAction)
+    days: dict[date, dict[LogAction, int]] = {}
+
+    logs = profile.logs
+    for _, position in _candidates(profile, query, query.start, query.end):
+        taken_at, action, _, _ = logs.summary(position)
+        if action in actions:
+            counts = days.setdefault(taken_at.astimezone(tz).date(), {})
+            counts[action] = counts.get(action, 0) + 1
+
+    if profile.log_aggregates:
+        first_day = query.start.astimezone(tz).date() if query.start else None
+        last_day = (
+            (query.end - _MICROSECOND).astimezone(tz).date() if query.end else None
+        )
+        for aggregate in profile.log_aggregates.values():
+            if (
+                (first_day is not None and aggregate.day < first_day)
+                or (last_day is not None and aggregate.day > last_day)
+                or (
+                    query.medication_id is not None
+                    and aggregate.medication_id != query.medication_id
+                )
+            ):
+                continue
+            counts = days.setdefault(aggregate.day, {})
+            for action in actions:
+                if count := aggregate.count(action):
+                    counts[action] = counts.get(action, 0) + count
+
+    return [
+        {
+            "day": day.isoformat(),
+            **{action.value: days[day].get(action, 0) for action in LogAction},
+        }
+        for day in sorted(days)
+        if days[day]
+    ]
+
+
+def _candidates(
+    profile: Profile,
+    query: HistoryQuery,
+    start: datetime | None,
+    end: datetime | None,
+) -> Iterator[tuple[float, int]]:
+    """Iterate over the indexed records in range, of the medication if any."""
+    reverse = query.newest_first
+    if query.medication_id is None:
+        return profile.time_index.iter_between(start, end, reverse=reverse)
+    if query.medication_id in profile.medications:
+        return profile.medication_index.iter_between(
+            query.medication_id, start, end, reverse=reverse
+        )
+    # Removed medications are not in the medication index
+    logs = profile.logs
+    return (
+        (timestamp, position)
+        for timestamp, position in profile.time_index.iter_between(
+            start, end, reverse=reverse
+        )
+        if logs.medication_id(position) == query.medication_id
+    )
+
+
+def _encode_cursor(taken_at: datetime, passed: int) -> str:
+    """Encode the cursor after a record."""
+    return f"{taken_at.isoformat()}{_CURSOR_SEPARATOR}{passed}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor into the time of its record and the records passed."""
+    try:
+        taken_at, passed = cursor.rsplit(_CURSOR_SEPARATOR, 1)
+        result = datetime.fromisoformat(taken_at), int(passed)
+    except ValueError as err:
+        msg = f"Invalid history cursor: {cursor}"
+        raise ValueError(msg) from err
+    if result[0].tzinfo is None or result[1] < 0:
+        msg = f"Invalid history cursor: {cursor}"
+        raise ValueError(msg)
+    return result
@@ -7,14 +7,20 @@ Uses rational numbers for doses to avoid float rounding errors.
 
 from __future__ import annotations
 
+import itertools
 import uuid
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator, MutableSequence
 from dataclasses import dataclass, field
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from enum import Enum
 from math import gcd
-from typing import ClassVar
+from typing import Any, ClassVar, overload
 from zoneinfo import ZoneInfo
 
+from .timezones import TransitionCache, transition_cache
+
 
 class ScheduleKind(str, Enum):
     """Types of medication schedules."""
@@ -396,6 +402,105 @@ class ScheduleSpec:
         )
 
 
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    """
+    A ScheduleSpec prepared for repeated occurrence computation.
+
+    Holds the slot times parsed and sorted, the weekdays as a bitmask,
+    the dose of every slot and the timezone object, so computing the next
+    occurrence does not re-parse the spec each time.
+
+    For daily and weekly schedules, every slot of the week that has a dose
+    is also listed in a table sorted by minute of the week (weekday * 1440
+    + minute of the day), so the next slot can be found with bisect.
+    """
+
+    spec: ScheduleSpec
+    timezone: str
+    tz: ZoneInfo
+    times: tuple[tuple[time, str], ...]  # (slot time, "HH:MM"), in order
+    weekday_mask: int  # bit n set for weekday n (0=Monday)
+    slot_doses: dict[str, DoseQuantity | None]
+    week_minutes: tuple[int, ...] = ()  # minute of the week of each slot
+    week_slots: tuple[tuple[time, str, DoseQuantity], ...] = ()  # time, key, dose
+
+    @classmethod
+    def compile(cls, spec: ScheduleSpec, timezone: str) -> CompiledSchedule:
+        """Compile a schedule for the given IANA timezone."""
+        times = []
+        for time_str in spec.times or ():
+            hour, minute = map(int, time_str.split(":"))
+            times.append((time(hour, minute), time_str))
+        times.sort()
+
+        weekday_mask = 0
+        for weekday in spec.weekdays or ():
+            weekday_mask |= 1 << weekday
+
+        if spec.kind == ScheduleKind.WEEKLY:
+            slot_keys = [
+                f"W{weekday}-{time_str}"
+                for weekday in range(7)
+                if weekday_mask & (1 << weekday)
+                for _, time_str in times
+            ]
+        else:
+            slot_keys = [time_str for _, time_str in times]
+        slot_doses = {key: spec.get_dose_for_slot(key) for key in slot_keys}
+
+        week_minutes: list[int] = []
+        week_slots: list[tuple[time, str, DoseQuantity]] = []
+        if spec.kind in (ScheduleKind.TIMES_PER_DAY, ScheduleKind.WEEKLY):
+            weekly = spec.kind == ScheduleKind.WEEKLY
+            for weekday in range(7):
+                if weekly and not weekday_mask & (1 << weekday):
+                    continue
+                for slot_time, time_str in times:
+                    slot_key = f"W{weekday}-{time_str}" if weekly else time_str
+                    dose = slot_doses[slot_key]
+                    if dose is None:
+                        continue
+                    week_minutes.append(
+                        weekday * MINUTES_PER_DAY
+                        + slot_time.hour * 60
+                        + slot_time.minute
+                    )
+                    week_slots.append((slot_time, slot_key, dose))
+
+        return cls(
+            spec=spec,
+            timezone=timezone,
+            tz=ZoneInfo(timezone),
+            times=tuple(times),
+            weekday_mask=weekday_mask,
+            slot_doses=slot_doses,
+            week_minutes=tuple(week_minutes),
+            week_slots=tuple(week_slots),
+        )
+
+    @property
+    def kind(self) -> ScheduleKind:
+        """Get the kind of the compiled schedule."""
+        return self.spec.kind
+
+    @property
+    def transitions(self) -> TransitionCache:
+        """Get the DST transition cache shared by all schedules of the timezone."""
+        return transition_cache(self.timezone)
+
+    def has_weekday(self, weekday: int) -> bool:
+        """Check whether the schedule includes a weekday (0=Monday)."""
+        return bool(self.weekday_mask & (1 << weekday))
+
+    def dose_for_slot(self, slot_key: str) -> DoseQuantity | None:
+        """Get the dose for a slot, falling back to the default dose."""
+        return self.slot_doses.get(slot_key, self.spec.default_dose)
+
+
 @dataclass
 class ReminderPolicy:
     """Policy for reminders and scheduling behavior."""
@@ -563,6 +668,532 @@ class LogRecord:
         )
 
 
+# Source of LazyLogList versions, unique across all lists
+_log_list_versions = itertools.count(1)
+
+
+class LazyLogList(MutableSequence[LogRecord]):
+    """
+    List of log records that are deserialized on first access.
+
+    Stored records are kept as the dictionaries read from storage and
+    only turned into LogRecord objects when an item is read, so loading
+    a profile does not pay for parsing its whole history. Behaves like
+    a list of LogRecord for all callers.
+
+    Every change other than an append gives the list a new version, so
+    indexes over record positions can tell that they went stale.
+    """
+
+    __slots__ = ("_default_dose", "_items", "_version")
+
+    def __init__(
+        self,
+        items: Iterable[LogRecord | dict[str, Any]] = (),
+        default_dose: DoseQuantity | None = None,
+    ) -> None:
+        """
+        Initialize the list.
+
+        Args:
+            items: Log records or serialized log records.
+            default_dose: Dose for serialized records without one (migration).
+
+        """
+        self._items: list[LogRecord | dict[str, Any]] = list(items)
+        self._default_dose = default_dose
+        self._version = next(_log_list_versions)
+
+    def _materialize(self, index: int) -> LogRecord:
+        """Get the record at index, deserializing it if needed."""
+        item = self._items[index]
+        if isinstance(item, dict):
+            item = LogRecord.from_dict(item, self._default_dose)
+            self._items[index] = item
+        return item
+
+    @property
+    def version(self) -> int:
+        """Return the version, changed by every mutation except appends."""
+        return self._version
+
+    @property
+    def materialized_count(self) -> int:
+        """Return how many records have been deserialized."""
+        return sum(1 for item in self._items if not isinstance(item, dict))
+
+    def taken_at(self, index: int) -> datetime:
+        """Get the taken_at of a record without deserializing the rest of it."""
+        item = self._items[index]
+        if isinstance(item, dict):
+            return datetime.fromisoformat(item["taken_at"])
+        return item.taken_at
+
+    def medication_id(self, index: int) -> str | None:
+        """Get the medication_id of a record without deserializing it."""
+        item = self._items[index]
+        if isinstance(item, dict):
+            return item.get("medication_id")
+        return item.medication_id
+
+    def summary(self, index: int) -> tuple[datetime, LogAction, str | None, str | None]:
+        """
+        Get the fields adherence is counted from without deserializing a record.
+
+        Args:
+            index: Position of the record.
+
+        Returns:
+            Tuple of (taken_at, action, medication_id, slot_key).
+
+        """
+        item = self._items[index]
+        if isinstance(item, dict):
+            return (
+                datetime.fromisoformat(item["taken_at"]),
+                LogAction(item["action"]),
+                item.get("medication_id"),
+                item.get("slot_key"),
+            )
+        return item.taken_at, item.action, item.medication_id, item.slot_key
+
+    def slot_summary(
+        self, index: int
+    ) -> tuple[datetime, LogAction, datetime | None, str | None]:
+        """
+        Get the fields a scheduled dose is matched by without deserializing a record.
+
+        Args:
+            index: Position of the record.
+
+        Returns:
+            Tuple of (taken_at, action, scheduled_for, slot_key).
+
+        """
+        item = self._items[index]
+        if isinstance(item, dict):
+            scheduled_for = item.get("scheduled_for")
+            return (
+                datetime.fromisoformat(item["taken_at"]),
+                LogAction(item["action"]),
+                datetime.fromisoformat(scheduled_for) if scheduled_for else None,
+                item.get("slot_key"),
+            )
+        return item.taken_at, item.action, item.scheduled_for, item.slot_key
+
+    def split_before(self, cutoff: datetime) -> tuple[list[LogRecord], LazyLogList]:
+        """
+        Split off the records taken before cutoff.
+
+        Records that stay keep their serialized form.
+
+        Args:
+            cutoff: Records taken before this time are split off.
+
+        Returns:
+            Tuple of (deserialized records before cutoff, remaining records).
+
+        """
+        before: list[LogRecord] = []
+        kept: list[LogRecord | dict[str, Any]] = []
+        for index, item in enumerate(self._items):
+            if self.taken_at(index) < cutoff:
+                before.append(self._materialize(index))
+            else:
+                kept.append(item)
+        return before, LazyLogList(kept, self._default_dose)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Serialize all records, reusing stored forms that were never read."""
+        return [
+            item
+            if isinstance(item, dict) and item.get("dose")
+            else self[index].to_dict()
+            for index, item in enumerate(self._items)
+        ]
+
+    @overload
+    def __getitem__(self, index: int) -> LogRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LogRecord]: ...
+
+    def __getitem__(self, index: int | slice) -> LogRecord | list[LogRecord]:
+        """Get a record or a list of records."""
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        return self._materialize(index)
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        """Replace a record or a slice of records."""
+        self._items[index] = value
+        self._version = next(_log_list_versions)
+
+    def __delitem__(self, index: int | slice) -> None:
+        """Delete a record or a slice of records."""
+        del self._items[index]
+        self._version = next(_log_list_versions)
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        """Iterate over the records, deserializing them as they are reached."""
+        for index in range(len(self._items)):
+            yield self._materialize(index)
+
+    def insert(self, index: int, value: LogRecord) -> None:
+        """Insert a record."""
+        if index < len(self._items):
+            self._version = next(_log_list_versions)
+        self._items.insert(index, value)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another sequence of records."""
+        if isinstance(other, (LazyLogList, list)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other, strict=True)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a representation that does not deserialize records."""
+        return f"LazyLogList(len={len(self)}, materialized={self.materialized_count})"
+
+
+class LogTimeIndex:
+    """
+    Index of a profile's log records ordered by taken_at.
+
+    Keeps the positions of records in the log list sorted by time, so a
+    time range is found by bisection, plus buckets of positions per local
+    day. Built from the records' timestamps only, without deserializing
+    the rest of each record.
+    """
+
+    __slots__ = ("_days", "_positions", "_size", "_times", "_tz")
+
+    def __init__(self, logs: LazyLogList, tz: ZoneInfo) -> None:
+        """
+        Build the index.
+
+        Args:
+            logs: The log records to index.
+            tz: Timezone that defines the day buckets.
+
+        """
+        self._tz = tz
+        self._times: list[float] = []
+        self._positions: list[int] = []
+        self._days: dict[date, list[int]] = {}
+        self._size = 0
+
+        entries = sorted(
+            (logs.taken_at(position), position) for position in range(len(logs))
+        )
+        for taken_at, position in entries:
+            self._times.append(taken_at.timestamp())
+            self._positions.append(position)
+            self._days.setdefault(taken_at.astimezone(tz).date(), []).append(position)
+        self._size = len(logs)
+
+    @property
+    def size(self) -> int:
+        """Return the number of indexed records."""
+        return self._size
+
+    def add(self, position: int, taken_at: datetime) -> None:
+        """
+        Index a record appended to the log list.
+
+        Args:
+            position: Position of the record in the log list.
+            taken_at: When the record was taken.
+
+        """
+        timestamp = taken_at.timestamp()
+        if not self._times or timestamp >= self._times[-1]:
+            self._times.append(timestamp)
+            self._positions.append(position)
+        else:
+            # Back-dated record
+            insert_at = bisect_right(self._times, timestamp)
+            self._times.insert(insert_at, timestamp)
+            self._positions.insert(insert_at, position)
+        self._days.setdefault(taken_at.astimezone(self._tz).date(), []).append(position)
+        self._size += 1
+
+    def positions_between(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[int]:
+        """
+        Get positions of records taken in [start, end), oldest first.
+
+        Args:
+            start: Start of the range, open if None.
+            end: End of the range (exclusive), open if None.
+
+        Returns:
+            Positions in the log list.
+
+        """
+        low, high = self._bounds(start, end)
+        return self._positions[low:high]
+
+    def iter_between(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        *,
+        reverse: bool = False,
+    ) -> Iterator[tuple[float, int]]:
+        """
+        Iterate over records taken in [start, end) without copying the range.
+
+        Args:
+            start: Start of the range, open if None.
+            end: End of the range (exclusive), open if None.
+            reverse: Newest first instead of oldest first.
+
+        Yields:
+            Tuples of (timestamp, position in the log list).
+
+        """
+        low, high = self._bounds(start, end)
+        times, positions = self._times, self._positions
+        indices = range(high - 1, low - 1, -1) if reverse else range(low, high)
+        for index in indices:
+            yield times[index], positions[index]
+
+    def _bounds(self, start: datetime | None, end: datetime | None) -> tuple[int, int]:
+        """Get the index range of records taken in [start, end)."""
+        low = 0 if start is None else bisect_left(self._times, start.timestamp())
+        high = (
+            len(self._times)
+            if end is None
+            else bisect_left(self._times, end.timestamp(), low)
+        )
+        return low, high
+
+    def positions_on(self, day: date) -> list[int]:
+        """Get positions of records taken on a local day, in insertion order."""
+        return self._days.get(day, [])
+
+    def days(self) -> set[date]:
+        """Get the local days that have records."""
+        return set(self._days)
+
+
+class LogMedicationIndex:
+    """
+    Index of a profile's log records per medication.
+
+    Maps each medication_id to the positions of its records in the log
+    list, ordered by taken_at.
+    """
+
+    __slots__ = ("_entries", "_size")
+
+    def __init__(
+        self,
+        logs: LazyLogList,
+        time_index: LogTimeIndex,
+        medication_ids: Iterable[str],
+    ) -> None:
+        """
+        Build the index.
+
+        Args:
+            logs: The log records to index.
+            time_index: Time index over the same records.
+            medication_ids: Medications whose records are indexed.
+
+        """
+        # medication_id -> [(timestamp, position)] in time order
+        self._entries: dict[str, list[tuple[float, int]]] = {}
+        indexed = set(medication_ids)
+        for position in time_index.positions_between():
+            medication_id = logs.medication_id(position)
+            if medication_id in indexed:
+                self._entries.setdefault(medication_id, []).append(
+                    (logs.taken_at(position).timestamp(), position)
+                )
+        self._size = len(logs)
+
+    @property
+    def size(self) -> int:
+        """Return the number of records covered by the index."""
+        return self._size
+
+    def add(self, position: int, log: LogRecord) -> None:
+        """
+        Index a record appended to the log list.
+
+        Args:
+            position: Position of the record in the log list.
+            log: The record.
+
+        """
+        self._size += 1
+        if not log.medication_id:
+            return
+        entry = (log.taken_at.timestamp(), position)
+        entries = self._entries.setdefault(log.medication_id, [])
+        if not entries or entry >= entries[-1]:
+            entries.append(entry)
+        else:
+            # Back-dated record
+            entries.insert(bisect_right(entries, entry), entry)
+
+    def discard(self, medication_id: str) -> None:
+        """Drop the records of a medication from the index."""
+        self._entries.pop(medication_id, None)
+
+    def positions(self, medication_id: str, limit: int | None = None) -> list[int]:
+        """
+        Get positions of a medication's records, oldest first.
+
+        Args:
+            medication_id: The medication ID.
+            limit: Only return the last limit positions.
+
+        Returns:
+            Positions in the log list.
+
+        """
+        entries = self._entries.get(medication_id, [])
+        if limit:
+            entries = entries[-limit:]
+        return [position for _, position in entries]
+
+    def iter_between(
+        self,
+        medication_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        *,
+        reverse: bool = False,
+    ) -> Iterator[tuple[float, int]]:
+        """
+        Iterate over a medication's records taken in [start, end).
+
+        Args:
+            medication_id: The medication ID.
+            start: Start of the range, open if None.
+            end: End of the range (exclusive), open if None.
+            reverse: Newest first instead of oldest first.
+
+        Yields:
+            Tuples of (timestamp, position in the log list).
+
+        """
+        entries = self._entries.get(medication_id, [])
+        low = 0 if start is None else bisect_left(entries, (start.timestamp(),))
+        high = (
+            len(entries)
+            if end is None
+            else bisect_left(entries, (end.timestamp(),), low)
+        )
+        indices = range(high - 1, low - 1, -1) if reverse else range(low, high)
+        for index in indices:
+            yield entries[index]
+
+
+@dataclass
+class LogAggregate:
+    """
+    Rolled-up log counts for one medication slot on one day.
+
+    Raw log records older than the retention window of a profile are
+    folded into these aggregates so long-range adherence and streak
+    queries keep working without keeping every record in memory.
+    """
+
+    day: date
+    medication_id: str | None = None
+    slot_key: str | None = None
+    taken: int = 0
+    prn_taken: int = 0
+    skipped: int = 0
+    missed: int = 0
+    snoozed: int = 0
+    dose_total: float = 0.0  # Sum of taken doses
+    dose_unit: str | None = None
+
+    @property
+    def key(self) -> str:
+        """Get the key identifying this aggregate."""
+        return aggregate_key(self.day, self.medication_id, self.slot_key)
+
+    def count(self, action: LogAction) -> int:
+        """Get the number of rolled-up records with an action."""
+        return {
+            LogAction.TAKEN: self.taken,
+            LogAction.PRN_TAKEN: self.prn_taken,
+            LogAction.SKIPPED: self.skipped,
+            LogAction.MISSED: self.missed,
+            LogAction.SNOOZED: self.snoozed,
+        }.get(action, 0)
+
+    def add(self, log: LogRecord) -> None:
+        """Fold a log record into this aggregate."""
+        if log.action == LogAction.TAKEN:
+            self.taken += 1
+        elif log.action == LogAction.PRN_TAKEN:
+            self.prn_taken += 1
+        elif log.action == LogAction.SKIPPED:
+            self.skipped += 1
+        elif log.action == LogAction.MISSED:
+            self.missed += 1
+        elif log.action == LogAction.SNOOZED:
+            self.snoozed += 1
+
+        if log.dose and log.action in (LogAction.TAKEN, LogAction.PRN_TAKEN):
+            self.dose_total += log.dose.to_float()
+            self.dose_unit = self.dose_unit or log.dose.unit
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for serialization."""
+        return {
+            "day": self.day.isoformat(),
+            "medication_id": self.medication_id,
+            "slot_key": self.slot_key,
+            "taken": self.taken,
+            "prn_taken": self.prn_taken,
+            "skipped": self.skipped,
+            "missed": self.missed,
+            "snoozed": self.snoozed,
+            "dose_total": self.dose_total,
+            "dose_unit": self.dose_unit,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LogAggregate:
+        """Create from dictionary."""
+        return cls(
+            day=date.fromisoformat(data["day"]),
+            medication_id=data.get("medication_id"),
+            slot_key=data.get("slot_key"),
+            taken=data.get("taken", 0),
+            prn_taken=data.get("prn_taken", 0),
+            skipped=data.get("skipped", 0),
+            missed=data.get("missed", 0),
+            snoozed=data.get("snoozed", 0),
+            dose_total=data.get("dose_total", 0.0),
+            dose_unit=data.get("dose_unit"),
+        )
+
+
+def aggregate_key(day: date, medication_id: str | None, slot_key: str | None) -> str:
+    """Build the key of a log aggregate."""
+    return f"{day.isoformat()}|{medication_id or ''}|{slot_key or ''}"
+
+
 @dataclass
 class Inventory:
     """Inventory tracking for a medication."""
@@ -766,6 +1397,10 @@ class Medication:
     notes: str | None = None
     # Active flag for soft-delete or pause
     is_active: bool = True
+    # Schedule compiled for the profile timezone, built on first use
+    _compiled_schedule: CompiledSchedule | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def create(
@@ -814,6 +1449,34 @@ class Medication:
             inhaler_tracking=inhaler_tracking,
         )
 
+    def compiled_schedule(self, timezone: str) -> CompiledSchedule:
+        """
+        Get the schedule compiled for a timezone.
+
+        Compiled on first use and again when the schedule is replaced or
+        the timezone changes.
+
+        Args:
+            timezone: IANA timezone string of the profile.
+
+        Returns:
+            The compiled schedule.
+
+        """
+        compiled = self._compiled_schedule
+        if (
+            compiled is None
+            or compiled.spec is not self.schedule
+            or compiled.timezone != timezone
+        ):
+            compiled = CompiledSchedule.compile(self.schedule, timezone)
+            self._compiled_schedule = compiled
+        return compiled
+
+    def invalidate_compiled_schedule(self) -> None:
+        """Drop the compiled schedule after the schedule was changed."""
+        self._compiled_schedule = None
+
     def get_icon(self) -> str:
         """Get the icon for this medication based on its form."""
         if self.form:
@@ -1014,6 +1677,236 @@ class AdherenceStats:
         )
 
 
+# Streaks are reported up to one year
+MAX_STREAK_DAYS = 365
+
+# Positions of the counters kept per day by AdherenceTracker
+_TAKEN = 0
+_SKIPPED = 1
+_MISSED = 2
+
+
+class AdherenceTracker:
+    """
+    Running adherence counters for a profile.
+
+    Keeps taken/skipped/missed counts per local day, the current streak
+    and missed counts per slot and medication. Each added log record
+    updates them in constant time, so statistics are read without
+    scanning the log history. A full pass over logs and archived
+    aggregates only happens when the tracker is built.
+    """
+
+    __slots__ = (
+        "_days",
+        "_days_taken",
+        "_missed_medications",
+        "_missed_slots",
+        "_size",
+        "_streak_end",
+        "_streak_length",
+        "_tz",
+    )
+
+    def __init__(self, tz: ZoneInfo) -> None:
+        """
+        Initialize an empty tracker.
+
+        Args:
+            tz: Timezone that defines the days.
+
+        """
+        self._tz = tz
+        self._days: dict[date, list[int]] = {}
+        self._days_taken: set[date] = set()
+        self._streak_end: date | None = None
+        self._streak_length = 0
+        self._missed_slots: Counter[str] = Counter()
+        self._missed_medications: Counter[str] = Counter()
+        self._size = 0
+
+    @classmethod
+    def build(
+        cls,
+        logs: LazyLogList,
+        aggregates: Iterable[LogAggregate],
+        tz: ZoneInfo,
+    ) -> AdherenceTracker:
+        """
+        Build a tracker from the full history.
+
+        Args:
+            logs: The raw log records.
+            aggregates: Archived daily aggregates.
+            tz: Timezone that defines the days.
+
+        Returns:
+            The tracker.
+
+        """
+        tracker = cls(tz)
+        for aggregate in aggregates:
+            tracker.add_aggregate(aggregate)
+        for position in range(len(logs)):
+            tracker._count(*logs.summary(position))
+        tracker._size = len(logs)
+        return tracker
+
+    @property
+    def size(self) -> int:
+        """Return the number of raw log records counted."""
+        return self._size
+
+    def add(self, log: LogRecord) -> None:
+        """Count a new log record."""
+        self._count(log.taken_at, log.action, log.medication_id, log.slot_key)
+        self._size += 1
+
+    def archived(self, count: int) -> None:
+        """
+        Note that raw records were archived.
+
+        Their counts stay, now represented by aggregates.
+
+        Args:
+            count: Number of records moved into aggregates.
+
+        """
+        self._size -= count
+
+    def add_aggregate(self, aggregate: LogAggregate) -> None:
+        """Count an archived daily aggregate."""
+        counts = self._day_counts(aggregate.day)
+        counts[_TAKEN] += aggregate.taken + aggregate.prn_taken
+        counts[_SKIPPED] += aggregate.skipped
+        counts[_MISSED] += aggregate.missed
+        if aggregate.taken and aggregate.medication_id:
+            self._add_streak_day(aggregate.day)
+        if aggregate.missed:
+            if aggregate.slot_key:
+                self._missed_slots[aggregate.slot_key] += aggregate.missed
+            if aggregate.medication_id:
+                self._missed_medications[aggregate.medication_id] += aggregate.missed
+
+    def _count(
+        self,
+        taken_at: datetime,
+        action: LogAction,
+        medication_id: str | None,
+        slot_key: str | None,
+    ) -> None:
+        """Count one log record."""
+        day = taken_at.astimezone(self._tz).date()
+        if action in (LogAction.TAKEN, LogAction.PRN_TAKEN):
+            self._day_counts(day)[_TAKEN] += 1
+            if action == LogAction.TAKEN and medication_id:
+                self._add_streak_day(day)
+        elif action == LogAction.SKIPPED:
+            self._day_counts(day)[_SKIPPED] += 1
+        elif action == LogAction.MISSED:
+            self._day_counts(day)[_MISSED] += 1
+            if slot_key:
+                self._missed_slots[slot_key] += 1
+            if medication_id:
+                self._missed_medications[medication_id] += 1
+
+    def _day_counts(self, day: date) -> list[int]:
+        """Get the counters of a day, creating them if needed."""
+        counts = self._days.get(day)
+        if counts is None:
+            counts = self._days[day] = [0, 0, 0]
+        return counts
+
+    def _add_streak_day(self, day: date) -> None:
+        """
+        Record a day on which a medication was taken.
+
+        The tracked streak is the run of consecutive days ending on the
+        latest such day.
+        """
+        if day in self._days_taken:
+            return
+        self._days_taken.add(day)
+
+        end = self._streak_end
+        if end is None or day > end + timedelta(days=1):
+            self._streak_end = day
+            self._streak_length = 1
+        elif day == end + timedelta(days=1):
+            self._streak_end = day
+            self._streak_length += 1
+        elif day == end - timedelta(days=self._streak_length):
+            # Back-dated day just before the streak, which may join an
+            # earlier run
+            self._streak_length += 1
+            start = day - timedelta(days=1)
+            while start in self._days_taken:
+                self._streak_length += 1
+                start -= timedelta(days=1)
+
+    @property
+    def streak_end(self) -> date | None:
+        """Return the latest day on which a medication was taken."""
+        return self._streak_end
+
+    def current_streak(self, today: date) -> int:
+        """Get the number of consecutive days up to today with a dose taken."""
+        if self._streak_end != today:
+            return 0
+        return min(self._streak_length, MAX_STREAK_DAYS)
+
+    def counts(self, today: date, days: int) -> tuple[int, int, int]:
+        """
+        Sum the counters of the last days.
+
+        Args:
+            today: The current local day.
+            days: Number of days, including today.
+
+        Returns:
+            Tuple of (taken, skipped, missed).
+
+        """
+        taken = skipped = missed = 0
+        for days_back in range(days):
+            counts = self._days.get(today - timedelta(days=days_back))
+            if counts is not None:
+                taken += counts[_TAKEN]
+                skipped += counts[_SKIPPED]
+                missed += counts[_MISSED]
+        return taken, skipped, missed
+
+    def rate(self, today: date, days: int) -> float:
+        """
+        Get the adherence rate of the last days.
+
+        Args:
+            today: The current local day.
+            days: Number of days, including today.
+
+        Returns:
+            Percentage (0-100) of taken vs expected doses.
+
+        """
+        taken, skipped, missed = self.counts(today, days)
+        expected = taken + skipped + missed
+        if expected == 0:
+            return 100.0
+        return round((taken / expected) * 100, 1)
+
+    def most_missed_slot(self) -> str | None:
+        """Get the slot with the most missed doses."""
+        if not self._missed_slots:
+            return None
+        return self._missed_slots.most_common(1)[0][0]
+
+    def most_missed_medication_id(self) -> str | None:
+        """Get the medication with the most missed doses."""
+        if not self._missed_medications:
+            return None
+        return self._missed_medications.most_common(1)[0][0]
+
+
 @dataclass
 class Profile:
     """
@@ -1026,7 +1919,7 @@ class Profile:
     name: str
     timezone: str
     medications: dict[str, Medication] = field(default_factory=dict)
-    logs: list[LogRecord] = field(default_factory=list)
+    logs: LazyLogList = field(default_factory=LazyLogList)
     default_policy: ReminderPolicy = field(default_factory=ReminderPolicy)
     # New fields
     notification_settings: NotificationSettings = field(
@@ -1036,6 +1929,40 @@ class Profile:
     # User metadata
     owner_name: str | None = None  # For multi-user display
     avatar: str | None = None  # Icon or image reference
+    # Log retention (None keeps raw logs forever)
+    log_retention_days: int | None = None
+    # Rolled-up history of archived logs, keyed by aggregate_key()
+    log_aggregates: dict[str, LogAggregate] = field(default_factory=dict)
+    # Logs taken before this time have been archived and rolled up
+    logs_archived_before: datetime | None = None
+    # Sequence number of the last command journal event applied
+    command_seq: int = 0
+    # Log records added since the last save (appended to the log journal)
+    _unsaved_logs: list[LogRecord] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # Time index over logs, built on first use
+    _time_index: LogTimeIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Per-medication index over logs, built on first use
+    _medication_index: LogMedicationIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    # Running adherence counters, built on first use
+    _adherence: AdherenceTracker | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Version of logs the indexes and counters above were kept in sync with
+    _logs_version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Wrap plain log lists and compile the loaded schedules."""
+        if not isinstance(self.logs, LazyLogList):
+            self.logs = LazyLogList(self.logs)
+        for medication in self.medications.values():
+            medication.compiled_schedule(self.timezone)
 
     @classmethod
     def create(
@@ -1058,28 +1985,251 @@ class Profile:
 
     def add_medication(self, medication: Medication) -> None:
         """Add a medication to this profile."""
+        medication.compiled_schedule(self.timezone)
         self.medications[medication.medication_id] = medication
 
     def remove_medication(self, medication_id: str) -> Medication | None:
-        """Remove a medication from this profile."""
+        """
+        Remove a medication from this profile.
+
+        Its log records stay in the history but are no longer listed
+        per medication.
+        """
+        if self._medication_index is not None:
+            self._medication_index.discard(medication_id)
         return self.medications.pop(medication_id, None)
 
     def get_medication(self, medication_id: str) -> Medication | None:
         """Get a medication by ID."""
         return self.medications.get(medication_id)
 
+    def _drop_stale_indexes(self) -> None:
+        """Drop the indexes and counters if logs changed other than by add_log."""
+        if self._logs_version != self.logs.version:
+            self._time_index = None
+            self._medication_index = None
+            self._adherence = None
+            self._logs_version = self.logs.version
+
     def add_log(self, log: LogRecord) -> None:
         """Add a log record."""
+        self._drop_stale_indexes()
+        position = len(self.logs)
+        index = self._time_index
+        if index is not None and index.size == position:
+            index.add(position, log.taken_at)
+        medication_index = self._medication_index
+        if medication_index is not None and medication_index.size == position:
+            medication_index.add(position, log)
+        tracker = self._adherence
+        if tracker is not None and tracker.size == position:
+            tracker.add(log)
         self.logs.append(log)
+        self._unsaved_logs.append(log)
+
+    @property
+    def adherence_tracker(self) -> AdherenceTracker:
+        """
+        Get the running adherence counters.
+
+        Built from the logs and archived aggregates on first use, kept up
+        to date by add_log and rebuilt if logs was changed otherwise.
+        """
+        self._drop_stale_indexes()
+        tracker = self._adherence
+        if tracker is None or tracker.size != len(self.logs):
+            tracker = AdherenceTracker.build(
+                self.logs, self.log_aggregates.values(), ZoneInfo(self.timezone)
+            )
+            self._adherence = tracker
+        return tracker
+
+    @property
+    def time_index(self) -> LogTimeIndex:
+        """
+        Get the time index over logs.
+
+        Built on first use and rebuilt if logs was changed other than
+        through add_log.
+        """
+        self._drop_stale_indexes()
+        index = self._time_index
+        if index is None or index.size != len(self.logs):
+            index = LogTimeIndex(self.logs, ZoneInfo(self.timezone))
+            self._time_index = index
+        return index
+
+    @property
+    def medication_index(self) -> LogMedicationIndex:
+        """
+        Get the per-medication index over logs.
+
+        Built on first use and rebuilt if logs was changed other than
+        through add_log. Only current medications are indexed.
+        """
+        self._drop_stale_indexes()
+        index = self._medication_index
+        if index is None or index.size != len(self.logs):
+            index = LogMedicationIndex(self.logs, self.time_index, self.medications)
+            self._medication_index = index
+        return index
+
+    def get_logs_between(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[LogRecord]:
+        """
+        Get log records taken in [start, end), oldest first.
+
+        Args:
+            start: Start of the range, open if None.
+            end: End of the range (exclusive), open if None.
+
+        Returns:
+            The log records in the range.
+
+        """
+        logs = self.logs
+        return [
+            logs[position] for position in self.time_index.positions_between(start, end)
+        ]
+
+    def get_logs_on(self, day: date) -> list[LogRecord]:
+        """
+        Get log records taken on a day in the profile's timezone.
+
+        Args:
+            day: The local day.
+
+        Returns:
+            The log records of that day.
+
+        """
+        logs = self.logs
+        return [logs[position] for position in self.time_index.positions_on(day)]
+
+    def get_unsaved_logs(self) -> list[LogRecord]:
+        """Get log records added since the last save, oldest first."""
+        return list(self._unsaved_logs)
+
+    def mark_logs_saved(self, count: int) -> None:
+        """Mark the oldest count unsaved log records as persisted."""
+        del self._unsaved_logs[:count]
+
+    def discard_duplicate_logs(self, start: int) -> int:
+        """
+        Drop log records from position start on that equal an earlier one.
+
+        Used when replaying journaled commands, whose log records may have
+        been stored before the crash that left them to be replayed.
+
+        Args:
+            start: Position of the first record to check.
+
+        Returns:
+            Number of dropped records.
+
+        """
+        logs = self.logs
+        duplicates = [
+            position
+            for position in range(start, len(logs))
+            if any(
+                earlier < start and logs[earlier] == logs[position]
+                for earlier in self.time_index.positions_between(
+                    logs[position].taken_at,
+                    logs[position].taken_at + timedelta(microseconds=1),
+                )
+            )
+        ]
+        for position in reversed(duplicates):
+            duplicate = logs[position]
+            del logs[position]
+            self._unsaved_logs = [
+                log for log in self._unsaved_logs if log is not duplicate
+            ]
+        return len(duplicates)
+
+    def archive_logs_before(self, cutoff: datetime) -> list[LogRecord]:
+        """
+        Roll up and remove log records taken before cutoff.
+
+        Args:
+            cutoff: Records taken before this time are archived.
+
+        Returns:
+            The newly archived raw log records.
+
+        """
+        tz = ZoneInfo(self.timezone)
+        archived, kept = self.logs.split_before(cutoff)
+
+        for log in archived:
+            day = log.taken_at.astimezone(tz).date()
+            key = aggregate_key(day, log.medication_id, log.slot_key)
+            aggregate = self.log_aggregates.get(key)
+            if aggregate is None:
+                aggregate = LogAggregate(
+                    day=day, medication_id=log.medication_id, slot_key=log.slot_key
+                )
+                self.log_aggregates[key] = aggregate
+            aggregate.add(log)
+
+        if not archived:
+            return archived
+
+        self._drop_stale_indexes()
+        tracker = self._adherence
+        if tracker is not None and tracker.size == len(self.logs):
+            tracker.archived(len(archived))
+        self.logs = kept
+        self._logs_version = kept.version
+        self._time_index = None
+        self._medication_index = None
+        archived_ids = {id(log) for log in archived}
+        self._unsaved_logs = [
+            log for log in self._unsaved_logs if id(log) not in archived_ids
+        ]
+        if self.logs_archived_before is None or cutoff > self.logs_archived_before:
+            self.logs_archived_before = cutoff
+        return archived
+
+    def count_actions_since(self, cutoff: datetime) -> dict[LogAction, int]:
+        """
+        Count log actions since cutoff, including archived aggregates.
+
+        Aggregates are counted by day, so a partial first day in the
+        archive counts in full.
+
+        Args:
+            cutoff: Start of the counting window.
+
+        Returns:
+            Mapping of action to number of records.
+
+        """
+        counts = dict.fromkeys(LogAction, 0)
+        for log in self.get_logs_between(cutoff):
+            counts[log.action] += 1
+
+        if self.log_aggregates:
+            cutoff_day = cutoff.astimezone(ZoneInfo(self.timezone)).date()
+            for aggregate in self.log_aggregates.values():
+                if aggregate.day >= cutoff_day:
+                    for action in counts:
+                        counts[action] += aggregate.count(action)
+        return counts
 
     def get_logs_for_medication(
         self, medication_id: str, limit: int | None = None
     ) -> list[LogRecord]:
-        """Get log records for a specific medication."""
-        filtered = [log for log in self.logs if log.medication_id == medication_id]
-        if limit:
-            filtered = filtered[-limit:]
-        return filtered
+        """Get log records for a specific medication, oldest first."""
+        logs = self.logs
+        return [
+            logs[position]
+            for position in self.medication_index.positions(medication_id, limit)
+        ]
 
     def get_recent_logs(
         self, days: int = 7, limit: int | None = None
@@ -1087,10 +2237,11 @@ class Profile:
         """Get recent log records within the specified number of days."""
         tz = ZoneInfo(self.timezone)
         cutoff = datetime.now(tz) - timedelta(days=days)
-        recent = [log for log in self.logs if log.taken_at >= cutoff]
+        positions = self.time_index.positions_between(cutoff)
         if limit:
-            recent = recent[-limit:]
-        return recent
+            positions = positions[-limit:]
+        logs = self.logs
+        return [logs[position] for position in positions]
 
     def calculate_adherence(self, days: int = 30) -> float:
         """
@@ -1100,46 +2251,58 @@ class Profile:
         """
         tz = ZoneInfo(self.timezone)
         cutoff = datetime.now(tz) - timedelta(days=days)
-        taken_count = sum(
-            1
-            for log in self.logs
-            if log.taken_at >= cutoff
-            and log.action in (LogAction.TAKEN, LogAction.PRN_TAKEN)
-        )
-        expected_count = sum(
-            1
-            for log in self.logs
-            if log.taken_at >= cutoff
-            and log.action
-            in (
-                LogAction.TAKEN,
-                LogAction.PRN_TAKEN,
-                LogAction.SKIPPED,
-                LogAction.MISSED,
-            )
+        counts = self.count_actions_since(cutoff)
+        taken_count = counts[LogAction.TAKEN] + counts[LogAction.PRN_TAKEN]
+        expected_count = (
+            taken_count + counts[LogAction.SKIPPED] + counts[LogAction.MISSED]
         )
         if expected_count == 0:
             return 100.0
         return round((taken_count / expected_count) * 100, 1)
 
-    def to_dict(self) -> dict:
-        """Convert to dictionary for serialization."""
+    def to_dict(self, *, include_logs: bool = True) -> dict:
+        """
+        Convert to dictionary for serialization.
+
+        Args:
+            include_logs: Whether to include log records and archived
+                aggregates. The store leaves them out since they are
+                persisted in the log journal.
+
+        """
         result = {
             "profile_id": self.profile_id,
             "name": self.name,
             "timezone": self.timezone,
             "medications": {k: v.to_dict() for k, v in self.medications.items()},
-            "logs": [log.to_dict() for log in self.logs],
             "default_policy": self.default_policy.to_dict(),
             "notification_settings": self.notification_settings.to_dict(),
             "adherence_stats": self.adherence_stats.to_dict(),
         }
+        if include_logs:
+            result["logs"] = self.logs.to_dicts()
+            result.update(self.archive_to_dict())
+        if self.log_retention_days is not None:
+            result["log_retention_days"] = self.log_retention_days
+        if self.command_seq:
+            result["command_seq"] = self.command_seq
         if self.owner_name:
             result["owner_name"] = self.owner_name
         if self.avatar:
             result["avatar"] = self.avatar
         return result
 
+    def archive_to_dict(self) -> dict:
+        """Convert the archived log aggregates to a dictionary."""
+        return {
+            "log_aggregates": [
+                aggregate.to_dict() for aggregate in self.log_aggregates.values()
+            ],
+            "logs_archived_before": self.logs_archived_before.isoformat()
+            if self.logs_archived_before
+            else None,
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> Profile:
         """Create from dictionary."""
@@ -1153,9 +2316,8 @@ class Profile:
             first_med = next(iter(medications.values()))
             default_dose = first_med.schedule.default_dose
 
-        logs = []
-        for log_data in data.get("logs", []):
-            logs.append(LogRecord.from_dict(log_data, default_dose))
+        # Log records are only deserialized when they are read
+        logs = LazyLogList(data.get("logs", []), default_dose)
 
         notification_settings = NotificationSettings()
         if data.get("notification_settings"):
@@ -1167,6 +2329,15 @@ class Profile:
         if data.get("adherence_stats"):
             adherence_stats = AdherenceStats.from_dict(data["adherence_stats"])
 
+        log_aggregates = {}
+        for aggregate_data in data.get("log_aggregates") or []:
+            aggregate = LogAggregate.from_dict(aggregate_data)
+            log_aggregates[aggregate.key] = aggregate
+
+        logs_archived_before = None
+        if data.get("logs_archived_before"):
+            logs_archived_before = datetime.fromisoformat(data["logs_archived_before"])
+
         return cls(
             profile_id=data["profile_id"],
             name=data["name"],
@@ -1178,6 +2349,10 @@ class Profile:
             adherence_stats=adherence_stats,
             owner_name=data.get("owner_name"),
             avatar=data.get("avatar"),
+            log_retention_days=data.get("log_retention_days"),
+            log_aggregates=log_aggregates,
+            logs_archived_before=logs_archived_before,
+            command_seq=data.get("command_seq", 0),
         )
 
 
@@ -7,11 +7,19 @@ Handles DST transitions safely by using timezone-aware datetime operations.
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime, time, timedelta
+from math import ceil, floor
 from typing import TYPE_CHECKING
-from zoneinfo import ZoneInfo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; expansion falls back to pure Python
+    np = None
 
 from .models import (
+    MINUTES_PER_DAY,
+    CompiledSchedule,
     MedicationStatus,
     Occurrence,
     ReminderPolicy,
@@ -20,8 +28,12 @@ from .models import (
 )
 
 if TYPE_CHECKING:
+    from zoneinfo import ZoneInfo
+
     from .models import LogRecord
 
+_MICROSECONDS_PER_SECOND = 1_000_000
+
 
 def compute_next_occurrence(
     timezone: str,
@@ -31,6 +43,7 @@ def compute_next_occurrence(
     snooze_until: datetime | None,
     policy: ReminderPolicy,
     logs: list[LogRecord] | None = None,
+    compiled: CompiledSchedule | None = None,
 ) -> tuple[Occurrence | None, MedicationStatus]:
     """
     Compute the next occurrence for a medication.
@@ -43,12 +56,16 @@ def compute_next_occurrence(
         snooze_until: If snoozed, when the snooze ends
         policy: The reminder policy
         logs: Recent log records for this medication
+        compiled: The schedule already compiled for the timezone, if cached
 
     Returns:
         Tuple of (next_occurrence_or_none, current_status)
 
     """
-    tz = ZoneInfo(timezone)
+    if compiled is None:
+        compiled = CompiledSchedule.compile(schedule, timezone)
+    schedule = compiled.spec
+    tz = compiled.tz
 
     # Ensure now is timezone-aware
     now = now.replace(tzinfo=tz) if now.tzinfo is None else now.astimezone(tz)
@@ -67,13 +84,13 @@ def compute_next_occurrence(
     # Handle snooze
     if snooze_until and now < snooze_until:
         # We're in a snooze period - return the original occurrence but with snoozed status
-        occurrence = _compute_base_occurrence(tz, schedule, now, last_taken)
+        occurrence = _compute_base_occurrence(compiled, now, last_taken)
         if occurrence:
             return occurrence, MedicationStatus.SNOOZED
         return None, MedicationStatus.SNOOZED
 
     # Compute base occurrence
-    occurrence = _compute_base_occurrence(tz, schedule, now, last_taken)
+    occurrence = _compute_base_occurrence(compiled, now, last_taken)
     if occurrence is None:
         return None, MedicationStatus.OK
 
@@ -95,24 +112,23 @@ def compute_next_occurrence(
 
 
 def _compute_base_occurrence(
-    tz: ZoneInfo,
-    schedule: ScheduleSpec,
+    compiled: CompiledSchedule,
     now: datetime,
     last_taken: datetime | None,
 ) -> Occurrence | None:
     """Compute the next base occurrence without considering snooze/status."""
-    if schedule.kind == ScheduleKind.TIMES_PER_DAY:
-        return _compute_times_per_day_occurrence(tz, schedule, now, last_taken)
-    if schedule.kind == ScheduleKind.INTERVAL:
-        return _compute_interval_occurrence(tz, schedule, now, last_taken)
-    if schedule.kind == ScheduleKind.WEEKLY:
-        return _compute_weekly_occurrence(tz, schedule, now, last_taken)
+    kind = compiled.kind
+    if kind == ScheduleKind.TIMES_PER_DAY:
+        return _compute_times_per_day_occurrence(compiled, now, last_taken)
+    if kind == ScheduleKind.INTERVAL:
+        return _compute_interval_occurrence(compiled, now, last_taken)
+    if kind == ScheduleKind.WEEKLY:
+        return _compute_weekly_occurrence(compiled, now, last_taken)
     return None
 
 
 def _compute_times_per_day_occurrence(
-    tz: ZoneInfo,
-    schedule: ScheduleSpec,
+    compiled: CompiledSchedule,
     now: datetime,
     last_taken: datetime | None,
 ) -> Occurrence | None:
@@ -125,94 +141,44 @@ def _compute_times_per_day_occurrence(
     1. The current slot if we're at or past its time and haven't taken it yet
     2. The next upcoming slot
     """
-    if not schedule.times:
+    if not compiled.week_minutes:
         return None
 
+    schedule = compiled.spec
+    tz = compiled.tz
     now_local = now.astimezone(tz)
     today = now_local.date()
+    last_taken_local = last_taken.astimezone(tz) if last_taken else None
 
-    # Sort times
-    sorted_times = sorted(schedule.times)
-
-    # First, check today's past slots that might still be "active" (not yet taken)
-    for time_str in sorted_times:
-        slot_key = time_str
-        scheduled_dt = _make_datetime(today, time_str, tz)
-
-        # Check date range
-        if schedule.start_date and today < schedule.start_date:
-            continue
-        if schedule.end_date and today > schedule.end_date:
-            continue
-
-        # Only consider slots that are at or before now (current or past)
-        if scheduled_dt > now_local:
-            continue
-
-        # Skip if we already took this slot
-        if last_taken and _is_same_slot_taken(last_taken, scheduled_dt, tz):
-            continue
-
-        dose = schedule.get_dose_for_slot(slot_key)
-        if dose is None:
-            dose = schedule.default_dose
-        if dose is None:
-            continue
-
-        # This is an active past slot that hasn't been taken
-        return Occurrence(
-            scheduled_for=scheduled_dt,
-            dose=dose,
-            slot_key=slot_key,
-        )
+    # First, check today's past slots that might still be "active" (not yet
+    # taken): the earliest slot at or before now, past the taken window
+    in_range = not (
+        (schedule.start_date and today < schedule.start_date)
+        or (schedule.end_date and today > schedule.end_date)
+    )
+    if in_range:
+        first, last = _day_slot_range(compiled, today)
+        cutoff = _slots_until(compiled, today, now_local, first, last)
+        index = _skip_taken(compiled, today, last_taken_local, first, first, last)
+        if index < cutoff:
+            return _slot_occurrence(compiled, index, today)
 
     # No active past slot found - find the next upcoming slot
-    for day_offset in range(7):  # Look up to 7 days ahead
-        check_date = today + timedelta(days=day_offset)
-
-        # Check date range
-        if schedule.start_date and check_date < schedule.start_date:
-            continue
-        if schedule.end_date and check_date > schedule.end_date:
-            return None
-
-        for time_str in sorted_times:
-            slot_key = time_str
-            scheduled_dt = _make_datetime(check_date, time_str, tz)
-
-            # Skip slots in the past or at now (those were handled above for today)
-            if scheduled_dt <= now_local:
-                continue
-
-            # Skip if we already took this slot
-            if last_taken and _is_same_slot_taken(last_taken, scheduled_dt, tz):
-                continue
-
-            dose = schedule.get_dose_for_slot(slot_key)
-            if dose is None:
-                dose = schedule.default_dose
-            if dose is None:
-                continue
-
-            return Occurrence(
-                scheduled_for=scheduled_dt,
-                dose=dose,
-                slot_key=slot_key,
-            )
-
-    return None
+    return _next_slot_occurrence(compiled, now_local, last_taken_local, days=7)
 
 
 def _compute_interval_occurrence(
-    tz: ZoneInfo,
-    schedule: ScheduleSpec,
+    compiled: CompiledSchedule,
     now: datetime,
     last_taken: datetime | None,
 ) -> Occurrence | None:
     """Compute next occurrence for interval schedule."""
+    schedule = compiled.spec
     if not schedule.interval_minutes:
         return None
 
+    tz = compiled.tz
+
     interval = timedelta(minutes=schedule.interval_minutes)
 
     # Determine anchor point
@@ -229,17 +195,12 @@ def _compute_interval_occurrence(
         now_local = now.astimezone(tz)
         anchor = datetime.combine(now_local.date(), time(0, 0), tzinfo=tz)
 
-    # Calculate next occurrence
-    next_due = anchor + interval
-
-    # If we're past that time, calculate when we should have taken it
+    # The pending dose is the last one at or before now, but at least one
+    # interval after the anchor. Both datetimes share tz, so the difference
+    # and the additions are in wall-clock time, as doses are scheduled.
     now_local = now.astimezone(tz)
-    while next_due <= now_local:
-        # Check if this is the current pending dose
-        next_after = next_due + interval
-        if next_after > now_local:
-            break
-        next_due = next_after
+    steps = max(1, (now_local - anchor) // interval)
+    next_due = anchor + steps * interval
 
     # Check date range
     if schedule.start_date and next_due.date() < schedule.start_date:
@@ -264,8 +225,7 @@ def _compute_interval_occurrence(
 
 
 def _compute_weekly_occurrence(
-    tz: ZoneInfo,
-    schedule: ScheduleSpec,
+    compiled: CompiledSchedule,
     now: datetime,
     last_taken: datetime | None,
 ) -> Occurrence | None:
@@ -274,23 +234,35 @@ def _compute_weekly_occurrence(
 
     Slot keys are in "W{weekday}-HH:MM" format (weekday 0-6, Monday-Sunday).
     """
-    if not schedule.weekdays or not schedule.times:
+    if not compiled.week_minutes:
         return None
 
-    now_local = now.astimezone(tz)
-    today = now_local.date()
-
-    # Sort weekdays and times
-    sorted_weekdays = sorted(schedule.weekdays)
-    sorted_times = sorted(schedule.times)
+    now_local = now.astimezone(compiled.tz)
+    last_taken_local = last_taken.astimezone(compiled.tz) if last_taken else None
 
     # Look up to 2 weeks ahead
-    for day_offset in range(14):
-        check_date = today + timedelta(days=day_offset)
-        weekday = check_date.weekday()
+    return _next_slot_occurrence(compiled, now_local, last_taken_local, days=14)
 
-        if weekday not in sorted_weekdays:
-            continue
+
+def _next_slot_occurrence(
+    compiled: CompiledSchedule,
+    now_local: datetime,
+    last_taken_local: datetime | None,
+    days: int,
+) -> Occurrence | None:
+    """
+    Find the first slot after now that was not taken, within some days.
+
+    Slots are looked up by bisect in the compiled week-minute table. Times
+    are compared as local wall-clock times, like the aware datetimes of
+    one timezone compare; a slot in a DST gap keeps its wall-clock place
+    and only its occurrence is shifted forward.
+    """
+    schedule = compiled.spec
+    today = now_local.date()
+
+    for day_offset in range(days):
+        check_date = today + timedelta(days=day_offset)
 
         # Check date range
         if schedule.start_date and check_date < schedule.start_date:
@@ -298,76 +270,279 @@ def _compute_weekly_occurrence(
         if schedule.end_date and check_date > schedule.end_date:
             return None
 
-        for time_str in sorted_times:
-            slot_key = f"W{weekday}-{time_str}"
-            scheduled_dt = _make_datetime(check_date, time_str, tz)
-
-            # Skip if in the past
-            if scheduled_dt <= now_local:
-                continue
+        first, last = _day_slot_range(compiled, check_date)
+        index = first
+        if day_offset == 0:
+            # Skip slots in the past or at now
+            index = _slots_until(compiled, check_date, now_local, first, last)
+        index = _skip_taken(compiled, check_date, last_taken_local, index, first, last)
+        if index < last:
+            return _slot_occurrence(compiled, index, check_date)
 
-            # Skip if we already took this slot
-            if last_taken and _is_same_slot_taken(last_taken, scheduled_dt, tz):
-                continue
-
-            dose = schedule.get_dose_for_slot(slot_key)
-            if dose is None:
-                dose = schedule.default_dose
-            if dose is None:
-                continue
+    return None
 
-            return Occurrence(
-                scheduled_for=scheduled_dt,
-                dose=dose,
-                slot_key=slot_key,
-            )
 
-    return None
+def _day_slot_range(compiled: CompiledSchedule, day: date) -> tuple[int, int]:
+    """Get the range of week table indexes of the slots on a day."""
+    week_start = day.weekday() * MINUTES_PER_DAY
+    return (
+        bisect_left(compiled.week_minutes, week_start),
+        bisect_left(compiled.week_minutes, week_start + MINUTES_PER_DAY),
+    )
 
 
-def _make_datetime(d: date, time_str: str, tz: ZoneInfo) -> datetime:
+def _slots_until(
+    compiled: CompiledSchedule,
+    day: date,
+    moment: datetime,
+    first: int,
+    last: int,
+) -> int:
+    """Get the index after the slots of a day at or before a local time."""
+    week_minute = day.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+    return bisect_right(compiled.week_minutes, week_minute, first, last)
+
+
+def _skip_taken(
+    compiled: CompiledSchedule,
+    day: date,
+    last_taken_local: datetime | None,
+    index: int,
+    first: int,
+    last: int,
+) -> int:
     """
-    Create a timezone-aware datetime from date and time string.
+    Move a slot index past the slots already taken.
 
-    Handles DST transitions by using fold for ambiguous times.
+    A slot counts as taken when last_taken is on the same local day and
+    less than an hour before or after it. Those slots form one run in the
+    table, found by bisect.
     """
-    hour, minute = map(int, time_str.split(":"))
-    t = time(hour, minute)
+    if last_taken_local is None or last_taken_local.date() != day:
+        return index
+
+    taken_us = (
+        last_taken_local.hour * 3600
+        + last_taken_local.minute * 60
+        + last_taken_local.second
+    ) * _MICROSECONDS_PER_SECOND + last_taken_local.microsecond
+    window_us = 3600 * _MICROSECONDS_PER_SECOND
+    minute_us = 60 * _MICROSECONDS_PER_SECOND
+    week_start = day.weekday() * MINUTES_PER_DAY
+    # Slots strictly after taken - 1h and strictly before taken + 1h
+    taken_first = bisect_right(
+        compiled.week_minutes,
+        week_start + (taken_us - window_us) // minute_us,
+        first,
+        last,
+    )
+    taken_last = bisect_left(
+        compiled.week_minutes,
+        week_start - (-(taken_us + window_us) // minute_us),
+        first,
+        last,
+    )
+    if taken_first <= index < taken_last:
+        return taken_last
+    return index
 
-    # Create naive datetime first
-    naive_dt = datetime.combine(d, t)
 
-    # Make timezone-aware, handling DST fold
-    try:
-        return naive_dt.replace(tzinfo=tz)
-        # Check if this time exists (might not during spring forward)
-        # If the time doesn't exist, it will be adjusted
-    except Exception:
-        # Fallback - just add the timezone
-        return naive_dt.replace(tzinfo=tz)
+def _slot_occurrence(compiled: CompiledSchedule, index: int, day: date) -> Occurrence:
+    """Build the occurrence of a week table slot on a day."""
+    slot_time, slot_key, dose = compiled.week_slots[index]
+    return Occurrence(
+        scheduled_for=compiled.transitions.localize(datetime.combine(day, slot_time)),
+        dose=dose,
+        slot_key=slot_key,
+    )
 
 
-def _is_same_slot_taken(
-    last_taken: datetime,
-    scheduled_dt: datetime,
-    tz: ZoneInfo,
-) -> bool:
+def compute_occurrences(
+    schedule: ScheduleSpec,
+    start: datetime,
+    end: datetime,
+    timezone: str,
+    compiled: CompiledSchedule | None = None,
+) -> list[Occurrence]:
     """
-    Check if we've already taken the dose for this slot.
+    Compute all occurrences of a schedule in a time range.
+
+    Slot times are parsed once and the local times of all days in the
+    range are computed in one batch (with NumPy when it is installed),
+    so expanding months of doses stays cheap.
+
+    Local times are resolved to instants in bulk through the timezone's
+    transition cache: times in a DST gap are shifted forward and times in
+    a fold take their first occurrence.
+
+    Interval and depot schedules count from the schedule's anchor, or
+    from the start of start_date, or else from the start of the day the
+    range starts on; the first dose is one interval after that point.
+
+    Args:
+        schedule: The medication schedule specification.
+        start: Start of the range (inclusive, timezone-aware).
+        end: End of the range (exclusive, timezone-aware).
+        timezone: IANA timezone string the schedule's times are in.
+        compiled: The schedule already compiled for the timezone, if cached.
+
+    Returns:
+        Occurrences in the range, in chronological order.
 
-    A slot is considered taken if last_taken is within 1 hour before or after
-    the scheduled time.
     """
-    last_taken_local = last_taken.astimezone(tz)
-    scheduled_local = scheduled_dt.astimezone(tz)
+    if end <= start:
+        return []
+
+    if compiled is None:
+        compiled = CompiledSchedule.compile(schedule, timezone)
+    schedule = compiled.spec
+    tz = compiled.tz
+    if schedule.kind in (ScheduleKind.TIMES_PER_DAY, ScheduleKind.WEEKLY):
+        local_times, slot_keys = _expand_daily_slots(compiled, start, end)
+    elif schedule.kind in (ScheduleKind.INTERVAL, ScheduleKind.DEPOT):
+        local_times, slot_keys = _expand_interval(tz, schedule, start, end)
+    else:
+        return []
+
+    transitions = compiled.transitions
+    instants = transitions.to_utc_many(local_times)
+    occurrences: list[tuple[datetime, Occurrence]] = []
+    for naive, instant, slot_key in zip(local_times, instants, slot_keys, strict=True):
+        if instant < start or instant >= end:
+            continue
+        local_date = naive.date()
+        if schedule.start_date and local_date < schedule.start_date:
+            continue
+        if schedule.end_date and local_date > schedule.end_date:
+            continue
+        dose = compiled.dose_for_slot(slot_key)
+        if dose is None:
+            continue
+        occurrences.append(
+            (
+                instant,
+                Occurrence(
+                    scheduled_for=transitions.localize(naive),
+                    dose=dose,
+                    slot_key=slot_key,
+                ),
+            )
+        )
+    # Times shifted out of a DST gap can pass later wall times; the sort is
+    # stable and linear on the already ordered common case
+    occurrences.sort(key=lambda item: item[0])
+    return [occurrence for _, occurrence in occurrences]
+
+
+def _local_range(
+    tz: ZoneInfo, start: datetime, end: datetime
+) -> tuple[datetime, datetime]:
+    """Get the naive local wall times of a range, padded for DST shifts."""
+    padding = timedelta(hours=3)
+    return (
+        start.astimezone(tz).replace(tzinfo=None) - padding,
+        end.astimezone(tz).replace(tzinfo=None) + padding,
+    )
 
-    # Check if on the same day and close to the same time
-    if last_taken_local.date() != scheduled_local.date():
-        return False
 
-    # Within 1 hour window
-    diff = abs((last_taken_local - scheduled_local).total_seconds())
-    return diff < 3600  # 1 hour in seconds
+def _expand_daily_slots(
+    compiled: CompiledSchedule,
+    start: datetime,
+    end: datetime,
+) -> tuple[list[datetime], list[str]]:
+    """Expand TIMES_PER_DAY and WEEKLY slots into naive local times."""
+    if not compiled.times:
+        return [], []
+    weekly = compiled.kind == ScheduleKind.WEEKLY
+    if weekly and not compiled.weekday_mask:
+        return [], []
+
+    schedule = compiled.spec
+    first, last = _local_range(compiled.tz, start, end)
+    first_day = first.date()
+    last_day = last.date()
+    if schedule.start_date:
+        first_day = max(first_day, schedule.start_date)
+    if schedule.end_date:
+        last_day = min(last_day, schedule.end_date)
+    if last_day < first_day:
+        return [], []
+
+    day_count = (last_day - first_day).days + 1
+    days = [
+        day
+        for day in (first_day + timedelta(days=n) for n in range(day_count))
+        if not weekly or compiled.has_weekday(day.weekday())
+    ]
+
+    offsets = [t.hour * 60 + t.minute for t, _ in compiled.times]
+    if np is not None:
+        local_times = (
+            (
+                np.array(days, dtype="datetime64[m]")[:, None]
+                + np.array(offsets, dtype="timedelta64[m]")[None, :]
+            )
+            .ravel()
+            .astype(object)
+            .tolist()
+        )
+    else:
+        local_times = [
+            datetime.combine(day, time()) + timedelta(minutes=minutes)
+            for day in days
+            for minutes in offsets
+        ]
+
+    if weekly:
+        slot_keys = [
+            f"W{day.weekday()}-{time_str}"
+            for day in days
+            for _, time_str in compiled.times
+        ]
+    else:
+        slot_keys = [time_str for _ in days for _, time_str in compiled.times]
+    return local_times, slot_keys
+
+
+def _expand_interval(
+    tz: ZoneInfo,
+    schedule: ScheduleSpec,
+    start: datetime,
+    end: datetime,
+) -> tuple[list[datetime], list[str]]:
+    """Expand INTERVAL and DEPOT schedules into naive local times."""
+    if not schedule.interval_minutes or schedule.interval_minutes <= 0:
+        return [], []
+
+    if schedule.anchor:
+        anchor = schedule.anchor
+        if anchor.tzinfo:
+            anchor = anchor.astimezone(tz).replace(tzinfo=None)
+    elif schedule.start_date:
+        anchor = datetime.combine(schedule.start_date, time())
+    else:
+        anchor = datetime.combine(start.astimezone(tz).date(), time())
+
+    interval = schedule.interval_minutes
+    first, last = _local_range(tz, start, end)
+    first_step = max(1, floor((first - anchor).total_seconds() / 60 / interval))
+    last_step = ceil((last - anchor).total_seconds() / 60 / interval)
+    if last_step < first_step:
+        return [], []
+
+    if np is not None:
+        minutes = np.arange(first_step, last_step + 1, dtype="int64") * interval
+        local_times = (
+            (np.datetime64(anchor, "us") + minutes.astype("timedelta64[m]"))
+            .astype(object)
+            .tolist()
+        )
+        minute_offsets = minutes.tolist()
+    else:
+        minute_offsets = [step * interval for step in range(first_step, last_step + 1)]
+        local_times = [anchor + timedelta(minutes=offset) for offset in minute_offsets]
+
+    return local_times, [f"interval_{offset}" for offset in minute_offsets]
 
 
 def compute_effective_next_due(
@@ -398,5 +573,6 @@ from .policies import is_in_quiet_hours  # noqa: E402
 __all__ = [
     "compute_effective_next_due",
     "compute_next_occurrence",
+    "compute_occurrences",
     "is_in_quiet_hours",
 ]
@@ -0,0 +1,206 @@
+"""
+Materialized timeline of upcoming doses across a profile's medications.
+
+Pure domain logic with no Home Assistant dependencies. Each medication's
+upcoming occurrences are expanded once up to a common horizon and merged
+into one sorted list, so agenda queries are a slice of a cached list. A
+medication's entries are dropped when its state changes and expanded
+again on the next query; the horizon is extended lazily when a query
+reaches past it.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from heapq import merge
+from typing import TYPE_CHECKING
+
+from .models import DoseQuantity, MedicationStatus, Profile
+from .schedule import compute_occurrences
+
+if TYPE_CHECKING:
+    from .models import Medication
+
+# Horizon materialized by default when the timeline is first queried
+DEFAULT_TIMELINE_HORIZON = timedelta(days=7)
+
+
+@dataclass(frozen=True, slots=True)
+class TimelineEntry:
+    """A dose on the timeline."""
+
+    due: datetime
+    medication_id: str
+    dose: DoseQuantity | None
+    slot_key: str | None
+    # Status of the pending dose; None for later scheduled doses
+    status: MedicationStatus | None = None
+
+    def to_dict(self, display_name: str | None = None) -> dict:
+        """Convert to dictionary."""
+        return {
+            "due": self.due.isoformat(),
+            "medication_id": self.medication_id,
+            "display_name": display_name,
+            "dose": self.dose.to_dict() if self.dose else None,
+            "slot_key": self.slot_key,
+            "status": self.status.value if self.status else None,
+        }
+
+
+class DoseTimeline:
+    """
+    Cached, sorted timeline of a profile's upcoming doses.
+
+    The first entry of a medication is its pending dose (state.next_due,
+    snooze included); later entries are its scheduled occurrences after
+    that, up to the materialized horizon.
+    """
+
+    def __init__(
+        self,
+        profile: Profile,
+        horizon: timedelta = DEFAULT_TIMELINE_HORIZON,
+    ) -> None:
+        """
+        Initialize the timeline.
+
+        Args:
+            profile: The profile whose medications are on the timeline.
+            horizon: How far the timeline is expanded at least, past the
+                first query's start and then past its end when extended.
+
+        """
+        self._profile = profile
+        self._horizon = horizon
+        self._until: datetime | None = None
+        self._entries: dict[str, list[TimelineEntry]] = {}
+        self._merged: list[TimelineEntry] | None = None
+        self._merged_due: list[datetime] = []
+
+    @property
+    def until(self) -> datetime | None:
+        """End of the materialized range, or None if nothing is materialized."""
+        return self._until
+
+    def invalidate(self, medication_id: str) -> None:
+        """
+        Drop a medication's entries, after its state or schedule changed.
+
+        Args:
+            medication_id: The medication ID.
+
+        """
+        self._entries.pop(medication_id, None)
+        self._merged = None
+
+    def invalidate_all(self) -> None:
+        """Drop all entries, e.g. after the profile timezone changed."""
+        self._until = None
+        self._entries.clear()
+        self._merged = None
+
+    def get(self, start: datetime, end: datetime) -> list[TimelineEntry]:
+        """
+        Get the doses due in a range, in chronological order.
+
+        Args:
+            start: Start of the range (inclusive, timezone-aware).
+            end: End of the range (exclusive, timezone-aware).
+
+        Returns:
+            The timeline entries in the range.
+
+        """
+        if end <= start:
+            return []
+        if self._until is None:
+            self._materialize(max(end, start + self._horizon))
+        elif end > self._until:
+            # Extend by at least the horizon so that sliding queries do
+            # not expand a few minutes at a time
+            self._materialize(max(end, self._until + self._horizon))
+        else:
+            self._materialize(self._until)
+        merged = self._merged_entries()
+        return merged[
+            bisect_left(self._merged_due, start) : bisect_left(self._merged_due, end)
+        ]
+
+    def _materialize(self, until: datetime) -> None:
+        """Expand every medication's entries up to until."""
+        if self._until is not None and until > self._until:
+            # Extend the entries already expanded
+            for medication_id, entries in self._entries.items():
+                medication = self._profile.get_medication(medication_id)
+                if medication is not None:
+                    entries.extend(
+                        self._occurrences(medication, self._until, until, entries)
+                    )
+            self._merged = None
+        self._until = until
+
+        for medication_id, medication in self._profile.medications.items():
+            if medication_id not in self._entries:
+                self._entries[medication_id] = self._expand(medication, until)
+                self._merged = None
+        for medication_id in self._entries.keys() - self._profile.medications.keys():
+            del self._entries[medication_id]
+            self._merged = None
+
+    def _expand(self, medication: Medication, until: datetime) -> list[TimelineEntry]:
+        """Expand a medication's entries from its pending dose up to until."""
+        state = medication.state
+        if not medication.is_active or state.next_due is None:
+            return []
+        entries = [
+            TimelineEntry(
+                due=state.next_due,
+                medication_id=medication.medication_id,
+                dose=state.next_dose,
+                slot_key=state.next_slot_key,
+                status=state.status,
+            )
+        ]
+        entries.extend(self._occurrences(medication, state.next_due, until, entries))
+        return entries
+
+    def _occurrences(
+        self,
+        medication: Medication,
+        start: datetime,
+        end: datetime,
+        entries: list[TimelineEntry],
+    ) -> list[TimelineEntry]:
+        """Get a medication's scheduled entries in a range, after its entries."""
+        if not entries or start >= end:
+            return []
+        last = entries[-1].due
+        compiled = medication.compiled_schedule(self._profile.timezone)
+        return [
+            TimelineEntry(
+                due=occurrence.scheduled_for,
+                medication_id=medication.medication_id,
+                dose=occurrence.dose,
+                slot_key=occurrence.slot_key,
+            )
+            for occurrence in compute_occurrences(
+                medication.schedule,
+                start,
+                end,
+                self._profile.timezone,
+                compiled=compiled,
+            )
+            if occurrence.scheduled_for > last
+        ]
+
+    def _merged_entries(self) -> list[TimelineEntry]:
+        """Get all entries in one sorted list, merging them if needed."""
+        if self._merged is None:
+            self._merged = list(
+                merge(*self._entries.values(), key=lambda entry: entry.due)
+            )
+            self._merged_due = [entry.due for entry in self._merged]
+        return self._merged
@@ -0,0 +1,207 @@
+"""
+Resolution of local wall times to instants, with a per-day offset cache.
+
+Pure domain logic with no Home Assistant dependencies. Scheduled doses
+are local wall times ("08:00"), which around DST changes either do not
+exist (spring forward gap) or exist twice (fall back fold). They are
+resolved with one explicit policy:
+
+- a time in a gap is shifted forward by the length of the gap
+  (02:30 on a day that skips 02:00-03:00 becomes 03:30), and
+- a time in a fold is the first of its two occurrences (the one still
+  at the offset in effect before the change).
+
+The UTC offset of every local day is looked up once and cached per
+timezone, so converting many wall times to instants is plain datetime
+arithmetic instead of a timezone lookup per time.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from functools import cache
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_EPOCH = datetime(1970, 1, 1)  # noqa: DTZ001
+
+
+@dataclass(frozen=True, slots=True)
+class DayOffsets:
+    """UTC offsets of one local day."""
+
+    before: timedelta  # offset in effect when the day starts
+    after: timedelta  # offset in effect when the day ends
+    # Local wall time from which after applies; None if the offset
+    # does not change during the day
+    switch_at: datetime | None = None
+
+    @property
+    def gap(self) -> timedelta:
+        """Length of the wall time skipped (positive) or repeated (negative)."""
+        return self.after - self.before
+
+
+class TransitionCache:
+    """Per-day UTC offsets of a timezone, filled as days are looked up."""
+
+    def __init__(self, tz: ZoneInfo) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            tz: The timezone.
+
+        """
+        self.tz = tz
+        self._days: dict[date, DayOffsets] = {}
+
+    def day(self, day: date) -> DayOffsets:
+        """
+        Get the UTC offsets of a local day.
+
+        Args:
+            day: The local date.
+
+        Returns:
+            The offsets of the day.
+
+        """
+        offsets = self._days.get(day)
+        if offsets is None:
+            offsets = self._days[day] = self._compute_day(day)
+        return offsets
+
+    def offset(self, naive: datetime) -> timedelta:
+        """
+        Get the UTC offset of a local wall time, resolved by the policy.
+
+        Args:
+            naive: Local wall time without tzinfo.
+
+        Returns:
+            The UTC offset.
+
+        """
+        offsets = self.day(naive.date())
+        if offsets.switch_at is None or naive < offsets.switch_at:
+            return offsets.before
+        return offsets.after
+
+    def to_utc(self, naive: datetime) -> datetime:
+        """
+        Resolve a local wall time to a UTC instant.
+
+        Args:
+            naive: Local wall time without tzinfo.
+
+        Returns:
+            The instant, in UTC.
+
+        """
+        return (naive - self.offset(naive)).replace(tzinfo=UTC)
+
+    def to_utc_many(self, naive_times: Iterable[datetime]) -> list[datetime]:
+        """
+        Resolve local wall times to UTC instants in bulk.
+
+        Args:
+            naive_times: Local wall times without tzinfo.
+
+        Returns:
+            The instants, in UTC, in the same order.
+
+        """
+        result = []
+        current: date | None = None
+        offsets: DayOffsets | None = None
+        for naive in naive_times:
+            naive_date = naive.date()
+            if naive_date != current:
+                current = naive_date
+                offsets = self.day(naive_date)
+            offset = (
+                offsets.before
+                if offsets.switch_at is None or naive < offsets.switch_at
+                else offsets.after
+            )
+            result.append((naive - offset).replace(tzinfo=UTC))
+        return result
+
+    def localize(self, naive: datetime) -> datetime:
+        """
+        Resolve a local wall time to an aware local datetime.
+
+        Times in a gap come back shifted forward, so the result is always
+        a valid wall time of the timezone.
+
+        Args:
+            naive: Local wall time without tzinfo.
+
+        Returns:
+            The aware datetime in the timezone.
+
+        """
+        if self.day(naive.date()).switch_at is None:
+            return naive.replace(tzinfo=self.tz)
+        return self.to_utc(naive).astimezone(self.tz)
+
+    def _utc_offset_at(self, timestamp: int) -> timedelta:
+        """Get the UTC offset at a POSIX timestamp."""
+        return datetime.fromtimestamp(timestamp, self.tz).utcoffset()
+
+    def _day_start(self, day: date) -> int:
+        """Get the POSIX timestamp at which a local day starts."""
+        midnight = datetime.combine(day, time())
+        offset = midnight.replace(tzinfo=self.tz).utcoffset()
+        return int((midnight - offset - _EPOCH).total_seconds())
+
+    def _compute_day(self, day: date) -> DayOffsets:
+        """
+        Look up the offsets of a local day in the timezone database.
+
+        A change of offset during the day is found by bisecting the
+        seconds of the day; at most one change per day is assumed.
+        """
+        start = self._day_start(day)
+        end = self._day_start(day + timedelta(days=1))
+        before = self._utc_offset_at(start - 1)
+        after = self._utc_offset_at(end - 1)
+        if before == after:
+            return DayOffsets(before=before, after=after)
+
+        low, high = start - 1, end - 1
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._utc_offset_at(middle) == before:
+                low = middle
+            else:
+                high = middle
+
+        change = _EPOCH + timedelta(seconds=high)
+        # Wall times before the later of the two readings of the change
+        # keep the old offset: gaps shift forward, folds take the first
+        return DayOffsets(
+            before=before,
+            after=after,
+            switch_at=change + max(before, after),
+        )
+
+
+@cache
+def transition_cache(timezone: str) -> TransitionCache:
+    """
+    Get the shared transition cache of a timezone.
+
+    Args:
+        timezone: IANA timezone string.
+
+    Returns:
+        The cache, created on first use.
+
+    """
+    return TransitionCache(ZoneInfo(timezone))
@@ -0,0 +1,106 @@
+"""Per-medication entity tracking for the Med Expert platforms."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import MedExpertConfigEntry
+    from .domain.models import Medication
+
+    EntityFactory = Callable[[MedExpertConfigEntry, Medication], list[Entity]]
+
+
+def medication_device_identifier(entry_id: str, medication_id: str) -> tuple[str, str]:
+    """Get the device registry identifier of a medication."""
+    return (DOMAIN, f"{entry_id}_{medication_id}")
+
+
+class MedicationEntityTracker:
+    """
+    Entities of one platform, per medication of a config entry.
+
+    When medications are added or removed, only the entities of those
+    medications are created or removed; the entry is not reloaded, so the
+    manager, its reminders and the other entities are left untouched.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: MedExpertConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        create_entities: EntityFactory,
+    ) -> None:
+        """
+        Initialize the tracker.
+
+        Args:
+            hass: Home Assistant instance.
+            entry: The config entry.
+            async_add_entities: Callback adding entities to the platform.
+            create_entities: Creates the platform's entities of a medication.
+
+        """
+        self._hass = hass
+        self._entry = entry
+        self._async_add_entities = async_add_entities
+        self._create_entities = create_entities
+        self._entities: dict[str, list[Entity]] = {}
+
+    @property
+    def medication_ids(self) -> set[str]:
+        """Get the IDs of the medications that have entities."""
+        return set(self._entities)
+
+    @callback
+    def async_sync(self) -> None:
+        """Add entities of new medications and remove those of removed ones."""
+        medications = self._entry.runtime_data.manager.profile.medications
+
+        new_entities: list[Entity] = []
+        for medication_id, medication in medications.items():
+            if medication_id not in self._entities:
+                entities = self._create_entities(self._entry, medication)
+                self._entities[medication_id] = entities
+                new_entities.extend(entities)
+        if new_entities:
+            self._async_add_entities(new_entities)
+
+        for medication_id in self._entities.keys() - medications.keys():
+            self._async_remove_medication(medication_id)
+
+    @callback
+    def _async_remove_medication(self, medication_id: str) -> None:
+        """Remove the entities of a medication, and its device once empty."""
+        entity_registry = er.async_get(self._hass)
+        for entity in self._entities.pop(medication_id):
+            if entity.entity_id and entity_registry.async_get(entity.entity_id):
+                # Removing the registry entry also removes the live entity
+                entity_registry.async_remove(entity.entity_id)
+            elif entity.hass is not None:
+                self._hass.async_create_task(entity.async_remove(force_remove=True))
+
+        device_registry = dr.async_get(self._hass)
+        device = device_registry.async_get_device(
+            identifiers={
+                medication_device_identifier(self._entry.entry_id, medication_id)
+            }
+        )
+        # The device is shared by the platforms; the last one removes it
+        if device is not None and not er.async_entries_for_device(
+            entity_registry, device.id, include_disabled_entities=True
+        ):
+            device_registry.async_remove_device(device.id)
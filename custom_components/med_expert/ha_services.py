@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import config_validation as cv
 
 from .application.services import (
@@ -14,6 +21,7 @@ from .application.services import (
     PRNTakeCommand,
     RefillCommand,
     ReplaceInhalerCommand,
+    SetLogRetentionCommand,
     SkipCommand,
     SnoozeCommand,
     TakeCommand,
@@ -42,6 +50,10 @@ SERVICE_UPDATE_INVENTORY = "update_inventory"
 SERVICE_REPLACE_INHALER = "replace_inhaler"
 SERVICE_UPDATE_NOTIFICATION_SETTINGS = "update_notification_settings"
 SERVICE_CALCULATE_ADHERENCE = "calculate_adherence"
+SERVICE_SET_LOG_RETENTION = "set_log_retention"
+SERVICE_EXPORT_ARCHIVED_LOGS = "export_archived_logs"
+SERVICE_PURGE_ARCHIVED_LOGS = "purge_archived_logs"
+SERVICE_GET_TIMELINE = "get_timeline"
 
 # Common field names
 ATTR_ENTRY_ID = "entry_id"
@@ -84,6 +96,13 @@ ATTR_MESSAGE_TEMPLATE = "message_template"
 ATTR_IS_ACTIVE = "is_active"
 ATTR_POLICY = "policy"
 ATTR_INTERACTION_WARNINGS = "interaction_warnings"
+ATTR_RETENTION_DAYS = "retention_days"
+ATTR_BEFORE = "before"
+ATTR_START = "start"
+ATTR_HOURS = "hours"
+
+# Longest range the timeline can be queried for
+MAX_TIMELINE_HOURS = 24 * 31
 
 # Valid dosage forms
 VALID_FORMS = [
@@ -250,6 +269,37 @@ SERVICE_CALCULATE_ADHERENCE_SCHEMA = vol.Schema(
     }
 )
 
+SERVICE_SET_LOG_RETENTION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        # 0 keeps raw logs forever
+        vol.Required(ATTR_RETENTION_DAYS): cv.positive_int,
+    }
+)
+
+SERVICE_EXPORT_ARCHIVED_LOGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+SERVICE_PURGE_ARCHIVED_LOGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_BEFORE): cv.datetime,
+    }
+)
+
+SERVICE_GET_TIMELINE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_HOURS, default=24): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_TIMELINE_HOURS)
+        ),
+    }
+)
+
 
 def _get_manager(hass: HomeAssistant, entry_id: str):
     """Get the profile manager for an entry."""
@@ -437,6 +487,40 @@ async def async_register_services(hass: HomeAssistant) -> None:
         manager = _get_manager(hass, call.data[ATTR_ENTRY_ID])
         await manager.async_calculate_adherence()
 
+    async def handle_set_log_retention(call: ServiceCall) -> None:
+        """Handle set log retention service call."""
+        manager = _get_manager(hass, call.data[ATTR_ENTRY_ID])
+
+        await manager.async_set_log_retention(
+            SetLogRetentionCommand(
+                retention_days=call.data[ATTR_RETENTION_DAYS] or None,
+            )
+        )
+
+    async def handle_export_archived_logs(call: ServiceCall) -> ServiceResponse:
+        """Handle export archived logs service call."""
+        manager = _get_manager(hass, call.data[ATTR_ENTRY_ID])
+
+        logs = await manager.async_export_archived_logs()
+        return {"logs": logs}
+
+    async def handle_purge_archived_logs(call: ServiceCall) -> ServiceResponse:
+        """Handle purge archived logs service call."""
+        manager = _get_manager(hass, call.data[ATTR_ENTRY_ID])
+
+        purged = await manager.async_purge_archived_logs(call.data.get(ATTR_BEFORE))
+        return {"purged": purged}
+
+    async def handle_get_timeline(call: ServiceCall) -> ServiceResponse:
+        """Handle get timeline service call."""
+        manager = _get_manager(hass, call.data[ATTR_ENTRY_ID])
+
+        timeline = manager.get_timeline(
+            call.data.get(ATTR_START),
+            timedelta(hours=call.data[ATTR_HOURS]),
+        )
+        return {"timeline": timeline}
+
     # Register services
     hass.services.async_register(
         DOMAIN, SERVICE_TAKE, handle_take, schema=SERVICE_TAKE_SCHEMA
@@ -498,6 +582,33 @@ async def async_register_services(hass: HomeAssistant) -> None:
         handle_calculate_adherence,
         schema=SERVICE_CALCULATE_ADHERENCE_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_LOG_RETENTION,
+        handle_set_log_retention,
+        schema=SERVICE_SET_LOG_RETENTION_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_ARCHIVED_LOGS,
+        handle_export_archived_logs,
+        schema=SERVICE_EXPORT_ARCHIVED_LOGS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PURGE_ARCHIVED_LOGS,
+        handle_purge_archived_logs,
+        schema=SERVICE_PURGE_ARCHIVED_LOGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TIMELINE,
+        handle_get_timeline,
+        schema=SERVICE_GET_TIMELINE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
 
     _LOGGER.info("Registered Med Expert services")
 
@@ -518,6 +629,10 @@ def async_unregister_services(hass: HomeAssistant) -> None:
         SERVICE_REPLACE_INHALER,
         SERVICE_UPDATE_NOTIFICATION_SETTINGS,
         SERVICE_CALCULATE_ADHERENCE,
+        SERVICE_SET_LOG_RETENTION,
+        SERVICE_EXPORT_ARCHIVED_LOGS,
+        SERVICE_PURGE_ARCHIVED_LOGS,
+        SERVICE_GET_TIMELINE,
     ]:
         hass.services.async_remove(DOMAIN, service)
 
@@ -0,0 +1,247 @@
+"""
+Columnar encoding of log records for med_expert.
+
+Serialized log records repeat the same keys, ISO timestamps and dose
+dictionaries for every entry. A columnar block stores each field as one
+array instead: timestamps as epoch seconds, and actions, units, slots,
+medication IDs and UTC offsets as indexes into small interned tables.
+Fields that are rarely set (meta, injection site) are kept sparsely per
+row. Decoding gives back the same dictionaries that LogRecord.to_dict
+produces, so the rest of the integration does not see the difference.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any
+
+# Value of the "format" key in the header of a columnar segment
+COLUMNAR_FORMAT = "columnar"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_NAIVE_EPOCH = datetime(1970, 1, 1)  # noqa: DTZ001
+_DOSE_KEYS = frozenset(("numerator", "denominator", "unit"))
+
+# Keys stored in columns; everything else goes into the sparse extras
+_COLUMN_KEYS = frozenset(
+    ("action", "taken_at", "scheduled_for", "dose", "slot_key", "medication_id")
+)
+
+
+class _Interner:
+    """Table of distinct values, each referenced by its index."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.codes: dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        """Get the index of a value, adding it to the table if needed."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _split_time(value: datetime) -> tuple[int, int, int | None]:
+    """Split a datetime into epoch seconds, microseconds and UTC offset."""
+    offset = value.utcoffset()
+    if offset is None:
+        delta = value - _NAIVE_EPOCH
+        offset_seconds = None
+    else:
+        delta = value - _EPOCH
+        offset_seconds = int(offset.total_seconds())
+    return delta.days * 86400 + delta.seconds, delta.microseconds, offset_seconds
+
+
+def _time_zones(offsets: list[int | None]) -> list[timezone | None]:
+    """Build the timezones of an offset table; None stays naive."""
+    return [
+        None if offset is None else timezone(timedelta(seconds=offset))
+        for offset in offsets
+    ]
+
+
+def _join_time(seconds: int, microseconds: int, tz: timezone | None) -> str:
+    """Rebuild the ISO string of a datetime split by _split_time."""
+    if tz is None:
+        value = _NAIVE_EPOCH + timedelta(seconds=seconds, microseconds=microseconds)
+    else:
+        value = datetime.fromtimestamp(seconds, tz)
+        if microseconds:
+            value = value.replace(microsecond=microseconds)
+    return value.isoformat()
+
+
+def encode_columns(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Encode serialized log records as a columnar block.
+
+    Args:
+        records: Log records as produced by LogRecord.to_dict.
+
+    Returns:
+        JSON-serializable columnar block.
+
+    """
+    actions = _Interner()
+    offsets = _Interner()
+    units = _Interner()
+    slots = _Interner()
+    medications = _Interner()
+
+    action_col: list[int] = []
+    taken_col: list[int] = []
+    taken_us_col: list[int] = []
+    offset_col: list[int] = []
+    scheduled_col: list[int | None] = []
+    scheduled_us_col: list[int] = []
+    scheduled_offset_col: list[int | None] = []
+    numerator_col: list[int | None] = []
+    denominator_col: list[int | None] = []
+    unit_col: list[int | None] = []
+    slot_col: list[int | None] = []
+    medication_col: list[int | None] = []
+    extras: dict[str, dict[str, Any]] = {}
+
+    for row, record in enumerate(records):
+        extra = {
+            key: value
+            for key, value in record.items()
+            if key not in _COLUMN_KEYS and value is not None
+        }
+
+        action_col.append(actions.code(record["action"]))
+
+        seconds, microseconds, offset = _split_time(
+            datetime.fromisoformat(record["taken_at"])
+        )
+        taken_col.append(seconds)
+        taken_us_col.append(microseconds)
+        offset_col.append(offsets.code(offset))
+
+        scheduled_for = record.get("scheduled_for")
+        if scheduled_for:
+            seconds, microseconds, offset = _split_time(
+                datetime.fromisoformat(scheduled_for)
+            )
+            scheduled_col.append(seconds)
+            scheduled_us_col.append(microseconds)
+            scheduled_offset_col.append(offsets.code(offset))
+        else:
+            scheduled_col.append(None)
+            scheduled_us_col.append(0)
+            scheduled_offset_col.append(None)
+
+        dose = record.get("dose")
+        if isinstance(dose, dict) and dose.keys() == _DOSE_KEYS:
+            numerator_col.append(dose["numerator"])
+            denominator_col.append(dose["denominator"])
+            unit_col.append(units.code(dose["unit"]))
+        else:
+            numerator_col.append(None)
+            denominator_col.append(None)
+            unit_col.append(None)
+            if dose is not None:
+                extra["dose"] = dose
+
+        slot_key = record.get("slot_key")
+        slot_col.append(None if slot_key is None else slots.code(slot_key))
+        medication_id = record.get("medication_id")
+        medication_col.append(
+            None if medication_id is None else medications.code(medication_id)
+        )
+
+        if extra:
+            extras[str(row)] = extra
+
+    block: dict[str, Any] = {
+        "n": len(records),
+        "actions": actions.values,
+        "offsets": offsets.values,
+        "units": units.values,
+        "slot_keys": slots.values,
+        "medication_ids": medications.values,
+        "action": action_col,
+        "taken_at": taken_col,
+        "offset": offset_col,
+        "scheduled_for": scheduled_col,
+        "scheduled_offset": scheduled_offset_col,
+        "dose_numerator": numerator_col,
+        "dose_denominator": denominator_col,
+        "dose_unit": unit_col,
+        "slot_key": slot_col,
+        "medication_id": medication_col,
+        "extras": extras,
+    }
+    # Microseconds are only stored when some record has them
+    if any(taken_us_col):
+        block["taken_at_us"] = taken_us_col
+    if any(scheduled_us_col):
+        block["scheduled_for_us"] = scheduled_us_col
+    return block
+
+
+def decode_columns(block: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Decode a columnar block back into serialized log records.
+
+    Args:
+        block: Block produced by encode_columns.
+
+    Returns:
+        Log records in the form produced by LogRecord.to_dict.
+
+    """
+    count = block["n"]
+    actions = block["actions"]
+    zones = _time_zones(block["offsets"])
+    units = block["units"]
+    slots = block["slot_keys"]
+    medications = block["medication_ids"]
+    taken_us_col = block.get("taken_at_us") or [0] * count
+    scheduled_us_col = block.get("scheduled_for_us") or [0] * count
+    extras = block["extras"]
+
+    records: list[dict[str, Any]] = []
+    for row in range(count):
+        scheduled = block["scheduled_for"][row]
+        unit = block["dose_unit"][row]
+        slot = block["slot_key"][row]
+        medication = block["medication_id"][row]
+
+        record: dict[str, Any] = {
+            "action": actions[block["action"][row]],
+            "taken_at": _join_time(
+                block["taken_at"][row],
+                taken_us_col[row],
+                zones[block["offset"][row]],
+            ),
+            "scheduled_for": None
+            if scheduled is None
+            else _join_time(
+                scheduled,
+                scheduled_us_col[row],
+                zones[block["scheduled_offset"][row]],
+            ),
+            "dose": None
+            if unit is None
+            else {
+                "numerator": block["dose_numerator"][row],
+                "denominator": block["dose_denominator"][row],
+                "unit": units[unit],
+            },
+            "slot_key": None if slot is None else slots[slot],
+            "meta": None,
+        }
+        if medication is not None:
+            record["medication_id"] = medications[medication]
+        extra = extras.get(str(row))
+        if extra:
+            record.update(extra)
+        records.append(record)
+    return records
@@ -0,0 +1,606 @@
+"""
+Append-only intake log journal for med_expert.
+
+Log records are kept out of the profile document and written as
+newline-delimited JSON segments, one directory per profile, under
+Home Assistant's storage directory. New records are appended to the
+active segment; once a profile has too many segments they are merged
+back into a single compacted segment.
+
+Compacted segments can be written in the columnar format of log_codec,
+which is several times smaller and faster to parse; appended segments
+stay one JSON record per line.
+
+Records that fall out of a profile's retention window are moved to an
+archive file next to the segments, and their rolled-up daily aggregates
+are kept in a separate aggregates file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import LOG_JOURNAL_DIR
+from .log_codec import COLUMNAR_FORMAT, decode_columns, encode_columns
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Records per segment before a new segment is started
+SEGMENT_MAX_RECORDS = 1000
+
+# Number of segments that triggers a compaction
+COMPACT_SEGMENT_THRESHOLD = 8
+
+SEGMENT_SUFFIX = ".jsonl"
+
+# Raw records archived by the retention policy
+ARCHIVE_FILE = "archive.jsonl"
+
+# Rolled-up aggregates of archived records
+AGGREGATES_FILE = "aggregates.json"
+
+# First line of a compacted segment. Segments numbered below a compacted
+# segment are stale (left behind by an interrupted compaction).
+COMPACTED_HEADER = {"compacted": True}
+
+# First line of a compacted segment holding columnar blocks
+COLUMNAR_HEADER = {"compacted": True, "format": COLUMNAR_FORMAT}
+
+
+class LogJournal:
+    """
+    Per-profile append-only storage for log records.
+
+    All file access runs in the executor. Operations on the same profile
+    are serialized with a per-profile lock.
+    """
+
+    def __init__(self, hass: HomeAssistant, *, columnar: bool = False) -> None:
+        """
+        Initialize the journal.
+
+        Args:
+            hass: Home Assistant instance.
+            columnar: Whether compacted segments use the columnar format.
+                Both formats are always readable.
+
+        """
+        self._hass = hass
+        self._columnar = columnar
+        self._base_path = Path(hass.config.path(STORAGE_DIR, LOG_JOURNAL_DIR))
+        # profile_id -> sorted segment numbers on disk
+        self._segments: dict[str, list[int]] = {}
+        # profile_id -> number of records in the active (last) segment
+        self._active_counts: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _lock(self, profile_id: str) -> asyncio.Lock:
+        """Get the lock for a profile."""
+        return self._locks.setdefault(profile_id, asyncio.Lock())
+
+    def _profile_path(self, profile_id: str) -> Path:
+        """Get the segment directory of a profile."""
+        return self._base_path / profile_id
+
+    def segment_count(self, profile_id: str) -> int:
+        """Return the number of known segments for a profile."""
+        return len(self._segments.get(profile_id, []))
+
+    async def async_load(self, profile_id: str) -> list[dict[str, Any]]:
+        """
+        Load all log records of a profile.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Stored log records in append order.
+
+        """
+        async with self._lock(profile_id):
+            path = self._profile_path(profile_id)
+            records, segments, active_count = await self._hass.async_add_executor_job(
+                _read_profile, path
+            )
+            self._segments[profile_id] = segments
+            self._active_counts[profile_id] = active_count
+
+            remaining = await self._hass.async_add_executor_job(
+                _drop_archived, path, records, segments
+            )
+            if remaining is not None:
+                # Finish the interrupted archive run
+                records = remaining
+                await self._async_compact_locked(profile_id, records)
+            return records
+
+    async def async_append(
+        self,
+        profile_id: str,
+        records: list[dict[str, Any]],
+    ) -> None:
+        """
+        Append log records to the active segment of a profile.
+
+        Starts a new segment when the active one is full and compacts the
+        profile when it has accumulated too many segments.
+
+        Args:
+            profile_id: The profile ID.
+            records: Serialized log records to append.
+
+        """
+        if not records:
+            return
+
+        async with self._lock(profile_id):
+            await self._async_ensure_index(profile_id)
+
+            segments = self._segments[profile_id]
+            if not segments or self._active_counts[profile_id] >= SEGMENT_MAX_RECORDS:
+                segments.append(segments[-1] + 1 if segments else 1)
+                self._active_counts[profile_id] = 0
+
+            await self._hass.async_add_executor_job(
+                _append_segment,
+                self._profile_path(profile_id),
+                segments[-1],
+                records,
+            )
+            self._active_counts[profile_id] += len(records)
+
+            if len(segments) > COMPACT_SEGMENT_THRESHOLD:
+                await self._async_compact_locked(profile_id, None)
+
+    async def async_compact(self, profile_id: str) -> None:
+        """
+        Merge all segments of a profile into a single segment.
+
+        Args:
+            profile_id: The profile ID.
+
+        """
+        async with self._lock(profile_id):
+            await self._async_ensure_index(profile_id)
+            if len(self._segments[profile_id]) > 1:
+                await self._async_compact_locked(profile_id, None)
+
+    async def async_rewrite(self, profile_id: str) -> None:
+        """
+        Rewrite all segments of a profile into one in the configured format.
+
+        Used to migrate between the row and columnar formats.
+
+        Args:
+            profile_id: The profile ID.
+
+        """
+        async with self._lock(profile_id):
+            await self._async_ensure_index(profile_id)
+            if self._segments[profile_id]:
+                await self._async_compact_locked(profile_id, None)
+
+    async def async_replace(
+        self,
+        profile_id: str,
+        records: list[dict[str, Any]],
+    ) -> None:
+        """
+        Replace all stored records of a profile.
+
+        Used when splitting legacy log arrays out of the profile document.
+        Idempotent: running it twice leaves a single copy of the records.
+
+        Args:
+            profile_id: The profile ID.
+            records: Serialized log records.
+
+        """
+        async with self._lock(profile_id):
+            await self._async_ensure_index(profile_id)
+            await self._async_compact_locked(profile_id, records)
+
+    async def async_archive(
+        self,
+        profile_id: str,
+        archived: list[dict[str, Any]],
+        aggregates: dict[str, Any],
+        remaining: list[dict[str, Any]],
+    ) -> None:
+        """
+        Move records out of the live segments into the archive.
+
+        The archive is appended first and the aggregates are written
+        before the live segments are rewritten. The aggregates remember
+        the number of the segment that replaces the live ones; if that
+        segment never got written, loading drops the records the
+        aggregates already cover instead of counting them twice.
+
+        Args:
+            profile_id: The profile ID.
+            archived: Serialized records to append to the archive.
+            aggregates: Serialized aggregates replacing the stored ones.
+            remaining: Serialized records that stay in the live segments.
+
+        """
+        async with self._lock(profile_id):
+            await self._async_ensure_index(profile_id)
+            path = self._profile_path(profile_id)
+            segments = self._segments[profile_id]
+            new_segment = segments[-1] + 1 if segments else 1
+            if archived:
+                await self._hass.async_add_executor_job(
+                    _append_file, path / ARCHIVE_FILE, archived
+                )
+            await self._hass.async_add_executor_job(
+                _write_json,
+                path / AGGREGATES_FILE,
+                {**aggregates, "segment": new_segment},
+            )
+            await self._async_compact_locked(profile_id, remaining)
+
+    async def async_load_aggregates(self, profile_id: str) -> dict[str, Any]:
+        """
+        Load the rolled-up aggregates of archived records.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized aggregates, empty if nothing was archived yet.
+
+        """
+        async with self._lock(profile_id):
+            data = await self._hass.async_add_executor_job(
+                _read_json, self._profile_path(profile_id) / AGGREGATES_FILE
+            )
+            data.pop("segment", None)
+            return data
+
+    async def async_load_archive(self, profile_id: str) -> list[dict[str, Any]]:
+        """
+        Load the archived raw records of a profile.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized archived records in archive order.
+
+        """
+        async with self._lock(profile_id):
+            path = self._profile_path(profile_id) / ARCHIVE_FILE
+            records, _ = await self._hass.async_add_executor_job(_read_file, path)
+            return records
+
+    async def async_purge_archive(
+        self,
+        profile_id: str,
+        before: datetime | None = None,
+    ) -> int:
+        """
+        Delete archived raw records; their aggregates are kept.
+
+        Args:
+            profile_id: The profile ID.
+            before: Only delete records taken before this time.
+
+        Returns:
+            Number of deleted records.
+
+        """
+        async with self._lock(profile_id):
+            return await self._hass.async_add_executor_job(
+                _purge_archive, self._profile_path(profile_id) / ARCHIVE_FILE, before
+            )
+
+    async def async_remove(self, profile_id: str) -> None:
+        """
+        Remove all stored records of a profile.
+
+        Args:
+            profile_id: The profile ID.
+
+        """
+        async with self._lock(profile_id):
+            await self._hass.async_add_executor_job(
+                _remove_profile, self._profile_path(profile_id)
+            )
+            self._segments.pop(profile_id, None)
+            self._active_counts.pop(profile_id, None)
+
+    async def _async_ensure_index(self, profile_id: str) -> None:
+        """Scan the segments of a profile unless they are already known."""
+        if profile_id in self._segments:
+            return
+        segments, active_count = await self._hass.async_add_executor_job(
+            _scan_profile, self._profile_path(profile_id)
+        )
+        self._segments[profile_id] = segments
+        self._active_counts[profile_id] = active_count
+
+    async def _async_compact_locked(
+        self,
+        profile_id: str,
+        records: list[dict[str, Any]] | None,
+    ) -> None:
+        """Write a compacted segment and drop the ones it replaces."""
+        segments = self._segments[profile_id]
+        new_segment = segments[-1] + 1 if segments else 1
+        count = await self._hass.async_add_executor_job(
+            _write_compacted,
+            self._profile_path(profile_id),
+            segments,
+            new_segment,
+            records,
+            self._columnar,
+        )
+        self._segments[profile_id] = [new_segment]
+        self._active_counts[profile_id] = count
+        _LOGGER.debug(
+            "Compacted %d log segments of profile %s into one (%d records)",
+            len(segments),
+            profile_id,
+            count,
+        )
+
+
+# ============================================================================
+# Blocking file helpers (run in the executor)
+# ============================================================================
+
+
+def _segment_path(path: Path, number: int) -> Path:
+    """Get the file path of a segment."""
+    return path / f"{number:08d}{SEGMENT_SUFFIX}"
+
+
+def _list_segments(path: Path) -> list[int]:
+    """List segment numbers in a profile directory."""
+    if not path.is_dir():
+        return []
+    numbers = []
+    for child in path.iterdir():
+        if child.suffix == SEGMENT_SUFFIX and child.stem.isdigit():
+            numbers.append(int(child.stem))
+    return sorted(numbers)
+
+
+def _read_segment(segment: Path) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Read one segment.
+
+    Returns:
+        Tuple of (records, is_compacted).
+
+    """
+    return _read_file(segment)
+
+
+def _read_file(segment: Path) -> tuple[list[dict[str, Any]], bool]:
+    """Read a newline-delimited JSON file, which may not exist."""
+    records: list[dict[str, Any]] = []
+    compacted = False
+    columnar = False
+    if not segment.is_file():
+        return records, compacted
+    with segment.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle):
+            line = line.strip()  # noqa: PLW2901
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write at the end of a segment after a crash
+                _LOGGER.warning(
+                    "Skipping unreadable line %d in log segment %s",
+                    line_number + 1,
+                    segment,
+                )
+                continue
+            if line_number == 0 and record in (COMPACTED_HEADER, COLUMNAR_HEADER):
+                compacted = True
+                columnar = record == COLUMNAR_HEADER
+                continue
+            if columnar and line_number == 1 and _is_block(record):
+                records.extend(decode_columns(record))
+            else:
+                records.append(record)
+    return records, compacted
+
+
+def _is_block(record: dict[str, Any]) -> bool:
+    """Check whether the line after a columnar header is its block."""
+    # Segments compacted without records used to be written without a
+    # block, so the line after the header can be an appended record
+    return "n" in record
+
+
+def _read_profile(path: Path) -> tuple[list[dict[str, Any]], list[int], int]:
+    """
+    Read all records of a profile, dropping stale pre-compaction segments.
+
+    Returns:
+        Tuple of (records, live segment numbers, active segment record count).
+
+    """
+    records: list[dict[str, Any]] = []
+    live: list[int] = []
+    active_count = 0
+
+    for number in _list_segments(path):
+        segment_records, compacted = _read_segment(_segment_path(path, number))
+        if compacted:
+            for stale in live:
+                _segment_path(path, stale).unlink(missing_ok=True)
+            records = []
+            live = []
+        records.extend(segment_records)
+        live.append(number)
+        active_count = len(segment_records)
+
+    return records, live, active_count
+
+
+def _drop_archived(
+    path: Path,
+    records: list[dict[str, Any]],
+    segments: list[int],
+) -> list[dict[str, Any]] | None:
+    """
+    Drop records an interrupted archive run already rolled up.
+
+    Returns:
+        The remaining records, or None if no archive run was interrupted.
+
+    """
+    aggregates = _read_json(path / AGGREGATES_FILE)
+    archived_before = aggregates.get("logs_archived_before")
+    if not archived_before or aggregates.get("segment", 0) <= (
+        segments[-1] if segments else 0
+    ):
+        return None
+
+    _LOGGER.warning(
+        "Log archiving in %s was interrupted, dropping already archived records",
+        path,
+    )
+    cutoff = datetime.fromisoformat(archived_before)
+    return [
+        record
+        for record in records
+        if datetime.fromisoformat(record["taken_at"]) >= cutoff
+    ]
+
+
+def _scan_profile(path: Path) -> tuple[list[int], int]:
+    """Find the segments of a profile and the size of the active one."""
+    segments = _list_segments(path)
+    if not segments:
+        return [], 0
+    header = json.dumps(COMPACTED_HEADER)
+    columnar_header = json.dumps(COLUMNAR_HEADER)
+    active_count = 0
+    columnar = False
+    with _segment_path(path, segments[-1]).open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle):
+            line = line.strip()  # noqa: PLW2901
+            if not line or line == header:
+                continue
+            if line_number == 0 and line == columnar_header:
+                columnar = True
+            elif columnar and line_number == 1:
+                record = json.loads(line)
+                active_count += record["n"] if _is_block(record) else 1
+            else:
+                active_count += 1
+    return segments, active_count
+
+
+def _append_segment(path: Path, number: int, records: list[dict[str, Any]]) -> None:
+    """Append records to a segment."""
+    _append_file(_segment_path(path, number), records)
+
+
+def _append_file(target: Path, records: list[dict[str, Any]]) -> None:
+    """Append records to a newline-delimited JSON file."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(
+        json.dumps(record, separators=(",", ":")) + "\n" for record in records
+    )
+    with target.open("a", encoding="utf-8") as handle:
+        handle.write(payload)
+
+
+def _read_json(target: Path) -> dict[str, Any]:
+    """Read a JSON document, empty if it does not exist."""
+    if not target.is_file():
+        return {}
+    return json.loads(target.read_text(encoding="utf-8"))
+
+
+def _write_json(target: Path, data: dict[str, Any]) -> None:
+    """Atomically write a JSON document."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_suffix(".tmp")
+    temp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    temp.replace(target)
+
+
+def _purge_archive(target: Path, before: datetime | None) -> int:
+    """Delete archived records, optionally only those taken before a time."""
+    records, _ = _read_file(target)
+    if before is None:
+        target.unlink(missing_ok=True)
+        return len(records)
+
+    kept = [
+        record
+        for record in records
+        if datetime.fromisoformat(record["taken_at"]) >= before
+    ]
+    temp = target.with_suffix(".tmp")
+    with temp.open("w", encoding="utf-8") as handle:
+        for record in kept:
+            handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+    temp.replace(target)
+    return len(records) - len(kept)
+
+
+def _remove_profile(path: Path) -> None:
+    """Delete the segment directory of a profile."""
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _write_compacted(
+    path: Path,
+    old_segments: list[int],
+    new_segment: int,
+    records: list[dict[str, Any]] | None,
+    columnar: bool = False,  # noqa: FBT001, FBT002
+) -> int:
+    """
+    Write a compacted segment replacing old_segments.
+
+    If records is None the old segments are read and merged. A columnar
+    segment holds a single block with all records on the line after the
+    header, even if there are no records; records appended later follow
+    one per line.
+
+    Returns:
+        Number of records in the compacted segment.
+
+    """
+    if records is None:
+        records, _, _ = _read_profile(path)
+
+    path.mkdir(parents=True, exist_ok=True)
+    target = _segment_path(path, new_segment)
+    temp = target.with_suffix(".tmp")
+    with temp.open("w", encoding="utf-8") as handle:
+        if columnar:
+            handle.write(json.dumps(COLUMNAR_HEADER) + "\n")
+            block = encode_columns(records)
+            handle.write(json.dumps(block, separators=(",", ":")) + "\n")
+        else:
+            handle.write(json.dumps(COMPACTED_HEADER) + "\n")
+            for record in records:
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+    temp.replace(target)
+
+    for number in old_segments:
+        _segment_path(path, number).unlink(missing_ok=True)
+
+    return len(records)
@@ -8,12 +8,14 @@ One manager instance per config entry (profile).
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Any
 from zoneinfo import ZoneInfo
 
 from homeassistant.core import Event
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_change
 
 from custom_components.med_expert.application.services import (
     AddMedicationCommand,
@@ -21,6 +23,7 @@ from custom_components.med_expert.application.services import (
     PRNTakeCommand,
     RefillCommand,
     ReplaceInhalerCommand,
+    SetLogRetentionCommand,
     SkipCommand,
     SnoozeCommand,
     TakeCommand,
@@ -30,19 +33,29 @@ from custom_components.med_expert.application.services import (
 )
 from custom_components.med_expert.const import (
     EVENT_MOBILE_APP_NOTIFICATION_ACTION,
+    MISSED_BACKFILL_DAYS,
     NOTIFICATION_ACTION_SKIP,
     NOTIFICATION_ACTION_SNOOZE,
+    NOTIFICATION_ACTION_SNOOZE_ALL,
+    NOTIFICATION_ACTION_TAKE_ALL,
     NOTIFICATION_ACTION_TAKEN,
     NOTIFICATION_TAG_PREFIX,
 )
+from custom_components.med_expert.domain.history import (
+    HistoryQuery,
+    count_history_by_day,
+    query_history,
+)
 from custom_components.med_expert.domain.models import (
     Medication,
     MedicationStatus,
     Profile,
 )
+from custom_components.med_expert.domain.timeline import DoseTimeline
 
 from .notifications import NotificationManager
-from .scheduler import MedicationScheduler
+from .scheduler import MedicationScheduler, ReminderTimer
+from .snapshots import MedicationSnapshot, SnapshotStore
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -51,9 +64,17 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
-# Dispatcher signal for entity updates
-SIGNAL_MEDICATION_UPDATED = "med_expert_medication_updated_{entry_id}"
+# Dispatcher signals for entity updates. SIGNAL_MEDICATION_UPDATED is one
+# channel per medication, sent when its snapshot changed, so that only the
+# entities of that medication wake up; SIGNAL_PROFILE_UPDATED carries the
+# list of updated medication IDs for listeners of the whole profile
+SIGNAL_MEDICATION_UPDATED = "med_expert_medication_updated_{entry_id}_{medication_id}"
+SIGNAL_PROFILE_UPDATED = "med_expert_profile_updated_{entry_id}"
 SIGNAL_MEDICATIONS_CHANGED = "med_expert_medications_changed_{entry_id}"
+SIGNAL_ADHERENCE_UPDATED = "med_expert_adherence_updated_{entry_id}"
+
+# Local time at which the log retention is applied every day
+LOG_RETENTION_HOUR = 3
 
 
 class ProfileManager:
@@ -73,6 +94,8 @@ class ProfileManager:
         entry_id: str,
         profile: Profile,
         repository: ProfileRepository,
+        timer: ReminderTimer | None = None,
+        backfill_window: timedelta = timedelta(days=MISSED_BACKFILL_DAYS),
     ) -> None:
         """
         Initialize the manager.
@@ -82,18 +105,27 @@ class ProfileManager:
             entry_id: The config entry ID.
             profile: The profile being managed.
             repository: The profile repository.
+            timer: Reminder timer shared by all profiles (optional).
+            backfill_window: Longest downtime whose missed doses are logged
+                on start.
 
         """
         self._hass = hass
         self._entry_id = entry_id
         self._profile = profile
         self._repository = repository
+        self._timer = timer
+        self._backfill_window = backfill_window
         self._service = MedicationService(
             get_now=lambda: datetime.now(ZoneInfo(profile.timezone))
         )
         self._scheduler: MedicationScheduler | None = None
+        self._timeline = DoseTimeline(profile)
+        self._snapshots = SnapshotStore(profile)
         self._notification_manager = NotificationManager(hass, entry_id)
         self._action_unsubscribe: callable | None = None
+        self._retention_unsubscribe: callable | None = None
+        self._day_change_unsubscribe: callable | None = None
 
     @property
     def profile(self) -> Profile:
@@ -110,6 +142,14 @@ class ProfileManager:
         """Get the config entry ID."""
         return self._entry_id
 
+    @property
+    def adherence_rate(self) -> float | None:
+        """Get the 30-day adherence rate, or None if not calculated yet."""
+        stats = self._profile.adherence_stats
+        if stats is None:
+            return None
+        return round(stats.monthly_rate, 1)
+
     def get_medication(self, medication_id: str) -> Medication | None:
         """
         Get a medication by ID.
@@ -123,6 +163,40 @@ class ProfileManager:
         """
         return self._profile.get_medication(medication_id)
 
+    def get_snapshot(self, medication_id: str) -> MedicationSnapshot | None:
+        """
+        Get the latest snapshot of a medication, as shown by its entities.
+
+        Args:
+            medication_id: The medication ID.
+
+        Returns:
+            The snapshot or None.
+
+        """
+        return self._snapshots.get(medication_id)
+
+    def get_profile_snapshot(self) -> dict[str, Any]:
+        """
+        Get the profile and the snapshots of all its medications.
+
+        Returns:
+            The profile, as a dictionary.
+
+        """
+        return {
+            "entry_id": self._entry_id,
+            "profile_id": self._profile.profile_id,
+            "name": self._profile.name,
+            "timezone": self._profile.timezone,
+            "adherence_rate": self.adherence_rate,
+            "medications": [
+                snapshot.to_dict()
+                for medication_id in self._profile.medications
+                if (snapshot := self._snapshots.get(medication_id))
+            ],
+        }
+
     def get_all_medications(self) -> dict[str, Medication]:
         """
         Get all medications.
@@ -140,14 +214,49 @@ class ProfileManager:
             self._profile,
             on_due=self._on_medication_due,
             on_missed=self._on_medication_missed,
+            timer=self._timer,
+            on_due_batch=self._on_medications_due,
+        )
+
+        # Log the doses missed while stopped, before the states move on
+        missed = self._service.backfill_missed_doses(
+            self._profile, self._backfill_window
         )
 
         # Recompute all states on startup
         self._service.recompute_all_states(self._profile)
+        self._timeline.invalidate_all()
+        self._snapshots.refresh(*self._profile.medications)
+
+        if missed:
+            # One save for the whole backfill
+            await self._repository.async_update(self._profile)
+            _LOGGER.info(
+                "Logged %d doses missed while %s was not running",
+                len(missed),
+                self._profile.name,
+            )
 
         # Schedule all medications
         self._scheduler.schedule_all()
 
+        # Build the adherence counters once; they are updated per log
+        # record from here on and refreshed when the day changes
+        self._service.calculate_adherence_stats(self._profile)
+        self._day_change_unsubscribe = async_track_time_change(
+            self._hass, self._on_day_change, hour=0, minute=0, second=0
+        )
+
+        # Archive logs outside the retention window, now and once a day
+        await self.async_apply_log_retention()
+        self._retention_unsubscribe = async_track_time_change(
+            self._hass,
+            self._on_retention_time,
+            hour=LOG_RETENTION_HOUR,
+            minute=0,
+            second=0,
+        )
+
         # Subscribe to mobile_app notification actions
         self._action_unsubscribe = self._hass.bus.async_listen(
             EVENT_MOBILE_APP_NOTIFICATION_ACTION,
@@ -171,9 +280,20 @@ class ProfileManager:
             self._action_unsubscribe()
             self._action_unsubscribe = None
 
+        if self._retention_unsubscribe:
+            self._retention_unsubscribe()
+            self._retention_unsubscribe = None
+
+        if self._day_change_unsubscribe:
+            self._day_change_unsubscribe()
+            self._day_change_unsubscribe = None
+
         # Dismiss all notifications
         await self._notification_manager.async_dismiss_all()
 
+        # Write changes still waiting in the save delay
+        await self._repository.async_flush()
+
         _LOGGER.info("Stopped profile manager for %s", self._profile.name)
 
     async def async_add_medication(
@@ -198,6 +318,7 @@ class ProfileManager:
         # Schedule
         if self._scheduler:
             self._scheduler.schedule_medication(medication)
+        self._timeline.invalidate(medication.medication_id)
 
         # Signal entities to update
         self._signal_medications_changed()
@@ -261,6 +382,8 @@ class ProfileManager:
             # Cancel schedule
             if self._scheduler:
                 self._scheduler.cancel_medication(medication_id)
+            self._timeline.invalidate(medication_id)
+            self._snapshots.remove(medication_id)
 
             # Dismiss notification
             await self._notification_manager.async_dismiss_notification(medication_id)
@@ -287,7 +410,8 @@ class ProfileManager:
             command: The take command.
 
         """
-        self._service.take(self._profile, command)
+        service = await self._async_record_command(command)
+        service.take(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -312,6 +436,8 @@ class ProfileManager:
             # Signal update
             self._signal_medication_updated(command.medication_id)
 
+        self._update_adherence()
+
     async def async_prn_take(
         self,
         command: PRNTakeCommand,
@@ -323,7 +449,8 @@ class ProfileManager:
             command: The PRN take command.
 
         """
-        self._service.prn_take(self._profile, command)
+        service = await self._async_record_command(command)
+        service.prn_take(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -338,6 +465,7 @@ class ProfileManager:
 
         # Signal update
         self._signal_medication_updated(command.medication_id)
+        self._update_adherence()
 
     async def async_snooze(
         self,
@@ -353,7 +481,8 @@ class ProfileManager:
             When the snooze ends.
 
         """
-        snooze_until = self._service.snooze(self._profile, command)
+        service = await self._async_record_command(command)
+        snooze_until = service.snooze(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -385,7 +514,8 @@ class ProfileManager:
             command: The skip command.
 
         """
-        self._service.skip(self._profile, command)
+        service = await self._async_record_command(command)
+        service.skip(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -404,6 +534,8 @@ class ProfileManager:
             # Signal update
             self._signal_medication_updated(command.medication_id)
 
+        self._update_adherence()
+
     async def _on_medication_due(
         self,
         profile_id: str,
@@ -417,27 +549,55 @@ class ProfileManager:
             medication_id: The medication ID.
 
         """
-        medication = self._profile.get_medication(medication_id)
-        if medication is None:
+        await self._on_medications_due(profile_id, [medication_id])
+
+    async def _on_medications_due(
+        self,
+        profile_id: str,
+        medication_ids: list[str],
+    ) -> None:
+        """
+        Handle medications that are due together.
+
+        The batch is persisted once, announced in one notification and
+        signalled to the entities once.
+
+        Args:
+            profile_id: The profile ID.
+            medication_ids: The medication IDs.
+
+        """
+        medications = [
+            medication
+            for medication_id in medication_ids
+            if (medication := self._profile.get_medication(medication_id))
+        ]
+        if not medications:
             return
 
         # Update status
-        medication.state.status = MedicationStatus.DUE
+        for medication in medications:
+            medication.state.status = MedicationStatus.DUE
 
         # Persist
         await self._repository.async_update(self._profile)
 
         # Send actionable notification
-        await self._notification_manager.async_send_due_notification(
-            self._profile, medication
-        )
+        if len(medications) == 1:
+            await self._notification_manager.async_send_due_notification(
+                self._profile, medications[0]
+            )
+        else:
+            await self._notification_manager.async_send_due_batch_notification(
+                self._profile, medications
+            )
 
         # Signal update
-        self._signal_medication_updated(medication_id)
+        self._signal_medication_updated(*(m.medication_id for m in medications))
 
         _LOGGER.info(
-            "Medication %s is due",
-            medication.display_name,
+            "Medications due: %s",
+            ", ".join(m.display_name for m in medications),
         )
 
     async def _on_medication_missed(
@@ -494,6 +654,10 @@ class ProfileManager:
             # Try to get from action data
             return
 
+        if action in (NOTIFICATION_ACTION_TAKE_ALL, NOTIFICATION_ACTION_SNOOZE_ALL):
+            await self._handle_batch_action(action, tag)
+            return
+
         # Extract entry_id and medication_id from tag
         # Tag format: med_expert_{entry_id}_{medication_id}
         parts = tag[len(NOTIFICATION_TAG_PREFIX) :].split("_", 1)
@@ -526,6 +690,40 @@ class ProfileManager:
         elif action == NOTIFICATION_ACTION_SKIP:
             await self.async_skip(SkipCommand(medication_id=medication_id))
 
+    async def _handle_batch_action(self, action: str, tag: str) -> None:
+        """
+        Handle an action of a batch notification.
+
+        Args:
+            action: NOTIFICATION_ACTION_TAKE_ALL or NOTIFICATION_ACTION_SNOOZE_ALL.
+            tag: The notification tag of the batch.
+
+        """
+        if not tag.startswith(f"{NOTIFICATION_TAG_PREFIX}{self._entry_id}_"):
+            # Not for this manager
+            return
+
+        medication_ids = self._notification_manager.get_batch_medication_ids(tag)
+        if not medication_ids:
+            # Batch forgotten (e.g. after a restart); its medications are
+            # unknown, so do not guess which doses the user confirmed
+            _LOGGER.warning(
+                "Ignoring notification action %s for unknown batch %s", action, tag
+            )
+            return
+
+        _LOGGER.info(
+            "Handling notification action %s for %d medications",
+            action,
+            len(medication_ids),
+        )
+
+        for medication_id in medication_ids:
+            if action == NOTIFICATION_ACTION_TAKE_ALL:
+                await self.async_take(TakeCommand(medication_id=medication_id))
+            else:
+                await self.async_snooze(SnoozeCommand(medication_id=medication_id))
+
     async def async_refill(
         self,
         command: RefillCommand,
@@ -537,7 +735,8 @@ class ProfileManager:
             command: The refill command.
 
         """
-        self._service.refill(self._profile, command)
+        service = await self._async_record_command(command)
+        service.refill(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -613,7 +812,8 @@ class ProfileManager:
             command: The replace inhaler command.
 
         """
-        self._service.replace_inhaler(self._profile, command)
+        service = await self._async_record_command(command)
+        service.replace_inhaler(self._profile, command)
 
         # Persist
         await self._repository.async_update(self._profile)
@@ -650,7 +850,7 @@ class ProfileManager:
         await self._repository.async_update(self._profile)
 
         # Signal update for adherence sensor
-        self._signal_medications_changed()
+        self._signal_adherence_updated()
 
         _LOGGER.info(
             "Calculated adherence for profile %s: %.1f%% (30-day)",
@@ -658,16 +858,211 @@ class ProfileManager:
             self._profile.adherence_stats.monthly_rate,
         )
 
-    def _signal_medication_updated(self, medication_id: str) -> None:
+    async def async_set_log_retention(self, command: SetLogRetentionCommand) -> None:
         """
-        Signal that a medication was updated.
+        Set the log retention and apply it right away.
 
         Args:
-            medication_id: The medication ID.
+            command: The set log retention command.
 
         """
-        signal = SIGNAL_MEDICATION_UPDATED.format(entry_id=self._entry_id)
-        async_dispatcher_send(self._hass, signal, medication_id)
+        self._service.set_log_retention(self._profile, command)
+
+        # Persist
+        await self._repository.async_update(self._profile)
+
+        await self.async_apply_log_retention()
+
+    async def async_apply_log_retention(self) -> None:
+        """Archive raw logs that fell out of the retention window."""
+        archived = self._service.apply_log_retention(self._profile)
+        if not archived:
+            return
+
+        await self._repository.async_archive_logs(self._profile, archived)
+
+        _LOGGER.info(
+            "Archived %d log records of profile %s",
+            len(archived),
+            self._profile.name,
+        )
+
+    async def _on_day_change(self, _now: datetime) -> None:
+        """Refresh adherence statistics at midnight, when the windows move."""
+        self._update_adherence()
+
+        # Inventories may have expired; only changed snapshots are signalled
+        changed = self._snapshots.refresh(*self._profile.medications)
+        if changed:
+            self._send_update_signals(changed, changed)
+
+    async def _on_retention_time(self, _now: datetime) -> None:
+        """Apply the log retention once a day."""
+        await self.async_apply_log_retention()
+
+    async def async_export_archived_logs(self) -> list[dict[str, Any]]:
+        """
+        Get the archived raw log records of this profile.
+
+        Returns:
+            Serialized archived log records.
+
+        """
+        return await self._repository.async_export_archived_logs(self.profile_id)
+
+    async def async_purge_archived_logs(self, before: datetime | None = None) -> int:
+        """
+        Delete archived raw log records; daily aggregates are kept.
+
+        Args:
+            before: Only delete records taken before this time.
+
+        Returns:
+            Number of deleted records.
+
+        """
+        purged = await self._repository.async_purge_archived_logs(
+            self.profile_id, before
+        )
+        _LOGGER.info(
+            "Purged %d archived log records of profile %s",
+            purged,
+            self._profile.name,
+        )
+        return purged
+
+    def get_timeline(
+        self,
+        start: datetime | None = None,
+        duration: timedelta = timedelta(hours=24),
+    ) -> list[dict[str, Any]]:
+        """
+        Get the upcoming doses of all medications, in chronological order.
+
+        Args:
+            start: Start of the range; defaults to now. Naive times are
+                taken in the profile's timezone.
+            duration: Length of the range.
+
+        Returns:
+            The doses in the range, as dictionaries.
+
+        """
+        tz = ZoneInfo(self._profile.timezone)
+        if start is None:
+            start = datetime.now(tz)
+        elif start.tzinfo is None:
+            start = start.replace(tzinfo=tz)
+        medications = self._profile.medications
+        return [
+            entry.to_dict(medications[entry.medication_id].display_name)
+            for entry in self._timeline.get(start, start + duration)
+        ]
+
+    def get_history(
+        self,
+        query: HistoryQuery,
+        *,
+        by_day: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Get one page of the profile's log records.
+
+        Args:
+            query: Filters and paging. Naive times are taken in the
+                profile's timezone.
+            by_day: Also count the matching records per day.
+
+        Returns:
+            The records and the cursor of the next page, plus the counts
+            per day if requested.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        """
+        tz = ZoneInfo(self._profile.timezone)
+        if query.start is not None and query.start.tzinfo is None:
+            query = replace(query, start=query.start.replace(tzinfo=tz))
+        if query.end is not None and query.end.tzinfo is None:
+            query = replace(query, end=query.end.replace(tzinfo=tz))
+
+        page = query_history(self._profile, query)
+        result: dict[str, Any] = {
+            "records": [record.to_dict() for record in page.records],
+            "next_cursor": page.next_cursor,
+        }
+        if by_day:
+            result["days"] = count_history_by_day(self._profile, query)
+        return result
+
+    def _signal_medication_updated(self, *medication_ids: str) -> None:
+        """
+        Signal that medications were updated.
+
+        Their entries on the timeline are dropped and their snapshots
+        rebuilt before the signals go out, since every state change is
+        signalled here.
+
+        Args:
+            *medication_ids: The medication IDs.
+
+        """
+        for medication_id in medication_ids:
+            self._timeline.invalidate(medication_id)
+        changed = self._snapshots.refresh(*medication_ids)
+        self._send_update_signals(list(medication_ids), changed)
+
+    def _send_update_signals(
+        self,
+        medication_ids: list[str],
+        changed: list[str],
+    ) -> None:
+        """
+        Send the profile signal, and the signal of each changed medication.
+
+        Args:
+            medication_ids: The updated medication IDs.
+            changed: The IDs among them whose snapshot changed.
+
+        """
+        for medication_id in changed:
+            signal = SIGNAL_MEDICATION_UPDATED.format(
+                entry_id=self._entry_id, medication_id=medication_id
+            )
+            async_dispatcher_send(self._hass, signal)
+        signal = SIGNAL_PROFILE_UPDATED.format(entry_id=self._entry_id)
+        async_dispatcher_send(self._hass, signal, medication_ids)
+
+    async def _async_record_command(self, command: object) -> MedicationService:
+        """
+        Write a dose command to the command journal before applying it.
+
+        Returns:
+            A service whose clock is fixed at the journaled time, so that
+            applying the command now and replaying it after a crash give
+            the same result. Apply the command right away.
+
+        """
+        now = datetime.now(ZoneInfo(self._profile.timezone))
+        await self._repository.async_record_command(self._profile, command, now)
+        return MedicationService(get_now=lambda: now)
+
+    def _update_adherence(self) -> None:
+        """
+        Refresh adherence statistics and signal the adherence sensor.
+
+        Cheap enough to run after every logged action since it only reads
+        the profile's running adherence counters. The stats are written
+        with the next save.
+        """
+        self._service.calculate_adherence_stats(self._profile)
+        self._signal_adherence_updated()
+
+    def _signal_adherence_updated(self) -> None:
+        """Signal that the adherence statistics changed."""
+        signal = SIGNAL_ADHERENCE_UPDATED.format(entry_id=self._entry_id)
+        async_dispatcher_send(self._hass, signal)
 
     def _signal_medications_changed(self) -> None:
         """Signal that medications were added or removed."""
@@ -3,12 +3,15 @@ Actionable notifications for medication reminders.
 
 Provides mobile_app notifications with TAKEN, SNOOZE, SKIP buttons.
 Handles notification grouping and user-configurable notification targets.
+Medications due at the same time share one notification with TAKE ALL and
+SNOOZE ALL buttons.
 """
 
 from __future__ import annotations
 
 import logging
 from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
 
 from homeassistant.components.persistent_notification import (
     async_create as async_create_persistent,
@@ -20,6 +23,8 @@ from homeassistant.components.persistent_notification import (
 from custom_components.med_expert.const import (
     NOTIFICATION_ACTION_SKIP,
     NOTIFICATION_ACTION_SNOOZE,
+    NOTIFICATION_ACTION_SNOOZE_ALL,
+    NOTIFICATION_ACTION_TAKE_ALL,
     NOTIFICATION_ACTION_TAKEN,
     NOTIFICATION_TAG_PREFIX,
 )
@@ -33,6 +38,21 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+# Title of a batch notification by the local hour it is due at
+_BATCH_TITLES = (
+    (5, "Night meds"),
+    (11, "Morning meds"),
+    (14, "Midday meds"),
+    (18, "Afternoon meds"),
+    (22, "Evening meds"),
+    (24, "Night meds"),
+)
+
+
+def _batch_title(hour: int) -> str:
+    """Get the title of a batch notification due at a local hour."""
+    return next(title for end, title in _BATCH_TITLES if hour < end)
+
 
 class NotificationManager:
     """
@@ -58,6 +78,8 @@ class NotificationManager:
         self._hass = hass
         self._entry_id = entry_id
         self._active_notifications: dict[str, str] = {}  # medication_id -> tag
+        self._batches: dict[str, list[str]] = {}  # batch key -> medication_ids
+        self._medication_batches: dict[str, str] = {}  # medication_id -> batch key
 
     def _get_notification_tag(self, medication_id: str) -> str:
         """Generate a unique notification tag."""
@@ -67,6 +89,22 @@ class NotificationManager:
         """Generate persistent notification ID."""
         return f"med_expert_{self._entry_id}_{medication_id}"
 
+    def get_batch_medication_ids(self, tag: str) -> list[str]:
+        """
+        Get the medications still pending in a batch notification.
+
+        Args:
+            tag: The notification tag of the batch.
+
+        Returns:
+            The medication IDs, empty if the batch is unknown.
+
+        """
+        for key, medication_ids in self._batches.items():
+            if self._get_notification_tag(key) == tag:
+                return list(medication_ids)
+        return []
+
     async def async_send_due_notification(
         self,
         profile: Profile,
@@ -108,6 +146,90 @@ class NotificationManager:
                 message=message,
             )
 
+    async def async_send_due_batch_notification(
+        self,
+        profile: Profile,
+        medications: list[Medication],
+    ) -> None:
+        """
+        Send one notification for medications due at the same time.
+
+        Args:
+            profile: The medication profile.
+            medications: The medications that are due.
+
+        """
+        tz = ZoneInfo(profile.timezone)
+        due_at = next((m.state.next_due for m in medications if m.state.next_due), None)
+        local = due_at.astimezone(tz) if due_at else None
+        key = f"batch-{local:%H%M}" if local else "batch"
+
+        for medication in medications:
+            self._forget_batch_member(medication.medication_id)
+        self._batches[key] = [m.medication_id for m in medications]
+        for medication in medications:
+            self._medication_batches[medication.medication_id] = key
+            self._active_notifications[medication.medication_id] = (
+                self._get_notification_tag(key)
+            )
+
+        names = []
+        doses = []
+        for medication in medications:
+            dose = medication.state.next_dose
+            names.append(
+                f"{medication.display_name} ({dose.format()})"
+                if dose
+                else medication.display_name
+            )
+            doses.append(dose.format() if dose else "")
+        title = _batch_title(local.hour) if local else "Medication Reminder"
+        message = f"Time to take {', '.join(names)}"
+
+        settings = profile.notification_settings
+        if settings and settings.notify_target:
+            title, message = self._apply_templates(
+                profile,
+                title,
+                message,
+                medication=", ".join(m.display_name for m in medications),
+                dose=", ".join(dose for dose in doses if dose),
+            )
+            actions = [
+                {
+                    "action": NOTIFICATION_ACTION_TAKE_ALL,
+                    "title": "✓ Take all",
+                    "uri": None,
+                },
+                {
+                    "action": NOTIFICATION_ACTION_SNOOZE_ALL,
+                    "title": "⏰ Snooze all",
+                    "uri": None,
+                },
+            ]
+            payload = self._build_payload(
+                profile,
+                self._get_notification_tag(key),
+                title,
+                message,
+                {"medication_ids": self._batches[key]},
+                actions,
+            )
+            if await self._async_notify(settings.notify_target, payload):
+                _LOGGER.debug(
+                    "Sent batch notification to %s for %d medications",
+                    settings.notify_target,
+                    len(medications),
+                )
+                return
+
+        async_create_persistent(
+            self._hass,
+            message,
+            title=title,
+            notification_id=self._get_persistent_id(key),
+        )
+
     async def async_send_missed_notification(
         self,
         profile: Profile,
@@ -159,8 +281,11 @@ class NotificationManager:
         persistent_id = self._get_persistent_id(medication_id)
         async_dismiss_persistent(self._hass, persistent_id)
 
-        # Remove from tracking
+        # Remove from tracking; a batch is dismissed with its last medication
         self._active_notifications.pop(medication_id, None)
+        key = self._forget_batch_member(medication_id)
+        if key is not None and key not in self._batches:
+            async_dismiss_persistent(self._hass, self._get_persistent_id(key))
 
         _LOGGER.debug("Dismissed notification for medication %s", medication_id)
 
@@ -169,104 +294,195 @@ class NotificationManager:
         for medication_id in list(self._active_notifications.keys()):
             await self.async_dismiss_notification(medication_id)
 
-    async def _send_actionable_notification(
+    def _forget_batch_member(self, medication_id: str) -> str | None:
+        """
+        Remove a medication from its batch, dropping the batch once empty.
+
+        Args:
+            medication_id: The medication ID.
+
+        Returns:
+            Key of the batch the medication was in, if any.
+
+        """
+        key = self._medication_batches.pop(medication_id, None)
+        if key is None:
+            return None
+        members = self._batches.get(key, [])
+        if medication_id in members:
+            members.remove(medication_id)
+        if not members:
+            self._batches.pop(key, None)
+        return key
+
+    def _apply_templates(
         self,
         profile: Profile,
-        medication: Medication,
         title: str,
         message: str,
-        is_missed: bool = False,
-    ) -> None:
+        medication: str,
+        dose: str,
+    ) -> tuple[str, str]:
         """
-        Send an actionable notification via mobile_app.
+        Apply the profile's title and message templates, if any.
 
         Args:
             profile: The medication profile.
-            medication: The medication.
-            title: Notification title.
-            message: Notification message.
-            is_missed: Whether this is a missed notification.
+            title: Default notification title.
+            message: Default notification message.
+            medication: Value of the {medication} placeholder.
+            dose: Value of the {dose} placeholder.
+
+        Returns:
+            Tuple of (title, message).
 
         """
         settings = profile.notification_settings
-        if not settings or not settings.notify_target:
-            return
+        if settings and settings.message_template:
+            message = settings.message_template.format(medication=medication, dose=dose)
+        if settings and settings.title_template:
+            title = settings.title_template.format(medication=medication, dose=dose)
+        return title, message
 
-        tag = self._get_notification_tag(medication.medication_id)
-        self._active_notifications[medication.medication_id] = tag
+    def _build_payload(
+        self,
+        profile: Profile,
+        tag: str,
+        title: str,
+        message: str,
+        action_data: dict[str, Any],
+        actions: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """
+        Build the notify service data of an actionable notification.
+
+        Args:
+            profile: The medication profile.
+            tag: The notification tag.
+            title: Notification title.
+            message: Notification message.
+            action_data: Data for handling the response.
+            actions: Actions, added if the profile enables them.
+
+        Returns:
+            The service data.
 
-        # Build notification data
+        """
+        settings = profile.notification_settings
         data: dict[str, Any] = {
             "tag": tag,
             "group": f"med_expert_{profile.profile_id}"
-            if settings.group_notifications
+            if settings and settings.group_notifications
             else None,
             "data": {
                 "tag": tag,
                 "persistent": True,
                 "sticky": True,
                 # Action data for handling the response
-                "medication_id": medication.medication_id,
+                **action_data,
                 "profile_id": profile.profile_id,
                 "entry_id": self._entry_id,
             },
         }
 
         # Add actions if enabled
-        if settings.include_actions:
-            data["data"]["actions"] = self._build_actions(
-                medication.medication_id,
-                profile.profile_id,
-                is_missed,
-            )
+        if settings and settings.include_actions:
+            data["data"]["actions"] = actions
 
-        # Use custom template if available
-        if settings.message_template:
-            message = settings.message_template.format(
-                medication=medication.display_name,
-                dose=medication.state.next_dose.format()
-                if medication.state.next_dose
-                else "",
-            )
+        return {"title": title, "message": message, **data}
 
-        # Use custom title template if available
-        if settings.title_template:
-            title = settings.title_template.format(
-                medication=medication.display_name,
-                dose=medication.state.next_dose.format()
-                if medication.state.next_dose
-                else "",
-            )
+    async def _async_notify(
+        self,
+        notify_target: str,
+        payload: dict[str, Any],
+    ) -> bool:
+        """
+        Send a notification through a notify service.
+
+        Args:
+            notify_target: The notify service, with or without "notify.".
+            payload: The service data.
+
+        Returns:
+            Whether the notification was sent.
 
-        # Determine notify target
+        """
         # Target should be like "mobile_app_my_phone" -> service "notify.mobile_app_my_phone"
-        service_target = settings.notify_target
+        service_target = notify_target
         if not service_target.startswith("notify."):
             service_target = f"notify.{service_target}"
 
         try:
-            # Call the notify service
             domain, service = service_target.split(".", 1)
             await self._hass.services.async_call(
                 domain,
                 service,
-                {
-                    "title": title,
-                    "message": message,
-                    **data,
-                },
+                payload,
                 blocking=False,
             )
-            _LOGGER.debug(
-                "Sent actionable notification to %s for %s",
-                service_target,
-                medication.display_name,
-            )
         except Exception:
             _LOGGER.exception(
                 "Failed to send notification to %s, falling back to persistent",
                 service_target,
             )
+            return False
+        return True
+
+    async def _send_actionable_notification(
+        self,
+        profile: Profile,
+        medication: Medication,
+        title: str,
+        message: str,
+        is_missed: bool = False,
+    ) -> None:
+        """
+        Send an actionable notification via mobile_app.
+
+        Args:
+            profile: The medication profile.
+            medication: The medication.
+            title: Notification title.
+            message: Notification message.
+            is_missed: Whether this is a missed notification.
+
+        """
+        settings = profile.notification_settings
+        if not settings or not settings.notify_target:
+            return
+
+        tag = self._get_notification_tag(medication.medication_id)
+        self._active_notifications[medication.medication_id] = tag
+
+        title, message = self._apply_templates(
+            profile,
+            title,
+            message,
+            medication=medication.display_name,
+            dose=medication.state.next_dose.format()
+            if medication.state.next_dose
+            else "",
+        )
+        payload = self._build_payload(
+            profile,
+            tag,
+            title,
+            message,
+            {"medication_id": medication.medication_id},
+            self._build_actions(
+                medication.medication_id,
+                profile.profile_id,
+                is_missed,
+            ),
+        )
+
+        if await self._async_notify(settings.notify_target, payload):
+            _LOGGER.debug(
+                "Sent actionable notification to %s for %s",
+                settings.notify_target,
+                medication.display_name,
+            )
+        else:
             # Fallback to persistent notification
             await self._send_persistent_notification(
                 medication=medication,
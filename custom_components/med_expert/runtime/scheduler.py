@@ -1,16 +1,21 @@
 """
 Scheduler for medication reminders.
 
-Handles scheduling of medication due callbacks using Home Assistant's
-async_track_point_in_time. Only schedules the next trigger for each
-medication to be restart-resistant.
+The due, repeat, missed-check and quiet-hour wakeups of all medications of
+all profiles are kept in one priority queue, the ReminderTimer shared
+through hass.data[DOMAIN]. It arms a single Home Assistant timer
+(async_track_point_in_time) for the earliest of them. Only the next event
+of each kind is kept per medication to be restart-resistant.
 """
 
 from __future__ import annotations
 
+import heapq
 import logging
+from collections import Counter
 from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
+from itertools import count
 from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
@@ -21,6 +26,7 @@ from custom_components.med_expert.domain.models import (
     Medication,
     MedicationStatus,
     Profile,
+    ScheduleKind,
 )
 from custom_components.med_expert.domain.policies import (
     is_in_quiet_hours,
@@ -38,14 +44,227 @@ _LOGGER = logging.getLogger(__name__)
 # Type for due callback
 DueCallback = Callable[[str, str], Awaitable[None]]  # (profile_id, medication_id)
 
+# Type for the callback of medications due together
+DueBatchCallback = Callable[[str, list[str]], Awaitable[None]]  # (profile_id, ids)
+
+# Type for the handler of a profile's due events
+EventsHandler = Callable[[list[tuple[str, str]]], Awaitable[None]]  # (kind, med_id)
+
+# Kinds of scheduled events
+EVENT_DUE = "due"
+EVENT_REPEAT = "repeat"
+EVENT_MISSED = "missed"
+EVENT_KINDS = (EVENT_DUE, EVENT_REPEAT, EVENT_MISSED)
+
+# Stale queue entries allowed beyond the live ones before the queue is rebuilt
+QUEUE_COMPACT_SLACK = 64
+
+# Due events this soon after the earliest one wait for it, so that they are
+# handled together
+BATCH_WINDOW = timedelta(minutes=1)
+
+
+class ReminderTimer:
+    """
+    Event queue shared by the schedulers of all profiles.
+
+    Events are (time, sequence, profile_id, kind, medication_id) entries in
+    a heap. Rescheduling an event does not search the heap: the new entry
+    gets a new sequence number and older entries for the same event are
+    dropped when they reach the top. Only the earliest live entry has a
+    Home Assistant timer, and all events due when it fires are handled
+    together in one task. If the earliest entry is a due event, the timer
+    is armed for the last due event within BATCH_WINDOW of it instead, so
+    those medications are announced together; no event fires early.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """
+        Initialize the timer.
+
+        Args:
+            hass: Home Assistant instance.
+
+        """
+        self._hass = hass
+        self._queue: list[tuple[datetime, int, str, str, str]] = []
+        # (profile_id, kind, medication_id) -> sequence number of the live entry
+        self._live: dict[tuple[str, str, str], int] = {}
+        self._pending: Counter[str] = Counter()
+        self._handlers: dict[str, EventsHandler] = {}
+        self._sequence = count()
+        self._timer_cancel: CALLBACK_TYPE | None = None
+        self._timer_at: datetime | None = None
+
+    @property
+    def next_event_at(self) -> datetime | None:
+        """Get the time the timer is armed for, if any."""
+        return self._timer_at
+
+    def pending_count(self, profile_id: str) -> int:
+        """Get the number of events scheduled for a profile."""
+        return self._pending[profile_id]
+
+    def pending_counts(self) -> dict[str, int]:
+        """Get the number of scheduled events of each profile."""
+        return dict(self._pending)
+
+    def is_scheduled(self, profile_id: str, kind: str, medication_id: str) -> bool:
+        """Check whether an event is scheduled."""
+        return (profile_id, kind, medication_id) in self._live
+
+    def push(
+        self,
+        profile_id: str,
+        kind: str,
+        medication_id: str,
+        when: datetime,
+        handler: EventsHandler,
+    ) -> None:
+        """
+        Schedule an event, replacing the medication's event of that kind.
+
+        Args:
+            profile_id: The profile ID.
+            kind: The event kind.
+            medication_id: The medication ID.
+            when: When the event is due.
+            handler: Handler for the profile's due events.
+
+        """
+        key = (profile_id, kind, medication_id)
+        if key not in self._live:
+            self._pending[profile_id] += 1
+        sequence = next(self._sequence)
+        self._live[key] = sequence
+        self._handlers[profile_id] = handler
+        heapq.heappush(self._queue, (when, sequence, profile_id, kind, medication_id))
+        if len(self._queue) > 2 * len(self._live) + QUEUE_COMPACT_SLACK:
+            self._queue = [entry for entry in self._queue if self._is_live(entry)]
+            heapq.heapify(self._queue)
+        self.arm()
+
+    def discard_medication(self, profile_id: str, medication_id: str) -> None:
+        """Drop all events of a medication without re-arming the timer."""
+        for kind in EVENT_KINDS:
+            self._drop((profile_id, kind, medication_id))
+
+    def discard_profile(self, profile_id: str) -> None:
+        """Drop all events and the handler of a profile and re-arm the timer."""
+        for key in [key for key in self._live if key[0] == profile_id]:
+            self._drop(key)
+        self._handlers.pop(profile_id, None)
+        self.arm()
+
+    def cancel_all(self) -> None:
+        """Drop all events and cancel the timer."""
+        self._queue.clear()
+        self._live.clear()
+        self._pending.clear()
+        self._handlers.clear()
+        self.arm()
+
+    def _drop(self, key: tuple[str, str, str]) -> None:
+        """Forget the live entry of an event, if any."""
+        if self._live.pop(key, None) is not None:
+            self._pending[key[0]] -= 1
+            if not self._pending[key[0]]:
+                del self._pending[key[0]]
+
+    def _is_live(self, entry: tuple[datetime, int, str, str, str]) -> bool:
+        """Check whether a queue entry is the live one of its event."""
+        return self._live.get(entry[2:]) == entry[1]
+
+    def arm(self) -> None:
+        """Arm the timer for the earliest live event, if it changed."""
+        queue = self._queue
+        while queue and not self._is_live(queue[0]):
+            heapq.heappop(queue)
+
+        when = queue[0][0] if queue else None
+        if when is not None and queue[0][3] == EVENT_DUE:
+            when = self._batch_end(when)
+        if when == self._timer_at:
+            return
+        if self._timer_cancel is not None:
+            self._timer_cancel()
+            self._timer_cancel = None
+        self._timer_at = when
+        if when is not None:
+            self._timer_cancel = async_track_point_in_time(
+                self._hass, self._on_timer, when
+            )
+
+    def _batch_end(self, start: datetime) -> datetime:
+        """Get the time of the last live due event within BATCH_WINDOW of start."""
+        queue = self._queue
+        limit = start + BATCH_WINDOW
+        end = start
+        # Only walk the part of the heap that is due by the limit
+        indexes = [0]
+        while indexes:
+            index = indexes.pop()
+            if index >= len(queue) or queue[index][0] > limit:
+                continue
+            entry = queue[index]
+            if entry[3] == EVENT_DUE and entry[0] > end and self._is_live(entry):
+                end = entry[0]
+            indexes.extend((2 * index + 1, 2 * index + 2))
+        return end
+
+    @callback
+    def _on_timer(self, now: datetime) -> None:
+        """Handle the timer firing."""
+        self._timer_cancel = None
+        self._timer_at = None
+        self._run_due(now)
+
+    def _run_due(self, now: datetime) -> None:
+        """
+        Start one task handling all events due by now.
+
+        Args:
+            now: The current time.
+
+        """
+        queue = self._queue
+        batches: dict[str, list[tuple[str, str]]] = {}
+        while queue and queue[0][0] <= now:
+            entry = heapq.heappop(queue)
+            if not self._is_live(entry):
+                continue
+            _, _, profile_id, kind, medication_id = entry
+            self._drop(entry[2:])
+            batches.setdefault(profile_id, []).append((kind, medication_id))
+        if batches:
+            self._hass.async_create_task(self._async_dispatch(batches))
+        self.arm()
+
+    async def _async_dispatch(self, batches: dict[str, list[tuple[str, str]]]) -> None:
+        """
+        Hand due events to the handlers of their profiles.
+
+        Args:
+            batches: Due (kind, medication_id) events per profile ID.
+
+        """
+        for profile_id, events in batches.items():
+            handler = self._handlers.get(profile_id)
+            if handler is None:
+                continue
+            try:
+                await handler(events)
+            except Exception:
+                _LOGGER.exception("Error handling reminders of profile %s", profile_id)
+
 
 class MedicationScheduler:
     """
-    Scheduler for medication reminders.
+    Scheduler for medication reminders of one profile.
 
-    Schedules the next due callback for each medication using
-    Home Assistant's event system. Only tracks the immediate next
-    trigger to be restart-resistant.
+    Decides when each medication's events are due and handles them; the
+    timing itself is done by a ReminderTimer, usually the one shared by
+    all profiles.
     """
 
     def __init__(
@@ -54,6 +273,8 @@ class MedicationScheduler:
         profile: Profile,
         on_due: DueCallback,
         on_missed: DueCallback | None = None,
+        timer: ReminderTimer | None = None,
+        on_due_batch: DueBatchCallback | None = None,
     ) -> None:
         """
         Initialize the scheduler.
@@ -63,16 +284,31 @@ class MedicationScheduler:
             profile: The medication profile.
             on_due: Callback when a medication is due.
             on_missed: Callback when a medication is missed (optional).
+            timer: Shared timer; a private one is created if not given.
+            on_due_batch: Callback with all medications due together; used
+                instead of on_due when given (optional).
 
         """
         self._hass = hass
         self._profile = profile
         self._on_due = on_due
         self._on_missed = on_missed
-        self._scheduled: dict[
-            str, CALLBACK_TYPE
-        ] = {}  # medication_id -> cancel callback
-        self._repeat_scheduled: dict[str, CALLBACK_TYPE] = {}
+        self._on_due_batch = on_due_batch
+        self._timer = timer or ReminderTimer(hass)
+
+    @property
+    def timer(self) -> ReminderTimer:
+        """Get the timer the events are scheduled on."""
+        return self._timer
+
+    @property
+    def pending_count(self) -> int:
+        """Get the number of scheduled events."""
+        return self._timer.pending_count(self._profile.profile_id)
+
+    def is_scheduled(self, kind: str, medication_id: str) -> bool:
+        """Check whether an event of a kind is scheduled for a medication."""
+        return self._timer.is_scheduled(self._profile.profile_id, kind, medication_id)
 
     def schedule_all(self) -> None:
         """Schedule all medications in the profile."""
@@ -88,10 +324,14 @@ class MedicationScheduler:
 
         """
         # Cancel any existing schedule
-        self.cancel_medication(medication.medication_id)
+        self._timer.discard_medication(
+            self._profile.profile_id, medication.medication_id
+        )
 
         # Don't schedule PRN-only medications
-        if medication.schedule.kind.value == "as_needed":
+        compiled = medication.compiled_schedule(self._profile.timezone)
+        if compiled.kind == ScheduleKind.AS_NEEDED:
+            self._timer.arm()
             return
 
         # Determine next due time
@@ -116,10 +356,11 @@ class MedicationScheduler:
                 "No next due time for medication %s",
                 medication.display_name,
             )
+            self._timer.arm()
             return
 
         # Schedule the callback
-        now = datetime.now(ZoneInfo(self._profile.timezone))
+        now = datetime.now(compiled.tz)
 
         if effective_due <= now:
             # Already due - trigger immediately (with small delay)
@@ -131,18 +372,45 @@ class MedicationScheduler:
             effective_due,
         )
 
-        @callback
-        def _trigger(now: datetime) -> None:
-            """Handle the due trigger."""
-            self._hass.async_create_task(self._handle_due(medication.medication_id))
+        self._push(EVENT_DUE, medication.medication_id, effective_due)
 
-        cancel = async_track_point_in_time(
-            self._hass,
-            _trigger,
-            effective_due,
+    def _push(self, kind: str, medication_id: str, when: datetime) -> None:
+        """Schedule an event of this profile on the timer."""
+        self._timer.push(
+            self._profile.profile_id, kind, medication_id, when, self._async_handle
         )
 
-        self._scheduled[medication.medication_id] = cancel
+    async def _async_handle(self, events: list[tuple[str, str]]) -> None:
+        """
+        Handle the profile's due events.
+
+        Medications due together are handled as one batch; repeat and
+        missed-check events are handled one by one, in order.
+
+        Args:
+            events: Due (kind, medication_id) events.
+
+        """
+        due = [medication_id for kind, medication_id in events if kind == EVENT_DUE]
+        if due:
+            try:
+                await self._handle_due_batch(due)
+            except Exception:
+                _LOGGER.exception("Error handling due medications %s", due)
+
+        handlers = {
+            EVENT_REPEAT: self._handle_repeat,
+            EVENT_MISSED: self._handle_missed_check,
+        }
+        for kind, medication_id in events:
+            if kind == EVENT_DUE:
+                continue
+            try:
+                await handlers[kind](medication_id)
+            except Exception:
+                _LOGGER.exception(
+                    "Error handling %s reminder of medication %s", kind, medication_id
+                )
 
     async def _handle_due(self, medication_id: str) -> None:
         """
@@ -152,43 +420,64 @@ class MedicationScheduler:
             medication_id: The medication ID.
 
         """
-        medication = self._profile.get_medication(medication_id)
-        if medication is None:
-            return
+        await self._handle_due_batch([medication_id])
+
+    async def _handle_due_batch(self, medication_ids: list[str]) -> None:
+        """
+        Handle medications that are due together.
 
-        # Remove from scheduled
-        self._scheduled.pop(medication_id, None)
+        Args:
+            medication_ids: The medication IDs.
 
+        """
         # Check if we should notify (quiet hours, rate limit)
         now = datetime.now(ZoneInfo(self._profile.timezone))
 
-        if is_in_quiet_hours(now, self._profile.timezone, medication.policy):
-            _LOGGER.debug(
-                "Medication %s is due but in quiet hours",
-                medication.display_name,
-            )
-            # Reschedule for after quiet hours end
-            self._schedule_after_quiet_hours(medication)
+        due: list[Medication] = []
+        for medication_id in medication_ids:
+            medication = self._profile.get_medication(medication_id)
+            if medication is None:
+                continue
+
+            if is_in_quiet_hours(now, self._profile.timezone, medication.policy):
+                _LOGGER.debug(
+                    "Medication %s is due but in quiet hours",
+                    medication.display_name,
+                )
+                # Reschedule for after quiet hours end
+                self._schedule_after_quiet_hours(medication)
+                continue
+
+            if not should_send_notification(medication.policy, medication.state, now):
+                _LOGGER.debug(
+                    "Medication %s notification rate-limited",
+                    medication.display_name,
+                )
+                continue
+
+            # Update last notified
+            medication.state.last_notified_at = now
+            due.append(medication)
+
+        if not due:
             return
 
-        if not should_send_notification(medication.policy, medication.state, now):
-            _LOGGER.debug(
-                "Medication %s notification rate-limited",
-                medication.display_name,
+        # Call the due callback, once for the whole batch if supported
+        if self._on_due_batch is not None:
+            await self._on_due_batch(
+                self._profile.profile_id,
+                [medication.medication_id for medication in due],
             )
-            return
-
-        # Update last notified
-        medication.state.last_notified_at = now
+        else:
+            for medication in due:
+                await self._on_due(self._profile.profile_id, medication.medication_id)
 
-        # Call the due callback
-        await self._on_due(self._profile.profile_id, medication_id)
-
-        # Schedule repeat if policy allows
-        self._schedule_repeat(medication)
+        for medication in due:
+            # Schedule repeat if policy allows
+            self._schedule_repeat(medication)
 
-        # Schedule check for missed
-        self._schedule_missed_check(medication)
+            # Schedule check for missed
+            self._schedule_missed_check(medication)
 
     def _schedule_repeat(self, medication: Medication) -> None:
         """
@@ -204,21 +493,8 @@ class MedicationScheduler:
         now = datetime.now(ZoneInfo(self._profile.timezone))
         repeat_at = now + timedelta(minutes=medication.policy.repeat_minutes)
 
-        @callback
-        def _repeat_trigger(now: datetime) -> None:
-            """Handle repeat notification."""
-            self._hass.async_create_task(self._handle_repeat(medication.medication_id))
-
-        # Cancel any existing repeat
-        if medication.medication_id in self._repeat_scheduled:
-            self._repeat_scheduled[medication.medication_id]()
-
-        cancel = async_track_point_in_time(
-            self._hass,
-            _repeat_trigger,
-            repeat_at,
-        )
-        self._repeat_scheduled[medication.medication_id] = cancel
+        # Replaces any existing repeat
+        self._push(EVENT_REPEAT, medication.medication_id, repeat_at)
 
     async def _handle_repeat(self, medication_id: str) -> None:
         """
@@ -273,18 +549,7 @@ class MedicationScheduler:
             # Already past grace period
             return
 
-        @callback
-        def _missed_check(now: datetime) -> None:
-            """Check if medication was missed."""
-            self._hass.async_create_task(
-                self._handle_missed_check(medication.medication_id)
-            )
-
-        async_track_point_in_time(
-            self._hass,
-            _missed_check,
-            grace_end,
-        )
+        self._push(EVENT_MISSED, medication.medication_id, grace_end)
 
     async def _handle_missed_check(self, medication_id: str) -> None:
         """
@@ -324,42 +589,24 @@ class MedicationScheduler:
         if next_end <= now:
             next_end += timedelta(days=1)
 
-        @callback
-        def _trigger(now: datetime) -> None:
-            self._hass.async_create_task(self._handle_due(medication.medication_id))
-
-        cancel = async_track_point_in_time(
-            self._hass,
-            _trigger,
-            next_end,
-        )
-        self._scheduled[medication.medication_id] = cancel
+        self._push(EVENT_DUE, medication.medication_id, next_end)
 
     def cancel_medication(self, medication_id: str) -> None:
         """
         Cancel scheduled callbacks for a medication.
 
+        Its due, repeat and missed-check events are all dropped.
+
         Args:
             medication_id: The medication ID.
 
         """
-        if medication_id in self._scheduled:
-            self._scheduled[medication_id]()
-            del self._scheduled[medication_id]
-
-        if medication_id in self._repeat_scheduled:
-            self._repeat_scheduled[medication_id]()
-            del self._repeat_scheduled[medication_id]
+        self._timer.discard_medication(self._profile.profile_id, medication_id)
+        self._timer.arm()
 
     def cancel_all(self) -> None:
-        """Cancel all scheduled callbacks."""
-        for cancel in self._scheduled.values():
-            cancel()
-        self._scheduled.clear()
-
-        for cancel in self._repeat_scheduled.values():
-            cancel()
-        self._repeat_scheduled.clear()
+        """Cancel all scheduled callbacks of the profile."""
+        self._timer.discard_profile(self._profile.profile_id)
 
     def reschedule_medication(self, medication: Medication) -> None:
         """
@@ -0,0 +1,307 @@
+"""
+Immutable per-medication snapshots of what the entities show.
+
+The profile manager rebuilds a medication's snapshot whenever it signals
+the medication as updated, before the signal goes out. Every field of a
+snapshot carries a version that only changes when the field's value
+changes, so an entity showing one field can skip writing its state when
+an update touched other fields only.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from custom_components.med_expert.domain.models import (
+    DosageFormInfo,
+    Medication,
+    MedicationStatus,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from custom_components.med_expert.domain.models import Profile
+
+# Fields of a snapshot, one per medication entity
+SNAPSHOT_FIELDS = ("status", "next_due", "next_dose", "inventory", "puffs")
+
+_NO_ATTRIBUTES: Mapping[str, Any] = MappingProxyType({})
+
+_STATUS_ICONS = {
+    MedicationStatus.OK: "mdi:pill",
+    MedicationStatus.DUE: "mdi:pill-multiple",
+    MedicationStatus.SNOOZED: "mdi:clock-outline",
+    MedicationStatus.MISSED: "mdi:pill-off",
+    MedicationStatus.PRN: "mdi:medical-bag",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotValue:
+    """The state of one entity, precomputed."""
+
+    value: Any
+    unit: str | None = None
+    icon: str | None = None
+    attributes: Mapping[str, Any] = _NO_ATTRIBUTES
+
+
+@dataclass(frozen=True, slots=True)
+class MedicationSnapshot:
+    """What the entities of a medication show, at one point in time."""
+
+    medication_id: str
+    display_name: str
+    status: SnapshotValue
+    next_due: SnapshotValue
+    next_dose: SnapshotValue
+    # None if the medication has no inventory or no inhaler tracking
+    inventory: SnapshotValue | None
+    puffs: SnapshotValue | None
+    versions: Mapping[str, int]
+
+    def field(self, name: str) -> SnapshotValue | None:
+        """
+        Get a field by name.
+
+        Args:
+            name: One of SNAPSHOT_FIELDS.
+
+        Returns:
+            The field's value.
+
+        """
+        return getattr(self, name)
+
+    def version(self, name: str) -> int:
+        """
+        Get the version of a field.
+
+        Args:
+            name: One of SNAPSHOT_FIELDS.
+
+        Returns:
+            A number that changes whenever the field's value changes.
+
+        """
+        return self.versions[name]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        status = self.status.attributes
+        return {
+            "medication_id": self.medication_id,
+            "display_name": self.display_name,
+            "status": self.status.value,
+            "next_due": self.next_due.value.isoformat()
+            if self.next_due.value
+            else None,
+            "next_dose": self.next_dose.value,
+            "form": status.get("form"),
+            "schedule_kind": status.get("schedule_kind"),
+            "snooze_until": status.get("snooze_until"),
+            "last_taken": status.get("last_taken"),
+            "inventory": {
+                "current_quantity": self.inventory.value,
+                "unit": self.inventory.unit,
+                **self.inventory.attributes,
+            }
+            if self.inventory
+            else None,
+            "puffs": {"remaining_puffs": self.puffs.value, **self.puffs.attributes}
+            if self.puffs
+            else None,
+        }
+
+
+def build_snapshot(
+    medication: Medication,
+    previous: MedicationSnapshot | None = None,
+) -> MedicationSnapshot:
+    """
+    Build the snapshot of a medication.
+
+    Args:
+        medication: The medication.
+        previous: The medication's last snapshot, whose versions are kept
+            for the fields that did not change.
+
+    Returns:
+        The new snapshot.
+
+    """
+    fields = {
+        "status": _status_value(medication),
+        "next_due": SnapshotValue(medication.state.next_due),
+        "next_dose": SnapshotValue(_formatted_next_dose(medication)),
+        "inventory": _inventory_value(medication),
+        "puffs": _puffs_value(medication),
+    }
+    if previous is None:
+        versions = dict.fromkeys(SNAPSHOT_FIELDS, 0)
+    else:
+        versions = {
+            name: previous.versions[name] + (previous.field(name) != value)
+            for name, value in fields.items()
+        }
+    return MedicationSnapshot(
+        medication_id=medication.medication_id,
+        display_name=medication.display_name,
+        versions=MappingProxyType(versions),
+        **fields,
+    )
+
+
+class SnapshotStore:
+    """The latest snapshots of a profile's medications."""
+
+    def __init__(self, profile: Profile) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            profile: The profile whose medications are snapshotted.
+
+        """
+        self._profile = profile
+        self._snapshots: dict[str, MedicationSnapshot] = {}
+
+    def get(self, medication_id: str) -> MedicationSnapshot | None:
+        """
+        Get the snapshot of a medication, building it on first use.
+
+        Args:
+            medication_id: The medication ID.
+
+        Returns:
+            The snapshot, or None if the medication does not exist.
+
+        """
+        snapshot = self._snapshots.get(medication_id)
+        if snapshot is None:
+            medication = self._profile.get_medication(medication_id)
+            if medication is None:
+                return None
+            snapshot = self._snapshots[medication_id] = build_snapshot(medication)
+        return snapshot
+
+    def refresh(self, *medication_ids: str) -> list[str]:
+        """
+        Rebuild the snapshots of medications after their state changed.
+
+        Args:
+            *medication_ids: The medication IDs.
+
+        Returns:
+            The IDs whose snapshot changed in at least one field.
+
+        """
+        changed = []
+        for medication_id in medication_ids:
+            medication = self._profile.get_medication(medication_id)
+            if medication is None:
+                self._snapshots.pop(medication_id, None)
+                continue
+            previous = self._snapshots.get(medication_id)
+            snapshot = build_snapshot(medication, previous)
+            self._snapshots[medication_id] = snapshot
+            if previous is None or snapshot.versions != previous.versions:
+                changed.append(medication_id)
+        return changed
+
+    def remove(self, medication_id: str) -> None:
+        """
+        Drop the snapshot of a removed medication.
+
+        Args:
+            medication_id: The medication ID.
+
+        """
+        self._snapshots.pop(medication_id, None)
+
+
+def _status_value(medication: Medication) -> SnapshotValue:
+    """Precompute the status entity."""
+    state = medication.state
+    attributes = {
+        "medication_id": medication.medication_id,
+        "display_name": medication.display_name,
+        "schedule_kind": medication.schedule.kind.value,
+    }
+    if medication.form:
+        attributes["form"] = medication.form.value
+    if state.snooze_until:
+        attributes["snooze_until"] = state.snooze_until.isoformat()
+    if state.last_taken:
+        attributes["last_taken"] = state.last_taken.isoformat()
+    return SnapshotValue(
+        state.status.value,
+        icon=_STATUS_ICONS.get(state.status, "mdi:pill"),
+        attributes=MappingProxyType(attributes),
+    )
+
+
+def _formatted_next_dose(medication: Medication) -> str | None:
+    """Format the next dose, or the schedule's default dose."""
+    if medication.state.next_dose:
+        return medication.state.next_dose.format()
+    if medication.schedule.default_dose:
+        return medication.schedule.default_dose.format()
+    return None
+
+
+def _inventory_value(medication: Medication) -> SnapshotValue | None:
+    """Precompute the inventory entity."""
+    inventory = medication.inventory
+    if inventory is None:
+        return None
+
+    attributes = {
+        "package_size": inventory.package_size,
+        "refill_threshold": inventory.refill_threshold,
+        "is_low": inventory.is_low(),
+        "auto_decrement": inventory.auto_decrement,
+    }
+    if inventory.expiry_date:
+        attributes["expiry_date"] = inventory.expiry_date.isoformat()
+        attributes["is_expired"] = inventory.is_expired()
+    if inventory.pharmacy_name:
+        attributes["pharmacy_name"] = inventory.pharmacy_name
+    if inventory.pharmacy_phone:
+        attributes["pharmacy_phone"] = inventory.pharmacy_phone
+    if inventory.notes:
+        attributes["notes"] = inventory.notes
+
+    # Use form-specific icon if available
+    icon = "mdi:package-variant"
+    if medication.form:
+        form_info = DosageFormInfo.get_info(medication.form)
+        if form_info:
+            icon = form_info.icon
+
+    return SnapshotValue(
+        inventory.current_quantity,
+        unit=inventory.unit or "units",
+        icon=icon,
+        attributes=MappingProxyType(attributes),
+    )
+
+
+def _puffs_value(medication: Medication) -> SnapshotValue | None:
+    """Precompute the inhaler puffs entity."""
+    tracking = medication.inhaler_tracking
+    if tracking is None:
+        return None
+    return SnapshotValue(
+        tracking.remaining_puffs,
+        attributes=MappingProxyType(
+            {
+                "total_puffs": tracking.total_puffs,
+                "used_puffs": tracking.used_puffs,
+                "is_low": tracking.is_low(),
+            }
+        ),
+    )
@@ -15,14 +15,20 @@ from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DOMAIN
-from .domain.models import DosageFormInfo, Medication, MedicationStatus
-from .runtime.manager import SIGNAL_MEDICATION_UPDATED, SIGNAL_MEDICATIONS_CHANGED
+from .entity_tracker import MedicationEntityTracker, medication_device_identifier
+from .runtime.manager import (
+    SIGNAL_ADHERENCE_UPDATED,
+    SIGNAL_MEDICATION_UPDATED,
+    SIGNAL_MEDICATIONS_CHANGED,
+)
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
     from .data import MedExpertConfigEntry
+    from .domain.models import Medication
+    from .runtime.snapshots import MedicationSnapshot, SnapshotValue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,31 +39,21 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Med Expert sensors."""
-    manager = entry.runtime_data.manager
-
-    # Create sensors for existing medications
-    entities: list[SensorEntity] = []
-    for medication in manager.get_all_medications().values():
-        entities.extend(_create_medication_sensors(entry, medication))
-
     # Add profile-level sensors
-    entities.append(ProfileAdherenceSensor(entry))
+    async_add_entities([ProfileAdherenceSensor(entry)])
 
-    async_add_entities(entities)
-
-    # Listen for medication changes to add/remove entities
-    @callback
-    def _handle_medications_changed() -> None:
-        """Handle medications added or removed."""
-        # For simplicity, we reload the entry when medications change
-        # A more sophisticated approach would track and add/remove entities
-        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+    # Create sensors for existing medications, then add and remove them as
+    # medications are added and removed
+    tracker = MedicationEntityTracker(
+        hass, entry, async_add_entities, _create_medication_sensors
+    )
+    tracker.async_sync()
 
     entry.async_on_unload(
         async_dispatcher_connect(
             hass,
             SIGNAL_MEDICATIONS_CHANGED.format(entry_id=entry.entry_id),
-            _handle_medications_changed,
+            tracker.async_sync,
         )
     )
 
@@ -85,9 +81,16 @@ def _create_medication_sensors(
 
 
 class MedicationBaseSensor(SensorEntity):
-    """Base class for medication sensors."""
+    """
+    Base class for medication sensors.
+
+    Sensors show one field of the medication's snapshot, precomputed by
+    the profile manager, and only write their state when that field's
+    version changed.
+    """
 
     _attr_has_entity_name = True
+    _snapshot_field: str
 
     def __init__(
         self,
@@ -99,6 +102,7 @@ class MedicationBaseSensor(SensorEntity):
         self._entry = entry
         self._medication = medication
         self._sensor_type = sensor_type
+        self._written_version: int | None = None
 
         # Entity IDs
         self._attr_unique_id = (
@@ -107,7 +111,9 @@ class MedicationBaseSensor(SensorEntity):
 
         # Device info - group all entities for same medication
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{entry.entry_id}_{medication.medication_id}")},
+            identifiers={
+                medication_device_identifier(entry.entry_id, medication.medication_id)
+            },
             name=medication.display_name,
             manufacturer="Med Expert",
             model="Medication",
@@ -119,28 +125,67 @@ class MedicationBaseSensor(SensorEntity):
         """Get the profile manager."""
         return self._entry.runtime_data.manager
 
-    def _get_medication(self) -> Medication | None:
-        """Get the current medication state."""
-        return self._manager.get_medication(self._medication.medication_id)
+    def _get_snapshot(self) -> MedicationSnapshot | None:
+        """Get the latest snapshot of the medication."""
+        return self._manager.get_snapshot(self._medication.medication_id)
+
+    def _get_value(self) -> SnapshotValue | None:
+        """Get the snapshot field shown by this sensor."""
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.field(self._snapshot_field)
+
+    def _get_version(self) -> int | None:
+        """Get the version of the snapshot field shown by this sensor."""
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.version(self._snapshot_field)
+
+    @property
+    def native_value(self):
+        """Return the value of the snapshot field."""
+        value = self._get_value()
+        if value is None:
+            return None
+        return value.value
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra state attributes."""
+        value = self._get_value()
+        if value is None:
+            return {}
+        return dict(value.attributes)
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
 
-        # Listen for updates
+        # The state is written right after this with the current snapshot
+        self._written_version = self._get_version()
+
+        # Listen for updates of this medication only
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
-                SIGNAL_MEDICATION_UPDATED.format(entry_id=self._entry.entry_id),
+                SIGNAL_MEDICATION_UPDATED.format(
+                    entry_id=self._entry.entry_id,
+                    medication_id=self._medication.medication_id,
+                ),
                 self._handle_update,
             )
         )
 
     @callback
-    def _handle_update(self, medication_id: str) -> None:
-        """Handle medication update."""
-        if medication_id == self._medication.medication_id:
-            self.async_write_ha_state()
+    def _handle_update(self) -> None:
+        """Handle medication update, if it changed the field shown."""
+        version = self._get_version()
+        if version is not None and version == self._written_version:
+            return
+        self._written_version = version
+        self.async_write_ha_state()
 
 
 class MedicationNextDueSensor(MedicationBaseSensor):
@@ -148,6 +193,7 @@ class MedicationNextDueSensor(MedicationBaseSensor):
 
     _attr_device_class = SensorDeviceClass.TIMESTAMP
     _attr_translation_key = "next_due"
+    _snapshot_field = "next_due"
 
     def __init__(
         self,
@@ -158,19 +204,12 @@ class MedicationNextDueSensor(MedicationBaseSensor):
         super().__init__(entry, medication, "next_due")
         self._attr_name = "Next Due"
 
-    @property
-    def native_value(self):
-        """Return the next due time."""
-        medication = self._get_medication()
-        if medication is None:
-            return None
-        return medication.state.next_due
-
 
 class MedicationStatusSensor(MedicationBaseSensor):
     """Sensor for medication status."""
 
     _attr_translation_key = "status"
+    _snapshot_field = "status"
 
     def __init__(
         self,
@@ -184,64 +223,38 @@ class MedicationStatusSensor(MedicationBaseSensor):
     @property
     def native_value(self) -> str:
         """Return the status."""
-        medication = self._get_medication()
-        if medication is None:
+        value = self._get_value()
+        if value is None:
             return "unknown"
-        return medication.state.status.value
+        return value.value
 
     @property
     def icon(self) -> str:
         """Return the icon based on status."""
-        medication = self._get_medication()
-        if medication is None:
+        value = self._get_value()
+        if value is None:
             return "mdi:pill"
-
-        status = medication.state.status
-        if status == MedicationStatus.OK:
-            return "mdi:pill"
-        if status == MedicationStatus.DUE:
-            return "mdi:pill-multiple"
-        if status == MedicationStatus.SNOOZED:
-            return "mdi:clock-outline"
-        if status == MedicationStatus.MISSED:
-            return "mdi:pill-off"
-        if status == MedicationStatus.PRN:
-            return "mdi:medical-bag"
-        return "mdi:pill"
+        return value.icon
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra state attributes."""
-        medication = self._get_medication()
-        if medication is None:
+        value = self._get_value()
+        if value is None:
             return {}
 
-        manager = self._manager
-        attrs = {
+        return {
             "entry_id": self._entry.entry_id,
-            "profile_name": manager.profile.name,
-            "medication_id": medication.medication_id,
-            "display_name": medication.display_name,
-            "schedule_kind": medication.schedule.kind.value,
+            "profile_name": self._manager.profile.name,
+            **value.attributes,
         }
 
-        # Add form if present
-        if medication.form:
-            attrs["form"] = medication.form.value
-
-        if medication.state.snooze_until:
-            attrs["snooze_until"] = medication.state.snooze_until.isoformat()
-
-        if medication.state.last_taken:
-            attrs["last_taken"] = medication.state.last_taken.isoformat()
-
-        return attrs
-
 
 class MedicationNextDoseSensor(MedicationBaseSensor):
     """Sensor for next dose amount."""
 
     _attr_translation_key = "next_dose_amount"
+    _snapshot_field = "next_dose"
 
     def __init__(
         self,
@@ -253,27 +266,13 @@ class MedicationNextDoseSensor(MedicationBaseSensor):
         self._attr_name = "Next Dose"
         self._attr_icon = "mdi:pill"
 
-    @property
-    def native_value(self) -> str | None:
-        """Return the formatted next dose."""
-        medication = self._get_medication()
-        if medication is None:
-            return None
-
-        if medication.state.next_dose:
-            return medication.state.next_dose.format()
-
-        if medication.schedule.default_dose:
-            return medication.schedule.default_dose.format()
-
-        return None
-
 
 class MedicationInventorySensor(MedicationBaseSensor):
     """Sensor for medication inventory level."""
 
     _attr_translation_key = "inventory"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _snapshot_field = "inventory"
 
     def __init__(
         self,
@@ -284,64 +283,21 @@ class MedicationInventorySensor(MedicationBaseSensor):
         super().__init__(entry, medication, "inventory")
         self._attr_name = "Inventory"
 
-    @property
-    def native_value(self) -> int | None:
-        """Return the current inventory quantity."""
-        medication = self._get_medication()
-        if medication is None or medication.inventory is None:
-            return None
-        return medication.inventory.current_quantity
-
     @property
     def native_unit_of_measurement(self) -> str | None:
         """Return the unit of measurement."""
-        medication = self._get_medication()
-        if medication is None or medication.inventory is None:
+        value = self._get_value()
+        if value is None:
             return None
-        return medication.inventory.unit or "units"
+        return value.unit
 
     @property
     def icon(self) -> str:
-        """Return the icon based on form and level."""
-        medication = self._get_medication()
-        if medication is None:
+        """Return the icon based on form."""
+        value = self._get_value()
+        if value is None:
             return "mdi:package-variant"
-
-        # Use form-specific icon if available
-        if medication.form:
-            form_info = DosageFormInfo.get_info(medication.form)
-            if form_info:
-                return form_info.icon
-
-        return "mdi:package-variant"
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra state attributes."""
-        medication = self._get_medication()
-        if medication is None or medication.inventory is None:
-            return {}
-
-        inv = medication.inventory
-        attrs = {
-            "package_size": inv.package_size,
-            "refill_threshold": inv.refill_threshold,
-            "is_low": inv.is_low(),
-            "auto_decrement": inv.auto_decrement,
-        }
-
-        if inv.expiry_date:
-            attrs["expiry_date"] = inv.expiry_date.isoformat()
-            attrs["is_expired"] = inv.is_expired()
-
-        if inv.pharmacy_name:
-            attrs["pharmacy_name"] = inv.pharmacy_name
-        if inv.pharmacy_phone:
-            attrs["pharmacy_phone"] = inv.pharmacy_phone
-        if inv.notes:
-            attrs["notes"] = inv.notes
-
-        return attrs
+        return value.icon
 
 
 class MedicationInhalerPuffsSensor(MedicationBaseSensor):
@@ -349,6 +305,7 @@ class MedicationInhalerPuffsSensor(MedicationBaseSensor):
 
     _attr_translation_key = "inhaler_puffs"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _snapshot_field = "puffs"
 
     def __init__(
         self,
@@ -361,28 +318,6 @@ class MedicationInhalerPuffsSensor(MedicationBaseSensor):
         self._attr_icon = "mdi:spray"
         self._attr_native_unit_of_measurement = "puffs"
 
-    @property
-    def native_value(self) -> int | None:
-        """Return the remaining puffs."""
-        medication = self._get_medication()
-        if medication is None or medication.inhaler_tracking is None:
-            return None
-        return medication.inhaler_tracking.remaining_puffs
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra state attributes."""
-        medication = self._get_medication()
-        if medication is None or medication.inhaler_tracking is None:
-            return {}
-
-        tracking = medication.inhaler_tracking
-        return {
-            "total_puffs": tracking.total_puffs,
-            "used_puffs": tracking.used_puffs,
-            "is_low": tracking.is_low(),
-        }
-
 
 class ProfileAdherenceSensor(SensorEntity):
     """Sensor for overall medication adherence rate."""
@@ -464,11 +399,11 @@ class ProfileAdherenceSensor(SensorEntity):
         """When entity is added to hass."""
         await super().async_added_to_hass()
 
-        # Listen for medication changes (which trigger adherence recalculation)
+        # Adherence stats are refreshed on every logged action
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
-                SIGNAL_MEDICATIONS_CHANGED.format(entry_id=self._entry.entry_id),
+                SIGNAL_ADHERENCE_UPDATED.format(entry_id=self._entry.entry_id),
                 self._handle_update,
             )
         )
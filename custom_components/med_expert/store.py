@@ -2,26 +2,58 @@
 Storage layer for med_expert.
 
 Handles persistence via Home Assistant's Store mechanism with
-schema versioning and migrations.
+schema versioning and migrations. Log records are not part of the
+profile document; they live in the append-only LogJournal. Dose commands
+are written to the CommandJournal before they are applied and replayed
+on load if the store document does not cover them yet.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, STORE_KEY, STORE_VERSION
+from .application.services import (
+    MedicationService,
+    MedicationServiceError,
+    command_from_dict,
+    command_name,
+    command_to_dict,
+)
+from .command_journal import CommandJournal
+from .const import (
+    DOMAIN,
+    SAVE_DELAY_SECONDS,
+    STORE_KEY,
+    STORE_MINOR_VERSION,
+    STORE_VERSION,
+)
 from .domain.models import Profile
+from .log_journal import LogJournal
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.core import HomeAssistant
 
+    from .domain.models import LogRecord
+
 _LOGGER = logging.getLogger(__name__)
 
-# Current schema version
-CURRENT_SCHEMA_VERSION = 2
+# Current schema version: compacted log segments are stored in columns
+CURRENT_SCHEMA_VERSION = 3
+
+# Last schema version that stores log records one per line. Profile
+# documents are the same in both; only the log journal format differs.
+ROW_LOGS_SCHEMA_VERSION = 2
+
+# Store minor version that moved log arrays into the log journal
+LOG_JOURNAL_MINOR_VERSION = 2
 
 
 class MedExpertStore(Store[dict[str, Any]]):
@@ -32,6 +64,31 @@ class MedExpertStore(Store[dict[str, Any]]):
     Home Assistant's Store detects a version mismatch.
     """
 
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        version: int,
+        key: str,
+        *,
+        minor_version: int = 1,
+        journal: LogJournal | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            hass: Home Assistant instance.
+            version: Major store version.
+            key: Storage key.
+            minor_version: Minor store version.
+            journal: Log journal that receives legacy log arrays.
+            **kwargs: Passed on to Store.
+
+        """
+        super().__init__(hass, version, key, minor_version=minor_version, **kwargs)
+        self._journal = journal
+
     async def _async_migrate_func(
         self,
         old_major_version: int,
@@ -70,11 +127,39 @@ class MedExpertStore(Store[dict[str, Any]]):
                 self.version,
             )
             # Try to use the data as-is, but update version markers
-            old_data["schema_version"] = CURRENT_SCHEMA_VERSION
+            old_data["schema_version"] = ROW_LOGS_SCHEMA_VERSION
             return old_data
 
         # Perform schema migration based on schema_version in the data
-        return await self._migrate_schema(old_data)
+        data = await self._migrate_schema(old_data)
+
+        if (
+            old_major_version < self.version
+            or old_minor_version < LOG_JOURNAL_MINOR_VERSION
+        ) and self.minor_version >= LOG_JOURNAL_MINOR_VERSION:
+            await self._async_split_logs(data)
+
+        return data
+
+    async def _async_split_logs(self, data: dict[str, Any]) -> None:
+        """
+        Move legacy log arrays out of the profile documents.
+
+        Writes each profile's logs to the log journal and removes them from
+        the document, so that saving a profile no longer rewrites its history.
+        """
+        if self._journal is None:
+            return
+
+        for profile_id, profile_data in data.get("profiles", {}).items():
+            logs = profile_data.pop("logs", None)
+            if logs:
+                await self._journal.async_replace(profile_id, logs)
+                _LOGGER.info(
+                    "Moved %d log records of profile %s to the log journal",
+                    len(logs),
+                    profile_id,
+                )
 
     async def _migrate_schema(self, data: dict[str, Any]) -> dict[str, Any]:
         """
@@ -89,13 +174,15 @@ class MedExpertStore(Store[dict[str, Any]]):
         """
         schema_version = data.get("schema_version", 0)
 
-        if schema_version == CURRENT_SCHEMA_VERSION:
+        # The log format step (2 <-> 3) is applied by ProfileStore, which
+        # knows the configured format
+        if schema_version >= ROW_LOGS_SCHEMA_VERSION:
             return data
 
         _LOGGER.info(
             "Migrating med_expert data from schema version %s to %s",
             schema_version,
-            CURRENT_SCHEMA_VERSION,
+            ROW_LOGS_SCHEMA_VERSION,
         )
 
         # Apply migrations in order
@@ -106,7 +193,7 @@ class MedExpertStore(Store[dict[str, Any]]):
             data = self._migrate_v1_to_v2(data)
             schema_version = 2
 
-        data["schema_version"] = CURRENT_SCHEMA_VERSION
+        data["schema_version"] = ROW_LOGS_SCHEMA_VERSION
         return data
 
     def _migrate_v1_to_v2(self, data: dict[str, Any]) -> dict[str, Any]:
@@ -268,29 +355,58 @@ class ProfileStore:
     Handles async load/save operations and schema migrations.
     """
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(self, hass: HomeAssistant, *, compact_logs: bool = True) -> None:
         """
         Initialize the store.
 
         Args:
             hass: Home Assistant instance
+            compact_logs: Whether compacted log segments use the columnar
+                format (schema version 3) or one record per line (2).
+                Stored logs are migrated to the chosen format on load.
 
         """
         self._hass = hass
+        self._schema_version = (
+            CURRENT_SCHEMA_VERSION if compact_logs else ROW_LOGS_SCHEMA_VERSION
+        )
+        self._journal = LogJournal(hass, columnar=compact_logs)
+        self._commands = CommandJournal(hass)
+        self._command_seq = 0
         self._store = MedExpertStore(
             hass,
             STORE_VERSION,
             f"{DOMAIN}.{STORE_KEY}",
-            minor_version=1,
+            minor_version=STORE_MINOR_VERSION,
+            journal=self._journal,
         )
         self._data: dict[str, Any] | None = None
-
-    async def async_load(self) -> dict[str, Profile]:
+        # Profiles changed since the last write of the store document
+        self._dirty: dict[str, Profile] = {}
+        self._write_pending = False
+        self._cancel_delayed_write: Callable[[], None] | None = None
+        self._coalesced_writes = 0
+
+    @property
+    def coalesced_writes(self) -> int:
+        """Return how many profile saves were folded into a pending write."""
+        return self._coalesced_writes
+
+    @property
+    def dirty_profile_ids(self) -> set[str]:
+        """Return the IDs of profiles with changes not yet written."""
+        return set(self._dirty)
+
+    async def async_load(self) -> dict[str, dict[str, Any]]:
         """
-        Load profiles from storage.
+        Load raw profile data from storage.
+
+        Profiles are returned as stored dictionaries; hydrating them into
+        Profile objects is left to the caller so that it only happens for
+        profiles that are actually used.
 
         Returns:
-            Dictionary mapping profile_id to Profile objects.
+            Dictionary mapping profile_id to stored profile data.
 
         """
         data = await self._store.async_load()
@@ -298,59 +414,301 @@ class ProfileStore:
         if data is None:
             # No existing data - initialize empty
             self._data = {
-                "schema_version": CURRENT_SCHEMA_VERSION,
+                "schema_version": self._schema_version,
                 "profiles": {},
             }
+            await self._async_replay_commands(self._data)
             return {}
 
         self._data = data
+        data.setdefault("profiles", {})
+        await self._async_migrate_log_format(data)
+        await self._async_replay_commands(data)
 
-        # Convert to Profile objects
-        profiles: dict[str, Profile] = {}
-        for profile_id, profile_data in data.get("profiles", {}).items():
+        return dict(data["profiles"])
+
+    async def _async_migrate_log_format(self, data: dict[str, Any]) -> None:
+        """
+        Rewrite stored logs if they are not in the configured format.
+
+        Schema version 3 stores compacted log segments in columns, version
+        2 one record per line; either can be migrated to the other.
+        """
+        schema_version = data.get("schema_version", 0)
+        if schema_version == self._schema_version or schema_version not in (
+            ROW_LOGS_SCHEMA_VERSION,
+            CURRENT_SCHEMA_VERSION,
+        ):
+            return
+
+        _LOGGER.info(
+            "Migrating med_expert log storage from schema version %s to %s",
+            schema_version,
+            self._schema_version,
+        )
+        for profile_id in data["profiles"]:
+            await self._journal.async_rewrite(profile_id)
+        data["schema_version"] = self._schema_version
+        await self._store.async_save(data)
+
+    async def _async_replay_commands(self, data: dict[str, Any]) -> None:
+        """
+        Apply journaled commands the store document does not cover yet.
+
+        Left behind when Home Assistant stopped between applying a command
+        and writing the store document. Commands are applied as of the
+        time they were journaled; log records that reached the log
+        journal before the crash are not added twice. The result is
+        written right away, which also clears the journal.
+        """
+        events = await self._commands.async_load()
+        profiles = data["profiles"]
+        self._command_seq = max(
+            [event["seq"] for event in events]
+            + [
+                profile_data.get("command_seq", 0) for profile_data in profiles.values()
+            ],
+            default=0,
+        )
+
+        replayed: dict[str, Profile] = {}
+        for event in events:
+            profile_id = event["profile_id"]
+            profile_data = profiles.get(profile_id)
+            if profile_data is None or event["seq"] <= profile_data.get(
+                "command_seq", 0
+            ):
+                continue
+
+            profile = replayed.get(profile_id)
+            if profile is None:
+                logs = await self.async_load_logs(profile_id)
+                archive = await self.async_load_log_aggregates(profile_id)
+                profile = Profile.from_dict({**profile_data, **archive, "logs": logs})
+                replayed[profile_id] = profile
+
+            at = datetime.fromisoformat(event["at"])
+            service = MedicationService(get_now=lambda at=at: at)
+            start = len(profile.logs)
             try:
-                profiles[profile_id] = Profile.from_dict(profile_data)
-            except Exception:
-                _LOGGER.exception(
-                    "Failed to load profile %s",
-                    profile_id,
+                service.apply_command(
+                    profile, command_from_dict(event["command"], event["data"])
+                )
+            except MedicationServiceError as err:
+                _LOGGER.warning(
+                    "Could not replay %s command %d: %s",
+                    event["command"],
+                    event["seq"],
+                    err,
                 )
+            profile.discard_duplicate_logs(start)
+            profile.command_seq = event["seq"]
+
+        if not replayed:
+            if events:
+                await self._commands.async_checkpoint(_command_seqs(data))
+            return
+
+        _LOGGER.warning(
+            "Replayed journaled commands of %d profile(s) not saved before shutdown",
+            len(replayed),
+        )
+        for profile in replayed.values():
+            await self._async_append_logs(profile)
+            profiles[profile.profile_id] = profile.to_dict(include_logs=False)
+        await self._store.async_save(data)
+        await self._commands.async_checkpoint(_command_seqs(data))
+
+    async def async_record_command(
+        self,
+        profile_id: str,
+        command: object,
+        at: datetime,
+    ) -> int:
+        """
+        Write a command to the command journal before it is applied.
+
+        The caller must apply the command without awaiting anything in
+        between and set the profile's command_seq to the returned number,
+        so that any store document written later covers the command.
 
-        return profiles
+        Args:
+            profile_id: The profile the command applies to.
+            command: A journaled command (see JOURNALED_COMMANDS).
+            at: The time the command is applied as of.
+
+        Returns:
+            The sequence number of the event.
+
+        """
+        self._command_seq += 1
+        seq = self._command_seq
+        await self._commands.async_append(
+            {
+                "seq": seq,
+                "profile_id": profile_id,
+                "command": command_name(command),
+                "at": at.isoformat(),
+                "data": command_to_dict(command),
+            }
+        )
+        return seq
+
+    async def async_load_logs(self, profile_id: str) -> list[dict[str, Any]]:
+        """
+        Load the stored log records of a profile from the log journal.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized log records in append order.
+
+        """
+        return await self._journal.async_load(profile_id)
+
+    async def async_load_log_aggregates(self, profile_id: str) -> dict[str, Any]:
+        """
+        Load the rolled-up aggregates of a profile's archived logs.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized aggregates as produced by Profile.archive_to_dict.
+
+        """
+        return await self._journal.async_load_aggregates(profile_id)
+
+    async def async_archive_logs(
+        self,
+        profile: Profile,
+        archived: list[LogRecord],
+    ) -> None:
+        """
+        Persist the result of applying the log retention to a profile.
+
+        Args:
+            profile: The profile whose logs were archived.
+            archived: The raw log records that were archived.
+
+        """
+        await self._async_append_logs(profile)
+        await self._journal.async_archive(
+            profile.profile_id,
+            [log.to_dict() for log in archived],
+            profile.archive_to_dict(),
+            profile.logs.to_dicts(),
+        )
+
+    async def async_load_archived_logs(self, profile_id: str) -> list[dict[str, Any]]:
+        """
+        Load the archived raw log records of a profile.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized archived log records.
+
+        """
+        return await self._journal.async_load_archive(profile_id)
 
-    async def async_save(self, profiles: dict[str, Profile]) -> None:
+    async def async_purge_archived_logs(
+        self,
+        profile_id: str,
+        before: datetime | None = None,
+    ) -> int:
         """
-        Save profiles to storage.
+        Delete archived raw log records of a profile.
 
         Args:
-            profiles: Dictionary mapping profile_id to Profile objects.
+            profile_id: The profile ID.
+            before: Only delete records taken before this time.
+
+        Returns:
+            Number of deleted records.
 
         """
-        self._data = {
-            "schema_version": CURRENT_SCHEMA_VERSION,
-            "profiles": {
-                profile_id: profile.to_dict()
-                for profile_id, profile in profiles.items()
-            },
-        }
-        await self._store.async_save(self._data)
+        return await self._journal.async_purge_archive(profile_id, before)
 
     async def async_save_profile(self, profile: Profile) -> None:
         """
         Save a single profile.
 
+        New log records are appended to the log journal; the profile
+        document itself no longer carries the log history.
+
         Args:
             profile: The profile to save.
 
         """
+        await self._async_append_logs(profile)
+
+        self._dirty[profile.profile_id] = profile
+        await self.async_flush()
+
+    async def async_delay_save_profile(self, profile: Profile, delay: float) -> None:
+        """
+        Save a profile after a delay, coalescing with other pending saves.
+
+        New log records are appended to the log journal right away, so no
+        intake is lost; only the rewrite of the store document is delayed.
+        Further saves within the delay are folded into the same write,
+        which also checkpoints the command journal. A pending write is
+        flushed when Home Assistant stops.
+
+        Args:
+            profile: The profile to save.
+            delay: Seconds to wait before writing the store document.
+
+        """
+        await self._async_append_logs(profile)
+
+        self._dirty[profile.profile_id] = profile
+        if self._write_pending:
+            self._coalesced_writes += 1
+            return
+
+        self._write_pending = True
+        self._cancel_delayed_write = async_call_later(
+            self._hass, delay, self._async_write_delayed
+        )
+
+    async def _async_write_delayed(self, _now: datetime) -> None:
+        """Write the pending profile changes once the save delay has passed."""
+        self._cancel_delayed_write = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """
+        Write pending profile changes to storage immediately.
+
+        Once written, the journaled commands they cover are dropped.
+        """
+        if self._cancel_delayed_write is not None:
+            self._cancel_delayed_write()
+            self._cancel_delayed_write = None
+        if not self._dirty and not self._write_pending:
+            return
+        data = self._data_to_save()
+        command_seqs = _command_seqs(data)
+        await self._store.async_save(data)
+        await self._commands.async_checkpoint(command_seqs)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Serialize dirty profiles into the store document."""
         if self._data is None:
             self._data = {
-                "schema_version": CURRENT_SCHEMA_VERSION,
+                "schema_version": self._schema_version,
                 "profiles": {},
             }
 
-        self._data["profiles"][profile.profile_id] = profile.to_dict()
-        await self._store.async_save(self._data)
+        for profile_id, profile in self._dirty.items():
+            self._data["profiles"][profile_id] = profile.to_dict(include_logs=False)
+        self._dirty.clear()
+        self._write_pending = False
+        return self._data
 
     async def async_delete_profile(self, profile_id: str) -> None:
         """
@@ -360,12 +718,33 @@ class ProfileStore:
             profile_id: The ID of the profile to delete.
 
         """
+        await self._journal.async_remove(profile_id)
+        self._dirty.pop(profile_id, None)
+
         if self._data is None:
             return
 
         if profile_id in self._data.get("profiles", {}):
             del self._data["profiles"][profile_id]
-            await self._store.async_save(self._data)
+            await self._store.async_save(self._data_to_save())
+
+    async def _async_append_logs(self, profile: Profile) -> None:
+        """Append the profile's unsaved log records to the log journal."""
+        unsaved = profile.get_unsaved_logs()
+        if not unsaved:
+            return
+        await self._journal.async_append(
+            profile.profile_id, [log.to_dict() for log in unsaved]
+        )
+        profile.mark_logs_saved(len(unsaved))
+
+
+def _command_seqs(data: dict[str, Any]) -> dict[str, int]:
+    """Get the last applied command sequence number per profile of a document."""
+    return {
+        profile_id: profile_data.get("command_seq", 0)
+        for profile_id, profile_data in data.get("profiles", {}).items()
+    }
 
 
 class ProfileRepository:
@@ -373,29 +752,96 @@ class ProfileRepository:
     Repository for managing medication profiles.
 
     Provides a clean interface for profile operations with
-    automatic persistence.
+    automatic persistence. A single repository is shared by all config
+    entries; stored profiles are only turned into Profile objects the
+    first time they are requested. Updates mark a profile dirty and are
+    written after save_delay seconds, so bursts of changes cost one write.
     """
 
-    def __init__(self, store: ProfileStore) -> None:
+    def __init__(
+        self,
+        store: ProfileStore,
+        save_delay: float = SAVE_DELAY_SECONDS,
+    ) -> None:
         """
         Initialize the repository.
 
         Args:
             store: The underlying store.
+            save_delay: Seconds to coalesce profile updates before writing.
 
         """
         self._store = store
+        self._save_delay = save_delay
         self._profiles: dict[str, Profile] = {}
+        self._raw_profiles: dict[str, dict[str, Any]] = {}
         self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Return whether the store has been read."""
+        return self._loaded
+
+    @property
+    def coalesced_writes(self) -> int:
+        """Return how many updates were folded into an already pending write."""
+        return self._store.coalesced_writes
+
+    def is_dirty(self, profile_id: str) -> bool:
+        """Return whether a profile has changes that are not yet written."""
+        return profile_id in self._store.dirty_profile_ids
+
+    async def async_flush(self) -> None:
+        """Write all pending profile changes immediately."""
+        await self._store.async_flush()
 
     async def async_load(self) -> None:
         """Load all profiles from storage."""
-        self._profiles = await self._store.async_load()
+        self._raw_profiles = await self._store.async_load()
+        self._profiles = {}
         self._loaded = True
 
-    def get(self, profile_id: str) -> Profile | None:
+    async def async_ensure_loaded(self) -> None:
         """
-        Get a profile by ID.
+        Load profiles from storage unless that already happened.
+
+        Safe to call concurrently from several config entries; the store
+        file is only read and parsed once.
+        """
+        async with self._load_lock:
+            if not self._loaded:
+                await self.async_load()
+
+    async def _async_hydrate(self, profile_id: str) -> Profile | None:
+        """Build the Profile object for a stored profile on first access."""
+        profile_data = self._raw_profiles.get(profile_id)
+        if profile_data is None:
+            return None
+
+        logs = await self._store.async_load_logs(profile_id)
+        archive = await self._store.async_load_log_aggregates(profile_id)
+
+        # Another caller may have finished hydrating while we were loading
+        if profile_id in self._profiles:
+            return self._profiles[profile_id]
+        self._raw_profiles.pop(profile_id, None)
+
+        try:
+            profile = Profile.from_dict({**profile_data, **archive, "logs": logs})
+        except Exception:
+            _LOGGER.exception(
+                "Failed to load profile %s",
+                profile_id,
+            )
+            return None
+
+        self._profiles[profile_id] = profile
+        return profile
+
+    async def async_get(self, profile_id: str) -> Profile | None:
+        """
+        Get a profile by ID, loading it from storage if needed.
 
         Args:
             profile_id: The profile ID.
@@ -403,19 +849,43 @@ class ProfileRepository:
         Returns:
             The profile or None if not found.
 
+        """
+        profile = self._profiles.get(profile_id)
+        if profile is None:
+            profile = await self._async_hydrate(profile_id)
+        return profile
+
+    def get(self, profile_id: str) -> Profile | None:
+        """
+        Get an already loaded profile by ID.
+
+        Use async_get to load a stored profile on first access.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            The profile or None if not loaded.
+
         """
         return self._profiles.get(profile_id)
 
-    def get_all(self) -> dict[str, Profile]:
+    async def async_get_all(self) -> dict[str, Profile]:
         """
-        Get all profiles.
+        Get all profiles, loading them from storage if needed.
 
         Returns:
             Dictionary mapping profile_id to Profile.
 
         """
+        for profile_id in list(self._raw_profiles):
+            await self._async_hydrate(profile_id)
         return self._profiles.copy()
 
+    def __contains__(self, profile_id: str) -> bool:
+        """Return whether a profile exists, without hydrating it."""
+        return profile_id in self._profiles or profile_id in self._raw_profiles
+
     async def async_add(self, profile: Profile) -> None:
         """
         Add a new profile.
@@ -424,6 +894,7 @@ class ProfileRepository:
             profile: The profile to add.
 
         """
+        self._raw_profiles.pop(profile.profile_id, None)
         self._profiles[profile.profile_id] = profile
         await self._store.async_save_profile(profile)
 
@@ -431,16 +902,94 @@ class ProfileRepository:
         """
         Update an existing profile.
 
+        The profile is marked dirty and written after the save delay,
+        together with any other updates made in the meantime.
+
         Args:
             profile: The profile to update.
 
         """
-        if profile.profile_id not in self._profiles:
+        if profile.profile_id not in self:
             msg = f"Profile {profile.profile_id} not found"
             raise ValueError(msg)
 
+        self._raw_profiles.pop(profile.profile_id, None)
         self._profiles[profile.profile_id] = profile
-        await self._store.async_save_profile(profile)
+        await self._store.async_delay_save_profile(profile, self._save_delay)
+
+    async def async_record_command(
+        self,
+        profile: Profile,
+        command: object,
+        at: datetime,
+    ) -> None:
+        """
+        Journal a dose command before it is applied to a profile.
+
+        Apply the command right after this returns, without awaiting
+        anything in between, then persist the profile with async_update.
+        If Home Assistant stops before the profile is written, the
+        command is replayed on the next load.
+
+        Args:
+            profile: The profile the command applies to.
+            command: A journaled command (see JOURNALED_COMMANDS).
+            at: The time the command is applied as of.
+
+        """
+        profile.command_seq = await self._store.async_record_command(
+            profile.profile_id, command, at
+        )
+
+    async def async_archive_logs(
+        self,
+        profile: Profile,
+        archived: list[LogRecord],
+    ) -> None:
+        """
+        Persist logs archived by the retention policy.
+
+        Rewrites the live log journal without the archived records, so
+        this is a full write rather than a delayed one.
+
+        Args:
+            profile: The profile whose logs were archived.
+            archived: The raw log records that were archived.
+
+        """
+        await self._store.async_archive_logs(profile, archived)
+        await self.async_update(profile)
+
+    async def async_export_archived_logs(self, profile_id: str) -> list[dict[str, Any]]:
+        """
+        Get the archived raw log records of a profile.
+
+        Args:
+            profile_id: The profile ID.
+
+        Returns:
+            Serialized archived log records.
+
+        """
+        return await self._store.async_load_archived_logs(profile_id)
+
+    async def async_purge_archived_logs(
+        self,
+        profile_id: str,
+        before: datetime | None = None,
+    ) -> int:
+        """
+        Delete archived raw log records; daily aggregates are kept.
+
+        Args:
+            profile_id: The profile ID.
+            before: Only delete records taken before this time.
+
+        Returns:
+            Number of deleted records.
+
+        """
+        return await self._store.async_purge_archived_logs(profile_id, before)
 
     async def async_delete(self, profile_id: str) -> None:
         """
@@ -450,11 +999,12 @@ class ProfileRepository:
             profile_id: The ID of the profile to delete.
 
         """
-        if profile_id in self._profiles:
-            del self._profiles[profile_id]
+        if profile_id in self:
+            self._profiles.pop(profile_id, None)
+            self._raw_profiles.pop(profile_id, None)
             await self._store.async_delete_profile(profile_id)
 
-    def find_by_name(self, name: str) -> Profile | None:
+    async def async_find_by_name(self, name: str) -> Profile | None:
         """
         Find a profile by name.
 
@@ -468,4 +1018,7 @@ class ProfileRepository:
         for profile in self._profiles.values():
             if profile.name == name:
                 return profile
+        for profile_id, profile_data in list(self._raw_profiles.items()):
+            if profile_data.get("name") == name:
+                return await self.async_get(profile_id)
         return None
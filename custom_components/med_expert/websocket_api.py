@@ -0,0 +1,333 @@
+"""Websocket commands for the Med Expert panel."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import SIGNAL_CONFIG_ENTRY_CHANGED, ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN
+from .domain.history import DEFAULT_HISTORY_LIMIT, MAX_HISTORY_LIMIT, HistoryQuery
+from .domain.models import LogAction
+from .runtime.manager import (
+    SIGNAL_ADHERENCE_UPDATED,
+    SIGNAL_MEDICATIONS_CHANGED,
+    SIGNAL_PROFILE_UPDATED,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.config_entries import ConfigEntry, ConfigEntryChange
+
+    from .runtime.manager import ProfileManager
+
+# Command types
+WS_TYPE_PROFILE_SNAPSHOT = f"{DOMAIN}/profile_snapshot"
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+WS_TYPE_HISTORY = f"{DOMAIN}/history"
+
+# Event types pushed to subscribers
+EVENT_SNAPSHOT = "snapshot"
+EVENT_MEDICATIONS = "medications"
+EVENT_PROFILE = "profile"
+EVENT_ADHERENCE = "adherence"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_MEDICATION_ID = "medication_id"
+ATTR_ACTIONS = "actions"
+ATTR_LIMIT = "limit"
+ATTR_CURSOR = "cursor"
+ATTR_ORDER = "order"
+ATTR_BY_DAY = "by_day"
+
+ORDER_NEWEST_FIRST = "desc"
+ORDER_OLDEST_FIRST = "asc"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the Med Expert websocket commands."""
+    websocket_api.async_register_command(hass, websocket_profile_snapshot)
+    websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_history)
+
+
+def _get_managers(
+    hass: HomeAssistant,
+    entry_id: str | None = None,
+) -> list[ProfileManager] | None:
+    """
+    Get the managers of loaded profiles.
+
+    Returns:
+        The managers of all loaded profiles, or of the one requested;
+        None if the requested profile is not loaded.
+
+    """
+    managers = [
+        entry.runtime_data.manager
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and (entry_id is None or entry.entry_id == entry_id)
+    ]
+    if entry_id is not None and not managers:
+        return None
+    return managers
+
+
+def _get_manager(hass: HomeAssistant, entry_id: str) -> ProfileManager | None:
+    """Get the manager of a loaded profile, None if it is not loaded."""
+    managers = _get_managers(hass, entry_id)
+    return managers[0] if managers else None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_PROFILE_SNAPSHOT,
+        vol.Optional(ATTR_ENTRY_ID): str,
+    }
+)
+@callback
+def websocket_profile_snapshot(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return all profiles and their medications in one payload."""
+    managers = _get_managers(hass, msg.get(ATTR_ENTRY_ID))
+    if managers is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Profile not found or not loaded"
+        )
+        return
+
+    connection.send_result(
+        msg["id"],
+        {"profiles": [manager.get_profile_snapshot() for manager in managers]},
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        vol.Optional(ATTR_ENTRY_ID): str,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Subscribe to the profiles and their medications.
+
+    The first event is the full snapshot, like profile_snapshot returns;
+    after that, only the medications that changed are pushed. Whenever a
+    profile is loaded or unloaded, e.g. on reload, the full snapshot is
+    pushed again.
+    """
+    entry_id = msg.get(ATTR_ENTRY_ID)
+    managers = _get_managers(hass, entry_id)
+    if managers is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Profile not found or not loaded"
+        )
+        return
+
+    msg_id = msg["id"]
+
+    @callback
+    def forward(event: dict[str, Any]) -> None:
+        """Push an event to the subscriber."""
+        connection.send_message(websocket_api.event_message(msg_id, event))
+
+    # entry_id -> callbacks disconnecting from the profile's signals
+    followed: dict[str, list[Callable[[], None]]] = {}
+
+    @callback
+    def follow(managers: list[ProfileManager]) -> None:
+        """Follow the loaded profiles and push them all."""
+        loaded = {manager.entry_id for manager in managers}
+        for gone in followed.keys() - loaded:
+            for unsub in followed.pop(gone):
+                unsub()
+        for loaded_id in loaded - followed.keys():
+            followed[loaded_id] = _async_subscribe_profile(hass, loaded_id, forward)
+        forward(
+            {
+                "type": EVENT_SNAPSHOT,
+                "profiles": [manager.get_profile_snapshot() for manager in managers],
+            }
+        )
+
+    @callback
+    def entry_changed(_change: ConfigEntryChange, entry: ConfigEntry) -> None:
+        """Push the profiles again once one was loaded or unloaded."""
+        if entry.domain != DOMAIN or entry_id not in (None, entry.entry_id):
+            return
+        managers = _get_managers(hass, entry_id) or []
+        if {manager.entry_id for manager in managers} != followed.keys():
+            follow(managers)
+
+    unsub_entries = async_dispatcher_connect(
+        hass, SIGNAL_CONFIG_ENTRY_CHANGED, entry_changed
+    )
+
+    @callback
+    def unsubscribe() -> None:
+        """Disconnect from the config entry and profile signals."""
+        unsub_entries()
+        for unsubs in followed.values():
+            for unsub in unsubs:
+                unsub()
+        followed.clear()
+
+    connection.subscriptions[msg_id] = unsubscribe
+    connection.send_result(msg_id)
+    follow(managers)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_HISTORY,
+        vol.Required(ATTR_ENTRY_ID): str,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_MEDICATION_ID): str,
+        vol.Optional(ATTR_ACTIONS): [vol.In([action.value for action in LogAction])],
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_HISTORY_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_HISTORY_LIMIT)
+        ),
+        vol.Optional(ATTR_CURSOR): str,
+        vol.Optional(ATTR_ORDER, default=ORDER_NEWEST_FIRST): vol.In(
+            [ORDER_NEWEST_FIRST, ORDER_OLDEST_FIRST]
+        ),
+        vol.Optional(ATTR_BY_DAY, default=False): bool,
+    }
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Return one page of a profile's intake history.
+
+    Pass the returned next_cursor back to get the following page; counts
+    per day are only needed with the first page.
+    """
+    managers = _get_managers(hass, msg[ATTR_ENTRY_ID])
+    if managers is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Profile not found or not loaded"
+        )
+        return
+
+    actions = msg.get(ATTR_ACTIONS)
+    query = HistoryQuery(
+        start=msg.get(ATTR_START),
+        end=msg.get(ATTR_END),
+        medication_id=msg.get(ATTR_MEDICATION_ID),
+        actions=frozenset(LogAction(action) for action in actions)
+        if actions is not None
+        else None,
+        limit=msg[ATTR_LIMIT],
+        cursor=msg.get(ATTR_CURSOR),
+        newest_first=msg[ATTR_ORDER] == ORDER_NEWEST_FIRST,
+    )
+    try:
+        result = managers[0].get_history(query, by_day=msg[ATTR_BY_DAY])
+    except ValueError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(err))
+        return
+
+    connection.send_result(msg["id"], result)
+
+
+@callback
+def _async_subscribe_profile(
+    hass: HomeAssistant,
+    entry_id: str,
+    forward: Callable[[dict[str, Any]], None],
+) -> list[Callable[[], None]]:
+    """
+    Forward the updates of one profile as events.
+
+    The manager is looked up on every update, so the events come from the
+    current one after the profile was reloaded.
+
+    Returns:
+        Callbacks disconnecting from the profile's signals.
+
+    """
+
+    @callback
+    def medications_updated(medication_ids: list[str]) -> None:
+        """Push the snapshots of updated medications."""
+        manager = _get_manager(hass, entry_id)
+        if manager is None:
+            return
+        medications = []
+        removed = []
+        for medication_id in medication_ids:
+            snapshot = manager.get_snapshot(medication_id)
+            if snapshot is None:
+                removed.append(medication_id)
+            else:
+                medications.append(snapshot.to_dict())
+        forward(
+            {
+                "type": EVENT_MEDICATIONS,
+                "entry_id": entry_id,
+                "medications": medications,
+                "removed": removed,
+            }
+        )
+
+    @callback
+    def medications_changed() -> None:
+        """Push the whole profile after medications were added or removed."""
+        manager = _get_manager(hass, entry_id)
+        if manager is None:
+            return
+        forward({"type": EVENT_PROFILE, "profile": manager.get_profile_snapshot()})
+
+    @callback
+    def adherence_updated() -> None:
+        """Push the new adherence rate."""
+        manager = _get_manager(hass, entry_id)
+        if manager is None:
+            return
+        forward(
+            {
+                "type": EVENT_ADHERENCE,
+                "entry_id": entry_id,
+                "adherence_rate": manager.adherence_rate,
+            }
+        )
+
+    return [
+        async_dispatcher_connect(
+            hass, SIGNAL_PROFILE_UPDATED.format(entry_id=entry_id), medications_updated
+        ),
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_MEDICATIONS_CHANGED.format(entry_id=entry_id),
+            medications_changed,
+        ),
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADHERENCE_UPDATED.format(entry_id=entry_id),
+            adherence_updated,
+        ),
+    ]
@@ -1,255 +1,9 @@
 /*! For license information please see med-expert-panel.js.LICENSE.txt */
-(()=>{"use strict";const t=globalThis,e=t.ShadowRoot&&(void 0===t.ShadyCSS||t.ShadyCSS.nativeShadow)&&"adoptedStyleSheets"in Document.prototype&&"replace"in CSSStyleSheet.prototype,i=Symbol(),r=new WeakMap;class s{constructor(t,e,r){if(this._$cssResult$=!0,r!==i)throw Error("CSSResult is not constructable. Use `unsafeCSS` or `css` instead.");this.cssText=t,this.t=e}get styleSheet(){let t=this.o;const i=this.t;if(e&&void 0===t){const e=void 0!==i&&1===i.length;e&&(t=r.get(i)),void 0===t&&((this.o=t=new CSSStyleSheet).replaceSync(this.cssText),e&&r.set(i,t))}return t}toString(){return this.cssText}}const o=(t,...e)=>{const r=1===t.length?t[0]:e.reduce((e,i,r)=>e+(t=>{if(!0===t._$cssResult$)return t.cssText;if("number"==typeof t)return t;throw Error("Value passed to 'css' function must be a 'css' function result: "+t+". Use 'unsafeCSS' to pass non-literal values, but take care to ensure page security.")})(i)+t[r+1],t[0]);return new s(r,t,i)},a=(i,r)=>{if(e)i.adoptedStyleSheets=r.map(t=>t instanceof CSSStyleSheet?t:t.styleSheet);else for(const e of r){const r=document.createElement("style"),s=t.litNonce;void 0!==s&&r.setAttribute("nonce",s),r.textContent=e.cssText,i.appendChild(r)}},n=e?t=>t:t=>t instanceof CSSStyleSheet?(t=>{let e="";for(const i of t.cssRules)e+=i.cssText;return(t=>new s("string"==typeof t?t:t+"",void 0,i))(e)})(t):t,{is:l,defineProperty:d,getOwnPropertyDescriptor:c,getOwnPropertyNames:p,getOwnPropertySymbols:h,getPrototypeOf:u}=Object,m=globalThis,_=m.trustedTypes,v=_?_.emptyScript:"",f=m.reactiveElementPolyfillSupport,g=(t,e)=>t,b={toAttribute(t,e){switch(e){case Boolean:t=t?v:null;break;case Object:case Array:t=null==t?t:JSON.stringify(t)}return t},fromAttribute(t,e){let i=t;switch(e){case Boolean:i=null!==t;break;case Number:i=null===t?null:Number(t);break;case Object:case Array:try{i=JSON.parse(t)}catch(t){i=null}}return i}},y=(t,e)=>!l(t,e),x={attribute:!0,type:String,converter:b,reflect:!1,useDefault:!1,hasChanged:y};Symbol.metadata??=Symbol("metadata"),m.litPropertyMetadata??=new WeakMap;class $ extends HTMLElement{static addInitializer(t){this._$Ei(),(this.l??=[]).push(t)}static get observedAttributes(){return this.finalize(),this._$Eh&&[...this._$Eh.keys()]}static createProperty(t,e=x){if(e.state&&(e.attribute=!1),this._$Ei(),this.prototype.hasOwnProperty(t)&&((e=Object.create(e)).wrapped=!0),this.elementProperties.set(t,e),!e.noAccessor){const i=Symbol(),r=this.getPropertyDescriptor(t,i,e);void 0!==r&&d(this.prototype,t,r)}}static getPropertyDescriptor(t,e,i){const{get:r,set:s}=c(this.prototype,t)??{get(){return this[e]},set(t){this[e]=t}};return{get:r,set(e){const o=r?.call(this);s?.call(this,e),this.requestUpdate(t,o,i)},configurable:!0,enumerable:!0}}static getPropertyOptions(t){return this.elementProperties.get(t)??x}static _$Ei(){if(this.hasOwnProperty(g("elementProperties")))return;const t=u(this);t.finalize(),void 0!==t.l&&(this.l=[...t.l]),this.elementProperties=new Map(t.elementProperties)}static finalize(){if(this.hasOwnProperty(g("finalized")))return;if(this.finalized=!0,this._$Ei(),this.hasOwnProperty(g("properties"))){const t=this.properties,e=[...p(t),...h(t)];for(const i of e)this.createProperty(i,t[i])}const t=this[Symbol.metadata];if(null!==t){const e=litPropertyMetadata.get(t);if(void 0!==e)for(const[t,i]of e)this.elementProperties.set(t,i)}this._$Eh=new Map;for(const[t,e]of this.elementProperties){const i=this._$Eu(t,e);void 0!==i&&this._$Eh.set(i,t)}this.elementStyles=this.finalizeStyles(this.styles)}static finalizeStyles(t){const e=[];if(Array.isArray(t)){const i=new Set(t.flat(1/0).reverse());for(const t of i)e.unshift(n(t))}else void 0!==t&&e.push(n(t));return e}static _$Eu(t,e){const i=e.attribute;return!1===i?void 0:"string"==typeof i?i:"string"==typeof t?t.toLowerCase():void 0}constructor(){super(),this._$Ep=void 0,this.isUpdatePending=!1,this.hasUpdated=!1,this._$Em=null,this._$Ev()}_$Ev(){this._$ES=new Promise(t=>this.enableUpdating=t),this._$AL=new Map,this._$E_(),this.requestUpdate(),this.constructor.l?.forEach(t=>t(this))}addController(t){(this._$EO??=new Set).add(t),void 0!==this.renderRoot&&this.isConnected&&t.hostConnected?.()}removeController(t){this._$EO?.delete(t)}_$E_(){const t=new Map,e=this.constructor.elementProperties;for(const i of e.keys())this.hasOwnProperty(i)&&(t.set(i,this[i]),delete this[i]);t.size>0&&(this._$Ep=t)}createRenderRoot(){const t=this.shadowRoot??this.attachShadow(this.constructor.shadowRootOptions);return a(t,this.constructor.elementStyles),t}connectedCallback(){this.renderRoot??=this.createRenderRoot(),this.enableUpdating(!0),this._$EO?.forEach(t=>t.hostConnected?.())}enableUpdating(t){}disconnectedCallback(){this._$EO?.forEach(t=>t.hostDisconnected?.())}attributeChangedCallback(t,e,i){this._$AK(t,i)}_$ET(t,e){const i=this.constructor.elementProperties.get(t),r=this.constructor._$Eu(t,i);if(void 0!==r&&!0===i.reflect){const s=(void 0!==i.converter?.toAttribute?i.converter:b).toAttribute(e,i.type);this._$Em=t,null==s?this.removeAttribute(r):this.setAttribute(r,s),this._$Em=null}}_$AK(t,e){const i=this.constructor,r=i._$Eh.get(t);if(void 0!==r&&this._$Em!==r){const t=i.getPropertyOptions(r),s="function"==typeof t.converter?{fromAttribute:t.converter}:void 0!==t.converter?.fromAttribute?t.converter:b;this._$Em=r;const o=s.fromAttribute(e,t.type);this[r]=o??this._$Ej?.get(r)??o,this._$Em=null}}requestUpdate(t,e,i,r=!1,s){if(void 0!==t){const o=this.constructor;if(!1===r&&(s=this[t]),i??=o.getPropertyOptions(t),!((i.hasChanged??y)(s,e)||i.useDefault&&i.reflect&&s===this._$Ej?.get(t)&&!this.hasAttribute(o._$Eu(t,i))))return;this.C(t,e,i)}!1===this.isUpdatePending&&(this._$ES=this._$EP())}C(t,e,{useDefault:i,reflect:r,wrapped:s},o){i&&!(this._$Ej??=new Map).has(t)&&(this._$Ej.set(t,o??e??this[t]),!0!==s||void 0!==o)||(this._$AL.has(t)||(this.hasUpdated||i||(e=void 0),this._$AL.set(t,e)),!0===r&&this._$Em!==t&&(this._$Eq??=new Set).add(t))}async _$EP(){this.isUpdatePending=!0;try{await this._$ES}catch(t){Promise.reject(t)}const t=this.scheduleUpdate();return null!=t&&await t,!this.isUpdatePending}scheduleUpdate(){return this.performUpdate()}performUpdate(){if(!this.isUpdatePending)return;if(!this.hasUpdated){if(this.renderRoot??=this.createRenderRoot(),this._$Ep){for(const[t,e]of this._$Ep)this[t]=e;this._$Ep=void 0}const t=this.constructor.elementProperties;if(t.size>0)for(const[e,i]of t){const{wrapped:t}=i,r=this[e];!0!==t||this._$AL.has(e)||void 0===r||this.C(e,void 0,i,r)}}let t=!1;const e=this._$AL;try{t=this.shouldUpdate(e),t?(this.willUpdate(e),this._$EO?.forEach(t=>t.hostUpdate?.()),this.update(e)):this._$EM()}catch(e){throw t=!1,this._$EM(),e}t&&this._$AE(e)}willUpdate(t){}_$AE(t){this._$EO?.forEach(t=>t.hostUpdated?.()),this.hasUpdated||(this.hasUpdated=!0,this.firstUpdated(t)),this.updated(t)}_$EM(){this._$AL=new Map,this.isUpdatePending=!1}get updateComplete(){return this.getUpdateComplete()}getUpdateComplete(){return this._$ES}shouldUpdate(t){return!0}update(t){this._$Eq&&=this._$Eq.forEach(t=>this._$ET(t,this[t])),this._$EM()}updated(t){}firstUpdated(t){}}$.elementStyles=[],$.shadowRootOptions={mode:"open"},$[g("elementProperties")]=new Map,$[g("finalized")]=new Map,f?.({ReactiveElement:$}),(m.reactiveElementVersions??=[]).push("2.1.2");const k=globalThis,w=t=>t,A=k.trustedTypes,z=A?A.createPolicy("lit-html",{createHTML:t=>t}):void 0,S="$lit$",D=`lit$${Math.random().toFixed(9).slice(2)}$`,E="?"+D,P=`<${E}>`,T=document,M=()=>T.createComment(""),C=t=>null===t||"object"!=typeof t&&"function"!=typeof t,O=Array.isArray,U="[ \t\n\f\r]",I=/<(?:(!--|\/[^a-zA-Z])|(\/?[a-zA-Z][^>\s]*)|(\/?$))/g,j=/-->/g,H=/>/g,N=RegExp(`>|${U}(?:([^\\s"'>=/]+)(${U}*=${U}*(?:[^ \t\n\f\r"'\`<>=]|("|')|))|$)`,"g"),F=/'/g,R=/"/g,W=/^(?:script|style|textarea|title)$/i,B=t=>(e,...i)=>({_$litType$:t,strings:e,values:i}),q=B(1),L=(B(2),B(3),Symbol.for("lit-noChange")),K=Symbol.for("lit-nothing"),G=new WeakMap,V=T.createTreeWalker(T,129);function Z(t,e){if(!O(t)||!t.hasOwnProperty("raw"))throw Error("invalid template strings array");return void 0!==z?z.createHTML(e):e}const J=(t,e)=>{const i=t.length-1,r=[];let s,o=2===e?"<svg>":3===e?"<math>":"",a=I;for(let e=0;e<i;e++){const i=t[e];let n,l,d=-1,c=0;for(;c<i.length&&(a.lastIndex=c,l=a.exec(i),null!==l);)c=a.lastIndex,a===I?"!--"===l[1]?a=j:void 0!==l[1]?a=H:void 0!==l[2]?(W.test(l[2])&&(s=RegExp("</"+l[2],"g")),a=N):void 0!==l[3]&&(a=N):a===N?">"===l[0]?(a=s??I,d=-1):void 0===l[1]?d=-2:(d=a.lastIndex-l[2].length,n=l[1],a=void 0===l[3]?N:'"'===l[3]?R:F):a===R||a===F?a=N:a===j||a===H?a=I:(a=N,s=void 0);const p=a===N&&t[e+1].startsWith("/>")?" ":"";o+=a===I?i+P:d>=0?(r.push(n),i.slice(0,d)+S+i.slice(d)+D+p):i+D+(-2===d?e:p)}return[Z(t,o+(t[i]||"<?>")+(2===e?"</svg>":3===e?"</math>":"")),r]};class X{constructor({strings:t,_$litType$:e},i){let r;this.parts=[];let s=0,o=0;const a=t.length-1,n=this.parts,[l,d]=J(t,e);if(this.el=X.createElement(l,i),V.currentNode=this.el.content,2===e||3===e){const t=this.el.content.firstChild;t.replaceWith(...t.childNodes)}for(;null!==(r=V.nextNode())&&n.length<a;){if(1===r.nodeType){if(r.hasAttributes())for(const t of r.getAttributeNames())if(t.endsWith(S)){const e=d[o++],i=r.getAttribute(t).split(D),a=/([.?@])?(.*)/.exec(e);n.push({type:1,index:s,name:a[2],strings:i,ctor:"."===a[1]?it:"?"===a[1]?rt:"@"===a[1]?st:et}),r.removeAttribute(t)}else t.startsWith(D)&&(n.push({type:6,index:s}),r.removeAttribute(t));if(W.test(r.tagName)){const t=r.textContent.split(D),e=t.length-1;if(e>0){r.textContent=A?A.emptyScript:"";for(let i=0;i<e;i++)r.append(t[i],M()),V.nextNode(),n.push({type:2,index:++s});r.append(t[e],M())}}}else if(8===r.nodeType)if(r.data===E)n.push({type:2,index:s});else{let t=-1;for(;-1!==(t=r.data.indexOf(D,t+1));)n.push({type:7,index:s}),t+=D.length-1}s++}}static createElement(t,e){const i=T.createElement("template");return i.innerHTML=t,i}}function Q(t,e,i=t,r){if(e===L)return e;let s=void 0!==r?i._$Co?.[r]:i._$Cl;const o=C(e)?void 0:e._$litDirective$;return s?.constructor!==o&&(s?._$AO?.(!1),void 0===o?s=void 0:(s=new o(t),s._$AT(t,i,r)),void 0!==r?(i._$Co??=[])[r]=s:i._$Cl=s),void 0!==s&&(e=Q(t,s._$AS(t,e.values),s,r)),e}class Y{constructor(t,e){this._$AV=[],this._$AN=void 0,this._$AD=t,this._$AM=e}get parentNode(){return this._$AM.parentNode}get _$AU(){return this._$AM._$AU}u(t){const{el:{content:e},parts:i}=this._$AD,r=(t?.creationScope??T).importNode(e,!0);V.currentNode=r;let s=V.nextNode(),o=0,a=0,n=i[0];for(;void 0!==n;){if(o===n.index){let e;2===n.type?e=new tt(s,s.nextSibling,this,t):1===n.type?e=new n.ctor(s,n.name,n.strings,this,t):6===n.type&&(e=new ot(s,this,t)),this._$AV.push(e),n=i[++a]}o!==n?.index&&(s=V.nextNode(),o++)}return V.currentNode=T,r}p(t){let e=0;for(const i of this._$AV)void 0!==i&&(void 0!==i.strings?(i._$AI(t,i,e),e+=i.strings.length-2):i._$AI(t[e])),e++}}class tt{get _$AU(){return this._$AM?._$AU??this._$Cv}constructor(t,e,i,r){this.type=2,this._$AH=K,this._$AN=void 0,this._$AA=t,this._$AB=e,this._$AM=i,this.options=r,this._$Cv=r?.isConnected??!0}get parentNode(){let t=this._$AA.parentNode;const e=this._$AM;return void 0!==e&&11===t?.nodeType&&(t=e.parentNode),t}get startNode(){return this._$AA}get endNode(){return this._$AB}_$AI(t,e=this){t=Q(this,t,e),C(t)?t===K||null==t||""===t?(this._$AH!==K&&this._$AR(),this._$AH=K):t!==this._$AH&&t!==L&&this._(t):void 0!==t._$litType$?this.$(t):void 0!==t.nodeType?this.T(t):(t=>O(t)||"function"==typeof t?.[Symbol.iterator])(t)?this.k(t):this._(t)}O(t){return this._$AA.parentNode.insertBefore(t,this._$AB)}T(t){this._$AH!==t&&(this._$AR(),this._$AH=this.O(t))}_(t){this._$AH!==K&&C(this._$AH)?this._$AA.nextSibling.data=t:this.T(T.createTextNode(t)),this._$AH=t}$(t){const{values:e,_$litType$:i}=t,r="number"==typeof i?this._$AC(t):(void 0===i.el&&(i.el=X.createElement(Z(i.h,i.h[0]),this.options)),i);if(this._$AH?._$AD===r)this._$AH.p(e);else{const t=new Y(r,this),i=t.u(this.options);t.p(e),this.T(i),this._$AH=t}}_$AC(t){let e=G.get(t.strings);return void 0===e&&G.set(t.strings,e=new X(t)),e}k(t){O(this._$AH)||(this._$AH=[],this._$AR());const e=this._$AH;let i,r=0;for(const s of t)r===e.length?e.push(i=new tt(this.O(M()),this.O(M()),this,this.options)):i=e[r],i._$AI(s),r++;r<e.length&&(this._$AR(i&&i._$AB.nextSibling,r),e.length=r)}_$AR(t=this._$AA.nextSibling,e){for(this._$AP?.(!1,!0,e);t!==this._$AB;){const e=w(t).nextSibling;w(t).remove(),t=e}}setConnected(t){void 0===this._$AM&&(this._$Cv=t,this._$AP?.(t))}}class et{get tagName(){return this.element.tagName}get _$AU(){return this._$AM._$AU}constructor(t,e,i,r,s){this.type=1,this._$AH=K,this._$AN=void 0,this.element=t,this.name=e,this._$AM=r,this.options=s,i.length>2||""!==i[0]||""!==i[1]?(this._$AH=Array(i.length-1).fill(new String),this.strings=i):this._$AH=K}_$AI(t,e=this,i,r){const s=this.strings;let o=!1;if(void 0===s)t=Q(this,t,e,0),o=!C(t)||t!==this._$AH&&t!==L,o&&(this._$AH=t);else{const r=t;let a,n;for(t=s[0],a=0;a<s.length-1;a++)n=Q(this,r[i+a],e,a),n===L&&(n=this._$AH[a]),o||=!C(n)||n!==this._$AH[a],n===K?t=K:t!==K&&(t+=(n??"")+s[a+1]),this._$AH[a]=n}o&&!r&&this.j(t)}j(t){t===K?this.element.removeAttribute(this.name):this.element.setAttribute(this.name,t??"")}}class it extends et{constructor(){super(...arguments),this.type=3}j(t){this.element[this.name]=t===K?void 0:t}}class rt extends et{constructor(){super(...arguments),this.type=4}j(t){this.element.toggleAttribute(this.name,!!t&&t!==K)}}class st extends et{constructor(t,e,i,r,s){super(t,e,i,r,s),this.type=5}_$AI(t,e=this){if((t=Q(this,t,e,0)??K)===L)return;const i=this._$AH,r=t===K&&i!==K||t.capture!==i.capture||t.once!==i.once||t.passive!==i.passive,s=t!==K&&(i===K||r);r&&this.element.removeEventListener(this.name,this,i),s&&this.element.addEventListener(this.name,this,t),this._$AH=t}handleEvent(t){"function"==typeof this._$AH?this._$AH.call(this.options?.host??this.element,t):this._$AH.handleEvent(t)}}class ot{constructor(t,e,i){this.element=t,this.type=6,this._$AN=void 0,this._$AM=e,this.options=i}get _$AU(){return this._$AM._$AU}_$AI(t){Q(this,t)}}const at=k.litHtmlPolyfillSupport;at?.(X,tt),(k.litHtmlVersions??=[]).push("3.3.2");const nt=globalThis;class lt extends ${constructor(){super(...arguments),this.renderOptions={host:this},this._$Do=void 0}createRenderRoot(){const t=super.createRenderRoot();return this.renderOptions.renderBefore??=t.firstChild,t}update(t){const e=this.render();this.hasUpdated||(this.renderOptions.isConnected=this.isConnected),super.update(t),this._$Do=((t,e,i)=>{const r=i?.renderBefore??e;let s=r._$litPart$;if(void 0===s){const t=i?.renderBefore??null;r._$litPart$=s=new tt(e.insertBefore(M(),t),t,void 0,i??{})}return s._$AI(t),s})(e,this.renderRoot,this.renderOptions)}connectedCallback(){super.connectedCallback(),this._$Do?.setConnected(!0)}disconnectedCallback(){super.disconnectedCallback(),this._$Do?.setConnected(!1)}render(){return L}}lt._$litElement$=!0,lt.finalized=!0,nt.litElementHydrateSupport?.({LitElement:lt});const dt=nt.litElementPolyfillSupport;dt?.({LitElement:lt}),(nt.litElementVersions??=[]).push("4.2.2");const ct=t=>(e,i)=>{void 0!==i?i.addInitializer(()=>{customElements.define(t,e)}):customElements.define(t,e)},pt={attribute:!0,type:String,converter:b,reflect:!1,hasChanged:y},ht=(t=pt,e,i)=>{const{kind:r,metadata:s}=i;let o=globalThis.litPropertyMetadata.get(s);if(void 0===o&&globalThis.litPropertyMetadata.set(s,o=new Map),"setter"===r&&((t=Object.create(t)).wrapped=!0),o.set(i.name,t),"accessor"===r){const{name:r}=i;return{set(i){const s=e.get.call(this);e.set.call(this,i),this.requestUpdate(r,s,t,!0,i)},init(e){return void 0!==e&&this.C(r,void 0,t,e),e}}}if("setter"===r){const{name:r}=i;return function(i){const s=this[r];e.call(this,i),this.requestUpdate(r,s,t,!0,i)}}throw Error("Unsupported decorator location: "+r)};function ut(t){return(e,i)=>"object"==typeof i?ht(t,e,i):((t,e,i)=>{const r=e.hasOwnProperty(i);return e.constructor.createProperty(i,t),r?Object.getOwnPropertyDescriptor(e,i):void 0})(t,e,i)}function mt(t){return ut({...t,state:!0,attribute:!1})}const _t={tablet:{icon:"💊",label:"Tablette",units:["tablet","mg","g"]},capsule:{icon:"💊",label:"Kapsel",units:["capsule","mg","g"]},injection:{icon:"💉",label:"Spritze",units:["ml","IU","mg","unit"]},nasal_spray:{icon:"👃",label:"Nasenspray",units:["spray","puff"]},inhaler:{icon:"🫁",label:"Inhalator",units:["puff","mcg"]},drops:{icon:"💧",label:"Tropfen",units:["drop","ml"]},cream:{icon:"🧴",label:"Creme/Salbe",units:["application","g"]},patch:{icon:"🩹",label:"Pflaster",units:["patch"]},suppository:{icon:"💊",label:"Zäpfchen",units:["suppository"]},liquid:{icon:"🧪",label:"Saft/Lösung",units:["ml","teaspoon","tablespoon"]},powder:{icon:"📦",label:"Pulver",units:["sachet","scoop","g"]},other:{icon:"📦",label:"Sonstige",units:["unit","dose","application"]}},vt={times_per_day:{icon:"🕐",label:"Täglich zu festen Zeiten",description:"z.B. 8:00, 12:00, 18:00"},interval:{icon:"⏱️",label:"Alle X Stunden",description:"z.B. alle 8 Stunden"},weekly:{icon:"📅",label:"Bestimmte Wochentage",description:"z.B. Mo, Mi, Fr"},as_needed:{icon:"🆘",label:"Bei Bedarf (PRN)",description:"Nur wenn nötig"},depot:{icon:"💉",label:"Depot-Injektion",description:"Termin-basiert (z.B. monatlich)"}},ft=[{value:0,short:"Mo",long:"Montag"},{value:1,short:"Di",long:"Dienstag"},{value:2,short:"Mi",long:"Mittwoch"},{value:3,short:"Do",long:"Donnerstag"},{value:4,short:"Fr",long:"Freitag"},{value:5,short:"Sa",long:"Samstag"},{value:6,short:"So",long:"Sonntag"}],gt=[{label:"¼",numerator:1,denominator:4},{label:"½",numerator:1,denominator:2},{label:"1",numerator:1,denominator:1},{label:"1½",numerator:3,denominator:2},{label:"2",numerator:2,denominator:1}];var bt=function(t,e,i,r){var s,o=arguments.length,a=o<3?e:null===r?r=Object.getOwnPropertyDescriptor(e,i):r;if("object"==typeof Reflect&&"function"==typeof Reflect.decorate)a=Reflect.decorate(t,e,i,r);else for(var n=t.length-1;n>=0;n--)(s=t[n])&&(a=(o<3?s(a):o>3?s(e,i,a):s(e,i))||a);return o>3&&a&&Object.defineProperty(e,i,a),a};let yt=class extends lt{constructor(){super(...arguments),this._step=1,this._saving=!1,this._error=null,this._formData={form:"tablet",display_name:"",dose_numerator:1,dose_denominator:1,dose_unit:"tablet",schedule_kind:"times_per_day",times:["08:00"],weekdays:[0,1,2,3,4],interval_minutes:480,track_inventory:!1,current_quantity:30,refill_threshold:7,grace_minutes:30,snooze_minutes:10}}render(){return q`
-      <div class="wizard-container">
-        <div class="wizard-header">
-          <h2>Medikament hinzufügen</h2>
-          <span class="step-indicator">${this._step}/4</span>
-        </div>
-
-        <div class="wizard-content">
-          ${this._error?q`<div class="error">${this._error}</div>`:""}
-          
-          ${1===this._step?this._renderStep1():""}
-          ${2===this._step?this._renderStep2():""}
-          ${3===this._step?this._renderStep3():""}
-          ${4===this._step?this._renderStep4():""}
-          ${5===this._step?this._renderSuccess():""}
-        </div>
-
-        ${this._step<5?q`
-          <div class="wizard-footer">
-            ${this._step>1?q`<button class="btn btn-secondary" @click=${this._prevStep}>← Zurück</button>`:q`<button class="btn btn-text" @click=${this._close}>Abbrechen</button>`}
-            
-            ${this._step<4?q`<button class="btn btn-primary" @click=${this._nextStep} ?disabled=${!this._canProceed()}>Weiter →</button>`:q`<button class="btn btn-primary" @click=${this._save} ?disabled=${this._saving}>
-                  ${this._saving?"Speichern...":"💊 Medikament speichern"}
-                </button>`}
-          </div>
-        `:""}
-      </div>
-    `}_renderStep1(){const t=Object.entries(_t);return q`
-      <div class="step-title">Was möchtest du hinzufügen?</div>
-      <div class="form-grid">
-        ${t.map(([t,e])=>q`
-          <div 
-            class="form-type-card ${this._formData.form===t?"selected":""}"
-            @click=${()=>this._selectForm(t)}
-          >
-            <span class="form-type-icon">${e.icon}</span>
-            <span class="form-type-label">${e.label}</span>
-          </div>
-        `)}
-      </div>
-    `}_renderStep2(){const t=_t[this._formData.form];return q`
-      <div class="step-title">${t.icon} ${t.label} - Details</div>
-      
-      <div class="field">
-        <label>Name *</label>
-        <input 
-          type="text" 
-          placeholder="z.B. Metformin"
-          .value=${this._formData.display_name}
-          @input=${t=>this._updateField("display_name",t.target.value)}
-        />
-      </div>
-
-      <div class="field-row">
-        <div class="field">
-          <label>Stärke (optional)</label>
-          <input 
-            type="text" 
-            placeholder="z.B. 500"
-            .value=${this._formData.strength||""}
-            @input=${t=>this._updateField("strength",t.target.value)}
-          />
-        </div>
-        <div class="field">
-          <label>Einheit</label>
-          <select 
-            .value=${this._formData.strength_unit||"mg"}
-            @change=${t=>this._updateField("strength_unit",t.target.value)}
-          >
-            <option value="mg">mg</option>
-            <option value="g">g</option>
-            <option value="mcg">mcg</option>
-            <option value="ml">ml</option>
-            <option value="IU">IU</option>
-          </select>
-        </div>
-      </div>
-
-      <div class="field">
-        <label>Dosis pro Einnahme</label>
-        <div class="dose-presets">
-          ${gt.map(t=>q`
-            <div 
-              class="dose-preset ${this._formData.dose_numerator===t.numerator&&this._formData.dose_denominator===t.denominator?"selected":""}"
-              @click=${()=>this._selectDose(t.numerator,t.denominator)}
-            >
-              ${t.label}
-            </div>
-          `)}
-        </div>
-      </div>
-
-      <div class="field">
-        <label>Einheit</label>
-        <select 
-          .value=${this._formData.dose_unit}
-          @change=${t=>this._updateField("dose_unit",t.target.value)}
-        >
-          ${t.units.map(t=>q`
-            <option value=${t}>${t}</option>
-          `)}
-        </select>
-      </div>
-
-      <div class="field">
-        <label>Notizen (optional)</label>
-        <input 
-          type="text" 
-          placeholder="z.B. Mit dem Essen einnehmen"
-          .value=${this._formData.notes||""}
-          @input=${t=>this._updateField("notes",t.target.value)}
-        />
-      </div>
-    `}_renderStep3(){return q`
-      <div class="step-title">Wann nimmst du ${this._formData.display_name||"dieses Medikament"}?</div>
-      
-      ${Object.entries(vt).map(([t,e])=>q`
-        <div 
-          class="schedule-option ${this._formData.schedule_kind===t?"selected":""}"
-          @click=${()=>this._updateField("schedule_kind",t)}
-        >
-          <span class="schedule-option-icon">${e.icon}</span>
-          <div class="schedule-option-content">
-            <div class="schedule-option-label">${e.label}</div>
-            <div class="schedule-option-desc">${e.description}</div>
-          </div>
-        </div>
-      `)}
-
-      ${"times_per_day"===this._formData.schedule_kind?this._renderTimesInput():""}
-      ${"weekly"===this._formData.schedule_kind?this._renderWeeklyInput():""}
-      ${"interval"===this._formData.schedule_kind?this._renderIntervalInput():""}
-    `}_renderTimesInput(){return q`
-      <div class="field" style="margin-top: 16px;">
-        <label>Um welche Uhrzeit(en)?</label>
-        <div class="time-inputs">
-          ${(this._formData.times||[]).map((t,e)=>q`
-            <div class="time-input-wrapper">
-              <input 
-                type="time" 
-                class="time-input"
-                .value=${t}
-                @change=${t=>this._updateTime(e,t.target.value)}
-              />
-              ${(this._formData.times?.length||0)>1?q`
-                <button class="remove-time" @click=${()=>this._removeTime(e)}>×</button>
-              `:""}
-            </div>
-          `)}
-          <button class="add-time-btn" @click=${this._addTime}>+ Zeit</button>
-        </div>
-      </div>
-    `}_renderWeeklyInput(){return q`
-      <div class="field" style="margin-top: 16px;">
-        <label>An welchen Tagen?</label>
-        <div class="weekday-toggles">
-          ${ft.map(t=>q`
-            <div 
-              class="weekday-toggle ${(this._formData.weekdays||[]).includes(t.value)?"selected":""}"
-              @click=${()=>this._toggleWeekday(t.value)}
-            >
-              ${t.short}
-            </div>
-          `)}
-        </div>
-      </div>
-      ${this._renderTimesInput()}
-    `}_renderIntervalInput(){return q`
-      <div class="field" style="margin-top: 16px;">
-        <label>Alle wie viele Stunden?</label>
-        <div class="dose-presets">
-          ${[4,6,8,12,24].map(t=>q`
-            <div 
-              class="dose-preset ${this._formData.interval_minutes===60*t?"selected":""}"
-              @click=${()=>this._updateField("interval_minutes",60*t)}
-            >
-              ${t}h
-            </div>
-          `)}
-        </div>
-      </div>
-    `}_renderStep4(){return q`
-      <div class="step-title">Bestand & Erinnerungen</div>
-      
-      <label class="checkbox-field" @click=${()=>this._updateField("track_inventory",!this._formData.track_inventory)}>
-        <input type="checkbox" .checked=${this._formData.track_inventory} />
-        <span>Bestand verwalten</span>
-      </label>
-
-      ${this._formData.track_inventory?q`
-        <div class="field-row">
-          <div class="field">
-            <label>Aktueller Bestand</label>
-            <input 
-              type="number" 
-              min="0"
-              .value=${String(this._formData.current_quantity||0)}
-              @input=${t=>this._updateField("current_quantity",parseInt(t.target.value)||0)}
-            />
-          </div>
-          <div class="field">
-            <label>Warnen unter</label>
-            <input 
-              type="number" 
-              min="1"
-              .value=${String(this._formData.refill_threshold||7)}
-              @input=${t=>this._updateField("refill_threshold",parseInt(t.target.value)||7)}
-            />
-          </div>
-        </div>
-      `:""}
-
-      <div class="field">
-        <label>Gnadenfrist (Minuten)</label>
-        <div class="dose-presets">
-          ${[10,15,30,60].map(t=>q`
-            <div 
-              class="dose-preset ${this._formData.grace_minutes===t?"selected":""}"
-              @click=${()=>this._updateField("grace_minutes",t)}
-            >
-              ${t} min
-            </div>
-          `)}
-        </div>
-        <small style="color: var(--secondary-text-color); font-size: 11px; margin-top: 4px; display: block;">
-          Zeit nach Fälligkeit bevor als "verpasst" markiert
-        </small>
-      </div>
-
-      <div class="field">
-        <label>Snooze-Dauer (Minuten)</label>
-        <div class="dose-presets">
-          ${[5,10,15,30].map(t=>q`
-            <div 
-              class="dose-preset ${this._formData.snooze_minutes===t?"selected":""}"
-              @click=${()=>this._updateField("snooze_minutes",t)}
-            >
-              ${t} min
-            </div>
-          `)}
-        </div>
-      </div>
-    `}_renderSuccess(){return q`
-      <div class="success-message">
-        <div class="success-icon">✅</div>
-        <h3>${this._formData.display_name} hinzugefügt!</h3>
-        <p>Das Medikament wurde erfolgreich angelegt.</p>
-        <button class="btn btn-primary" @click=${this._addAnother}>+ Weiteres hinzufügen</button>
-        <button class="btn btn-text" @click=${this._close}>Fertig</button>
-      </div>
-    `}_selectForm(t){const e=_t[t];this._formData={...this._formData,form:t,dose_unit:e.units[0]},this.requestUpdate()}_selectDose(t,e){this._formData={...this._formData,dose_numerator:t,dose_denominator:e},this.requestUpdate()}_updateField(t,e){this._formData={...this._formData,[t]:e},this.requestUpdate()}_addTime(){const t=[...this._formData.times||[],"12:00"];this._updateField("times",t)}_removeTime(t){const e=[...this._formData.times||[]];e.splice(t,1),this._updateField("times",e)}_updateTime(t,e){const i=[...this._formData.times||[]];i[t]=e,this._updateField("times",i)}_toggleWeekday(t){const e=[...this._formData.weekdays||[]],i=e.indexOf(t);i>=0?e.splice(i,1):(e.push(t),e.sort()),this._updateField("weekdays",e)}_canProceed(){switch(this._step){case 1:return!!this._formData.form;case 2:return!!this._formData.display_name.trim();case 3:return"as_needed"===this._formData.schedule_kind||("times_per_day"===this._formData.schedule_kind?(this._formData.times?.length||0)>0:"weekly"===this._formData.schedule_kind?(this._formData.weekdays?.length||0)>0&&(this._formData.times?.length||0)>0:"interval"!==this._formData.schedule_kind||(this._formData.interval_minutes||0)>0);default:return!0}}_nextStep(){this._canProceed()&&(this._step++,this._error=null)}_prevStep(){this._step>1&&(this._step--,this._error=null)}async _save(){this._saving=!0,this._error=null;try{const t=this._formData.strength?`${this._formData.display_name} ${this._formData.strength}${this._formData.strength_unit||"mg"}`:this._formData.display_name,e={entry_id:this.entryId,display_name:t,schedule_kind:this._formData.schedule_kind,form:this._formData.form,default_dose:{numerator:this._formData.dose_numerator,denominator:this._formData.dose_denominator,unit:this._formData.dose_unit},policy:{grace_minutes:this._formData.grace_minutes,snooze_minutes:this._formData.snooze_minutes}};"times_per_day"!==this._formData.schedule_kind&&"weekly"!==this._formData.schedule_kind||(e.times=this._formData.times),"weekly"===this._formData.schedule_kind&&(e.weekdays=this._formData.weekdays),"interval"!==this._formData.schedule_kind&&"depot"!==this._formData.schedule_kind||(e.interval_minutes=this._formData.interval_minutes),this._formData.track_inventory&&(e.inventory={current_quantity:this._formData.current_quantity,refill_threshold:this._formData.refill_threshold,auto_decrement:!0}),this._formData.notes&&(e.notes=this._formData.notes),await this.hass.callService("med_expert","add_medication",e),this._step=5}catch(t){this._error=`Fehler beim Speichern: ${t}`}finally{this._saving=!1}}_addAnother(){this._formData={form:"tablet",display_name:"",dose_numerator:1,dose_denominator:1,dose_unit:"tablet",schedule_kind:"times_per_day",times:["08:00"],weekdays:[0,1,2,3,4],interval_minutes:480,track_inventory:!1,current_quantity:30,refill_threshold:7,grace_minutes:30,snooze_minutes:10},this._step=1,this._error=null}_close(){this.dispatchEvent(new CustomEvent("close"))}};yt.styles=o`
+(()=>{var{defineProperty:K,getOwnPropertyNames:Se,getOwnPropertyDescriptor:Ae}=Object,Ee=Object.prototype.hasOwnProperty;function De(e){return this[e]}var ze=(e)=>{var t=(ee??=new WeakMap).get(e),i;if(t)return t;if(t=K({},"__esModule",{value:!0}),e&&typeof e==="object"||typeof e==="function"){for(var r of Se(e))if(!Ee.call(t,r))K(t,r,{get:De.bind(e,r),enumerable:!(i=Ae(e,r))||i.enumerable})}return ee.set(e,t),t},ee;var Me=(e)=>e;function Pe(e,t){this[e]=Me.bind(null,t)}var Te=(e,t)=>{for(var i in t)K(e,i,{get:t[i],enumerable:!0,configurable:!0,set:Pe.bind(t,i)})};var p=function(e,t,i,r){var s=arguments.length,o=s<3?t:r===null?r=Object.getOwnPropertyDescriptor(t,i):r,n;if(typeof Reflect==="object"&&typeof Reflect.decorate==="function")o=Reflect.decorate(e,t,i,r);else for(var l=e.length-1;l>=0;l--)if(n=e[l])o=(s<3?n(o):s>3?n(t,i,o):n(t,i))||o;return s>3&&o&&Object.defineProperty(t,i,o),o};var Ve={};Te(Ve,{MedExpertPanel:()=>q});var F=globalThis,R=F.ShadowRoot&&(F.ShadyCSS===void 0||F.ShadyCSS.nativeShadow)&&"adoptedStyleSheets"in Document.prototype&&"replace"in CSSStyleSheet.prototype,G=Symbol(),te=new WeakMap;class N{constructor(e,t,i){if(this._$cssResult$=!0,i!==G)throw Error("CSSResult is not constructable. Use `unsafeCSS` or `css` instead.");this.cssText=e,this.t=t}get styleSheet(){let e=this.o,t=this.t;if(R&&e===void 0){let i=t!==void 0&&t.length===1;i&&(e=te.get(t)),e===void 0&&((this.o=e=new CSSStyleSheet).replaceSync(this.cssText),i&&te.set(t,e))}return e}toString(){return this.cssText}}var ie=(e)=>new N(typeof e=="string"?e:e+"",void 0,G),D=(e,...t)=>{let i=e.length===1?e[0]:t.reduce((r,s,o)=>r+((n)=>{if(n._$cssResult$===!0)return n.cssText;if(typeof n=="number")return n;throw Error("Value passed to 'css' function must be a 'css' function result: "+n+". Use 'unsafeCSS' to pass non-literal values, but take care to ensure page security.")})(s)+e[o+1],e[0]);return new N(i,e,G)},re=(e,t)=>{if(R)e.adoptedStyleSheets=t.map((i)=>i instanceof CSSStyleSheet?i:i.styleSheet);else for(let i of t){let r=document.createElement("style"),s=F.litNonce;s!==void 0&&r.setAttribute("nonce",s),r.textContent=i.cssText,e.appendChild(r)}},V=R?(e)=>e:(e)=>e instanceof CSSStyleSheet?((t)=>{let i="";for(let r of t.cssRules)i+=r.cssText;return ie(i)})(e):e;var{is:Ce,defineProperty:He,getOwnPropertyDescriptor:Ue,getOwnPropertyNames:Ie,getOwnPropertySymbols:Oe,getPrototypeOf:Fe}=Object,L=globalThis,se=L.trustedTypes,Re=se?se.emptyScript:"",Ne=L.reactiveElementPolyfillSupport,z=(e,t)=>e,M={toAttribute(e,t){switch(t){case Boolean:e=e?Re:null;break;case Object:case Array:e=e==null?e:JSON.stringify(e)}return e},fromAttribute(e,t){let i=e;switch(t){case Boolean:i=e!==null;break;case Number:i=e===null?null:Number(e);break;case Object:case Array:try{i=JSON.parse(e)}catch(r){i=null}}return i}},j=(e,t)=>!Ce(e,t),oe={attribute:!0,type:String,converter:M,reflect:!1,useDefault:!1,hasChanged:j};Symbol.metadata??=Symbol("metadata"),L.litPropertyMetadata??=new WeakMap;class v extends HTMLElement{static addInitializer(e){this._$Ei(),(this.l??=[]).push(e)}static get observedAttributes(){return this.finalize(),this._$Eh&&[...this._$Eh.keys()]}static createProperty(e,t=oe){if(t.state&&(t.attribute=!1),this._$Ei(),this.prototype.hasOwnProperty(e)&&((t=Object.create(t)).wrapped=!0),this.elementProperties.set(e,t),!t.noAccessor){let i=Symbol(),r=this.getPropertyDescriptor(e,i,t);r!==void 0&&He(this.prototype,e,r)}}static getPropertyDescriptor(e,t,i){let{get:r,set:s}=Ue(this.prototype,e)??{get(){return this[t]},set(o){this[t]=o}};return{get:r,set(o){let n=r?.call(this);s?.call(this,o),this.requestUpdate(e,n,i)},configurable:!0,enumerable:!0}}static getPropertyOptions(e){return this.elementProperties.get(e)??oe}static _$Ei(){if(this.hasOwnProperty(z("elementProperties")))return;let e=Fe(this);e.finalize(),e.l!==void 0&&(this.l=[...e.l]),this.elementProperties=new Map(e.elementProperties)}static finalize(){if(this.hasOwnProperty(z("finalized")))return;if(this.finalized=!0,this._$Ei(),this.hasOwnProperty(z("properties"))){let t=this.properties,i=[...Ie(t),...Oe(t)];for(let r of i)this.createProperty(r,t[r])}let e=this[Symbol.metadata];if(e!==null){let t=litPropertyMetadata.get(e);if(t!==void 0)for(let[i,r]of t)this.elementProperties.set(i,r)}this._$Eh=new Map;for(let[t,i]of this.elementProperties){let r=this._$Eu(t,i);r!==void 0&&this._$Eh.set(r,t)}this.elementStyles=this.finalizeStyles(this.styles)}static finalizeStyles(e){let t=[];if(Array.isArray(e)){let i=new Set(e.flat(1/0).reverse());for(let r of i)t.unshift(V(r))}else e!==void 0&&t.push(V(e));return t}static _$Eu(e,t){let i=t.attribute;return i===!1?void 0:typeof i=="string"?i:typeof e=="string"?e.toLowerCase():void 0}constructor(){super(),this._$Ep=void 0,this.isUpdatePending=!1,this.hasUpdated=!1,this._$Em=null,this._$Ev()}_$Ev(){this._$ES=new Promise((e)=>this.enableUpdating=e),this._$AL=new Map,this._$E_(),this.requestUpdate(),this.constructor.l?.forEach((e)=>e(this))}addController(e){(this._$EO??=new Set).add(e),this.renderRoot!==void 0&&this.isConnected&&e.hostConnected?.()}removeController(e){this._$EO?.delete(e)}_$E_(){let e=new Map,t=this.constructor.elementProperties;for(let i of t.keys())this.hasOwnProperty(i)&&(e.set(i,this[i]),delete this[i]);e.size>0&&(this._$Ep=e)}createRenderRoot(){let e=this.shadowRoot??this.attachShadow(this.constructor.shadowRootOptions);return re(e,this.constructor.elementStyles),e}connectedCallback(){this.renderRoot??=this.createRenderRoot(),this.enableUpdating(!0),this._$EO?.forEach((e)=>e.hostConnected?.())}enableUpdating(e){}disconnectedCallback(){this._$EO?.forEach((e)=>e.hostDisconnected?.())}attributeChangedCallback(e,t,i){this._$AK(e,i)}_$ET(e,t){let i=this.constructor.elementProperties.get(e),r=this.constructor._$Eu(e,i);if(r!==void 0&&i.reflect===!0){let s=(i.converter?.toAttribute!==void 0?i.converter:M).toAttribute(t,i.type);this._$Em=e,s==null?this.removeAttribute(r):this.setAttribute(r,s),this._$Em=null}}_$AK(e,t){let i=this.constructor,r=i._$Eh.get(e);if(r!==void 0&&this._$Em!==r){let s=i.getPropertyOptions(r),o=typeof s.converter=="function"?{fromAttribute:s.converter}:s.converter?.fromAttribute!==void 0?s.converter:M;this._$Em=r;let n=o.fromAttribute(t,s.type);this[r]=n??this._$Ej?.get(r)??n,this._$Em=null}}requestUpdate(e,t,i,r=!1,s){if(e!==void 0){let o=this.constructor;if(r===!1&&(s=this[e]),i??=o.getPropertyOptions(e),!((i.hasChanged??j)(s,t)||i.useDefault&&i.reflect&&s===this._$Ej?.get(e)&&!this.hasAttribute(o._$Eu(e,i))))return;this.C(e,t,i)}this.isUpdatePending===!1&&(this._$ES=this._$EP())}C(e,t,{useDefault:i,reflect:r,wrapped:s},o){i&&!(this._$Ej??=new Map).has(e)&&(this._$Ej.set(e,o??t??this[e]),s!==!0||o!==void 0)||(this._$AL.has(e)||(this.hasUpdated||i||(t=void 0),this._$AL.set(e,t)),r===!0&&this._$Em!==e&&(this._$Eq??=new Set).add(e))}async _$EP(){this.isUpdatePending=!0;try{await this._$ES}catch(t){Promise.reject(t)}let e=this.scheduleUpdate();return e!=null&&await e,!this.isUpdatePending}scheduleUpdate(){return this.performUpdate()}performUpdate(){if(!this.isUpdatePending)return;if(!this.hasUpdated){if(this.renderRoot??=this.createRenderRoot(),this._$Ep){for(let[r,s]of this._$Ep)this[r]=s;this._$Ep=void 0}let i=this.constructor.elementProperties;if(i.size>0)for(let[r,s]of i){let{wrapped:o}=s,n=this[r];o!==!0||this._$AL.has(r)||n===void 0||this.C(r,void 0,s,n)}}let e=!1,t=this._$AL;try{e=this.shouldUpdate(t),e?(this.willUpdate(t),this._$EO?.forEach((i)=>i.hostUpdate?.()),this.update(t)):this._$EM()}catch(i){throw e=!1,this._$EM(),i}e&&this._$AE(t)}willUpdate(e){}_$AE(e){this._$EO?.forEach((t)=>t.hostUpdated?.()),this.hasUpdated||(this.hasUpdated=!0,this.firstUpdated(e)),this.updated(e)}_$EM(){this._$AL=new Map,this.isUpdatePending=!1}get updateComplete(){return this.getUpdateComplete()}getUpdateComplete(){return this._$ES}shouldUpdate(e){return!0}update(e){this._$Eq&&=this._$Eq.forEach((t)=>this._$ET(t,this[t])),this._$EM()}updated(e){}firstUpdated(e){}}v.elementStyles=[],v.shadowRootOptions={mode:"open"},v[z("elementProperties")]=new Map,v[z("finalized")]=new Map,Ne?.({ReactiveElement:v}),(L.reactiveElementVersions??=[]).push("2.1.2");var Z=globalThis,ne=(e)=>e,B=Z.trustedTypes,ae=B?B.createPolicy("lit-html",{createHTML:(e)=>e}):void 0;var g=`lit$${Math.random().toFixed(9).slice(2)}$`,ue="?"+g,Le=`<${ue}>`,w=document,T=()=>w.createComment(""),C=(e)=>e===null||typeof e!="object"&&typeof e!="function",Y=Array.isArray,je=(e)=>Y(e)||typeof e?.[Symbol.iterator]=="function";var P=/<(?:(!--|\/[^a-zA-Z])|(\/?[a-zA-Z][^>\s]*)|(\/?$))/g,le=/-->/g,de=/>/g,x=RegExp(`>|[ 	
+\f\r](?:([^\\s"'>=/]+)([ 	
+\f\r]*=[ 	
+\f\r]*(?:[^ 	
+\f\r"'\`<>=]|("|')|))|$)`,"g"),ce=/'/g,pe=/"/g,me=/^(?:script|style|textarea|title)$/i,J=(e)=>(t,...i)=>({_$litType$:e,strings:t,values:i}),a=J(1),et=J(2),tt=J(3),S=Symbol.for("lit-noChange"),h=Symbol.for("lit-nothing"),he=new WeakMap,k=w.createTreeWalker(w,129);function _e(e,t){if(!Y(e)||!e.hasOwnProperty("raw"))throw Error("invalid template strings array");return ae!==void 0?ae.createHTML(t):t}var Be=(e,t)=>{let i=e.length-1,r=[],s,o=t===2?"<svg>":t===3?"<math>":"",n=P;for(let l=0;l<i;l++){let c=e[l],O,d,m=-1,_=0;for(;_<c.length&&(n.lastIndex=_,d=n.exec(c),d!==null);)_=n.lastIndex,n===P?d[1]==="!--"?n=le:d[1]!==void 0?n=de:d[2]!==void 0?(me.test(d[2])&&(s=RegExp("</"+d[2],"g")),n=x):d[3]!==void 0&&(n=x):n===x?d[0]===">"?(n=s??P,m=-1):d[1]===void 0?m=-2:(m=n.lastIndex-d[2].length,O=d[1],n=d[3]===void 0?x:d[3]==='"'?pe:ce):n===pe||n===ce?n=x:n===le||n===de?n=P:(n=x,s=void 0);let y=n===x&&e[l+1].startsWith("/>")?" ":"";o+=n===P?c+Le:m>=0?(r.push(O),c.slice(0,m)+"$lit$"+c.slice(m)+g+y):c+g+(m===-2?l:y)}return[_e(e,o+(e[i]||"<?>")+(t===2?"</svg>":t===3?"</math>":"")),r]};class H{constructor({strings:e,_$litType$:t},i){let r;this.parts=[];let s=0,o=0,n=e.length-1,l=this.parts,[c,O]=Be(e,t);if(this.el=H.createElement(c,i),k.currentNode=this.el.content,t===2||t===3){let d=this.el.content.firstChild;d.replaceWith(...d.childNodes)}for(;(r=k.nextNode())!==null&&l.length<n;){if(r.nodeType===1){if(r.hasAttributes())for(let d of r.getAttributeNames())if(d.endsWith("$lit$")){let m=O[o++],_=r.getAttribute(d).split(g),y=/([.?@])?(.*)/.exec(m);l.push({type:1,index:s,name:y[2],strings:_,ctor:y[1]==="."?ve:y[1]==="?"?ge:y[1]==="@"?be:I}),r.removeAttribute(d)}else d.startsWith(g)&&(l.push({type:6,index:s}),r.removeAttribute(d));if(me.test(r.tagName)){let d=r.textContent.split(g),m=d.length-1;if(m>0){r.textContent=B?B.emptyScript:"";for(let _=0;_<m;_++)r.append(d[_],T()),k.nextNode(),l.push({type:2,index:++s});r.append(d[m],T())}}}else if(r.nodeType===8)if(r.data===ue)l.push({type:2,index:s});else{let d=-1;for(;(d=r.data.indexOf(g,d+1))!==-1;)l.push({type:7,index:s}),d+=g.length-1}s++}}static createElement(e,t){let i=w.createElement("template");return i.innerHTML=e,i}}function E(e,t,i=e,r){if(t===S)return t;let s=r!==void 0?i._$Co?.[r]:i._$Cl,o=C(t)?void 0:t._$litDirective$;return s?.constructor!==o&&(s?._$AO?.(!1),o===void 0?s=void 0:(s=new o(e),s._$AT(e,i,r)),r!==void 0?(i._$Co??=[])[r]=s:i._$Cl=s),s!==void 0&&(t=E(e,s._$AS(e,t.values),s,r)),t}class fe{constructor(e,t){this._$AV=[],this._$AN=void 0,this._$AD=e,this._$AM=t}get parentNode(){return this._$AM.parentNode}get _$AU(){return this._$AM._$AU}u(e){let{el:{content:t},parts:i}=this._$AD,r=(e?.creationScope??w).importNode(t,!0);k.currentNode=r;let s=k.nextNode(),o=0,n=0,l=i[0];for(;l!==void 0;){if(o===l.index){let c;l.type===2?c=new U(s,s.nextSibling,this,e):l.type===1?c=new l.ctor(s,l.name,l.strings,this,e):l.type===6&&(c=new ye(s,this,e)),this._$AV.push(c),l=i[++n]}o!==l?.index&&(s=k.nextNode(),o++)}return k.currentNode=w,r}p(e){let t=0;for(let i of this._$AV)i!==void 0&&(i.strings!==void 0?(i._$AI(e,i,t),t+=i.strings.length-2):i._$AI(e[t])),t++}}class U{get _$AU(){return this._$AM?._$AU??this._$Cv}constructor(e,t,i,r){this.type=2,this._$AH=h,this._$AN=void 0,this._$AA=e,this._$AB=t,this._$AM=i,this.options=r,this._$Cv=r?.isConnected??!0}get parentNode(){let e=this._$AA.parentNode,t=this._$AM;return t!==void 0&&e?.nodeType===11&&(e=t.parentNode),e}get startNode(){return this._$AA}get endNode(){return this._$AB}_$AI(e,t=this){e=E(this,e,t),C(e)?e===h||e==null||e===""?(this._$AH!==h&&this._$AR(),this._$AH=h):e!==this._$AH&&e!==S&&this._(e):e._$litType$!==void 0?this.$(e):e.nodeType!==void 0?this.T(e):je(e)?this.k(e):this._(e)}O(e){return this._$AA.parentNode.insertBefore(e,this._$AB)}T(e){this._$AH!==e&&(this._$AR(),this._$AH=this.O(e))}_(e){this._$AH!==h&&C(this._$AH)?this._$AA.nextSibling.data=e:this.T(w.createTextNode(e)),this._$AH=e}$(e){let{values:t,_$litType$:i}=e,r=typeof i=="number"?this._$AC(e):(i.el===void 0&&(i.el=H.createElement(_e(i.h,i.h[0]),this.options)),i);if(this._$AH?._$AD===r)this._$AH.p(t);else{let s=new fe(r,this),o=s.u(this.options);s.p(t),this.T(o),this._$AH=s}}_$AC(e){let t=he.get(e.strings);return t===void 0&&he.set(e.strings,t=new H(e)),t}k(e){Y(this._$AH)||(this._$AH=[],this._$AR());let t=this._$AH,i,r=0;for(let s of e)r===t.length?t.push(i=new U(this.O(T()),this.O(T()),this,this.options)):i=t[r],i._$AI(s),r++;r<t.length&&(this._$AR(i&&i._$AB.nextSibling,r),t.length=r)}_$AR(e=this._$AA.nextSibling,t){for(this._$AP?.(!1,!0,t);e!==this._$AB;){let i=ne(e).nextSibling;ne(e).remove(),e=i}}setConnected(e){this._$AM===void 0&&(this._$Cv=e,this._$AP?.(e))}}class I{get tagName(){return this.element.tagName}get _$AU(){return this._$AM._$AU}constructor(e,t,i,r,s){this.type=1,this._$AH=h,this._$AN=void 0,this.element=e,this.name=t,this._$AM=r,this.options=s,i.length>2||i[0]!==""||i[1]!==""?(this._$AH=Array(i.length-1).fill(new String),this.strings=i):this._$AH=h}_$AI(e,t=this,i,r){let s=this.strings,o=!1;if(s===void 0)e=E(this,e,t,0),o=!C(e)||e!==this._$AH&&e!==S,o&&(this._$AH=e);else{let n=e,l,c;for(e=s[0],l=0;l<s.length-1;l++)c=E(this,n[i+l],t,l),c===S&&(c=this._$AH[l]),o||=!C(c)||c!==this._$AH[l],c===h?e=h:e!==h&&(e+=(c??"")+s[l+1]),this._$AH[l]=c}o&&!r&&this.j(e)}j(e){e===h?this.element.removeAttribute(this.name):this.element.setAttribute(this.name,e??"")}}class ve extends I{constructor(){super(...arguments),this.type=3}j(e){this.element[this.name]=e===h?void 0:e}}class ge extends I{constructor(){super(...arguments),this.type=4}j(e){this.element.toggleAttribute(this.name,!!e&&e!==h)}}class be extends I{constructor(e,t,i,r,s){super(e,t,i,r,s),this.type=5}_$AI(e,t=this){if((e=E(this,e,t,0)??h)===S)return;let i=this._$AH,r=e===h&&i!==h||e.capture!==i.capture||e.once!==i.once||e.passive!==i.passive,s=e!==h&&(i===h||r);r&&this.element.removeEventListener(this.name,this,i),s&&this.element.addEventListener(this.name,this,e),this._$AH=e}handleEvent(e){typeof this._$AH=="function"?this._$AH.call(this.options?.host??this.element,e):this._$AH.handleEvent(e)}}class ye{constructor(e,t,i){this.element=e,this.type=6,this._$AN=void 0,this._$AM=t,this.options=i}get _$AU(){return this._$AM._$AU}_$AI(e){E(this,e)}}var We=Z.litHtmlPolyfillSupport;We?.(H,U),(Z.litHtmlVersions??=[]).push("3.3.2");var xe=(e,t,i)=>{let r=i?.renderBefore??t,s=r._$litPart$;if(s===void 0){let o=i?.renderBefore??null;r._$litPart$=s=new U(t.insertBefore(T(),o),o,void 0,i??{})}return s._$AI(e),s};var Q=globalThis;class f extends v{constructor(){super(...arguments),this.renderOptions={host:this},this._$Do=void 0}createRenderRoot(){let e=super.createRenderRoot();return this.renderOptions.renderBefore??=e.firstChild,e}update(e){let t=this.render();this.hasUpdated||(this.renderOptions.isConnected=this.isConnected),super.update(e),this._$Do=xe(t,this.renderRoot,this.renderOptions)}connectedCallback(){super.connectedCallback(),this._$Do?.setConnected(!0)}disconnectedCallback(){super.disconnectedCallback(),this._$Do?.setConnected(!1)}render(){return S}}f._$litElement$=!0,f.finalized=!0,Q.litElementHydrateSupport?.({LitElement:f});var qe=Q.litElementPolyfillSupport;qe?.({LitElement:f});(Q.litElementVersions??=[]).push("4.2.2");var W=(e)=>(t,i)=>{i!==void 0?i.addInitializer(()=>{customElements.define(e,t)}):customElements.define(e,t)};var Ke={attribute:!0,type:String,converter:M,reflect:!1,hasChanged:j},Ge=(e=Ke,t,i)=>{let{kind:r,metadata:s}=i,o=globalThis.litPropertyMetadata.get(s);if(o===void 0&&globalThis.litPropertyMetadata.set(s,o=new Map),r==="setter"&&((e=Object.create(e)).wrapped=!0),o.set(i.name,e),r==="accessor"){let{name:n}=i;return{set(l){let c=t.get.call(this);t.set.call(this,l),this.requestUpdate(n,c,e,!0,l)},init(l){return l!==void 0&&this.C(n,void 0,e,l),l}}}if(r==="setter"){let{name:n}=i;return function(l){let c=this[n];t.call(this,l),this.requestUpdate(n,c,e,!0,l)}}throw Error("Unsupported decorator location: "+r)};function b(e){return(t,i)=>typeof i=="object"?Ge(e,t,i):((r,s,o)=>{let n=s.hasOwnProperty(o);return s.constructor.createProperty(o,r),n?Object.getOwnPropertyDescriptor(s,o):void 0})(e,t,i)}function u(e){return b({...e,state:!0,attribute:!1})}var A={tablet:{icon:"\uD83D\uDC8A",label:"Tablette",units:["tablet","mg","g"]},capsule:{icon:"\uD83D\uDC8A",label:"Kapsel",units:["capsule","mg","g"]},injection:{icon:"\uD83D\uDC89",label:"Spritze",units:["ml","IU","mg","unit"]},nasal_spray:{icon:"\uD83D\uDC43",label:"Nasenspray",units:["spray","puff"]},inhaler:{icon:"\uD83E\uDEC1",label:"Inhalator",units:["puff","mcg"]},drops:{icon:"\uD83D\uDCA7",label:"Tropfen",units:["drop","ml"]},cream:{icon:"\uD83E\uDDF4",label:"Creme/Salbe",units:["application","g"]},patch:{icon:"\uD83E\uDE79",label:"Pflaster",units:["patch"]},suppository:{icon:"\uD83D\uDC8A",label:"Zäpfchen",units:["suppository"]},liquid:{icon:"\uD83E\uDDEA",label:"Saft/Lösung",units:["ml","teaspoon","tablespoon"]},powder:{icon:"\uD83D\uDCE6",label:"Pulver",units:["sachet","scoop","g"]},other:{icon:"\uD83D\uDCE6",label:"Sonstige",units:["unit","dose","application"]}},$e={times_per_day:{icon:"\uD83D\uDD50",label:"Täglich zu festen Zeiten",description:"z.B. 8:00, 12:00, 18:00"},interval:{icon:"⏱️",label:"Alle X Stunden",description:"z.B. alle 8 Stunden"},weekly:{icon:"\uD83D\uDCC5",label:"Bestimmte Wochentage",description:"z.B. Mo, Mi, Fr"},as_needed:{icon:"\uD83C\uDD98",label:"Bei Bedarf (PRN)",description:"Nur wenn nötig"},depot:{icon:"\uD83D\uDC89",label:"Depot-Injektion",description:"Termin-basiert (z.B. monatlich)"}},ke=[{value:0,short:"Mo",long:"Montag"},{value:1,short:"Di",long:"Dienstag"},{value:2,short:"Mi",long:"Mittwoch"},{value:3,short:"Do",long:"Donnerstag"},{value:4,short:"Fr",long:"Freitag"},{value:5,short:"Sa",long:"Samstag"},{value:6,short:"So",long:"Sonntag"}],we=[{label:"¼",numerator:1,denominator:4},{label:"½",numerator:1,denominator:2},{label:"1",numerator:1,denominator:1},{label:"1½",numerator:3,denominator:2},{label:"2",numerator:2,denominator:1}];class X extends f{constructor(){super(...arguments);this._step=1;this._saving=!1;this._error=null;this._formData={form:"tablet",display_name:"",dose_numerator:1,dose_denominator:1,dose_unit:"tablet",schedule_kind:"times_per_day",times:["08:00"],weekdays:[0,1,2,3,4],interval_minutes:480,track_inventory:!1,current_quantity:30,refill_threshold:7,grace_minutes:30,snooze_minutes:10}}static styles=D`
     :host {
       display: block;
     }
@@ -637,245 +391,257 @@
       color: var(--secondary-text-color);
       margin: 0 0 24px;
     }
-  `,bt([ut({attribute:!1})],yt.prototype,"hass",void 0),bt([ut({type:String})],yt.prototype,"entryId",void 0),bt([mt()],yt.prototype,"_step",void 0),bt([mt()],yt.prototype,"_saving",void 0),bt([mt()],yt.prototype,"_error",void 0),bt([mt()],yt.prototype,"_formData",void 0),yt=bt([ct("add-medication-wizard")],yt);var xt=function(t,e,i,r){var s,o=arguments.length,a=o<3?e:null===r?r=Object.getOwnPropertyDescriptor(e,i):r;if("object"==typeof Reflect&&"function"==typeof Reflect.decorate)a=Reflect.decorate(t,e,i,r);else for(var n=t.length-1;n>=0;n--)(s=t[n])&&(a=(o<3?s(a):o>3?s(e,i,a):s(e,i))||a);return o>3&&a&&Object.defineProperty(e,i,a),a};let $t=class extends lt{constructor(){super(...arguments),this.narrow=!1,this._medications=[],this._loading=!0,this._error=null,this._activeTab="today",this._showWizard=!1,this._entryId=null,this._profiles=[],this._currentProfile=null}connectedCallback(){super.connectedCallback(),this._loadData(),this._refreshInterval=setInterval(()=>this._loadData(),3e4)}disconnectedCallback(){super.disconnectedCallback(),this._refreshInterval&&clearInterval(this._refreshInterval)}async _loadData(){try{this._loading=0===this._medications.length&&0===this._profiles.length,this._error=null,await this._loadProfiles(),!this._currentProfile&&this._profiles.length>0&&(this._currentProfile=this._profiles[0],this._entryId=this._currentProfile.entry_id);const t=Object.keys(this.hass.states).filter(t=>{if(!t.startsWith("sensor.")||!t.endsWith("_status"))return!1;const e=this.hass.states[t];return void 0!==e?.attributes?.medication_id});this._medications=t.map(t=>{const e=this.hass.states[t],i=t.replace("sensor.","").replace("_status",""),r=this.hass.states[`sensor.${i}_next_due`],s=this.hass.states[`sensor.${i}_next_dose`];!this._entryId&&e.attributes.entry_id&&(this._entryId=e.attributes.entry_id);let o=null;r?.state&&"unknown"!==r.state&&(o=new Date(r.state));const a=e.attributes.form||"tablet",n=_t[a]||_t.tablet;return{entity_id:t,medication_id:e.attributes.medication_id||"",entry_id:e.attributes.entry_id||"",name:e.attributes.friendly_name?.replace(" Status","")||e.attributes.display_name||i,status:e.state,next_due:o,next_dose:s?.state||e.attributes.next_dose||"",form:a,icon:n.icon,inventory:e.attributes.inventory?{current:e.attributes.inventory.current_quantity||0,threshold:e.attributes.inventory.refill_threshold||7,low:(e.attributes.inventory.current_quantity||0)<=(e.attributes.inventory.refill_threshold||7)}:void 0,attributes:e.attributes}}).filter(t=>!this._currentProfile||t.entry_id===this._currentProfile.entry_id),this._loading=!1}catch(t){this._error=`Failed to load medications: ${t}`,this._loading=!1}}async _loadProfiles(){try{const t=await this.hass.callWS({type:"config_entries/get"});this._profiles=t.filter(t=>"med_expert"===t.domain).map(t=>({entry_id:t.entry_id,title:t.title,state:t.state}))}catch(t){console.error("Failed to load profiles:",t),this._profiles=[]}}_selectProfile(t){this._currentProfile=t,this._entryId=t.entry_id,this._loadData()}get _dueMedications(){return this._medications.filter(t=>"due"===t.status||"missed"===t.status||"snoozed"===t.status)}get _upcomingMedications(){const t=new Date,e=new Date(t);return e.setHours(23,59,59,999),this._medications.filter(t=>!("ok"!==t.status||!t.next_due)&&t.next_due<=e).sort((t,e)=>(t.next_due?.getTime()||0)-(e.next_due?.getTime()||0))}get _completedToday(){return[]}get _stats(){return{total:this._medications.length,due:this._dueMedications.length,upcoming:this._upcomingMedications.length}}async _takeMedication(t){try{await this.hass.callService("med_expert","take",{medication_id:t.medication_id,entry_id:t.entry_id}),await this._loadData()}catch(t){this._error=`Failed to take medication: ${t}`}}async _snoozeMedication(t){try{await this.hass.callService("med_expert","snooze",{medication_id:t.medication_id,entry_id:t.entry_id}),await this._loadData()}catch(t){this._error=`Failed to snooze medication: ${t}`}}async _skipMedication(t){try{await this.hass.callService("med_expert","skip",{medication_id:t.medication_id,entry_id:t.entry_id}),await this._loadData()}catch(t){this._error=`Failed to skip medication: ${t}`}}_formatTime(t){return t?t.toLocaleTimeString("de-DE",{hour:"2-digit",minute:"2-digit"}):"--:--"}_formatTimeAgo(t){if(!t)return{value:"--:--",label:"",overdue:!1};const e=new Date,i=t.getTime()-e.getTime(),r=Math.abs(i),s=i<0;return r<6e4?{value:"Jetzt",label:"",overdue:s}:r<36e5?{value:`${s?"-":""}${Math.round(r/6e4)}`,label:"Min",overdue:s}:{value:this._formatTime(t),label:s?"Überfällig":"Uhr",overdue:s}}render(){return this._loading?q`
-        <div class="loading">
-          <div class="loading-spinner">💊</div>
-          <p>Medikamente laden...</p>
+  `;render(){return a`
+      <div class="wizard-container">
+        <div class="wizard-header">
+          <h2>Medikament hinzufügen</h2>
+          <span class="step-indicator">${this._step}/4</span>
         </div>
-      `:q`
-      <div class="app-container">
-        ${this._renderHeader()}
-        ${this._renderTabs()}
-        
-        <div class="content">
-          ${this._error?q`<div class="error">${this._error}</div>`:""}
+
+        <div class="wizard-content">
+          ${this._error?a`<div class="error">${this._error}</div>`:""}
           
-          ${"today"===this._activeTab?this._renderTodayTab():""}
-          ${"calendar"===this._activeTab?this._renderCalendarTab():""}
-          ${"profile"===this._activeTab?this._renderProfileTab():""}
-          ${"meds"===this._activeTab?this._renderMedsTab():""}
+          ${this._step===1?this._renderStep1():""}
+          ${this._step===2?this._renderStep2():""}
+          ${this._step===3?this._renderStep3():""}
+          ${this._step===4?this._renderStep4():""}
+          ${this._step===5?this._renderSuccess():""}
         </div>
-      </div>
 
-      ${this._showWizard?q`
-        <div class="wizard-overlay" @click=${t=>t.target===t.currentTarget&&this._closeWizard()}>
-          <add-medication-wizard
-            .hass=${this.hass}
-            .entryId=${this._entryId||""}
-            @close=${this._closeWizard}
-          ></add-medication-wizard>
-        </div>
-      `:""}
-    `}_renderHeader(){const t=this._stats,e=this._getGreeting(),i=this._currentProfile?.title||"Kein Profil";return q`
-      <div class="header">
-        <div class="header-top">
-          <div>
-            <h1>${e}</h1>
-            <div class="header-subtitle">
-              ${this._profiles.length>1?q`
-                <select 
-                  class="profile-select"
-                  .value=${this._currentProfile?.entry_id||""}
-                  @change=${t=>{const e=t.target,i=this._profiles.find(t=>t.entry_id===e.value);i&&this._selectProfile(i)}}
-                >
-                  ${this._profiles.map(t=>q`
-                    <option value=${t.entry_id} ?selected=${t.entry_id===this._currentProfile?.entry_id}>
-                      ${t.title}
-                    </option>
-                  `)}
-                </select>
-                <span style="margin: 0 6px;">•</span>
-              `:1===this._profiles.length?q`
-                <span class="profile-badge">👤 ${i}</span>
-                <span style="margin: 0 6px;">•</span>
-              `:""}
-              ${t.due>0?`${t.due} Medikament${t.due>1?"e":""} jetzt fällig`:t.upcoming>0?`${t.upcoming} noch heute`:"Alles erledigt 🎉"}
-            </div>
-          </div>
-          <button class="add-btn" @click=${this._openWizard} title="Medikament hinzufügen">
-            ➕
-          </button>
-        </div>
-        
-        <div class="stats-bar">
-          <div class="stat">
-            <div class="stat-value">${t.due}</div>
-            <div class="stat-label">Fällig</div>
-          </div>
-          <div class="stat">
-            <div class="stat-value">${t.upcoming}</div>
-            <div class="stat-label">Heute noch</div>
-          </div>
-          <div class="stat">
-            <div class="stat-value">${t.total}</div>
-            <div class="stat-label">Gesamt</div>
+        ${this._step<5?a`
+          <div class="wizard-footer">
+            ${this._step>1?a`<button class="btn btn-secondary" @click=${this._prevStep}>← Zurück</button>`:a`<button class="btn btn-text" @click=${this._close}>Abbrechen</button>`}
+            
+            ${this._step<4?a`<button class="btn btn-primary" @click=${this._nextStep} ?disabled=${!this._canProceed()}>Weiter →</button>`:a`<button class="btn btn-primary" @click=${this._save} ?disabled=${this._saving}>
+                  ${this._saving?"Speichern...":"\uD83D\uDC8A Medikament speichern"}
+                </button>`}
           </div>
-        </div>
+        `:""}
       </div>
-    `}_getGreeting(){const t=(new Date).getHours();return t<12?"☀️ Guten Morgen":t<18?"🌤️ Guten Tag":"🌙 Guten Abend"}_renderTabs(){return q`
-      <nav class="tab-nav">
-        ${[{id:"today",icon:"📅",label:"Heute"},{id:"calendar",icon:"🗓️",label:"Kalender"},{id:"profile",icon:"👤",label:"Profil"},{id:"meds",icon:"💊",label:"Meds"}].map(t=>q`
-          <button 
-            class="tab ${this._activeTab===t.id?"active":""}"
-            @click=${()=>this._activeTab=t.id}
+    `}_renderStep1(){let e=Object.entries(A);return a`
+      <div class="step-title">Was möchtest du hinzufügen?</div>
+      <div class="form-grid">
+        ${e.map(([t,i])=>a`
+          <div 
+            class="form-type-card ${this._formData.form===t?"selected":""}"
+            @click=${()=>this._selectForm(t)}
           >
-            <span class="tab-icon">${t.icon}</span>
-            ${t.label}
-          </button>
-        `)}
-      </nav>
-    `}_renderTodayTab(){if(0===this._medications.length)return this._renderEmptyState();const t=this._dueMedications,e=this._upcomingMedications;return q`
-      ${t.length>0?q`
-        <div class="section">
-          <div class="section-header">
-            <span class="section-title">🔴 Jetzt fällig</span>
-            <span class="section-badge">${t.length}</span>
+            <span class="form-type-icon">${i.icon}</span>
+            <span class="form-type-label">${i.label}</span>
           </div>
-          ${t.map(t=>this._renderMedCard(t,!0))}
-        </div>
-      `:""}
-
-      ${e.length>0?q`
-        <div class="section">
-          <div class="section-header">
-            <span class="section-title">⏳ Heute noch</span>
-          </div>
-          ${e.map(t=>this._renderMedCard(t,!1))}
-        </div>
-      `:""}
+        `)}
+      </div>
+    `}_renderStep2(){let e=A[this._formData.form];return a`
+      <div class="step-title">${e.icon} ${e.label} - Details</div>
+      
+      <div class="field">
+        <label>Name *</label>
+        <input 
+          type="text" 
+          placeholder="z.B. Metformin"
+          .value=${this._formData.display_name}
+          @input=${(t)=>this._updateField("display_name",t.target.value)}
+        />
+      </div>
 
-      ${0===t.length&&0===e.length?q`
-        <div class="empty-state">
-          <div class="empty-icon">✅</div>
-          <div class="empty-title">Alles erledigt!</div>
-          <div class="empty-text">Keine Medikamente mehr für heute.</div>
-        </div>
-      `:""}
-    `}_renderMedCard(t,e){const i=this._formatTimeAgo(t.next_due),r="missed"===t.status,s="due"===t.status||"snoozed"===t.status;return q`
-      <div class="med-card ${r?"urgent":s?"due":""}">
-        <div class="med-icon">${t.icon}</div>
-        <div class="med-info">
-          <div class="med-name">${t.name}</div>
-          <div class="med-dose">${t.next_dose}</div>
-          ${t.inventory?.low?q`
-            <div class="inventory-warning">⚠️ Nur noch ${t.inventory.current} übrig</div>
-          `:""}
+      <div class="field-row">
+        <div class="field">
+          <label>Stärke (optional)</label>
+          <input 
+            type="text" 
+            placeholder="z.B. 500"
+            .value=${this._formData.strength||""}
+            @input=${(t)=>this._updateField("strength",t.target.value)}
+          />
         </div>
-        <div class="med-time">
-          <div class="med-time-value ${i.overdue?"med-time-overdue":""}">${i.value}</div>
-          <div class="med-time-label">${i.label}</div>
+        <div class="field">
+          <label>Einheit</label>
+          <select 
+            .value=${this._formData.strength_unit||"mg"}
+            @change=${(t)=>this._updateField("strength_unit",t.target.value)}
+          >
+            <option value="mg">mg</option>
+            <option value="g">g</option>
+            <option value="mcg">mcg</option>
+            <option value="ml">ml</option>
+            <option value="IU">IU</option>
+          </select>
         </div>
       </div>
-      
-      ${e?q`
-        <div class="med-actions" style="margin-top: -4px; margin-bottom: 12px;">
-          <button class="action-btn take" @click=${()=>this._takeMedication(t)}>
-            ✓ Genommen
-          </button>
-          <button class="action-btn snooze" @click=${()=>this._snoozeMedication(t)}>
-            ⏰ Später
-          </button>
-          <button class="action-btn skip" @click=${()=>this._skipMedication(t)}>
-            ✕
-          </button>
+
+      <div class="field">
+        <label>Dosis pro Einnahme</label>
+        <div class="dose-presets">
+          ${we.map((t)=>a`
+            <div 
+              class="dose-preset ${this._formData.dose_numerator===t.numerator&&this._formData.dose_denominator===t.denominator?"selected":""}"
+              @click=${()=>this._selectDose(t.numerator,t.denominator)}
+            >
+              ${t.label}
+            </div>
+          `)}
         </div>
-      `:""}
-    `}_renderEmptyState(){return q`
-      <div class="empty-state">
-        <div class="empty-icon">💊</div>
-        <div class="empty-title">Keine Medikamente</div>
-        <div class="empty-text">Füge dein erstes Medikament hinzu, um loszulegen.</div>
-        <button class="empty-btn" @click=${this._openWizard}>
-          ➕ Medikament hinzufügen
-        </button>
       </div>
-    `}_renderCalendarTab(){return q`
-      <div class="calendar-placeholder">
-        <div style="font-size: 48px; margin-bottom: 16px;">🗓️</div>
-        <p>Kalenderansicht kommt bald...</p>
+
+      <div class="field">
+        <label>Einheit</label>
+        <select 
+          .value=${this._formData.dose_unit}
+          @change=${(t)=>this._updateField("dose_unit",t.target.value)}
+        >
+          ${e.units.map((t)=>a`
+            <option value=${t}>${t}</option>
+          `)}
+        </select>
       </div>
-    `}_renderProfileTab(){return q`
-      <div class="section">
-        <div class="section-header">
-          <span class="section-title">Aktuelles Profil</span>
+
+      <div class="field">
+        <label>Notizen (optional)</label>
+        <input 
+          type="text" 
+          placeholder="z.B. Mit dem Essen einnehmen"
+          .value=${this._formData.notes||""}
+          @input=${(t)=>this._updateField("notes",t.target.value)}
+        />
+      </div>
+    `}_renderStep3(){return a`
+      <div class="step-title">Wann nimmst du ${this._formData.display_name||"dieses Medikament"}?</div>
+      
+      ${Object.entries($e).map(([e,t])=>a`
+        <div 
+          class="schedule-option ${this._formData.schedule_kind===e?"selected":""}"
+          @click=${()=>this._updateField("schedule_kind",e)}
+        >
+          <span class="schedule-option-icon">${t.icon}</span>
+          <div class="schedule-option-content">
+            <div class="schedule-option-label">${t.label}</div>
+            <div class="schedule-option-desc">${t.description}</div>
+          </div>
         </div>
-        
-        ${this._currentProfile?q`
-          <div class="profile-card">
-            <div class="profile-avatar">👤</div>
-            <div class="profile-info">
-              <div class="profile-name">${this._currentProfile.title}</div>
-              <div class="profile-status">
-                ${"loaded"===this._currentProfile.state?"🟢 Aktiv":"🔴 "+this._currentProfile.state}
-              </div>
+      `)}
+
+      ${this._formData.schedule_kind==="times_per_day"?this._renderTimesInput():""}
+      ${this._formData.schedule_kind==="weekly"?this._renderWeeklyInput():""}
+      ${this._formData.schedule_kind==="interval"?this._renderIntervalInput():""}
+    `}_renderTimesInput(){return a`
+      <div class="field" style="margin-top: 16px;">
+        <label>Um welche Uhrzeit(en)?</label>
+        <div class="time-inputs">
+          ${(this._formData.times||[]).map((e,t)=>a`
+            <div class="time-input-wrapper">
+              <input 
+                type="time" 
+                class="time-input"
+                .value=${e}
+                @change=${(i)=>this._updateTime(t,i.target.value)}
+              />
+              ${(this._formData.times?.length||0)>1?a`
+                <button class="remove-time" @click=${()=>this._removeTime(t)}>×</button>
+              `:""}
             </div>
-          </div>
-          
-          <div class="profile-stats">
-            <div class="profile-stat">
-              <span class="stat-icon">💊</span>
-              <span>${this._medications.length} Medikamente</span>
+          `)}
+          <button class="add-time-btn" @click=${this._addTime}>+ Zeit</button>
+        </div>
+      </div>
+    `}_renderWeeklyInput(){return a`
+      <div class="field" style="margin-top: 16px;">
+        <label>An welchen Tagen?</label>
+        <div class="weekday-toggles">
+          ${ke.map((e)=>a`
+            <div 
+              class="weekday-toggle ${(this._formData.weekdays||[]).includes(e.value)?"selected":""}"
+              @click=${()=>this._toggleWeekday(e.value)}
+            >
+              ${e.short}
             </div>
-          </div>
-        `:q`
-          <div class="no-profile">
-            <p>Kein Profil ausgewählt</p>
-          </div>
-        `}
+          `)}
+        </div>
+      </div>
+      ${this._renderTimesInput()}
+    `}_renderIntervalInput(){return a`
+      <div class="field" style="margin-top: 16px;">
+        <label>Alle wie viele Stunden?</label>
+        <div class="dose-presets">
+          ${[4,6,8,12,24].map((e)=>a`
+            <div 
+              class="dose-preset ${this._formData.interval_minutes===e*60?"selected":""}"
+              @click=${()=>this._updateField("interval_minutes",e*60)}
+            >
+              ${e}h
+            </div>
+          `)}
+        </div>
       </div>
+    `}_renderStep4(){return a`
+      <div class="step-title">Bestand & Erinnerungen</div>
       
-      ${this._profiles.length>0?q`
-        <div class="section">
-          <div class="section-header">
-            <span class="section-title">Alle Profile (${this._profiles.length})</span>
+      <label class="checkbox-field" @click=${()=>this._updateField("track_inventory",!this._formData.track_inventory)}>
+        <input type="checkbox" .checked=${this._formData.track_inventory} />
+        <span>Bestand verwalten</span>
+      </label>
+
+      ${this._formData.track_inventory?a`
+        <div class="field-row">
+          <div class="field">
+            <label>Aktueller Bestand</label>
+            <input 
+              type="number" 
+              min="0"
+              .value=${String(this._formData.current_quantity||0)}
+              @input=${(e)=>this._updateField("current_quantity",parseInt(e.target.value)||0)}
+            />
           </div>
-          
-          ${this._profiles.map(t=>q`
+          <div class="field">
+            <label>Warnen unter</label>
+            <input 
+              type="number" 
+              min="1"
+              .value=${String(this._formData.refill_threshold||7)}
+              @input=${(e)=>this._updateField("refill_threshold",parseInt(e.target.value)||7)}
+            />
+          </div>
+        </div>
+      `:""}
+
+      <div class="field">
+        <label>Gnadenfrist (Minuten)</label>
+        <div class="dose-presets">
+          ${[10,15,30,60].map((e)=>a`
             <div 
-              class="profile-list-item ${t.entry_id===this._currentProfile?.entry_id?"active":""}"
-              @click=${()=>this._selectProfile(t)}
+              class="dose-preset ${this._formData.grace_minutes===e?"selected":""}"
+              @click=${()=>this._updateField("grace_minutes",e)}
             >
-              <div class="profile-avatar-small">👤</div>
-              <div class="profile-item-info">
-                <div class="profile-item-name">${t.title}</div>
-                <div class="profile-item-status">
-                  ${"loaded"===t.state?"Aktiv":t.state}
-                </div>
-              </div>
-              ${t.entry_id===this._currentProfile?.entry_id?q`
-                <span class="check-mark">✓</span>
-              `:""}
+              ${e} min
             </div>
           `)}
         </div>
-      `:""}
-      
-      <div class="section">
-        <button class="profile-action-btn" @click=${this._openAddProfile}>
-          ➕ Neues Profil erstellen
-        </button>
+        <small style="color: var(--secondary-text-color); font-size: 11px; margin-top: 4px; display: block;">
+          Zeit nach Fälligkeit bevor als "verpasst" markiert
+        </small>
       </div>
-    `}_openAddProfile(){window.location.href="/config/integrations/integration/med_expert"}_renderMedsTab(){return 0===this._medications.length?this._renderEmptyState():q`
-      <div class="section">
-        <div class="section-header">
-          <span class="section-title">Alle Medikamente</span>
-        </div>
-        ${this._medications.map(t=>q`
-          <div class="meds-list-item">
-            <div class="med-icon">${t.icon}</div>
-            <div class="med-info">
-              <div class="med-name">${t.name}</div>
-              <div class="med-dose">${t.next_dose}</div>
-              ${t.inventory?q`
-                <div style="font-size: 11px; color: var(--secondary-text-color);">
-                  📦 ${t.inventory.current} auf Lager
-                </div>
-              `:""}
+
+      <div class="field">
+        <label>Snooze-Dauer (Minuten)</label>
+        <div class="dose-presets">
+          ${[5,10,15,30].map((e)=>a`
+            <div 
+              class="dose-preset ${this._formData.snooze_minutes===e?"selected":""}"
+              @click=${()=>this._updateField("snooze_minutes",e)}
+            >
+              ${e} min
             </div>
-          </div>
-        `)}
+          `)}
+        </div>
+      </div>
+    `}_renderSuccess(){return a`
+      <div class="success-message">
+        <div class="success-icon">✅</div>
+        <h3>${this._formData.display_name} hinzugefügt!</h3>
+        <p>Das Medikament wurde erfolgreich angelegt.</p>
+        <button class="btn btn-primary" @click=${this._addAnother}>+ Weiteres hinzufügen</button>
+        <button class="btn btn-text" @click=${this._close}>Fertig</button>
       </div>
-    `}async _openWizard(){if(!this._entryId&&this._medications.length>0&&(this._entryId=this._medications[0].entry_id),!this._entryId){const t=Object.keys(this.hass.states).filter(t=>t.includes("med_expert")).map(t=>this.hass.states[t]?.attributes?.entry_id).filter(Boolean);t.length>0&&(this._entryId=t[0])}if(!this._entryId)try{const t=(await this.hass.callWS({type:"config_entries/get"})).find(t=>"med_expert"===t.domain);t&&(this._entryId=t.entry_id)}catch(t){console.error("Failed to fetch config entries:",t)}this._entryId?this._showWizard=!0:this._error="Kein Med Expert Profil gefunden. Bitte erstelle zuerst ein Profil in den Einstellungen."}_closeWizard(){this._showWizard=!1,setTimeout(()=>this._loadData(),500)}};$t.styles=o`
+    `}_selectForm(e){let t=A[e];this._formData={...this._formData,form:e,dose_unit:t.units[0]},this.requestUpdate()}_selectDose(e,t){this._formData={...this._formData,dose_numerator:e,dose_denominator:t},this.requestUpdate()}_updateField(e,t){this._formData={...this._formData,[e]:t},this.requestUpdate()}_addTime(){let e=[...this._formData.times||[],"12:00"];this._updateField("times",e)}_removeTime(e){let t=[...this._formData.times||[]];t.splice(e,1),this._updateField("times",t)}_updateTime(e,t){let i=[...this._formData.times||[]];i[e]=t,this._updateField("times",i)}_toggleWeekday(e){let t=[...this._formData.weekdays||[]],i=t.indexOf(e);if(i>=0)t.splice(i,1);else t.push(e),t.sort();this._updateField("weekdays",t)}_canProceed(){switch(this._step){case 1:return!!this._formData.form;case 2:return!!this._formData.display_name.trim();case 3:if(this._formData.schedule_kind==="as_needed")return!0;if(this._formData.schedule_kind==="times_per_day")return(this._formData.times?.length||0)>0;if(this._formData.schedule_kind==="weekly")return(this._formData.weekdays?.length||0)>0&&(this._formData.times?.length||0)>0;if(this._formData.schedule_kind==="interval")return(this._formData.interval_minutes||0)>0;return!0;default:return!0}}_nextStep(){if(this._canProceed())this._step++,this._error=null}_prevStep(){if(this._step>1)this._step--,this._error=null}async _save(){this._saving=!0,this._error=null;try{let e=this._formData.strength?`${this._formData.display_name} ${this._formData.strength}${this._formData.strength_unit||"mg"}`:this._formData.display_name,t={entry_id:this.entryId,display_name:e,schedule_kind:this._formData.schedule_kind,form:this._formData.form,default_dose:{numerator:this._formData.dose_numerator,denominator:this._formData.dose_denominator,unit:this._formData.dose_unit},policy:{grace_minutes:this._formData.grace_minutes,snooze_minutes:this._formData.snooze_minutes}};if(this._formData.schedule_kind==="times_per_day"||this._formData.schedule_kind==="weekly")t.times=this._formData.times;if(this._formData.schedule_kind==="weekly")t.weekdays=this._formData.weekdays;if(this._formData.schedule_kind==="interval"||this._formData.schedule_kind==="depot")t.interval_minutes=this._formData.interval_minutes;if(this._formData.track_inventory)t.inventory={current_quantity:this._formData.current_quantity,refill_threshold:this._formData.refill_threshold,auto_decrement:!0};if(this._formData.notes)t.notes=this._formData.notes;await this.hass.callService("med_expert","add_medication",t),this._step=5}catch(e){this._error=`Fehler beim Speichern: ${e}`}finally{this._saving=!1}}_addAnother(){this._formData={form:"tablet",display_name:"",dose_numerator:1,dose_denominator:1,dose_unit:"tablet",schedule_kind:"times_per_day",times:["08:00"],weekdays:[0,1,2,3,4],interval_minutes:480,track_inventory:!1,current_quantity:30,refill_threshold:7,grace_minutes:30,snooze_minutes:10},this._step=1,this._error=null}_close(){this.dispatchEvent(new CustomEvent("close"))}}p([b({attribute:!1})],X.prototype,"hass",void 0),p([b({type:String})],X.prototype,"entryId",void 0),p([u()],X.prototype,"_step",void 0),p([u()],X.prototype,"_saving",void 0),p([u()],X.prototype,"_error",void 0),p([u()],X.prototype,"_formData",void 0),X=p([W("add-medication-wizard")],X);class q extends f{constructor(){super(...arguments);this.narrow=!1;this._medications=[];this._loading=!0;this._error=null;this._activeTab="today";this._showWizard=!1;this._entryId=null;this._profiles=[];this._currentProfile=null;this._profileSnapshots=new Map}static styles=D`
     :host {
       display: block;
       min-height: 100vh;
@@ -1409,5 +1175,245 @@
       padding: 40px;
       color: var(--secondary-text-color);
     }
-  `,xt([ut({attribute:!1})],$t.prototype,"hass",void 0),xt([ut({type:Boolean})],$t.prototype,"narrow",void 0),xt([mt()],$t.prototype,"_medications",void 0),xt([mt()],$t.prototype,"_loading",void 0),xt([mt()],$t.prototype,"_error",void 0),xt([mt()],$t.prototype,"_activeTab",void 0),xt([mt()],$t.prototype,"_showWizard",void 0),xt([mt()],$t.prototype,"_entryId",void 0),xt([mt()],$t.prototype,"_profiles",void 0),xt([mt()],$t.prototype,"_currentProfile",void 0),$t=xt([ct("med-expert-panel")],$t)})();
-//# sourceMappingURL=med-expert-panel.js.map
\ No newline at end of file
+  `;connectedCallback(){super.connectedCallback(),this._loadData(),this._refreshInterval=setInterval(()=>{if(this._unsubscribe)this.requestUpdate();else this._loadData()},30000)}disconnectedCallback(){if(super.disconnectedCallback(),this._refreshInterval)clearInterval(this._refreshInterval);this._unsubscribe?.then((e)=>e()).catch(()=>{return}),this._unsubscribe=void 0}async _loadData(){try{this._loading=this._profileSnapshots.size===0,this._error=null,this._unsubscribe=this.hass.connection.subscribeMessage((e)=>this._handleEvent(e),{type:"med_expert/subscribe"}),await this._unsubscribe}catch(e){this._unsubscribe=void 0,this._error=`Failed to load medications: ${e}`,this._loading=!1}}_handleEvent(e){switch(e.type){case"snapshot":this._setProfiles(e.profiles);return;case"profile":this._profileSnapshots.set(e.profile.entry_id,e.profile);break;case"medications":{let t=this._profileSnapshots.get(e.entry_id);if(!t)return;let i=new Map(e.medications.map((s)=>[s.medication_id,s])),r=new Set(e.removed);this._profileSnapshots.set(e.entry_id,{...t,medications:t.medications.filter((s)=>!r.has(s.medication_id)).map((s)=>i.get(s.medication_id)||s)});break}case"adherence":{let t=this._profileSnapshots.get(e.entry_id);if(!t)return;this._profileSnapshots.set(e.entry_id,{...t,adherence_rate:e.adherence_rate});break}}this._applyProfiles()}_setProfiles(e){this._profileSnapshots=new Map(e.map((t)=>[t.entry_id,t])),this._applyProfiles()}_applyProfiles(){this._profiles=[...this._profileSnapshots.values()].map((t)=>({entry_id:t.entry_id,title:t.name,state:"loaded"})),this._currentProfile=this._profiles.find((t)=>t.entry_id===this._currentProfile?.entry_id)||this._profiles[0]||null,this._entryId=this._currentProfile?.entry_id||null;let e=this._currentProfile&&this._profileSnapshots.get(this._currentProfile.entry_id);this._medications=e?e.medications.map((t)=>this._parseMedication(e.entry_id,t)):[],this._loading=!1}_parseMedication(e,t){let i=t.form||"tablet",r=A[i]||A.tablet;return{medication_id:t.medication_id,entry_id:e,name:t.display_name,status:t.status,next_due:t.next_due?new Date(t.next_due):null,next_dose:t.next_dose||"",form:i,icon:r.icon,inventory:t.inventory?{current:t.inventory.current_quantity,threshold:t.inventory.refill_threshold,low:t.inventory.is_low}:void 0}}_selectProfile(e){this._currentProfile=e,this._applyProfiles()}get _dueMedications(){return this._medications.filter((e)=>e.status==="due"||e.status==="missed"||e.status==="snoozed")}get _upcomingMedications(){let t=new Date(new Date);return t.setHours(23,59,59,999),this._medications.filter((i)=>{if(i.status!=="ok"||!i.next_due)return!1;return i.next_due<=t}).sort((i,r)=>(i.next_due?.getTime()||0)-(r.next_due?.getTime()||0))}get _completedToday(){return[]}get _stats(){let e=this._medications.length,t=this._dueMedications.length,i=this._upcomingMedications.length;return{total:e,due:t,upcoming:i}}async _takeMedication(e){try{await this.hass.callService("med_expert","take",{medication_id:e.medication_id,entry_id:e.entry_id})}catch(t){this._error=`Failed to take medication: ${t}`}}async _snoozeMedication(e){try{await this.hass.callService("med_expert","snooze",{medication_id:e.medication_id,entry_id:e.entry_id})}catch(t){this._error=`Failed to snooze medication: ${t}`}}async _skipMedication(e){try{await this.hass.callService("med_expert","skip",{medication_id:e.medication_id,entry_id:e.entry_id})}catch(t){this._error=`Failed to skip medication: ${t}`}}_formatTime(e){if(!e)return"--:--";return e.toLocaleTimeString("de-DE",{hour:"2-digit",minute:"2-digit"})}_formatTimeAgo(e){if(!e)return{value:"--:--",label:"",overdue:!1};let t=new Date,i=e.getTime()-t.getTime(),r=Math.abs(i),s=i<0;if(r<60000)return{value:"Jetzt",label:"",overdue:s};else if(r<3600000){let o=Math.round(r/60000);return{value:`${s?"-":""}${o}`,label:"Min",overdue:s}}else return{value:this._formatTime(e),label:s?"Überfällig":"Uhr",overdue:s}}render(){if(this._loading)return a`
+        <div class="loading">
+          <div class="loading-spinner">💊</div>
+          <p>Medikamente laden...</p>
+        </div>
+      `;return a`
+      <div class="app-container">
+        ${this._renderHeader()}
+        ${this._renderTabs()}
+        
+        <div class="content">
+          ${this._error?a`<div class="error">${this._error}</div>`:""}
+          
+          ${this._activeTab==="today"?this._renderTodayTab():""}
+          ${this._activeTab==="calendar"?this._renderCalendarTab():""}
+          ${this._activeTab==="profile"?this._renderProfileTab():""}
+          ${this._activeTab==="meds"?this._renderMedsTab():""}
+        </div>
+      </div>
+
+      ${this._showWizard?a`
+        <div class="wizard-overlay" @click=${(e)=>e.target===e.currentTarget&&this._closeWizard()}>
+          <add-medication-wizard
+            .hass=${this.hass}
+            .entryId=${this._entryId||""}
+            @close=${this._closeWizard}
+          ></add-medication-wizard>
+        </div>
+      `:""}
+    `}_renderHeader(){let e=this._stats,t=this._getGreeting(),i=this._currentProfile?.title||"Kein Profil";return a`
+      <div class="header">
+        <div class="header-top">
+          <div>
+            <h1>${t}</h1>
+            <div class="header-subtitle">
+              ${this._profiles.length>1?a`
+                <select 
+                  class="profile-select"
+                  .value=${this._currentProfile?.entry_id||""}
+                  @change=${(r)=>{let s=r.target,o=this._profiles.find((n)=>n.entry_id===s.value);if(o)this._selectProfile(o)}}
+                >
+                  ${this._profiles.map((r)=>a`
+                    <option value=${r.entry_id} ?selected=${r.entry_id===this._currentProfile?.entry_id}>
+                      ${r.title}
+                    </option>
+                  `)}
+                </select>
+                <span style="margin: 0 6px;">•</span>
+              `:this._profiles.length===1?a`
+                <span class="profile-badge">👤 ${i}</span>
+                <span style="margin: 0 6px;">•</span>
+              `:""}
+              ${e.due>0?`${e.due} Medikament${e.due>1?"e":""} jetzt fällig`:e.upcoming>0?`${e.upcoming} noch heute`:"Alles erledigt \uD83C\uDF89"}
+            </div>
+          </div>
+          <button class="add-btn" @click=${this._openWizard} title="Medikament hinzufügen">
+            ➕
+          </button>
+        </div>
+        
+        <div class="stats-bar">
+          <div class="stat">
+            <div class="stat-value">${e.due}</div>
+            <div class="stat-label">Fällig</div>
+          </div>
+          <div class="stat">
+            <div class="stat-value">${e.upcoming}</div>
+            <div class="stat-label">Heute noch</div>
+          </div>
+          <div class="stat">
+            <div class="stat-value">${e.total}</div>
+            <div class="stat-label">Gesamt</div>
+          </div>
+        </div>
+      </div>
+    `}_getGreeting(){let e=new Date().getHours();if(e<12)return"☀️ Guten Morgen";if(e<18)return"\uD83C\uDF24️ Guten Tag";return"\uD83C\uDF19 Guten Abend"}_renderTabs(){return a`
+      <nav class="tab-nav">
+        ${[{id:"today",icon:"\uD83D\uDCC5",label:"Heute"},{id:"calendar",icon:"\uD83D\uDDD3️",label:"Kalender"},{id:"profile",icon:"\uD83D\uDC64",label:"Profil"},{id:"meds",icon:"\uD83D\uDC8A",label:"Meds"}].map((t)=>a`
+          <button 
+            class="tab ${this._activeTab===t.id?"active":""}"
+            @click=${()=>this._activeTab=t.id}
+          >
+            <span class="tab-icon">${t.icon}</span>
+            ${t.label}
+          </button>
+        `)}
+      </nav>
+    `}_renderTodayTab(){if(this._medications.length===0)return this._renderEmptyState();let e=this._dueMedications,t=this._upcomingMedications;return a`
+      ${e.length>0?a`
+        <div class="section">
+          <div class="section-header">
+            <span class="section-title">🔴 Jetzt fällig</span>
+            <span class="section-badge">${e.length}</span>
+          </div>
+          ${e.map((i)=>this._renderMedCard(i,!0))}
+        </div>
+      `:""}
+
+      ${t.length>0?a`
+        <div class="section">
+          <div class="section-header">
+            <span class="section-title">⏳ Heute noch</span>
+          </div>
+          ${t.map((i)=>this._renderMedCard(i,!1))}
+        </div>
+      `:""}
+
+      ${e.length===0&&t.length===0?a`
+        <div class="empty-state">
+          <div class="empty-icon">✅</div>
+          <div class="empty-title">Alles erledigt!</div>
+          <div class="empty-text">Keine Medikamente mehr für heute.</div>
+        </div>
+      `:""}
+    `}_renderMedCard(e,t){let i=this._formatTimeAgo(e.next_due),r=e.status==="missed",s=e.status==="due"||e.status==="snoozed";return a`
+      <div class="med-card ${r?"urgent":s?"due":""}">
+        <div class="med-icon">${e.icon}</div>
+        <div class="med-info">
+          <div class="med-name">${e.name}</div>
+          <div class="med-dose">${e.next_dose}</div>
+          ${e.inventory?.low?a`
+            <div class="inventory-warning">⚠️ Nur noch ${e.inventory.current} übrig</div>
+          `:""}
+        </div>
+        <div class="med-time">
+          <div class="med-time-value ${i.overdue?"med-time-overdue":""}">${i.value}</div>
+          <div class="med-time-label">${i.label}</div>
+        </div>
+      </div>
+      
+      ${t?a`
+        <div class="med-actions" style="margin-top: -4px; margin-bottom: 12px;">
+          <button class="action-btn take" @click=${()=>this._takeMedication(e)}>
+            ✓ Genommen
+          </button>
+          <button class="action-btn snooze" @click=${()=>this._snoozeMedication(e)}>
+            ⏰ Später
+          </button>
+          <button class="action-btn skip" @click=${()=>this._skipMedication(e)}>
+            ✕
+          </button>
+        </div>
+      `:""}
+    `}_renderEmptyState(){return a`
+      <div class="empty-state">
+        <div class="empty-icon">💊</div>
+        <div class="empty-title">Keine Medikamente</div>
+        <div class="empty-text">Füge dein erstes Medikament hinzu, um loszulegen.</div>
+        <button class="empty-btn" @click=${this._openWizard}>
+          ➕ Medikament hinzufügen
+        </button>
+      </div>
+    `}_renderCalendarTab(){return a`
+      <div class="calendar-placeholder">
+        <div style="font-size: 48px; margin-bottom: 16px;">🗓️</div>
+        <p>Kalenderansicht kommt bald...</p>
+      </div>
+    `}_renderProfileTab(){return a`
+      <div class="section">
+        <div class="section-header">
+          <span class="section-title">Aktuelles Profil</span>
+        </div>
+        
+        ${this._currentProfile?a`
+          <div class="profile-card">
+            <div class="profile-avatar">👤</div>
+            <div class="profile-info">
+              <div class="profile-name">${this._currentProfile.title}</div>
+              <div class="profile-status">
+                ${this._currentProfile.state==="loaded"?"\uD83D\uDFE2 Aktiv":"\uD83D\uDD34 "+this._currentProfile.state}
+              </div>
+            </div>
+          </div>
+          
+          <div class="profile-stats">
+            <div class="profile-stat">
+              <span class="stat-icon">💊</span>
+              <span>${this._medications.length} Medikamente</span>
+            </div>
+          </div>
+        `:a`
+          <div class="no-profile">
+            <p>Kein Profil ausgewählt</p>
+          </div>
+        `}
+      </div>
+      
+      ${this._profiles.length>0?a`
+        <div class="section">
+          <div class="section-header">
+            <span class="section-title">Alle Profile (${this._profiles.length})</span>
+          </div>
+          
+          ${this._profiles.map((e)=>a`
+            <div 
+              class="profile-list-item ${e.entry_id===this._currentProfile?.entry_id?"active":""}"
+              @click=${()=>this._selectProfile(e)}
+            >
+              <div class="profile-avatar-small">👤</div>
+              <div class="profile-item-info">
+                <div class="profile-item-name">${e.title}</div>
+                <div class="profile-item-status">
+                  ${e.state==="loaded"?"Aktiv":e.state}
+                </div>
+              </div>
+              ${e.entry_id===this._currentProfile?.entry_id?a`
+                <span class="check-mark">✓</span>
+              `:""}
+            </div>
+          `)}
+        </div>
+      `:""}
+      
+      <div class="section">
+        <button class="profile-action-btn" @click=${this._openAddProfile}>
+          ➕ Neues Profil erstellen
+        </button>
+      </div>
+    `}_openAddProfile(){window.location.href="/config/integrations/integration/med_expert"}_renderMedsTab(){if(this._medications.length===0)return this._renderEmptyState();return a`
+      <div class="section">
+        <div class="section-header">
+          <span class="section-title">Alle Medikamente</span>
+        </div>
+        ${this._medications.map((e)=>a`
+          <div class="meds-list-item">
+            <div class="med-icon">${e.icon}</div>
+            <div class="med-info">
+              <div class="med-name">${e.name}</div>
+              <div class="med-dose">${e.next_dose}</div>
+              ${e.inventory?a`
+                <div style="font-size: 11px; color: var(--secondary-text-color);">
+                  📦 ${e.inventory.current} auf Lager
+                </div>
+              `:""}
+            </div>
+          </div>
+        `)}
+      </div>
+    `}_openWizard(){if(!this._entryId){this._error="Kein Med Expert Profil gefunden. Bitte erstelle zuerst ein Profil in den Einstellungen.";return}this._showWizard=!0}_closeWizard(){this._showWizard=!1}}p([b({attribute:!1})],q.prototype,"hass",void 0),p([b({type:Boolean})],q.prototype,"narrow",void 0),p([u()],q.prototype,"_medications",void 0),p([u()],q.prototype,"_loading",void 0),p([u()],q.prototype,"_error",void 0),p([u()],q.prototype,"_activeTab",void 0),p([u()],q.prototype,"_showWizard",void 0),p([u()],q.prototype,"_entryId",void 0),p([u()],q.prototype,"_profiles",void 0),p([u()],q.prototype,"_currentProfile",void 0),q=p([W("med-expert-panel")],q);})();
+
+//# debugId=5598BFFDCBD89DC464756E2164756E21
+//# sourceMappingURL=med-expert-panel.js.map
@@ -1,6 +1,13 @@
 import { LitElement, html, css } from 'lit';
 import { customElement, property, state } from 'lit/decorators.js';
-import { HomeAssistant, MedicationStatus, DOSAGE_FORMS, HassEntityAttributes } from './types';
+import {
+  HomeAssistant,
+  MedicationStatus,
+  MedicationSnapshot,
+  ProfileEvent,
+  ProfileSnapshot,
+  DOSAGE_FORMS,
+} from './types';
 // Import wizard component
 import './add-medication-wizard';
 
@@ -13,7 +20,6 @@ interface ProfileInfo {
 }
 
 interface ParsedMedication {
-  entity_id: string;
   medication_id: string;
   entry_id: string;
   name: string;
@@ -27,7 +33,6 @@ interface ParsedMedication {
     threshold: number;
     low: boolean;
   };
-  attributes: HassEntityAttributes;
 }
 
 /**
@@ -586,9 +591,16 @@ export class MedExpertPanel extends LitElement {
   connectedCallback() {
     super.connectedCallback();
     this._loadData();
-    
-    // Auto-refresh every 30 seconds
-    this._refreshInterval = setInterval(() => this._loadData(), 30000);
+
+    // Re-render every 30 seconds so relative times stay current; the data
+    // itself is pushed by the subscription, which is retried if it failed
+    this._refreshInterval = setInterval(() => {
+      if (this._unsubscribe) {
+        this.requestUpdate();
+      } else {
+        this._loadData();
+      }
+    }, 30000);
   }
 
   disconnectedCallback() {
@@ -596,115 +608,116 @@ export class MedExpertPanel extends LitElement {
     if (this._refreshInterval) {
       clearInterval(this._refreshInterval);
     }
+    this._unsubscribe?.then((unsubscribe) => unsubscribe()).catch(() => undefined);
+    this._unsubscribe = undefined;
   }
 
   private _refreshInterval?: ReturnType<typeof setInterval>;
+  private _unsubscribe?: Promise<() => void>;
+  private _profileSnapshots = new Map<string, ProfileSnapshot>();
 
   private async _loadData() {
     try {
-      this._loading = this._medications.length === 0 && this._profiles.length === 0;
+      this._loading = this._profileSnapshots.size === 0;
       this._error = null;
 
-      // Load profiles from config entries via WebSocket
-      await this._loadProfiles();
-
-      // If no current profile selected but profiles exist, select first one
-      if (!this._currentProfile && this._profiles.length > 0) {
-        this._currentProfile = this._profiles[0];
-        this._entryId = this._currentProfile.entry_id;
-      }
-
-      // Fetch med_expert medication status sensors
-      // Med Expert sensors have 'medication_id' attribute - that's how we identify them
-      const entities = Object.keys(this.hass.states).filter((entity_id) => {
-        if (!entity_id.startsWith('sensor.') || !entity_id.endsWith('_status')) {
-          return false;
-        }
-        const state = this.hass.states[entity_id];
-        // Med Expert status sensors have medication_id attribute
-        return state?.attributes?.medication_id !== undefined;
-      });
-
-      // Parse medications from sensor entities, filtered by current profile
-      this._medications = entities
-        .map((entity_id) => {
-          const state = this.hass.states[entity_id];
-          const baseName = entity_id.replace('sensor.', '').replace('_status', '');
-          
-          // Find related entities
-          const nextDueEntity = this.hass.states[`sensor.${baseName}_next_due`];
-          const nextDoseEntity = this.hass.states[`sensor.${baseName}_next_dose`];
-
-          // Extract entry_id from any med_expert entity
-          if (!this._entryId && state.attributes.entry_id) {
-            this._entryId = state.attributes.entry_id;
-          }
-
-          // Parse next due
-          let nextDue: Date | null = null;
-          if (nextDueEntity?.state && nextDueEntity.state !== 'unknown') {
-            nextDue = new Date(nextDueEntity.state);
-          }
-
-          // Get form and icon
-          const form = state.attributes.form || 'tablet';
-          const formInfo = DOSAGE_FORMS[form as keyof typeof DOSAGE_FORMS] || DOSAGE_FORMS.tablet;
-
-          return {
-            entity_id,
-            medication_id: state.attributes.medication_id || '',
-            entry_id: state.attributes.entry_id || '',
-            name: state.attributes.friendly_name?.replace(' Status', '') || state.attributes.display_name || baseName,
-            status: state.state as MedicationStatus,
-            next_due: nextDue,
-            next_dose: nextDoseEntity?.state || state.attributes.next_dose || '',
-            form,
-            icon: formInfo.icon,
-            inventory: state.attributes.inventory ? {
-              current: state.attributes.inventory.current_quantity || 0,
-              threshold: state.attributes.inventory.refill_threshold || 7,
-              low: (state.attributes.inventory.current_quantity || 0) <= (state.attributes.inventory.refill_threshold || 7)
-            } : undefined,
-            attributes: state.attributes
-          } as ParsedMedication;
-        })
-        // Filter by current profile if selected
-        .filter((med) => !this._currentProfile || med.entry_id === this._currentProfile.entry_id);
-
-      this._loading = false;
+      // One payload with all profiles and medications, then deltas as
+      // medications change. The server pushes all profiles again when one
+      // is loaded or unloaded, and the connection resubscribes after a
+      // reconnect.
+      this._unsubscribe = this.hass.connection.subscribeMessage<ProfileEvent>(
+        (event) => this._handleEvent(event),
+        { type: 'med_expert/subscribe' },
+      );
+      await this._unsubscribe;
     } catch (error) {
+      this._unsubscribe = undefined;
       this._error = `Failed to load medications: ${error}`;
       this._loading = false;
     }
   }
 
-  private async _loadProfiles() {
-    try {
-      const result = await this.hass.callWS({ type: 'config_entries/get' }) as Array<{
-        entry_id: string;
-        domain: string;
-        title: string;
-        state: string;
-      }>;
-      
-      this._profiles = result
-        .filter(entry => entry.domain === 'med_expert')
-        .map(entry => ({
-          entry_id: entry.entry_id,
-          title: entry.title,
-          state: entry.state
-        }));
-    } catch (error) {
-      console.error('Failed to load profiles:', error);
-      this._profiles = [];
+  private _handleEvent(event: ProfileEvent) {
+    switch (event.type) {
+      case 'snapshot':
+        this._setProfiles(event.profiles);
+        return;
+      case 'profile':
+        this._profileSnapshots.set(event.profile.entry_id, event.profile);
+        break;
+      case 'medications': {
+        const profile = this._profileSnapshots.get(event.entry_id);
+        if (!profile) return;
+        const updated = new Map(event.medications.map((med) => [med.medication_id, med]));
+        const removed = new Set(event.removed);
+        this._profileSnapshots.set(event.entry_id, {
+          ...profile,
+          medications: profile.medications
+            .filter((med) => !removed.has(med.medication_id))
+            .map((med) => updated.get(med.medication_id) || med),
+        });
+        break;
+      }
+      case 'adherence': {
+        const profile = this._profileSnapshots.get(event.entry_id);
+        if (!profile) return;
+        this._profileSnapshots.set(event.entry_id, { ...profile, adherence_rate: event.adherence_rate });
+        break;
+      }
     }
+    this._applyProfiles();
+  }
+
+  private _setProfiles(profiles: ProfileSnapshot[]) {
+    this._profileSnapshots = new Map(profiles.map((profile) => [profile.entry_id, profile]));
+    this._applyProfiles();
+  }
+
+  private _applyProfiles() {
+    this._profiles = [...this._profileSnapshots.values()].map((profile) => ({
+      entry_id: profile.entry_id,
+      title: profile.name,
+      // Only loaded profiles are part of the snapshot
+      state: 'loaded',
+    }));
+
+    // Keep the selected profile if it is still there, else select the first
+    this._currentProfile =
+      this._profiles.find((p) => p.entry_id === this._currentProfile?.entry_id) ||
+      this._profiles[0] ||
+      null;
+    this._entryId = this._currentProfile?.entry_id || null;
+
+    const current = this._currentProfile && this._profileSnapshots.get(this._currentProfile.entry_id);
+    this._medications = current
+      ? current.medications.map((med) => this._parseMedication(current.entry_id, med))
+      : [];
+    this._loading = false;
+  }
+
+  private _parseMedication(entryId: string, med: MedicationSnapshot): ParsedMedication {
+    const form = med.form || 'tablet';
+    const formInfo = DOSAGE_FORMS[form] || DOSAGE_FORMS.tablet;
+    return {
+      medication_id: med.medication_id,
+      entry_id: entryId,
+      name: med.display_name,
+      status: med.status,
+      next_due: med.next_due ? new Date(med.next_due) : null,
+      next_dose: med.next_dose || '',
+      form,
+      icon: formInfo.icon,
+      inventory: med.inventory ? {
+        current: med.inventory.current_quantity,
+        threshold: med.inventory.refill_threshold,
+        low: med.inventory.is_low,
+      } : undefined,
+    };
   }
 
   private _selectProfile(profile: ProfileInfo) {
     this._currentProfile = profile;
-    this._entryId = profile.entry_id;
-    // Reload medications for new profile
-    this._loadData();
+    this._applyProfiles();
   }
 
   // Grouped medications
@@ -742,7 +755,6 @@ export class MedExpertPanel extends LitElement {
         medication_id: medication.medication_id,
         entry_id: medication.entry_id
       });
-      await this._loadData();
     } catch (error) {
       this._error = `Failed to take medication: ${error}`;
     }
@@ -754,7 +766,6 @@ export class MedExpertPanel extends LitElement {
         medication_id: medication.medication_id,
         entry_id: medication.entry_id
       });
-      await this._loadData();
     } catch (error) {
       this._error = `Failed to snooze medication: ${error}`;
     }
@@ -766,7 +777,6 @@ export class MedExpertPanel extends LitElement {
         medication_id: medication.medication_id,
         entry_id: medication.entry_id
       });
-      await this._loadData();
     } catch (error) {
       this._error = `Failed to skip medication: ${error}`;
     }
@@ -1127,53 +1137,18 @@ export class MedExpertPanel extends LitElement {
     `;
   }
 
-  private async _openWizard() {
-    // Find entry_id from first medication
-    if (!this._entryId && this._medications.length > 0) {
-      this._entryId = this._medications[0].entry_id;
-    }
-    
-    // If still no entry_id, try to get from sensor attributes
-    if (!this._entryId) {
-      const configEntries = Object.keys(this.hass.states)
-        .filter(e => e.includes('med_expert'))
-        .map(e => this.hass.states[e]?.attributes?.entry_id)
-        .filter(Boolean);
-      
-      if (configEntries.length > 0) {
-        this._entryId = configEntries[0] as string;
-      }
-    }
-
-    // If still no entry_id, fetch from config entries via WebSocket
-    if (!this._entryId) {
-      try {
-        const result = await this.hass.callWS({ type: 'config_entries/get' }) as Array<{
-          entry_id: string;
-          domain: string;
-          title: string;
-        }>;
-        const medExpertEntry = result.find(entry => entry.domain === 'med_expert');
-        if (medExpertEntry) {
-          this._entryId = medExpertEntry.entry_id;
-        }
-      } catch (error) {
-        console.error('Failed to fetch config entries:', error);
-      }
-    }
-
+  private _openWizard() {
     if (!this._entryId) {
       this._error = 'Kein Med Expert Profil gefunden. Bitte erstelle zuerst ein Profil in den Einstellungen.';
       return;
     }
-    
+
     this._showWizard = true;
   }
 
   private _closeWizard() {
+    // New medications are pushed by the subscription
     this._showWizard = false;
-    // Reload data to show new medication
-    setTimeout(() => this._loadData(), 500);
   }
 }
 
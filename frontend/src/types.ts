@@ -6,6 +6,9 @@ export interface HomeAssistant {
   states: { [entity_id: string]: HassEntity };
   callService: (domain: string, service: string, serviceData?: object) => Promise<void>;
   callWS: (msg: object) => Promise<unknown>;
+  connection: {
+    subscribeMessage: <T>(callback: (message: T) => void, msg: object) => Promise<() => void>;
+  };
   language: string;
   themes: Record<string, unknown>;
   panelUrl: string;
@@ -119,6 +122,49 @@ export interface Profile {
   adherence_rate?: number;
 }
 
+// ============================================================================
+// Websocket API (med_expert/profile_snapshot, med_expert/subscribe)
+// ============================================================================
+
+export interface MedicationSnapshot {
+  medication_id: string;
+  display_name: string;
+  status: MedicationStatus;
+  next_due: string | null;
+  next_dose: string | null;
+  form: DosageForm | null;
+  schedule_kind: ScheduleKind;
+  snooze_until: string | null;
+  last_taken: string | null;
+  inventory: {
+    current_quantity: number;
+    unit: string;
+    refill_threshold: number;
+    is_low: boolean;
+  } | null;
+  puffs: {
+    remaining_puffs: number;
+    total_puffs: number;
+    used_puffs: number;
+    is_low: boolean;
+  } | null;
+}
+
+export interface ProfileSnapshot {
+  entry_id: string;
+  profile_id: string;
+  name: string;
+  timezone: string;
+  adherence_rate: number | null;
+  medications: MedicationSnapshot[];
+}
+
+export type ProfileEvent =
+  | { type: 'snapshot'; profiles: ProfileSnapshot[] }
+  | { type: 'profile'; profile: ProfileSnapshot }
+  | { type: 'medications'; entry_id: string; medications: MedicationSnapshot[]; removed: string[] }
+  | { type: 'adherence'; entry_id: string; adherence_rate: number | null };
+
 // Dosage form metadata for UI
 export const DOSAGE_FORMS: Record<DosageForm, { icon: string; label: string; units: string[] }> = {
   tablet: { icon: '💊', label: 'Tablette', units: ['tablet', 'mg', 'g'] },
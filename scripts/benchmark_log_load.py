@@ -0,0 +1,72 @@
+"""
+Benchmark loading profiles with large log histories.
+
+Compares the time Profile.from_dict takes for 1k, 10k and 100k stored log
+records with the time it takes to deserialize every record, which is what
+loading cost before logs were deserialized lazily.
+
+Usage:
+    python scripts/benchmark_log_load.py
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import timeit
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+# Load the domain models directly; they have no Home Assistant dependencies
+MODELS_PATH = (
+    Path(__file__).parent.parent
+    / "custom_components"
+    / "med_expert"
+    / "domain"
+    / "models.py"
+)
+_spec = importlib.util.spec_from_file_location("med_expert_models", MODELS_PATH)
+models = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = models
+_spec.loader.exec_module(models)
+
+LOG_COUNTS = (1_000, 10_000, 100_000)
+REPEAT = 5
+
+
+def build_profile_data(log_count: int) -> dict:
+    """Build serialized profile data with log_count log records."""
+    profile = models.Profile.create(name="Benchmark", timezone="UTC")
+    start = datetime(2020, 1, 1, 8, 0, tzinfo=UTC)
+    data = profile.to_dict()
+    data["logs"] = [
+        models.LogRecord(
+            action=models.LogAction.TAKEN,
+            taken_at=start + timedelta(hours=12 * index),
+            medication_id="med-1",
+            scheduled_for=start + timedelta(hours=12 * index),
+            dose=models.DoseQuantity.normalize(2, 4, "tablet"),
+            slot_key="08:00",
+        ).to_dict()
+        for index in range(log_count)
+    ]
+    return data
+
+
+def best_of(func: object) -> float:
+    """Return the best run time of func in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=REPEAT)) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(f"{'logs':>8} {'load (lazy)':>14} {'load + read all':>16}")
+    for log_count in LOG_COUNTS:
+        data = build_profile_data(log_count)
+        lazy = best_of(lambda data=data: models.Profile.from_dict(data))
+        eager = best_of(lambda data=data: list(models.Profile.from_dict(data).logs))
+        print(f"{log_count:>8} {lazy:>11.2f} ms {eager:>13.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,9 @@ from __future__ import annotations
 import importlib.util
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 # Add the project root to sys.path so imports work correctly
 project_root = Path(__file__).parent.parent
@@ -35,6 +37,9 @@ class MockStore:
         self.key = key
         self.minor_version = minor_version
         self._data = None
+        self._delay_data_func = None
+        self.delay = None
+        self.write_count = 0
         # Ignore any other kwargs (like async_migrator) for compatibility
 
     async def async_load(self):
@@ -42,8 +47,20 @@ class MockStore:
         return self._data
 
     async def async_save(self, data):
-        """Save data to store."""
+        """Save data to store, replacing any pending delayed save."""
+        self._delay_data_func = None
         self._data = data
+        self.write_count += 1
+
+    def async_delay_save(self, data_func, delay=0):
+        """Schedule a delayed save; call flush_delayed_save() to run it."""
+        self._delay_data_func = data_func
+        self.delay = delay
+
+    async def flush_delayed_save(self):
+        """Write a pending delayed save as if the delay had elapsed."""
+        if self._delay_data_func is not None:
+            await self.async_save(self._delay_data_func())
 
     async def _async_load(self):
         """Internal load method (for pytest-homeassistant-custom-component compatibility)."""
@@ -82,6 +99,7 @@ if not HAS_HA_FIXTURES:
 
     mock_ha.helpers.storage = MagicMock()
     mock_ha.helpers.storage.Store = MockStore
+    mock_ha.helpers.storage.STORAGE_DIR = ".storage"
 
     sys.modules["homeassistant"] = mock_ha
     sys.modules["homeassistant.const"] = mock_ha.const
@@ -124,3 +142,14 @@ else:
 
 # Pytest-asyncio configuration
 pytest_plugins = ["pytest_asyncio"]
+
+
+@pytest.fixture
+def storage_hass(tmp_path: Path) -> MagicMock:
+    """Mock hass whose config dir is tmp_path and whose executor runs inline."""
+    hass = MagicMock()
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+    hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda target, *args: target(*args)
+    )
+    return hass
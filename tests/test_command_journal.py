@@ -0,0 +1,208 @@
+"""Tests for the write-ahead command journal."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.med_expert.application.services import (
+    AddMedicationCommand,
+    MedicationService,
+    SkipCommand,
+    TakeCommand,
+    command_from_dict,
+    command_to_dict,
+)
+from custom_components.med_expert.command_journal import CommandJournal
+from custom_components.med_expert.domain.models import (
+    LogAction,
+    Profile,
+    ScheduleKind,
+)
+from custom_components.med_expert.store import (
+    MedExpertStore,
+    ProfileRepository,
+    ProfileStore,
+)
+
+NOW = datetime(2025, 1, 15, 8, 5, tzinfo=ZoneInfo("UTC"))
+
+
+def _event(seq: int, profile_id: str = "p1") -> dict:
+    """Build a journal event."""
+    return {
+        "seq": seq,
+        "profile_id": profile_id,
+        "command": "skip",
+        "at": NOW.isoformat(),
+        "data": {"medication_id": "med-1", "reason": None},
+    }
+
+
+class TestCommandJournal:
+    """Tests for the CommandJournal file."""
+
+    @pytest.mark.asyncio
+    async def test_append_load_and_checkpoint(self, storage_hass):
+        """Test that a checkpoint drops the events it covers."""
+        journal = CommandJournal(storage_hass)
+        for seq, profile_id in ((1, "p1"), (2, "p2"), (3, "p1"), (4, "gone")):
+            await journal.async_append(_event(seq, profile_id))
+
+        assert [event["seq"] for event in await journal.async_load()] == [1, 2, 3, 4]
+
+        await journal.async_checkpoint({"p1": 1, "p2": 2})
+
+        assert [event["seq"] for event in await journal.async_load()] == [3]
+
+    @pytest.mark.asyncio
+    async def test_skips_torn_line(self, storage_hass, tmp_path):
+        """Test that an event cut off by a crash is ignored."""
+        journal = CommandJournal(storage_hass)
+        await journal.async_append(_event(1))
+        path = tmp_path / ".storage" / "med_expert_commands.jsonl"
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write('{"seq": 2, "profile')
+
+        assert [event["seq"] for event in await journal.async_load()] == [1]
+
+    def test_command_roundtrip(self):
+        """Test that commands survive serialization, datetimes included."""
+        command = TakeCommand(
+            medication_id="med-1",
+            taken_at=NOW,
+            dose_override={"numerator": 1, "denominator": 2, "unit": "tablet"},
+        )
+
+        data = json.loads(json.dumps(command_to_dict(command)))
+
+        assert command_from_dict("take", data) == command
+
+
+class TestCommandReplay:
+    """Tests for replaying journaled commands after a crash."""
+
+    async def _setup(self, storage_hass) -> tuple[ProfileStore, Profile, str]:
+        """Create a stored profile with one medication."""
+        store = ProfileStore(storage_hass)
+        await store.async_load()
+        profile = Profile.create(name="Test", timezone="UTC")
+        medication = MedicationService(get_now=lambda: NOW).add_medication(
+            profile,
+            AddMedicationCommand(
+                display_name="Aspirin",
+                schedule_kind=ScheduleKind.TIMES_PER_DAY,
+                times=["08:00"],
+                default_dose={"numerator": 1, "denominator": 1, "unit": "tablet"},
+            ),
+        )
+        await store.async_save_profile(profile)
+        return store, profile, medication.medication_id
+
+    async def _restart(self, storage_hass, store: ProfileStore) -> Profile | None:
+        """Load the last written store document into a new repository."""
+        written = json.loads(json.dumps(store._store._data))
+        with patch.object(
+            MedExpertStore, "async_load", new_callable=AsyncMock
+        ) as mock_load:
+            mock_load.return_value = written
+            repository = ProfileRepository(ProfileStore(storage_hass))
+            await repository.async_load()
+            profiles = await repository.async_get_all()
+        return next(iter(profiles.values()), None)
+
+    @pytest.mark.asyncio
+    async def test_replays_command_lost_before_save(self, storage_hass):
+        """Test that a take applied but never written is replayed."""
+        store, profile, medication_id = await self._setup(storage_hass)
+        repository = ProfileRepository(store)
+        await repository.async_load()
+
+        command = TakeCommand(medication_id=medication_id)
+        await repository.async_record_command(profile, command, NOW)
+        MedicationService(get_now=lambda: NOW).take(profile, command)
+        # Crash before async_update
+
+        loaded = await self._restart(storage_hass, store)
+
+        assert loaded is not None
+        assert [log.action for log in loaded.logs] == [LogAction.TAKEN]
+        assert loaded.logs[0].taken_at == NOW
+        assert loaded.medications[medication_id].state.last_taken == NOW
+        assert loaded.command_seq == 1
+        assert await CommandJournal(storage_hass).async_load() == []
+
+    @pytest.mark.asyncio
+    async def test_replay_does_not_duplicate_stored_logs(self, storage_hass):
+        """Test that logs appended before the crash are not added again."""
+        store, profile, medication_id = await self._setup(storage_hass)
+        repository = ProfileRepository(store, save_delay=60)
+        await repository.async_load()
+
+        for command in (
+            TakeCommand(medication_id=medication_id),
+            SkipCommand(medication_id=medication_id, reason="away"),
+        ):
+            await repository.async_record_command(profile, command, NOW)
+            MedicationService(get_now=lambda: NOW).apply_command(profile, command)
+            # Logs reach the log journal; the document write is delayed
+            await repository.async_update(profile)
+
+        loaded = await self._restart(storage_hass, store)
+
+        assert loaded is not None
+        assert [log.action for log in loaded.logs] == [
+            LogAction.TAKEN,
+            LogAction.SKIPPED,
+        ]
+        assert (
+            loaded.medications[medication_id].state
+            == profile.medications[medication_id].state
+        )
+        assert loaded.command_seq == 2
+
+    @pytest.mark.asyncio
+    async def test_delayed_write_checkpoints_journal(self, storage_hass):
+        """Test that the delayed document write also drops covered commands."""
+        store, profile, medication_id = await self._setup(storage_hass)
+        repository = ProfileRepository(store, save_delay=60)
+        await repository.async_load()
+
+        command = TakeCommand(medication_id=medication_id)
+        await repository.async_record_command(profile, command, NOW)
+        MedicationService(get_now=lambda: NOW).take(profile, command)
+        with patch(
+            "custom_components.med_expert.store.async_call_later"
+        ) as mock_call_later:
+            await repository.async_update(profile)
+        assert len(await CommandJournal(storage_hass).async_load()) == 1
+
+        _, _, write_delayed = mock_call_later.call_args.args
+        await write_delayed(NOW)
+
+        assert not repository.is_dirty(profile.profile_id)
+        assert await CommandJournal(storage_hass).async_load() == []
+
+    @pytest.mark.asyncio
+    async def test_flush_checkpoints_journal(self, storage_hass):
+        """Test that writing the document drops the covered commands."""
+        store, profile, medication_id = await self._setup(storage_hass)
+        repository = ProfileRepository(store, save_delay=60)
+        await repository.async_load()
+
+        command = TakeCommand(medication_id=medication_id)
+        await repository.async_record_command(profile, command, NOW)
+        MedicationService(get_now=lambda: NOW).take(profile, command)
+        await repository.async_update(profile)
+        assert len(await CommandJournal(storage_hass).async_load()) == 1
+
+        await repository.async_flush()
+
+        assert await CommandJournal(storage_hass).async_load() == []
+        loaded = await self._restart(storage_hass, store)
+        assert loaded is not None
+        assert len(loaded.logs) == 1
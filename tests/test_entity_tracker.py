@@ -0,0 +1,105 @@
+"""Tests for adding and removing medication entities without a reload."""
+
+from __future__ import annotations
+
+import importlib
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import homeassistant.core
+import pytest
+
+from custom_components.med_expert import entity_tracker
+from custom_components.med_expert.domain.models import (
+    Medication,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+
+
+@pytest.fixture
+def tracker_module():
+    """Load the tracker with a pass-through callback decorator."""
+    with patch.object(homeassistant.core, "callback", lambda func: func):
+        module = importlib.reload(entity_tracker)
+    yield module
+    importlib.reload(entity_tracker)
+
+
+@pytest.fixture
+def profile() -> Profile:
+    """Create an empty profile."""
+    return Profile.create(name="Test", timezone="UTC")
+
+
+def _add_medication(profile: Profile, medication_id: str) -> None:
+    """Add an as-needed medication with a fixed ID."""
+    medication = Medication.create(
+        display_name=medication_id,
+        schedule=ScheduleSpec(kind=ScheduleKind.AS_NEEDED),
+    )
+    medication.medication_id = medication_id
+    profile.add_medication(medication)
+
+
+def _entities(_entry, medication: Medication) -> list:
+    """Create two fake entities of a medication."""
+    return [
+        SimpleNamespace(
+            entity_id=f"sensor.{medication.medication_id}_{kind}", hass=object()
+        )
+        for kind in ("status", "next_due")
+    ]
+
+
+class TestMedicationEntityTracker:
+    """Tests for MedicationEntityTracker."""
+
+    def test_adds_and_removes_only_changed_medications(
+        self, tracker_module, profile: Profile
+    ):
+        """Test that a change touches only the added or removed medication."""
+        entry = MagicMock()
+        entry.entry_id = "entry"
+        entry.runtime_data.manager.profile = profile
+        add_entities = MagicMock()
+        entity_registry = MagicMock()
+        entity_registry.async_get.side_effect = lambda entity_id: entity_id
+        device_registry = MagicMock()
+        device_registry.async_get_device.return_value = SimpleNamespace(id="device")
+        for medication_id in ("a", "b"):
+            _add_medication(profile, medication_id)
+
+        tracker = tracker_module.MedicationEntityTracker(
+            MagicMock(), entry, add_entities, _entities
+        )
+        with (
+            patch.object(tracker_module.er, "async_get", return_value=entity_registry),
+            patch.object(tracker_module.dr, "async_get", return_value=device_registry),
+            patch.object(
+                tracker_module.er, "async_entries_for_device", return_value=[]
+            ),
+        ):
+            tracker.async_sync()
+            assert len(add_entities.call_args.args[0]) == 4
+
+            _add_medication(profile, "c")
+            tracker.async_sync()
+            added = add_entities.call_args.args[0]
+            assert [entity.entity_id for entity in added] == [
+                "sensor.c_status",
+                "sensor.c_next_due",
+            ]
+
+            profile.remove_medication("a")
+            tracker.async_sync()
+
+        assert add_entities.call_count == 2
+        assert tracker.medication_ids == {"b", "c"}
+        removed = [call.args[0] for call in entity_registry.async_remove.call_args_list]
+        assert removed == ["sensor.a_status", "sensor.a_next_due"]
+        device_registry.async_get_device.assert_called_once_with(
+            identifiers={("med_expert", "entry_a")}
+        )
+        device_registry.async_remove_device.assert_called_once_with("device")
@@ -0,0 +1,188 @@
+"""Tests for paginated history queries over intake logs."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.med_expert.domain.history import (
+    HistoryQuery,
+    count_history_by_day,
+    query_history,
+)
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    LogAction,
+    LogRecord,
+    Medication,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+
+UTC = ZoneInfo("UTC")
+START = datetime(2025, 1, 1, 8, 0, tzinfo=UTC)
+
+
+def _log(
+    taken_at: datetime,
+    medication_id: str = "med-a",
+    action: LogAction = LogAction.TAKEN,
+) -> LogRecord:
+    """Build a log record."""
+    return LogRecord(
+        action=action,
+        taken_at=taken_at,
+        medication_id=medication_id,
+        dose=DoseQuantity.normalize(1, 1, "tablet"),
+    )
+
+
+@pytest.fixture
+def profile() -> Profile:
+    """Build a profile with two medications and ten days of history."""
+    profile = Profile.create(name="Test", timezone="UTC")
+    for name in ("a", "b"):
+        medication = Medication.create(
+            display_name=name,
+            schedule=ScheduleSpec(
+                kind=ScheduleKind.TIMES_PER_DAY,
+                times=["08:00"],
+                default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+            ),
+        )
+        medication.medication_id = f"med-{name}"
+        profile.add_medication(medication)
+    for day in range(10):
+        taken_at = START + timedelta(days=day)
+        # Both medications logged at the same instant
+        profile.add_log(_log(taken_at, "med-a"))
+        profile.add_log(
+            _log(
+                taken_at,
+                "med-b",
+                LogAction.SKIPPED if day % 2 else LogAction.TAKEN,
+            )
+        )
+    return profile
+
+
+def _all_pages(profile: Profile, query: HistoryQuery) -> list[list[LogRecord]]:
+    """Follow the cursors of a query to its last page."""
+    pages = []
+    cursor = None
+    while True:
+        page = query_history(profile, replace(query, cursor=cursor))
+        pages.append(page.records)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class TestQueryHistory:
+    """Tests for query_history."""
+
+    def test_pages_newest_first_across_equal_times(self, profile: Profile):
+        """Test that pages split between records of the same instant."""
+        pages = _all_pages(profile, HistoryQuery(limit=3))
+
+        records = [record for page in pages for record in page]
+        assert [len(page) for page in pages] == [3, 3, 3, 3, 3, 3, 2]
+        assert len({id(record) for record in records}) == 20
+        times = [record.taken_at for record in records]
+        assert times == sorted(times, reverse=True)
+
+    def test_pages_oldest_first(self, profile: Profile):
+        """Test paging in time order."""
+        pages = _all_pages(profile, HistoryQuery(limit=4, newest_first=False))
+
+        records = [record for page in pages for record in page]
+        assert len(records) == 20
+        assert records[0].taken_at == START
+        assert records[-1].taken_at == START + timedelta(days=9)
+
+    def test_filters_by_range_medication_and_action(self, profile: Profile):
+        """Test that filters combine."""
+        page = query_history(
+            profile,
+            HistoryQuery(
+                start=START + timedelta(days=2),
+                end=START + timedelta(days=8),
+                medication_id="med-b",
+                actions=frozenset({LogAction.SKIPPED}),
+            ),
+        )
+
+        assert [record.taken_at.day for record in page.records] == [8, 6, 4]
+        assert page.next_cursor is None
+
+    def test_removed_medication_is_still_found(self, profile: Profile):
+        """Test that the history of a removed medication can be read."""
+        profile.remove_medication("med-b")
+
+        page = query_history(profile, HistoryQuery(medication_id="med-b"))
+
+        assert len(page.records) == 10
+
+    def test_cursor_survives_new_records(self, profile: Profile):
+        """Test that records appended between pages do not shift the pages."""
+        first = query_history(profile, HistoryQuery(limit=5))
+        profile.add_log(_log(START + timedelta(days=20)))
+
+        second = query_history(profile, HistoryQuery(limit=5, cursor=first.next_cursor))
+
+        assert first.records[-1].taken_at == START + timedelta(days=7)
+        assert [record.taken_at for record in second.records] == [
+            START + timedelta(days=7),
+            START + timedelta(days=6),
+            START + timedelta(days=6),
+            START + timedelta(days=5),
+            START + timedelta(days=5),
+        ]
+
+    def test_only_returned_records_are_deserialized(self, profile: Profile):
+        """Test that a page reads its records only, not the whole history."""
+        restored = Profile.from_dict(profile.to_dict())
+
+        page = query_history(restored, HistoryQuery(limit=2))
+
+        assert len(page.records) == 2
+        assert restored.logs.materialized_count == 2
+
+    def test_invalid_cursor(self, profile: Profile):
+        """Test that a malformed cursor is rejected."""
+        with pytest.raises(ValueError, match="Invalid history cursor"):
+            query_history(profile, HistoryQuery(cursor="yesterday"))
+
+
+class TestCountHistoryByDay:
+    """Tests for count_history_by_day."""
+
+    def test_counts_per_day_including_archive(self, profile: Profile):
+        """Test that archived days are counted from their aggregates."""
+        profile.archive_logs_before(START + timedelta(days=5))
+
+        days = count_history_by_day(
+            profile, HistoryQuery(start=START + timedelta(days=3))
+        )
+
+        assert [day["day"] for day in days] == [
+            f"2025-01-{day:02d}" for day in range(4, 11)
+        ]
+        assert days[0]["taken"] == 1
+        assert days[0]["skipped"] == 1
+        assert days[1]["taken"] == 2
+        assert sum(day["taken"] + day["skipped"] for day in days) == 14
+
+    def test_counts_respect_filters(self, profile: Profile):
+        """Test that counts use the query's medication and actions."""
+        days = count_history_by_day(
+            profile,
+            HistoryQuery(medication_id="med-b", actions=frozenset({LogAction.SKIPPED})),
+        )
+
+        assert len(days) == 5
+        assert all(day["skipped"] == 1 and day["taken"] == 0 for day in days)
@@ -0,0 +1,414 @@
+"""Tests for the append-only log journal."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.med_expert import log_codec, log_journal
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    LogAction,
+    LogRecord,
+    Profile,
+)
+from custom_components.med_expert.log_journal import LogJournal
+from custom_components.med_expert.store import (
+    CURRENT_SCHEMA_VERSION,
+    LOG_JOURNAL_MINOR_VERSION,
+    ROW_LOGS_SCHEMA_VERSION,
+    MedExpertStore,
+    ProfileRepository,
+    ProfileStore,
+)
+
+
+def _record(index: int) -> dict:
+    """Build a serialized log record."""
+    taken_at = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC")) + timedelta(
+        hours=index
+    )
+    return LogRecord(
+        action=LogAction.TAKEN,
+        taken_at=taken_at,
+        medication_id="med-1",
+        dose=DoseQuantity.normalize(1, 1, "tablet"),
+    ).to_dict()
+
+
+class TestLogJournal:
+    """Tests for LogJournal segment handling."""
+
+    @pytest.mark.asyncio
+    async def test_append_and_load(self, storage_hass):
+        """Test that appended records are loaded back in order."""
+        journal = LogJournal(storage_hass)
+
+        await journal.async_append("p1", [_record(0), _record(1)])
+        await journal.async_append("p1", [_record(2)])
+
+        records = await LogJournal(storage_hass).async_load("p1")
+        assert records == [_record(0), _record(1), _record(2)]
+
+    @pytest.mark.asyncio
+    async def test_load_unknown_profile(self, storage_hass):
+        """Test that a profile without segments has no records."""
+        assert await LogJournal(storage_hass).async_load("missing") == []
+
+    @pytest.mark.asyncio
+    async def test_rolls_over_and_compacts(self, storage_hass):
+        """Test segment rollover and compaction once too many segments exist."""
+        journal = LogJournal(storage_hass)
+
+        with (
+            patch.object(log_journal, "SEGMENT_MAX_RECORDS", 2),
+            patch.object(log_journal, "COMPACT_SEGMENT_THRESHOLD", 3),
+        ):
+            for index in range(6):
+                await journal.async_append("p1", [_record(index)])
+            assert journal.segment_count("p1") == 3
+
+            await journal.async_append("p1", [_record(6)])
+            assert journal.segment_count("p1") == 1
+
+        records = await LogJournal(storage_hass).async_load("p1")
+        assert records == [_record(i) for i in range(7)]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_compaction_drops_stale_segments(
+        self, storage_hass, tmp_path
+    ):
+        """Test that segments older than a compacted segment are ignored."""
+        journal = LogJournal(storage_hass)
+        await journal.async_append("p1", [_record(0)])
+
+        # Simulate a compaction that wrote its segment but died before
+        # removing the segment it replaced.
+        profile_dir = tmp_path / ".storage" / "med_expert_logs" / "p1"
+        log_journal._write_compacted(profile_dir, [], 2, [_record(0)])
+
+        records = await LogJournal(storage_hass).async_load("p1")
+        assert records == [_record(0)]
+        assert sorted(p.name for p in profile_dir.iterdir()) == ["00000002.jsonl"]
+
+    @pytest.mark.asyncio
+    async def test_skips_torn_line(self, storage_hass, tmp_path):
+        """Test that a partially written last line does not break loading."""
+        journal = LogJournal(storage_hass)
+        await journal.async_append("p1", [_record(0)])
+
+        segment = tmp_path / ".storage" / "med_expert_logs" / "p1" / "00000001.jsonl"
+        with segment.open("a", encoding="utf-8") as handle:
+            handle.write('{"action": "tak')
+
+        assert await LogJournal(storage_hass).async_load("p1") == [_record(0)]
+
+    @pytest.mark.asyncio
+    async def test_replace_is_idempotent(self, storage_hass):
+        """Test that replacing records twice keeps a single copy."""
+        journal = LogJournal(storage_hass)
+        records = [_record(0), _record(1)]
+
+        await journal.async_replace("p1", records)
+        await LogJournal(storage_hass).async_replace("p1", records)
+
+        assert await LogJournal(storage_hass).async_load("p1") == records
+
+
+class TestLogArchive:
+    """Tests for archiving records out of the live segments."""
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_records(self, storage_hass):
+        """Test that archived records leave the live log."""
+        journal = LogJournal(storage_hass)
+        await journal.async_append("p1", [_record(i) for i in range(5)])
+        aggregates = {"log_aggregates": [], "logs_archived_before": "2025-01-01T10:00"}
+
+        await journal.async_archive(
+            "p1", [_record(0), _record(1)], aggregates, [_record(i) for i in (2, 3, 4)]
+        )
+
+        reloaded = LogJournal(storage_hass)
+        assert await reloaded.async_load("p1") == [_record(i) for i in (2, 3, 4)]
+        assert await reloaded.async_load_archive("p1") == [_record(0), _record(1)]
+        assert await reloaded.async_load_aggregates("p1") == aggregates
+
+    @pytest.mark.asyncio
+    async def test_interrupted_archive_is_finished_on_load(self, storage_hass):
+        """Test that records rolled up by an interrupted run are not reloaded."""
+        journal = LogJournal(storage_hass)
+        await journal.async_append("p1", [_record(i) for i in range(5)])
+
+        # Aggregates written, live segments not rewritten yet
+        with patch.object(journal, "_async_compact_locked", new_callable=AsyncMock):
+            await journal.async_archive(
+                "p1",
+                [_record(0), _record(1)],
+                {"log_aggregates": [], "logs_archived_before": _record(2)["taken_at"]},
+                [],
+            )
+
+        reloaded = LogJournal(storage_hass)
+        assert await reloaded.async_load("p1") == [_record(i) for i in (2, 3, 4)]
+        await reloaded.async_append("p1", [_record(5)])
+        assert await LogJournal(storage_hass).async_load("p1") == [
+            _record(i) for i in (2, 3, 4, 5)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_purge_archive(self, storage_hass):
+        """Test purging archived records, optionally by time."""
+        journal = LogJournal(storage_hass)
+        await journal.async_archive("p1", [_record(i) for i in range(3)], {}, [])
+
+        before = datetime.fromisoformat(_record(1)["taken_at"])
+        assert await journal.async_purge_archive("p1", before) == 1
+        assert await journal.async_load_archive("p1") == [_record(1), _record(2)]
+
+        assert await journal.async_purge_archive("p1") == 2
+        assert await journal.async_load_archive("p1") == []
+
+
+class TestProfileStoreJournal:
+    """Tests for ProfileStore writing logs to the journal."""
+
+    @pytest.mark.asyncio
+    async def test_save_profile_appends_only_new_logs(self, storage_hass):
+        """Test that saving a profile appends new logs and omits them from the doc."""
+        store = ProfileStore(storage_hass)
+        await store.async_load()
+        profile = Profile.create(name="Test", timezone="UTC")
+
+        profile.add_log(LogRecord.from_dict(_record(0)))
+        await store.async_save_profile(profile)
+        profile.add_log(LogRecord.from_dict(_record(1)))
+        await store.async_save_profile(profile)
+        await store.async_save_profile(profile)
+
+        saved_doc = store._data["profiles"][profile.profile_id]
+        assert "logs" not in saved_doc
+        assert profile.get_unsaved_logs() == []
+        assert await store.async_load_logs(profile.profile_id) == [
+            _record(0),
+            _record(1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_repository_hydrates_logs_from_journal(self, storage_hass):
+        """Test that a profile is rebuilt with the logs from its journal."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        await LogJournal(storage_hass).async_append(
+            profile.profile_id, [_record(0), _record(1)]
+        )
+
+        with patch.object(
+            MedExpertStore, "async_load", new_callable=AsyncMock
+        ) as mock_load:
+            mock_load.return_value = {
+                "schema_version": 2,
+                "profiles": {profile.profile_id: profile.to_dict(include_logs=False)},
+            }
+            repository = ProfileRepository(ProfileStore(storage_hass))
+            await repository.async_load()
+
+            loaded = await repository.async_get(profile.profile_id)
+
+        assert loaded is not None
+        assert len(loaded.logs) == 2
+        assert loaded.logs[1].taken_at == LogRecord.from_dict(_record(1)).taken_at
+        assert loaded.get_unsaved_logs() == []
+
+    @pytest.mark.asyncio
+    async def test_migration_splits_legacy_logs(self, storage_hass):
+        """Test that migrating to the journal minor version moves logs out."""
+        journal = LogJournal(storage_hass)
+        store = MedExpertStore(
+            storage_hass,
+            2,
+            "med_expert.med_expert_data",
+            minor_version=LOG_JOURNAL_MINOR_VERSION,
+            journal=journal,
+        )
+        data = {
+            "schema_version": 2,
+            "profiles": {
+                "p1": {
+                    "profile_id": "p1",
+                    "name": "Test",
+                    "timezone": "UTC",
+                    "medications": {},
+                    "logs": [_record(0), _record(1)],
+                },
+            },
+        }
+
+        migrated = await store._async_migrate_func(2, 1, data)
+
+        assert "logs" not in migrated["profiles"]["p1"]
+        assert await journal.async_load("p1") == [_record(0), _record(1)]
+
+    @pytest.mark.asyncio
+    async def test_archived_profile_hydrates_with_aggregates(self, storage_hass):
+        """Test that a profile is rebuilt with its archived aggregates."""
+        store = ProfileStore(storage_hass)
+        await store.async_load()
+        profile = Profile.create(name="Test", timezone="UTC")
+        for index in range(4):
+            profile.add_log(LogRecord.from_dict(_record(index * 24)))
+        await store.async_save_profile(profile)
+
+        cutoff = datetime(2025, 1, 3, tzinfo=ZoneInfo("UTC"))
+        archived = profile.archive_logs_before(cutoff)
+        await store.async_archive_logs(profile, archived)
+
+        with patch.object(
+            MedExpertStore, "async_load", new_callable=AsyncMock
+        ) as mock_load:
+            mock_load.return_value = {
+                "schema_version": 2,
+                "profiles": {profile.profile_id: profile.to_dict(include_logs=False)},
+            }
+            repository = ProfileRepository(ProfileStore(storage_hass))
+            await repository.async_load()
+            loaded = await repository.async_get(profile.profile_id)
+
+        assert loaded is not None
+        assert len(loaded.logs) == 2
+        assert loaded.log_aggregates == profile.log_aggregates
+        assert loaded.logs_archived_before == cutoff
+        assert len(await store.async_load_archived_logs(profile.profile_id)) == 2
+
+
+class TestColumnarFormat:
+    """Tests for the columnar log encoding."""
+
+    def _varied_records(self) -> list[dict]:
+        """Build records that exercise every column."""
+        local = ZoneInfo("Europe/Berlin")
+        return [
+            _record(0),
+            LogRecord(
+                action=LogAction.SKIPPED,
+                taken_at=datetime(2025, 7, 1, 8, 0, 5, 123456, tzinfo=local),
+                medication_id="med-2",
+                scheduled_for=datetime(2025, 7, 1, 8, 0, tzinfo=local),
+                dose=DoseQuantity.normalize(1, 2, "ml"),
+                slot_key="08:00",
+                meta={"reason": "nausea"},
+            ).to_dict(),
+            LogRecord(
+                action=LogAction.PRN_TAKEN,
+                taken_at=datetime(2025, 1, 1, 8, 0),  # noqa: DTZ001
+            ).to_dict(),
+            {"action": "taken", "taken_at": "2024-03-01T08:00:00+00:00"},
+        ]
+
+    def test_roundtrip(self):
+        """Test that decoding gives back equivalent records."""
+        records = self._varied_records()
+
+        block = log_codec.decode_columns(
+            json.loads(json.dumps(log_codec.encode_columns(records)))
+        )
+
+        assert [LogRecord.from_dict(r) for r in block] == [
+            LogRecord.from_dict(r) for r in records
+        ]
+        assert block[:3] == records[:3]
+        assert block[1]["taken_at"] == records[1]["taken_at"]
+
+    def test_block_is_smaller(self):
+        """Test that a columnar block is much smaller than rows."""
+        records = [_record(index) for index in range(500)]
+
+        rows = sum(len(json.dumps(record)) for record in records)
+        columns = len(json.dumps(log_codec.encode_columns(records)))
+
+        assert columns * 3 < rows
+
+    @pytest.mark.asyncio
+    async def test_columnar_compaction(self, storage_hass):
+        """Test that columnar segments load and keep accepting appends."""
+        journal = LogJournal(storage_hass, columnar=True)
+        records = [_record(index) for index in range(5)]
+        await journal.async_replace("p1", records)
+
+        reopened = LogJournal(storage_hass, columnar=True)
+        await reopened.async_append("p1", [_record(5)])
+
+        assert await LogJournal(storage_hass).async_load("p1") == [
+            _record(index) for index in range(6)
+        ]
+        assert reopened._active_counts["p1"] == 6
+
+    @pytest.mark.asyncio
+    async def test_archive_all_then_append(self, storage_hass):
+        """Test that an empty columnar segment keeps accepting appends."""
+        journal = LogJournal(storage_hass, columnar=True)
+        await journal.async_append("p1", [_record(0), _record(1)])
+        await journal.async_archive(
+            "p1", [_record(0), _record(1)], {"logs_archived_before": None}, []
+        )
+        await journal.async_append("p1", [_record(2)])
+
+        reopened = LogJournal(storage_hass, columnar=True)
+        assert await reopened.async_load("p1") == [_record(2)]
+        await reopened.async_append("p1", [_record(3)])
+        assert reopened._active_counts["p1"] == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_columnar_segment_without_block(self, storage_hass, tmp_path):
+        """Test that segments compacted empty by older versions still load."""
+        profile_dir = tmp_path / ".storage" / "med_expert_logs" / "p1"
+        profile_dir.mkdir(parents=True)
+        (profile_dir / "00000001.jsonl").write_text(
+            json.dumps(log_journal.COLUMNAR_HEADER)
+            + "\n"
+            + json.dumps(_record(0))
+            + "\n",
+            encoding="utf-8",
+        )
+
+        journal = LogJournal(storage_hass, columnar=True)
+        await journal.async_append("p1", [_record(1)])
+
+        assert journal._active_counts["p1"] == 2
+        assert await LogJournal(storage_hass).async_load("p1") == [
+            _record(0),
+            _record(1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_store_migrates_log_format_both_ways(self, storage_hass, tmp_path):
+        """Test that the store rewrites logs when the format changes."""
+        profile_dir = tmp_path / ".storage" / "med_expert_logs" / "p1"
+        await LogJournal(storage_hass).async_append("p1", [_record(0), _record(1)])
+        data = {
+            "schema_version": ROW_LOGS_SCHEMA_VERSION,
+            "profiles": {"p1": {"profile_id": "p1"}},
+        }
+
+        def _header() -> str:
+            (segment,) = profile_dir.iterdir()
+            return segment.read_text(encoding="utf-8").splitlines()[0]
+
+        with patch.object(
+            MedExpertStore, "async_load", new_callable=AsyncMock
+        ) as mock_load:
+            mock_load.return_value = data
+            store = ProfileStore(storage_hass)
+            await store.async_load()
+            assert data["schema_version"] == CURRENT_SCHEMA_VERSION
+            assert json.loads(_header()) == log_journal.COLUMNAR_HEADER
+            assert await store.async_load_logs("p1") == [_record(0), _record(1)]
+
+            store = ProfileStore(storage_hass, compact_logs=False)
+            await store.async_load()
+            assert data["schema_version"] == ROW_LOGS_SCHEMA_VERSION
+            assert json.loads(_header()) == log_journal.COMPACTED_HEADER
+            assert await store.async_load_logs("p1") == [_record(0), _record(1)]
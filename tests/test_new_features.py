@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -12,9 +12,11 @@ from custom_components.med_expert.application.services import (
     MedicationService,
     RefillCommand,
     ReplaceInhalerCommand,
+    SetLogRetentionCommand,
     TakeCommand,
     UpdateMedicationCommand,
     UpdateNotificationSettingsCommand,
+    ValidationError,
 )
 from custom_components.med_expert.domain.models import (
     DosageForm,
@@ -22,6 +24,8 @@ from custom_components.med_expert.domain.models import (
     InhalerTracking,
     InjectionSite,
     Inventory,
+    LogAction,
+    LogRecord,
     NotificationSettings,
     Profile,
     ScheduleKind,
@@ -391,6 +395,217 @@ class TestAdherenceStats:
         # Should have a streak
         assert profile.adherence_stats.current_streak >= 0
 
+    def _add_medication(self, service: MedicationService, profile: Profile) -> str:
+        """Add a scheduled medication and return its ID."""
+        return service.add_medication(
+            profile,
+            AddMedicationCommand(
+                display_name="Aspirin",
+                schedule_kind=ScheduleKind.TIMES_PER_DAY,
+                times=["08:00"],
+                default_dose={"numerator": 1, "denominator": 1, "unit": "tablet"},
+            ),
+        ).medication_id
+
+    def test_incremental_matches_rebuild(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that counters updated per record match a full rebuild."""
+        medication_id = self._add_medication(service, profile)
+        service.calculate_adherence_stats(profile)
+        tracker = profile.adherence_tracker
+
+        actions = [LogAction.TAKEN, LogAction.SKIPPED, LogAction.MISSED]
+        for days_back in range(40):
+            profile.add_log(
+                LogRecord(
+                    action=actions[days_back % 3],
+                    taken_at=fixed_now - timedelta(days=days_back),
+                    medication_id=medication_id,
+                    slot_key="08:00",
+                )
+            )
+        incremental = service.calculate_adherence_stats(profile).to_dict()
+
+        # Counters were updated in place, not rebuilt
+        assert profile.adherence_tracker is tracker
+
+        rebuilt = Profile.from_dict(profile.to_dict())
+        rebuilt_stats = service.calculate_adherence_stats(rebuilt).to_dict()
+        assert rebuilt_stats == incremental
+        assert rebuilt.logs.materialized_count == 0
+
+        # 30 days including today: 10 taken, 10 skipped, 10 missed
+        assert incremental["total_taken"] == 10
+        assert incremental["total_skipped"] == 10
+        assert incremental["total_missed"] == 10
+        assert incremental["monthly_rate"] == 33.3
+        assert incremental["daily_rate"] == 100.0
+        assert incremental["most_missed_slot"] == "08:00"
+        assert incremental["most_missed_medication_id"] == medication_id
+
+    def test_streak_updates_incrementally(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that back-dated records join the current streak."""
+        medication_id = self._add_medication(service, profile)
+        for days_back in (0, 1, 3, 4):
+            service.take(
+                profile,
+                TakeCommand(
+                    medication_id=medication_id,
+                    taken_at=fixed_now - timedelta(days=days_back),
+                ),
+            )
+        stats = service.calculate_adherence_stats(profile)
+        assert stats.current_streak == 2
+        assert stats.last_streak_date == fixed_now.date()
+
+        # Filling the gap joins the earlier run
+        service.take(
+            profile,
+            TakeCommand(
+                medication_id=medication_id,
+                taken_at=fixed_now - timedelta(days=2),
+            ),
+        )
+        stats = service.calculate_adherence_stats(profile)
+        assert stats.current_streak == 5
+        assert stats.longest_streak == 5
+
+    def test_streak_requires_dose_today(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that the streak is broken when nothing was taken today."""
+        medication_id = self._add_medication(service, profile)
+        service.take(
+            profile,
+            TakeCommand(
+                medication_id=medication_id,
+                taken_at=fixed_now - timedelta(days=1),
+            ),
+        )
+
+        stats = service.calculate_adherence_stats(profile)
+
+        assert stats.current_streak == 0
+        assert stats.last_streak_date == (fixed_now - timedelta(days=1)).date()
+
+
+class TestLogRetention:
+    """Tests for archiving logs into daily aggregates."""
+
+    def _add_taken_days(
+        self,
+        service: MedicationService,
+        profile: Profile,
+        fixed_now: datetime,
+        days: int,
+    ) -> str:
+        """Take a medication once a day for the given number of days."""
+        medication = service.add_medication(
+            profile,
+            AddMedicationCommand(
+                display_name="Aspirin",
+                schedule_kind=ScheduleKind.TIMES_PER_DAY,
+                times=["08:00"],
+                default_dose={"numerator": 1, "denominator": 2, "unit": "tablet"},
+            ),
+        )
+        for days_back in range(days):
+            service.take(
+                profile,
+                TakeCommand(
+                    medication_id=medication.medication_id,
+                    taken_at=fixed_now - timedelta(days=days_back),
+                ),
+            )
+        return medication.medication_id
+
+    def test_no_retention_keeps_logs(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that profiles without retention never archive."""
+        self._add_taken_days(service, profile, fixed_now, 10)
+
+        assert service.apply_log_retention(profile) == []
+        assert len(profile.logs) == 10
+        assert profile.log_aggregates == {}
+
+    def test_archives_old_logs_into_daily_aggregates(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that logs outside the window are rolled up per day and slot."""
+        medication_id = self._add_taken_days(service, profile, fixed_now, 10)
+        service.set_log_retention(profile, SetLogRetentionCommand(retention_days=3))
+
+        archived = service.apply_log_retention(profile)
+
+        # Today and the 3 days before stay raw
+        assert len(profile.logs) == 4
+        assert len(archived) == 6
+        assert len(profile.log_aggregates) == 6
+        assert profile.logs_archived_before == datetime(
+            2025, 1, 12, tzinfo=ZoneInfo("UTC")
+        )
+        aggregate = next(iter(profile.log_aggregates.values()))
+        assert aggregate.medication_id == medication_id
+        assert aggregate.taken == 1
+        assert aggregate.dose_total == 0.5
+        assert aggregate.dose_unit == "tablet"
+
+        # Running again archives nothing new
+        assert service.apply_log_retention(profile) == []
+
+    def test_adherence_and_streak_include_aggregates(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that long-window stats are unchanged by archiving."""
+        self._add_taken_days(service, profile, fixed_now, 10)
+        profile.add_log(
+            LogRecord(
+                action=LogAction.MISSED,
+                taken_at=fixed_now - timedelta(days=20),
+                medication_id=profile.logs[0].medication_id,
+                slot_key="08:00",
+            )
+        )
+        before = service.calculate_adherence_stats(profile).to_dict()
+
+        service.set_log_retention(profile, SetLogRetentionCommand(retention_days=2))
+        service.apply_log_retention(profile)
+        after = service.calculate_adherence_stats(profile).to_dict()
+
+        assert len(profile.logs) == 3
+        for key in (
+            "total_taken",
+            "total_missed",
+            "current_streak",
+            "most_missed_slot",
+            "most_missed_medication_id",
+        ):
+            assert after[key] == before[key]
+        assert after["current_streak"] == 10
+
+    def test_aggregates_roundtrip(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that aggregates survive serialization."""
+        self._add_taken_days(service, profile, fixed_now, 5)
+        service.set_log_retention(profile, SetLogRetentionCommand(retention_days=1))
+        service.apply_log_retention(profile)
+
+        restored = Profile.from_dict(profile.to_dict())
+
+        assert restored.log_retention_days == 1
+        assert restored.log_aggregates == profile.log_aggregates
+        assert restored.logs_archived_before == profile.logs_archived_before
+
+    def test_invalid_retention(self, service: MedicationService, profile: Profile):
+        """Test that a retention below one day is rejected."""
+        with pytest.raises(ValidationError):
+            service.set_log_retention(profile, SetLogRetentionCommand(retention_days=0))
+
 
 class TestUpdateMedicationForm:
     """Tests for updating medication form."""
@@ -9,14 +9,21 @@ Tests cover:
 - Snooze behavior
 - Missed doses after grace period
 - DST transitions (spring forward, fall back)
+- Range expansion of occurrences
+- Compiled schedules
+- Closed-form interval occurrences against the stepping loop
+- Bisect slot lookup against scanning every slot
 """
 
-from datetime import date, datetime
+import random
+from datetime import UTC, date, datetime, time, timedelta
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
 
 import pytest
 
 from custom_components.med_expert.domain.models import (
+    CompiledSchedule,
     DoseQuantity,
     MedicationStatus,
     ReminderPolicy,
@@ -26,6 +33,7 @@ from custom_components.med_expert.domain.models import (
 from custom_components.med_expert.domain.schedule import (
     compute_effective_next_due,
     compute_next_occurrence,
+    compute_occurrences,
     is_in_quiet_hours,
 )
 
@@ -582,10 +590,13 @@ class TestDST:
             policy=default_policy,
         )
 
-        # Should skip the non-existent 2:30 and get 8:00
+        # The non-existent 2:30 is shifted forward past the gap
         assert occurrence is not None
-        # The 2:30 time during spring forward will be adjusted
-        assert occurrence.scheduled_for.hour in (2, 3, 8)
+        assert (occurrence.scheduled_for.hour, occurrence.scheduled_for.minute) == (
+            3,
+            30,
+        )
+        assert occurrence.scheduled_for.utcoffset() == timedelta(hours=2)
 
     def test_fall_back(
         self, berlin_tz: str, default_policy: ReminderPolicy, tablet_dose: DoseQuantity
@@ -680,3 +691,502 @@ class TestQuietHours:
         # 08:00 - should not be in quiet hours
         now = datetime(2025, 1, 15, 8, 0, tzinfo=ZoneInfo(utc_tz))
         assert is_in_quiet_hours(now, utc_tz, policy) is False
+
+
+class TestComputeOccurrences:
+    """Tests for expanding a schedule over a time range."""
+
+    def test_times_per_day(self, berlin_tz: str, tablet_dose: DoseQuantity):
+        """Test expanding daily slots with slot-specific doses."""
+        half = DoseQuantity.normalize(1, 2, "tablet")
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["20:00", "08:00"],
+            slot_doses={"08:00": tablet_dose, "20:00": half},
+        )
+        tz = ZoneInfo(berlin_tz)
+
+        occurrences = compute_occurrences(
+            schedule,
+            datetime(2025, 1, 15, 9, 0, tzinfo=tz),
+            datetime(2025, 1, 17, 8, 0, tzinfo=tz),
+            berlin_tz,
+        )
+
+        assert [(o.scheduled_for.day, o.slot_key) for o in occurrences] == [
+            (15, "20:00"),
+            (16, "08:00"),
+            (16, "20:00"),
+        ]
+        assert [o.dose for o in occurrences] == [half, tablet_dose, half]
+
+    def test_weekly(self, utc_tz: str, tablet_dose: DoseQuantity):
+        """Test that only the scheduled weekdays are expanded."""
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.WEEKLY,
+            times=["09:00"],
+            weekdays=[0, 3],  # Monday, Thursday
+            default_dose=tablet_dose,
+        )
+        tz = ZoneInfo(utc_tz)
+
+        occurrences = compute_occurrences(
+            schedule,
+            datetime(2025, 1, 13, tzinfo=tz),  # Monday
+            datetime(2025, 1, 27, tzinfo=tz),
+            utc_tz,
+        )
+
+        assert [o.scheduled_for.date() for o in occurrences] == [
+            date(2025, 1, 13),
+            date(2025, 1, 16),
+            date(2025, 1, 20),
+            date(2025, 1, 23),
+        ]
+        assert occurrences[1].slot_key == "W3-09:00"
+
+    def test_interval_from_anchor(self, utc_tz: str, tablet_dose: DoseQuantity):
+        """Test that interval doses follow the anchor."""
+        tz = ZoneInfo(utc_tz)
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.INTERVAL,
+            interval_minutes=480,
+            anchor=datetime(2025, 1, 10, 6, 0, tzinfo=tz),
+            default_dose=tablet_dose,
+        )
+
+        occurrences = compute_occurrences(
+            schedule,
+            datetime(2025, 1, 15, 7, 0, tzinfo=tz),
+            datetime(2025, 1, 16, 7, 0, tzinfo=tz),
+            utc_tz,
+        )
+
+        assert [o.scheduled_for.hour for o in occurrences] == [14, 22, 6]
+
+    def test_depot(self, utc_tz: str, tablet_dose: DoseQuantity):
+        """Test that depot schedules expand from their start date."""
+        tz = ZoneInfo(utc_tz)
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.DEPOT,
+            interval_minutes=28 * 24 * 60,
+            start_date=date(2025, 1, 1),
+            default_dose=tablet_dose,
+        )
+
+        occurrences = compute_occurrences(
+            schedule,
+            datetime(2025, 1, 1, tzinfo=tz),
+            datetime(2025, 4, 1, tzinfo=tz),
+            utc_tz,
+        )
+
+        assert [o.scheduled_for.date() for o in occurrences] == [
+            date(2025, 1, 29),
+            date(2025, 2, 26),
+            date(2025, 3, 26),
+        ]
+
+    def test_respects_date_range(self, utc_tz: str, tablet_dose: DoseQuantity):
+        """Test that days outside start_date and end_date are left out."""
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["08:00"],
+            start_date=date(2025, 1, 16),
+            end_date=date(2025, 1, 18),
+            default_dose=tablet_dose,
+        )
+        tz = ZoneInfo(utc_tz)
+
+        occurrences = compute_occurrences(
+            schedule,
+            datetime(2025, 1, 10, tzinfo=tz),
+            datetime(2025, 1, 25, tzinfo=tz),
+            utc_tz,
+        )
+
+        assert [o.scheduled_for.day for o in occurrences] == [16, 17, 18]
+
+    def test_as_needed_is_empty(self, utc_tz: str):
+        """Test that PRN schedules have no occurrences."""
+        tz = ZoneInfo(utc_tz)
+
+        assert (
+            compute_occurrences(
+                ScheduleSpec(kind=ScheduleKind.AS_NEEDED),
+                datetime(2025, 1, 1, tzinfo=tz),
+                datetime(2025, 2, 1, tzinfo=tz),
+                utc_tz,
+            )
+            == []
+        )
+
+    def test_matches_next_occurrence(
+        self, berlin_tz: str, default_policy: ReminderPolicy, tablet_dose: DoseQuantity
+    ):
+        """Test that expansion agrees with repeated next-occurrence lookups."""
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.WEEKLY,
+            times=["02:30", "08:00"],
+            weekdays=[6],  # Sunday, across the spring DST change
+            default_dose=tablet_dose,
+        )
+        tz = ZoneInfo(berlin_tz)
+        start = datetime(2025, 3, 20, tzinfo=tz)
+        end = datetime(2025, 4, 10, tzinfo=tz)
+
+        expected = []
+        now = start
+        while True:
+            occurrence, _ = compute_next_occurrence(
+                timezone=berlin_tz,
+                schedule=schedule,
+                now=now,
+                last_taken=None,
+                snooze_until=None,
+                policy=default_policy,
+            )
+            if occurrence is None or occurrence.scheduled_for >= end:
+                break
+            expected.append(occurrence)
+            now = occurrence.scheduled_for + timedelta(minutes=1)
+
+        assert compute_occurrences(schedule, start, end, berlin_tz) == expected
+
+    @pytest.mark.parametrize(
+        "kind", [ScheduleKind.TIMES_PER_DAY, ScheduleKind.INTERVAL]
+    )
+    def test_fallback_matches(
+        self, berlin_tz: str, tablet_dose: DoseQuantity, kind: ScheduleKind
+    ):
+        """Test that the pure-Python expansion gives the same result."""
+        tz = ZoneInfo(berlin_tz)
+        schedule = ScheduleSpec(
+            kind=kind,
+            times=["07:15", "19:45"],
+            interval_minutes=390,
+            anchor=datetime(2025, 3, 1, 7, 0, 30, tzinfo=tz),
+            default_dose=tablet_dose,
+        )
+        start = datetime(2025, 3, 1, tzinfo=tz)
+        end = datetime(2025, 5, 1, tzinfo=tz)
+
+        occurrences = compute_occurrences(schedule, start, end, berlin_tz)
+        with patch("custom_components.med_expert.domain.schedule.np", None):
+            fallback = compute_occurrences(schedule, start, end, berlin_tz)
+
+        assert occurrences
+        assert fallback == occurrences
+
+
+class TestCompiledSchedule:
+    """Tests for schedules compiled ahead of occurrence computation."""
+
+    def test_compile(self, berlin_tz: str, tablet_dose: DoseQuantity):
+        """Test that slots are parsed, sorted and resolved to doses."""
+        half = DoseQuantity.normalize(1, 2, "tablet")
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.WEEKLY,
+            times=["20:00", "08:00"],
+            weekdays=[4, 0],
+            slot_doses={"W4-20:00": half},
+            default_dose=tablet_dose,
+        )
+
+        compiled = CompiledSchedule.compile(schedule, berlin_tz)
+
+        assert [time_str for _, time_str in compiled.times] == ["08:00", "20:00"]
+        assert compiled.tz == ZoneInfo(berlin_tz)
+        assert compiled.has_weekday(0)
+        assert compiled.has_weekday(4)
+        assert not compiled.has_weekday(2)
+        assert compiled.dose_for_slot("W4-20:00") == half
+        assert compiled.dose_for_slot("W0-08:00") == tablet_dose
+
+    def test_compiled_matches_spec(
+        self, berlin_tz: str, default_policy: ReminderPolicy, tablet_dose: DoseQuantity
+    ):
+        """Test that a cached compiled schedule gives the same occurrence."""
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["20:00", "08:00"],
+            default_dose=tablet_dose,
+        )
+        compiled = CompiledSchedule.compile(schedule, berlin_tz)
+        now = datetime(2025, 1, 15, 9, 0, tzinfo=ZoneInfo(berlin_tz))
+        kwargs = {
+            "timezone": berlin_tz,
+            "schedule": schedule,
+            "now": now,
+            "last_taken": None,
+            "snooze_until": None,
+            "policy": default_policy,
+        }
+
+        assert compute_next_occurrence(
+            **kwargs, compiled=compiled
+        ) == compute_next_occurrence(**kwargs)
+
+
+def _interval_by_stepping(
+    schedule: ScheduleSpec, timezone: str, now: datetime, last_taken: datetime | None
+) -> datetime | None:
+    """Compute the pending interval dose by stepping from the anchor."""
+    tz = ZoneInfo(timezone)
+    interval = timedelta(minutes=schedule.interval_minutes)
+    if last_taken:
+        anchor = last_taken.astimezone(tz)
+    elif schedule.anchor:
+        anchor = schedule.anchor.astimezone(tz)
+    else:
+        anchor = datetime.combine(now.astimezone(tz).date(), time(0, 0), tzinfo=tz)
+
+    next_due = anchor + interval
+    now_local = now.astimezone(tz)
+    while next_due <= now_local:
+        next_after = next_due + interval
+        if next_after > now_local:
+            break
+        next_due = next_after
+    return next_due
+
+
+class TestIntervalClosedForm:
+    """Property tests for the closed-form interval computation."""
+
+    @pytest.mark.parametrize("seed", range(8))
+    @pytest.mark.parametrize(
+        "timezone", ["Europe/Berlin", "America/New_York", "Australia/Lord_Howe"]
+    )
+    def test_matches_stepping(
+        self,
+        seed: int,
+        timezone: str,
+        default_policy: ReminderPolicy,
+        tablet_dose: DoseQuantity,
+    ):
+        """Test random anchors, intervals and times against the loop."""
+        rng = random.Random(seed)  # noqa: S311
+        tz = ZoneInfo(timezone)
+        # Anchors around the spring and autumn DST changes of both hemispheres
+        base = datetime(2025, rng.choice([3, 4, 10, 11]), 1, tzinfo=tz)
+
+        for _ in range(25):
+            anchor = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 40))
+            anchor = anchor.replace(second=rng.choice([0, 0, 17]))
+            interval_minutes = rng.choice([15, 45, 90, 360, 480, 1440, 2880, 10080])
+            now = anchor + timedelta(minutes=rng.randrange(-600, 60 * 24 * 60))
+            last_taken = None
+            if rng.random() < 0.3:
+                last_taken = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 3))
+            schedule = ScheduleSpec(
+                kind=ScheduleKind.INTERVAL,
+                interval_minutes=interval_minutes,
+                anchor=anchor,
+                default_dose=tablet_dose,
+            )
+
+            occurrence, _ = compute_next_occurrence(
+                timezone=timezone,
+                schedule=schedule,
+                now=now,
+                last_taken=last_taken,
+                snooze_until=None,
+                policy=default_policy,
+            )
+
+            expected = _interval_by_stepping(schedule, timezone, now, last_taken)
+            assert occurrence is not None
+            assert occurrence.scheduled_for == expected
+            assert occurrence.scheduled_for.utcoffset() == expected.utcoffset()
+
+    def test_old_anchor(
+        self, utc_tz: str, default_policy: ReminderPolicy, tablet_dose: DoseQuantity
+    ):
+        """Test that a years-old anchor with a short interval is exact."""
+        tz = ZoneInfo(utc_tz)
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.INTERVAL,
+            interval_minutes=15,
+            anchor=datetime(2015, 1, 1, 0, 5, tzinfo=tz),
+            default_dose=tablet_dose,
+        )
+
+        occurrence, status = compute_next_occurrence(
+            timezone=utc_tz,
+            schedule=schedule,
+            now=datetime(2025, 1, 15, 10, 12, tzinfo=tz),
+            last_taken=None,
+            snooze_until=None,
+            policy=default_policy,
+        )
+
+        assert occurrence is not None
+        assert occurrence.scheduled_for == datetime(2025, 1, 15, 10, 5, tzinfo=tz)
+        assert status == MedicationStatus.DUE
+
+
+def _slot_by_scanning(
+    schedule: ScheduleSpec, timezone: str, now: datetime, last_taken: datetime | None
+) -> tuple[datetime, str] | None:
+    """Find the active slot by scanning every slot of every day."""
+    tz = ZoneInfo(timezone)
+    now_local = now.astimezone(tz)
+    today = now_local.date()
+    weekly = schedule.kind == ScheduleKind.WEEKLY
+
+    def taken(scheduled: datetime) -> bool:
+        if last_taken is None:
+            return False
+        last_local = last_taken.astimezone(tz)
+        if last_local.date() != scheduled.date():
+            return False
+        return abs((last_local - scheduled).total_seconds()) < 3600
+
+    def in_range(day: date) -> bool:
+        if schedule.start_date and day < schedule.start_date:
+            return False
+        return not (schedule.end_date and day > schedule.end_date)
+
+    def slots(day: date) -> list[tuple[datetime, str]]:
+        result = []
+        for time_str in sorted(schedule.times):
+            key = f"W{day.weekday()}-{time_str}" if weekly else time_str
+            if schedule.get_dose_for_slot(key) is None:
+                continue
+            hour, minute = map(int, time_str.split(":"))
+            result.append((datetime.combine(day, time(hour, minute), tzinfo=tz), key))
+        return result
+
+    if not weekly and in_range(today):
+        for scheduled, key in slots(today):
+            if scheduled <= now_local and not taken(scheduled):
+                return scheduled, key
+
+    for day_offset in range(14 if weekly else 7):
+        day = today + timedelta(days=day_offset)
+        if weekly and day.weekday() not in schedule.weekdays:
+            continue
+        if schedule.start_date and day < schedule.start_date:
+            continue
+        if schedule.end_date and day > schedule.end_date:
+            return None
+        for scheduled, key in slots(day):
+            if scheduled > now_local and not taken(scheduled):
+                return scheduled, key
+    return None
+
+
+class TestSlotLookup:
+    """Property tests for the bisect slot lookup."""
+
+    @pytest.mark.parametrize("seed", range(8))
+    @pytest.mark.parametrize("kind", [ScheduleKind.TIMES_PER_DAY, ScheduleKind.WEEKLY])
+    def test_matches_scanning(
+        self,
+        seed: int,
+        kind: ScheduleKind,
+        berlin_tz: str,
+        default_policy: ReminderPolicy,
+        tablet_dose: DoseQuantity,
+    ):
+        """Test random schedules, times and last doses against a full scan."""
+        rng = random.Random(seed)  # noqa: S311
+        tz = ZoneInfo(berlin_tz)
+
+        for _ in range(40):
+            step = rng.choice([15, 60, 170, 480])
+            first_minute = rng.randrange(step)
+            times = [
+                f"{minute // 60:02d}:{minute % 60:02d}"
+                for minute in range(first_minute, 24 * 60, step)
+                if rng.random() < 0.8
+            ] or ["08:00"]
+            weekdays = sorted(rng.sample(range(7), rng.randint(1, 7)))
+            slot_doses = {
+                (
+                    f"W{weekdays[0]}-{time_str}"
+                    if kind == ScheduleKind.WEEKLY
+                    else time_str
+                ): DoseQuantity.normalize(1, 2, "tablet")
+                for time_str in rng.sample(times, min(2, len(times)))
+            }
+            # Around the spring and autumn DST changes
+            now = datetime(2025, rng.choice([3, 10]), 24, tzinfo=tz) + timedelta(
+                minutes=rng.randrange(0, 60 * 24 * 10), seconds=rng.choice([0, 30])
+            )
+            last_taken = None
+            if rng.random() < 0.7:
+                last_taken = now + timedelta(minutes=rng.randrange(-600, 120))
+            schedule = ScheduleSpec(
+                kind=kind,
+                times=times,
+                weekdays=weekdays,
+                start_date=now.date() + timedelta(days=rng.choice([-3, 0, 2])),
+                end_date=now.date() + timedelta(days=rng.choice([0, 4, 30])),
+                slot_doses=slot_doses,
+                default_dose=tablet_dose if rng.random() < 0.9 else None,
+            )
+
+            occurrence, _ = compute_next_occurrence(
+                timezone=berlin_tz,
+                schedule=schedule,
+                now=now,
+                last_taken=last_taken,
+                snooze_until=None,
+                policy=default_policy,
+            )
+
+            if schedule.start_date > now.date() or schedule.end_date < now.date():
+                expected = None
+            else:
+                expected = _slot_by_scanning(schedule, berlin_tz, now, last_taken)
+            if expected is None:
+                assert occurrence is None
+            else:
+                assert occurrence is not None
+                assert (occurrence.scheduled_for, occurrence.slot_key) == expected
+                assert occurrence.dose == schedule.get_dose_for_slot(expected[1])
+
+    @pytest.mark.parametrize(
+        ("last_taken_time", "expected"),
+        [
+            (
+                time(7, 0),
+                datetime(2025, 1, 15, 8, 0, tzinfo=UTC),
+            ),  # an hour before: not taken
+            (time(7, 0, 1), datetime(2025, 1, 15, 9, 0, tzinfo=UTC)),
+            (time(8, 59, 59), datetime(2025, 1, 16, 8, 0, tzinfo=UTC)),  # both taken
+            (
+                time(9, 0),
+                datetime(2025, 1, 15, 8, 0, tzinfo=UTC),
+            ),  # an hour after: not taken
+        ],
+    )
+    def test_taken_window_bounds(
+        self,
+        utc_tz: str,
+        default_policy: ReminderPolicy,
+        tablet_dose: DoseQuantity,
+        last_taken_time: time,
+        expected: datetime,
+    ):
+        """Test that the taken window excludes slots exactly an hour away."""
+        tz = ZoneInfo(utc_tz)
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["08:00", "09:00"],
+            default_dose=tablet_dose,
+        )
+
+        occurrence, _ = compute_next_occurrence(
+            timezone=utc_tz,
+            schedule=schedule,
+            now=datetime(2025, 1, 15, 9, 30, tzinfo=tz),
+            last_taken=datetime.combine(date(2025, 1, 15), last_taken_time, tz),
+            snooze_until=None,
+            policy=default_policy,
+        )
+
+        assert occurrence is not None
+        assert occurrence.scheduled_for == expected
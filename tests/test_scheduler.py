@@ -0,0 +1,375 @@
+"""Tests for the medication scheduler and the shared reminder timer."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.med_expert.const import (
+    NOTIFICATION_ACTION_SNOOZE_ALL,
+    NOTIFICATION_ACTION_TAKE_ALL,
+)
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    Medication,
+    MedicationStatus,
+    NotificationSettings,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+from custom_components.med_expert.runtime.manager import ProfileManager
+from custom_components.med_expert.runtime.notifications import NotificationManager
+from custom_components.med_expert.runtime.scheduler import (
+    BATCH_WINDOW,
+    EVENT_DUE,
+    EVENT_MISSED,
+    MedicationScheduler,
+    ReminderTimer,
+)
+
+NOW = datetime.now(UTC)
+
+
+def _profile(name: str, hours: tuple[int, ...] = (2, 1, 3)) -> Profile:
+    """Create a profile with medications due the given hours from now."""
+    profile = Profile.create(name=name, timezone="UTC")
+    for hour in hours:
+        medication = Medication.create(
+            display_name=f"Med {hour}",
+            schedule=ScheduleSpec(
+                kind=ScheduleKind.TIMES_PER_DAY,
+                times=["08:00"],
+                default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+            ),
+        )
+        medication.medication_id = f"med-{hour}"
+        medication.state.next_due = NOW + timedelta(hours=hour)
+        profile.add_medication(medication)
+    return profile
+
+
+@pytest.fixture
+def profile() -> Profile:
+    """Create a profile with three medications due in 1, 2 and 3 hours."""
+    return _profile("Test")
+
+
+@pytest.fixture
+def track():
+    """Patch the point-in-time tracker, returning a new cancel mock per call."""
+    with patch(
+        "custom_components.med_expert.runtime.scheduler.async_track_point_in_time",
+        side_effect=lambda *_: MagicMock(),
+    ) as mock_track:
+        yield mock_track
+
+
+@pytest.fixture
+def tasks() -> list:
+    """Coroutines passed to hass.async_create_task."""
+    return []
+
+
+@pytest.fixture
+def timer(tasks: list) -> ReminderTimer:
+    """Create a timer whose hass collects created tasks."""
+    hass = MagicMock()
+    hass.async_create_task.side_effect = tasks.append
+    return ReminderTimer(hass)
+
+
+def _scheduler(profile: Profile, timer: ReminderTimer) -> MedicationScheduler:
+    """Create a scheduler for a profile on a timer."""
+    return MedicationScheduler(timer._hass, profile, on_due=AsyncMock(), timer=timer)
+
+
+class TestSchedulerQueue:
+    """Tests for the single-timer event queue."""
+
+    def test_single_timer_for_earliest_event(
+        self, profile: Profile, timer: ReminderTimer, track
+    ):
+        """Test that only the earliest event of the profile has a timer."""
+        scheduler = _scheduler(profile, timer)
+
+        scheduler.schedule_all()
+
+        assert scheduler.pending_count == 3
+        assert timer.next_event_at == profile.medications["med-1"].state.next_due
+        # Armed for med-2, then re-armed for the earlier med-1; med-3 is later
+        assert [call.args[2] for call in track.call_args_list] == [
+            profile.medications["med-2"].state.next_due,
+            profile.medications["med-1"].state.next_due,
+        ]
+
+    def test_reschedule_rearms_and_skips_stale_entries(
+        self, profile: Profile, timer: ReminderTimer, tasks: list, track
+    ):
+        """Test that a rescheduled event replaces its older queue entry."""
+        scheduler = _scheduler(profile, timer)
+        scheduler.schedule_all()
+        medication = profile.medications["med-1"]
+
+        medication.state.next_due += timedelta(hours=5)
+        scheduler.reschedule_medication(medication)
+
+        assert scheduler.pending_count == 3
+        assert timer.next_event_at == profile.medications["med-2"].state.next_due
+
+        timer._run_due(medication.state.next_due - timedelta(hours=1))
+
+        # med-2 and med-3 ran in one task; the stale med-1 entry did not
+        assert len(tasks) == 1
+        assert scheduler.pending_count == 1
+        assert scheduler.is_scheduled(EVENT_DUE, "med-1")
+        assert timer.next_event_at == medication.state.next_due
+        tasks[0].close()
+
+    @pytest.mark.asyncio
+    async def test_due_event_runs_handler(
+        self, profile: Profile, timer: ReminderTimer, tasks: list, track
+    ):
+        """Test that a due event calls the due callback."""
+        scheduler = _scheduler(profile, timer)
+        scheduler.schedule_all()
+
+        timer._run_due(profile.medications["med-1"].state.next_due)
+        assert len(tasks) == 1
+        with patch(
+            "custom_components.med_expert.runtime.scheduler.is_in_quiet_hours",
+            return_value=False,
+        ):
+            await tasks[0]
+
+        scheduler._on_due.assert_awaited_once_with(profile.profile_id, "med-1")
+        assert scheduler.is_scheduled(EVENT_MISSED, "med-1")
+
+    def test_reschedule_cancels_missed_check(
+        self, profile: Profile, timer: ReminderTimer, track
+    ):
+        """Test that rescheduling drops the pending missed check."""
+        scheduler = _scheduler(profile, timer)
+        medication = profile.medications["med-1"]
+        medication.state.status = MedicationStatus.DUE
+        scheduler.schedule_all()
+        scheduler._schedule_missed_check(medication)
+        assert scheduler.is_scheduled(EVENT_MISSED, "med-1")
+
+        scheduler.reschedule_medication(medication)
+
+        assert not scheduler.is_scheduled(EVENT_MISSED, "med-1")
+        assert scheduler.is_scheduled(EVENT_DUE, "med-1")
+
+    def test_cancel_all_cancels_timer(self, profile: Profile, track):
+        """Test that cancelling everything cancels the armed timer."""
+        cancel = MagicMock()
+        track.side_effect = lambda *_: cancel
+        scheduler = MedicationScheduler(MagicMock(), profile, on_due=AsyncMock())
+        scheduler.schedule_all()
+
+        scheduler.cancel_all()
+
+        assert scheduler.pending_count == 0
+        assert scheduler.timer.next_event_at is None
+        cancel.assert_called()
+
+
+class TestSharedTimer:
+    """Tests for the timer shared by all profiles."""
+
+    def test_one_timer_for_all_profiles(self, timer: ReminderTimer, track):
+        """Test that profiles share one armed timer and count their events."""
+        first = _profile("First", (2, 3))
+        second = _profile("Second", (1,))
+
+        _scheduler(first, timer).schedule_all()
+        _scheduler(second, timer).schedule_all()
+
+        assert timer.next_event_at == second.medications["med-1"].state.next_due
+        assert timer.pending_counts() == {first.profile_id: 2, second.profile_id: 1}
+        # Armed for the first profile, re-armed once for the earlier event
+        assert track.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_same_instant_events_dispatch_in_one_task(
+        self, timer: ReminderTimer, tasks: list, track
+    ):
+        """Test that events due together are handled by one task."""
+        first = _profile("First", (1,))
+        second = _profile("Second", (1,))
+        first_scheduler = _scheduler(first, timer)
+        second_scheduler = _scheduler(second, timer)
+        first_scheduler.schedule_all()
+        second_scheduler.schedule_all()
+
+        timer._run_due(NOW + timedelta(hours=1))
+        assert len(tasks) == 1
+        with patch(
+            "custom_components.med_expert.runtime.scheduler.is_in_quiet_hours",
+            return_value=False,
+        ):
+            await tasks[0]
+
+        first_scheduler._on_due.assert_awaited_once_with(first.profile_id, "med-1")
+        second_scheduler._on_due.assert_awaited_once_with(second.profile_id, "med-1")
+
+    def test_cancel_all_of_profile_keeps_others(self, timer: ReminderTimer, track):
+        """Test that stopping one profile leaves the others scheduled."""
+        first = _profile("First", (1,))
+        second = _profile("Second", (2,))
+        first_scheduler = _scheduler(first, timer)
+        first_scheduler.schedule_all()
+        _scheduler(second, timer).schedule_all()
+
+        first_scheduler.cancel_all()
+
+        assert timer.pending_counts() == {second.profile_id: 1}
+        assert timer.next_event_at == second.medications["med-2"].state.next_due
+
+
+class TestDueBatch:
+    """Tests for medications due in the same slot."""
+
+    @pytest.mark.asyncio
+    async def test_same_slot_due_in_one_batch(
+        self, timer: ReminderTimer, tasks: list, track
+    ):
+        """Test that medications due together reach the batch callback once."""
+        profile = _profile("Test", (1, 1, 2))
+        profile.medications["med-2"].state.next_due = (
+            NOW + timedelta(hours=1) + BATCH_WINDOW / 2
+        )
+        on_due_batch = AsyncMock()
+        scheduler = MedicationScheduler(
+            timer._hass,
+            profile,
+            on_due=AsyncMock(),
+            timer=timer,
+            on_due_batch=on_due_batch,
+        )
+        scheduler.schedule_all()
+        # The timer waits for the last medication due in the window
+        assert timer.next_event_at == profile.medications["med-2"].state.next_due
+
+        timer._run_due(timer.next_event_at)
+        assert len(tasks) == 1
+        with patch(
+            "custom_components.med_expert.runtime.scheduler.is_in_quiet_hours",
+            return_value=False,
+        ):
+            await tasks[0]
+
+        on_due_batch.assert_awaited_once()
+        profile_id, medication_ids = on_due_batch.call_args.args
+        assert profile_id == profile.profile_id
+        assert sorted(medication_ids) == ["med-1", "med-2"]
+        scheduler._on_due.assert_not_awaited()
+        assert scheduler.is_scheduled(EVENT_MISSED, "med-2")
+
+    def test_events_are_not_pulled_forward(
+        self, timer: ReminderTimer, tasks: list, track
+    ):
+        """Test that a missed check just after a due event does not fire early."""
+        due_at = NOW + timedelta(hours=1)
+        timer.push("p1", EVENT_DUE, "med-1", due_at, AsyncMock())
+        timer.push("p1", EVENT_MISSED, "med-2", due_at + BATCH_WINDOW / 2, AsyncMock())
+        assert timer.next_event_at == due_at
+
+        timer._run_due(due_at)
+
+        assert len(tasks) == 1
+        assert timer.is_scheduled("p1", EVENT_MISSED, "med-2")
+        assert timer.next_event_at == due_at + BATCH_WINDOW / 2
+        tasks[0].close()
+
+    @pytest.mark.asyncio
+    async def test_batch_notification_tracks_members(self, profile: Profile):
+        """Test that a batch notification is dismissed with its last member."""
+        hass = MagicMock()
+        manager = NotificationManager(hass, "entry")
+        medications = [profile.medications["med-1"], profile.medications["med-2"]]
+
+        with (
+            patch(
+                "custom_components.med_expert.runtime.notifications.async_create_persistent"
+            ) as create,
+            patch(
+                "custom_components.med_expert.runtime.notifications.async_dismiss_persistent"
+            ) as dismiss,
+        ):
+            await manager.async_send_due_batch_notification(profile, medications)
+
+            create.assert_called_once()
+            notification_id = create.call_args.kwargs["notification_id"]
+            assert "Med 1" in create.call_args.args[1]
+            assert "Med 2" in create.call_args.args[1]
+            # Persistent IDs and notify tags share the med_expert_ prefix
+            tag = notification_id
+            assert manager.get_batch_medication_ids(tag) == ["med-1", "med-2"]
+
+            await manager.async_dismiss_notification("med-1")
+            assert manager.get_batch_medication_ids(tag) == ["med-2"]
+            assert notification_id not in [c.args[1] for c in dismiss.call_args_list]
+
+            await manager.async_dismiss_notification("med-2")
+            assert manager.get_batch_medication_ids(tag) == []
+            assert dismiss.call_args.args[1] == notification_id
+
+    @pytest.mark.asyncio
+    async def test_batch_notification_matches_single_layout(self, profile: Profile):
+        """Test that batch notifications use the single-dose payload and templates."""
+        hass = MagicMock()
+        hass.services.async_call = AsyncMock()
+        manager = NotificationManager(hass, "entry")
+        profile.notification_settings = NotificationSettings(
+            notify_target="mobile_app_phone",
+            title_template="Pills: {medication}",
+        )
+        medications = [profile.medications["med-1"], profile.medications["med-2"]]
+
+        await manager.async_send_due_batch_notification(profile, medications)
+        single = MagicMock()
+        single.services.async_call = AsyncMock()
+        await NotificationManager(single, "entry").async_send_due_notification(
+            profile, medications[0]
+        )
+
+        domain, service, payload = hass.services.async_call.call_args.args
+        assert (domain, service) == ("notify", "mobile_app_phone")
+        assert payload["title"] == "Pills: Med 1, Med 2"
+        assert payload["message"] == "Time to take Med 1, Med 2"
+        assert payload["tag"] == payload["data"]["tag"]
+        assert payload["group"] == f"med_expert_{profile.profile_id}"
+        assert payload["data"]["medication_ids"] == ["med-1", "med-2"]
+        assert [a["action"] for a in payload["data"]["actions"]] == [
+            NOTIFICATION_ACTION_TAKE_ALL,
+            NOTIFICATION_ACTION_SNOOZE_ALL,
+        ]
+        single_payload = single.services.async_call.call_args.args[2]
+        assert payload.keys() == single_payload.keys()
+        assert payload["data"].keys() - {"medication_ids"} == single_payload[
+            "data"
+        ].keys() - {"medication_id"}
+
+    @pytest.mark.asyncio
+    async def test_take_all_of_unknown_batch_is_ignored(self, profile: Profile):
+        """Test that a forgotten batch does not take unrelated medications."""
+        for medication in profile.medications.values():
+            medication.state.status = MedicationStatus.DUE
+        manager = ProfileManager(MagicMock(), "entry", profile, MagicMock())
+
+        with patch.object(manager, "async_take", new_callable=AsyncMock) as take:
+            await manager._handle_notification_action(
+                SimpleNamespace(
+                    data={
+                        "action": NOTIFICATION_ACTION_TAKE_ALL,
+                        "tag": "med_expert_entry_batch-0800",
+                    }
+                )
+            )
+
+        take.assert_not_awaited()
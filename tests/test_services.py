@@ -20,6 +20,7 @@ from custom_components.med_expert.application.services import (
 )
 from custom_components.med_expert.domain.models import (
     LogAction,
+    LogRecord,
     MedicationStatus,
     Profile,
     ScheduleKind,
@@ -518,6 +519,32 @@ class TestUpdateMedication:
         assert medication.display_name == "Aspirin 100mg"
         assert medication.ref.display_name == "Aspirin 100mg"
 
+    def test_update_schedule_recompiles(
+        self, service: MedicationService, profile: Profile
+    ):
+        """Test that a schedule update replaces the compiled schedule."""
+        command = AddMedicationCommand(
+            display_name="Aspirin",
+            schedule_kind=ScheduleKind.TIMES_PER_DAY,
+            times=["08:00"],
+            default_dose={"numerator": 1, "denominator": 1, "unit": "tablet"},
+        )
+        medication = service.add_medication(profile, command)
+        compiled = medication.compiled_schedule(profile.timezone)
+
+        service.update_medication(
+            profile,
+            UpdateMedicationCommand(
+                medication_id=medication.medication_id,
+                schedule_updates={"times": ["12:00", "18:00"]},
+            ),
+        )
+
+        recompiled = medication.compiled_schedule(profile.timezone)
+        assert recompiled is not compiled
+        assert [time_str for _, time_str in recompiled.times] == ["12:00", "18:00"]
+        assert medication.state.next_slot_key == "12:00"
+
     def test_update_not_found(self, service: MedicationService, profile: Profile):
         """Test update with non-existent medication."""
         with pytest.raises(MedicationNotFoundError):
@@ -555,3 +582,141 @@ class TestRemoveMedication:
         """Test removing non-existent medication returns None."""
         removed = service.remove_medication(profile, "non-existent")
         assert removed is None
+
+
+class TestMissedBackfill:
+    """Tests for logging doses missed while stopped."""
+
+    def _add(self, profile: Profile, kind: ScheduleKind, **kwargs: object) -> str:
+        """Add a medication on 2025-01-10, before the downtime."""
+        added = MedicationService(
+            get_now=lambda: datetime(2025, 1, 10, 7, 0, tzinfo=ZoneInfo("UTC"))
+        ).add_medication(
+            profile,
+            AddMedicationCommand(
+                display_name="Aspirin",
+                schedule_kind=kind,
+                default_dose={"numerator": 1, "denominator": 1, "unit": "tablet"},
+                **kwargs,
+            ),
+        )
+        return added.medication_id
+
+    def test_logs_unhandled_slots(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that slots without a record are logged as missed, once."""
+        medication_id = self._add(
+            profile, ScheduleKind.TIMES_PER_DAY, times=["08:00", "20:00"]
+        )
+        # Taken on the first morning before the downtime
+        MedicationService(
+            get_now=lambda: datetime(2025, 1, 10, 8, 5, tzinfo=ZoneInfo("UTC"))
+        ).take(profile, TakeCommand(medication_id=medication_id))
+
+        missed = service.backfill_missed_doses(profile, timedelta(days=30))
+
+        # 10th 20:00 through 14th 20:00; fixed_now is the 15th at 10:00 and
+        # the 15th 08:00 is still pending
+        assert len(missed) == 9
+        assert all(log.action == LogAction.MISSED for log in missed)
+        assert missed[0].scheduled_for == datetime(
+            2025, 1, 10, 20, 0, tzinfo=ZoneInfo("UTC")
+        )
+        assert missed[-1].slot_key == "20:00"
+        assert profile.get_unsaved_logs()[-9:] == missed
+        _, _, missed_count = profile.adherence_tracker.counts(fixed_now.date(), 30)
+        assert missed_count == 9
+
+        # A second start finds nothing new
+        assert service.backfill_missed_doses(profile, timedelta(days=30)) == []
+
+    def test_window_and_grace_bound_the_backfill(
+        self, service: MedicationService, profile: Profile
+    ):
+        """Test that only the window is backfilled and doses in grace are not."""
+        self._add(profile, ScheduleKind.TIMES_PER_DAY, times=["09:45"])
+
+        missed = service.backfill_missed_doses(profile, timedelta(days=3))
+
+        # From the 12th at 10:00: the 15th at 09:45 is still within grace
+        assert [log.scheduled_for.day for log in missed] == [13, 14]
+
+    def test_interval_counts_from_pending_dose(
+        self, service: MedicationService, profile: Profile
+    ):
+        """Test that interval doses follow the stored pending dose."""
+        medication_id = self._add(
+            profile, ScheduleKind.INTERVAL, interval_minutes=24 * 60
+        )
+        medication = profile.medications[medication_id]
+        medication.state.next_due = datetime(2025, 1, 13, 6, 0, tzinfo=ZoneInfo("UTC"))
+
+        missed = service.backfill_missed_doses(profile, timedelta(days=7))
+
+        assert [log.scheduled_for.day for log in missed] == [13, 14, 15]
+
+    def test_pending_dose_is_not_logged(
+        self, service: MedicationService, profile: Profile, fixed_now: datetime
+    ):
+        """Test that a dose that can still be taken late is not backfilled."""
+        medication_id = self._add(profile, ScheduleKind.TIMES_PER_DAY, times=["08:00"])
+        medication = profile.medications[medication_id]
+        medication.state.next_due = fixed_now.replace(hour=8)
+        medication.state.status = MedicationStatus.MISSED
+
+        assert service.backfill_missed_doses(profile, timedelta(days=7)) == []
+
+        service.recompute_all_states(profile)
+        assert medication.state.next_due == fixed_now.replace(hour=8)
+
+    def test_reads_only_records_near_the_window(
+        self, service: MedicationService, profile: Profile
+    ):
+        """Test that records are matched without deserializing the history."""
+        medication_id = self._add(profile, ScheduleKind.TIMES_PER_DAY, times=["08:00"])
+        utc = ZoneInfo("UTC")
+        for day in [*range(1, 11), 13]:
+            scheduled_for = datetime(2025, 1, day, 8, 0, tzinfo=utc)
+            profile.add_log(
+                LogRecord(
+                    action=LogAction.TAKEN,
+                    taken_at=scheduled_for + timedelta(minutes=5),
+                    medication_id=medication_id,
+                    scheduled_for=scheduled_for,
+                    slot_key="08:00",
+                )
+            )
+        restored = Profile.from_dict(profile.to_dict())
+
+        missed = service.backfill_missed_doses(restored, timedelta(days=3))
+
+        # From the 12th at 10:00; the 13th was taken and the 15th is pending
+        assert [log.scheduled_for.day for log in missed] == [14]
+        assert restored.logs.materialized_count == len(missed)
+
+    def test_interval_steps_in_profile_timezone(self, service: MedicationService):
+        """Test that interval doses keep their wall-clock time across DST."""
+        berlin = ZoneInfo("Europe/Berlin")
+        profile = Profile.create(name="Test", timezone="Europe/Berlin")
+        medication_id = self._add(
+            profile, ScheduleKind.INTERVAL, interval_minutes=24 * 60
+        )
+        medication = profile.medications[medication_id]
+        # Stored with the fixed winter offset, as after a round-trip
+        medication.state.next_due = datetime.fromisoformat("2025-03-29T08:00:00+01:00")
+        medication.state.next_slot_key = "interval_1440"
+        service = MedicationService(
+            get_now=lambda: datetime(2025, 4, 1, 12, 0, tzinfo=berlin)
+        )
+
+        missed = service.backfill_missed_doses(profile, timedelta(days=7))
+
+        # 29th through 1st; the clocks went forward on the 30th
+        assert [log.scheduled_for.astimezone(berlin).hour for log in missed] == [8] * 4
+        assert [log.slot_key for log in missed] == [
+            "interval_1440",
+            "interval_2880",
+            "interval_4320",
+            "interval_5760",
+        ]
@@ -0,0 +1,157 @@
+"""Tests for the per-medication entity snapshots."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    Inventory,
+    Medication,
+    MedicationStatus,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+from custom_components.med_expert.runtime import manager as manager_module
+from custom_components.med_expert.runtime.snapshots import (
+    SNAPSHOT_FIELDS,
+    SnapshotStore,
+    build_snapshot,
+)
+
+TZ = ZoneInfo("Europe/Berlin")
+
+
+@pytest.fixture
+def profile() -> Profile:
+    """Create a profile with one daily medication that has an inventory."""
+    profile = Profile.create(name="Test", timezone="Europe/Berlin")
+    medication = Medication.create(
+        display_name="Aspirin",
+        schedule=ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["08:00"],
+            default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+        ),
+    )
+    medication.medication_id = "a"
+    medication.inventory = Inventory(current_quantity=30, unit="tablet")
+    medication.state.next_due = datetime(2025, 3, 10, 8, 0, tzinfo=TZ)
+    medication.state.status = MedicationStatus.OK
+    profile.add_medication(medication)
+    return profile
+
+
+class TestBuildSnapshot:
+    """Tests for build_snapshot."""
+
+    def test_precomputes_entity_values(self, profile: Profile):
+        """Test that the snapshot holds what the sensors show."""
+        snapshot = build_snapshot(profile.get_medication("a"))
+
+        assert snapshot.status.value == "ok"
+        assert snapshot.status.icon == "mdi:pill"
+        assert snapshot.status.attributes["schedule_kind"] == "times_per_day"
+        assert snapshot.next_due.value == datetime(2025, 3, 10, 8, 0, tzinfo=TZ)
+        assert snapshot.next_dose.value == "1 tablet"
+        assert snapshot.inventory.value == 30
+        assert snapshot.inventory.unit == "tablet"
+        assert snapshot.puffs is None
+        assert dict(snapshot.versions) == dict.fromkeys(SNAPSHOT_FIELDS, 0)
+
+    def test_is_immutable(self, profile: Profile):
+        """Test that a published snapshot cannot be changed."""
+        snapshot = build_snapshot(profile.get_medication("a"))
+
+        with pytest.raises(AttributeError):
+            snapshot.next_due = None
+        with pytest.raises(TypeError):
+            snapshot.status.attributes["form"] = "tablet"
+
+    def test_bumps_only_changed_fields(self, profile: Profile):
+        """Test that a take bumps status, next due and inventory only."""
+        medication = profile.get_medication("a")
+        first = build_snapshot(medication)
+
+        medication.state.last_taken = datetime(2025, 3, 10, 8, 5, tzinfo=TZ)
+        medication.state.next_due = datetime(2025, 3, 11, 8, 0, tzinfo=TZ)
+        medication.inventory.decrement()
+        second = build_snapshot(medication, first)
+
+        assert dict(second.versions) == {
+            "status": 1,
+            "next_due": 1,
+            "next_dose": 0,
+            "inventory": 1,
+            "puffs": 0,
+        }
+        # The previous snapshot is left as it was
+        assert first.inventory.value == 30
+
+
+class TestSnapshotStore:
+    """Tests for SnapshotStore."""
+
+    def test_builds_on_first_use(self, profile: Profile):
+        """Test that snapshots are built lazily and cached."""
+        store = SnapshotStore(profile)
+
+        snapshot = store.get("a")
+
+        assert snapshot is store.get("a")
+        assert store.get("missing") is None
+
+    def test_refresh_reports_changed_medications(self, profile: Profile):
+        """Test that refreshing without changes keeps the versions."""
+        store = SnapshotStore(profile)
+        store.get("a")
+
+        assert store.refresh("a") == []
+
+        profile.get_medication("a").state.status = MedicationStatus.DUE
+        assert store.refresh("a") == ["a"]
+        assert store.get("a").version("status") == 1
+        assert store.get("a").version("next_due") == 0
+
+    def test_refresh_drops_removed_medications(self, profile: Profile):
+        """Test that a removed medication has no snapshot any more."""
+        store = SnapshotStore(profile)
+        store.get("a")
+
+        profile.remove_medication("a")
+
+        assert store.refresh("a") == []
+        assert store.get("a") is None
+
+
+class TestUpdateSignals:
+    """Tests for the signals sent when medications are updated."""
+
+    def test_only_changed_medications_are_signalled(self, profile: Profile):
+        """Test that unchanged medications keep their entities asleep."""
+        other = Medication.create(
+            display_name="Ibuprofen",
+            schedule=ScheduleSpec(kind=ScheduleKind.AS_NEEDED),
+        )
+        other.medication_id = "b"
+        profile.add_medication(other)
+        manager = manager_module.ProfileManager(
+            MagicMock(), "entry", profile, MagicMock()
+        )
+        manager.get_snapshot("a")
+        manager.get_snapshot("b")
+
+        profile.get_medication("a").state.status = MedicationStatus.DUE
+        with patch.object(manager_module, "async_dispatcher_send") as send:
+            manager._signal_medication_updated("a", "b")
+
+        assert [c.args[1:] for c in send.call_args_list] == [
+            ("med_expert_medication_updated_entry_a",),
+            ("med_expert_profile_updated_entry", ["a", "b"]),
+        ]
+        assert manager.get_snapshot("a").version("status") == 1
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from unittest.mock import MagicMock
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -148,6 +148,231 @@ class TestProfileSerialization:
         assert restored.kind == ScheduleKind.AS_NEEDED
 
 
+class TestLazyLogs:
+    """Tests for lazily deserialized profile logs."""
+
+    def _profile_data(self, count: int) -> dict:
+        """Build serialized profile data with count logs, one hour apart."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        for index in range(count):
+            profile.add_log(
+                LogRecord(
+                    action=LogAction.TAKEN,
+                    taken_at=start.replace(hour=index % 24, day=1 + index // 24),
+                    medication_id="med-1",
+                    dose=DoseQuantity.normalize(1, 1, "tablet"),
+                )
+            )
+        return profile.to_dict()
+
+    def test_logs_are_deserialized_on_access(self):
+        """Test that loading a profile does not deserialize its logs."""
+        restored = Profile.from_dict(self._profile_data(10))
+
+        assert len(restored.logs) == 10
+        assert restored.logs.materialized_count == 0
+
+        assert restored.logs[3].action == LogAction.TAKEN
+        assert restored.logs.materialized_count == 1
+
+        assert len(restored.logs[-2:]) == 2
+        assert restored.logs.materialized_count == 3
+
+        assert all(log.medication_id == "med-1" for log in restored.logs)
+        assert restored.logs.materialized_count == 10
+
+    def test_serialization_reuses_stored_records(self):
+        """Test that unread logs serialize without being deserialized."""
+        data = self._profile_data(5)
+        restored = Profile.from_dict(data)
+
+        assert restored.to_dict()["logs"] == data["logs"]
+        assert restored.logs.materialized_count == 0
+
+    def test_archive_keeps_remaining_logs_serialized(self):
+        """Test that archiving only deserializes the archived records."""
+        restored = Profile.from_dict(self._profile_data(30))
+
+        archived = restored.archive_logs_before(
+            datetime(2025, 1, 2, 0, 0, tzinfo=ZoneInfo("UTC"))
+        )
+
+        assert len(archived) == 24
+        assert len(restored.logs) == 6
+        assert restored.logs.materialized_count == 0
+
+
+class TestLogTimeIndex:
+    """Tests for the time index over profile logs."""
+
+    def _log(self, taken_at: datetime, action: LogAction = LogAction.TAKEN):
+        """Build a log record."""
+        return LogRecord(
+            action=action,
+            taken_at=taken_at,
+            medication_id="med-1",
+            dose=DoseQuantity.normalize(1, 1, "tablet"),
+        )
+
+    def test_range_lookup(self):
+        """Test that ranges are found in time order."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        for hours in (0, 24, 48, 72):
+            profile.add_log(self._log(start + timedelta(hours=hours)))
+
+        logs = profile.get_logs_between(
+            start + timedelta(hours=24), start + timedelta(hours=72)
+        )
+
+        assert [log.taken_at for log in logs] == [
+            start + timedelta(hours=24),
+            start + timedelta(hours=48),
+        ]
+        assert len(profile.get_logs_between(start + timedelta(hours=1))) == 3
+
+    def test_back_dated_log_is_indexed_in_order(self):
+        """Test that a log added out of order is found in time order."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        profile.add_log(self._log(start))
+        profile.add_log(self._log(start + timedelta(hours=48)))
+        assert len(profile.get_logs_between()) == 2
+
+        profile.add_log(self._log(start + timedelta(hours=24), LogAction.SKIPPED))
+
+        actions = [log.action for log in profile.get_logs_between()]
+        assert actions == [LogAction.TAKEN, LogAction.SKIPPED, LogAction.TAKEN]
+
+    def test_day_buckets_use_profile_timezone(self):
+        """Test that per-day lookups use the profile's local day."""
+        profile = Profile.create(name="Test", timezone="Europe/Berlin")
+        # 23:30 UTC is already the next day in Berlin
+        profile.add_log(self._log(datetime(2025, 1, 1, 23, 30, tzinfo=ZoneInfo("UTC"))))
+
+        assert profile.get_logs_on(date(2025, 1, 1)) == []
+        assert len(profile.get_logs_on(date(2025, 1, 2))) == 1
+
+    def test_index_follows_archiving(self):
+        """Test that the index is rebuilt after logs are archived."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        for hours in (0, 24, 48):
+            profile.add_log(self._log(start + timedelta(hours=hours)))
+        assert len(profile.get_logs_on(date(2025, 1, 1))) == 1
+
+        profile.archive_logs_before(datetime(2025, 1, 2, tzinfo=ZoneInfo("UTC")))
+
+        assert profile.get_logs_on(date(2025, 1, 1)) == []
+        assert len(profile.get_logs_between()) == 2
+
+    def test_index_follows_discarded_duplicates(self):
+        """Test that indexes are rebuilt after duplicates are discarded."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        profile.add_log(self._log(start))
+        profile.add_log(self._log(start + timedelta(hours=24)))
+        profile.add_log(self._log(start))
+        assert profile.adherence_tracker.counts(date(2025, 1, 4), 7) == (3, 0, 0)
+
+        assert profile.discard_duplicate_logs(2) == 1
+        missed = self._log(start + timedelta(hours=72), LogAction.MISSED)
+        profile.add_log(missed)
+
+        assert profile.get_logs_between(start + timedelta(hours=48)) == [missed]
+        assert profile.get_logs_on(date(2025, 1, 4)) == [missed]
+        assert profile.adherence_tracker.counts(date(2025, 1, 4), 7) == (2, 0, 1)
+
+    def test_index_is_built_without_deserializing(self):
+        """Test that building the index leaves stored logs serialized."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        for hours in range(0, 240, 12):
+            profile.add_log(self._log(start + timedelta(hours=hours)))
+        restored = Profile.from_dict(profile.to_dict())
+
+        logs = restored.get_logs_on(date(2025, 1, 10))
+
+        assert len(logs) == 2
+        assert restored.logs.materialized_count == 2
+
+
+class TestLogMedicationIndex:
+    """Tests for the per-medication index over profile logs."""
+
+    def _profile(self) -> Profile:
+        """Build a profile with two medications taking turns."""
+        profile = Profile.create(name="Test", timezone="UTC")
+        for name in ("A", "B"):
+            medication = Medication.create(
+                display_name=name,
+                schedule=ScheduleSpec(
+                    kind=ScheduleKind.TIMES_PER_DAY,
+                    times=["08:00"],
+                    default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+                ),
+            )
+            medication.medication_id = f"med-{name.lower()}"
+            profile.add_medication(medication)
+
+        start = datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC"))
+        for hours in range(10):
+            profile.add_log(
+                LogRecord(
+                    action=LogAction.TAKEN,
+                    taken_at=start + timedelta(hours=hours),
+                    medication_id="med-a" if hours % 2 == 0 else "med-b",
+                    dose=DoseQuantity.normalize(1, 1, "tablet"),
+                )
+            )
+        return profile
+
+    def test_logs_for_medication(self):
+        """Test that a medication's logs are found, with last-N limits."""
+        profile = self._profile()
+
+        logs = profile.get_logs_for_medication("med-a")
+        assert len(logs) == 5
+        assert all(log.medication_id == "med-a" for log in logs)
+
+        last_two = profile.get_logs_for_medication("med-b", limit=2)
+        assert [log.taken_at.hour for log in last_two] == [15, 17]
+
+    def test_add_log_updates_index(self):
+        """Test that logs added after the index was built are included."""
+        profile = self._profile()
+        assert len(profile.get_logs_for_medication("med-a")) == 5
+
+        back_dated = LogRecord(
+            action=LogAction.SKIPPED,
+            taken_at=datetime(2025, 1, 1, 7, 0, tzinfo=ZoneInfo("UTC")),
+            medication_id="med-a",
+        )
+        profile.add_log(back_dated)
+
+        logs = profile.get_logs_for_medication("med-a")
+        assert len(logs) == 6
+        assert logs[0] is back_dated
+
+    def test_remove_medication_drops_its_logs_from_index(self):
+        """Test that removed medications are no longer indexed."""
+        profile = self._profile()
+        assert len(profile.get_logs_for_medication("med-b")) == 5
+
+        profile.remove_medication("med-b")
+
+        assert profile.get_logs_for_medication("med-b") == []
+        assert len(profile.logs) == 10
+
+    def test_index_reads_only_matching_logs(self):
+        """Test that stored logs of other medications stay serialized."""
+        restored = Profile.from_dict(self._profile().to_dict())
+
+        assert len(restored.get_logs_for_medication("med-b", limit=3)) == 3
+        assert restored.logs.materialized_count == 3
+
+
 class TestMigrations:
     """Tests for data migrations."""
 
@@ -661,3 +886,75 @@ class TestDoseQuantityEdgeCases:
         dose = DoseQuantity.from_dict(data)
         assert dose.numerator == 1
         assert dose.denominator == 2
+
+
+class TestDelayedSave:
+    """Tests for coalesced profile writes in the repository."""
+
+    async def _make_repository(self, hass):
+        """Create a loaded repository with one profile."""
+        from custom_components.med_expert.store import ProfileRepository, ProfileStore
+
+        store = ProfileStore(hass)
+        repository = ProfileRepository(store, save_delay=7)
+        await repository.async_load()
+        profile = Profile.create(name="Test", timezone="UTC")
+        await repository.async_add(profile)
+        return repository, store, profile
+
+    @pytest.mark.asyncio
+    async def test_updates_are_coalesced(self, storage_hass):
+        """Test that a burst of updates results in a single write."""
+        repository, store, profile = await self._make_repository(storage_hass)
+        ha_store = store._store
+        writes_before = ha_store.write_count
+
+        with patch(
+            "custom_components.med_expert.store.async_call_later"
+        ) as mock_call_later:
+            for _ in range(8):
+                profile.add_log(
+                    LogRecord(
+                        action=LogAction.TAKEN,
+                        taken_at=datetime(2025, 1, 1, 8, 0, tzinfo=ZoneInfo("UTC")),
+                        dose=DoseQuantity.normalize(1, 1, "tablet"),
+                    )
+                )
+                await repository.async_update(profile)
+
+        assert repository.is_dirty(profile.profile_id)
+        assert repository.coalesced_writes == 7
+        mock_call_later.assert_called_once()
+        _, delay, write_delayed = mock_call_later.call_args.args
+        assert delay == 7
+        assert ha_store.write_count == writes_before
+
+        # Logs are journaled immediately, independent of the delay
+        assert len(await store.async_load_logs(profile.profile_id)) == 8
+
+        await write_delayed(datetime(2025, 1, 1, 8, 0, 7, tzinfo=ZoneInfo("UTC")))
+        assert ha_store.write_count == writes_before + 1
+        assert not repository.is_dirty(profile.profile_id)
+        assert profile.profile_id in ha_store._data["profiles"]
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_pending_changes(self, storage_hass):
+        """Test that flushing writes dirty profiles and cancels the delay."""
+        repository, store, profile = await self._make_repository(storage_hass)
+        ha_store = store._store
+
+        profile.name = "Renamed"
+        with patch(
+            "custom_components.med_expert.store.async_call_later"
+        ) as mock_call_later:
+            await repository.async_update(profile)
+        await repository.async_flush()
+
+        assert not repository.is_dirty(profile.profile_id)
+        assert ha_store._data["profiles"][profile.profile_id]["name"] == "Renamed"
+        mock_call_later.return_value.assert_called_once()
+
+        # Nothing pending - flushing again does not write
+        writes = ha_store.write_count
+        await repository.async_flush()
+        assert ha_store.write_count == writes
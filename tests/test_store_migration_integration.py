@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from custom_components.med_expert.domain.models import Profile
 from custom_components.med_expert.store import (
     MedExpertStore,
     ProfileRepository,
@@ -162,9 +164,9 @@ async def test_store_migration_v1_to_v2():
 
 
 @pytest.mark.asyncio
-async def test_repository_load_with_migration():
+async def test_repository_load_with_migration(storage_hass):
     """Test that ProfileRepository correctly loads and migrates data."""
-    hass = MagicMock()
+    hass = storage_hass
 
     # Current version data (no migration needed)
     current_data = {
@@ -196,7 +198,7 @@ async def test_repository_load_with_migration():
         await repository.async_load()
 
         # Verify profile was loaded
-        assert repository.get("prof-1") is not None
+        assert await repository.async_get("prof-1") is not None
         assert repository.get("prof-1").name == "Test"
 
 
@@ -259,3 +261,54 @@ async def test_downgrade_scenario_handles_gracefully():
     # Future fields should be preserved (even if not used)
     assert "prof-1" in migrated_data["profiles"]
     assert migrated_data["profiles"]["prof-1"]["name"] == "Test"
+
+
+@pytest.mark.asyncio
+async def test_repository_loads_once_and_hydrates_lazily(storage_hass):
+    """Test that the shared repository parses the store once and on demand."""
+    hass = storage_hass
+
+    current_data = {
+        "schema_version": 2,
+        "profiles": {
+            f"prof-{i}": {
+                "profile_id": f"prof-{i}",
+                "name": f"Patient {i}",
+                "timezone": "UTC",
+                "medications": {},
+                "logs": [],
+            }
+            for i in range(3)
+        },
+    }
+
+    with (
+        patch.object(MedExpertStore, "async_load", new_callable=AsyncMock) as mock_load,
+        patch(
+            "custom_components.med_expert.store.Profile.from_dict",
+            wraps=Profile.from_dict,
+        ) as mock_from_dict,
+    ):
+        mock_load.return_value = current_data
+        repository = ProfileRepository(ProfileStore(hass))
+
+        # Several config entries asking for the repository at once
+        await asyncio.gather(*(repository.async_ensure_loaded() for _ in range(3)))
+        assert mock_load.await_count == 1
+        assert mock_from_dict.call_count == 0
+
+        assert "prof-1" in repository
+        assert mock_from_dict.call_count == 0
+
+        assert repository.get("prof-1") is None
+        profile = await repository.async_get("prof-1")
+        assert profile is not None
+        assert await repository.async_get("prof-1") is profile
+        assert repository.get("prof-1") is profile
+        assert mock_from_dict.call_count == 1
+
+        assert await repository.async_find_by_name("Patient 2") is not None
+        assert mock_from_dict.call_count == 2
+
+        assert len(await repository.async_get_all()) == 3
+        assert mock_from_dict.call_count == 3
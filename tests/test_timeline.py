@@ -0,0 +1,127 @@
+"""Tests for the materialized dose timeline."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    Medication,
+    MedicationStatus,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+from custom_components.med_expert.domain.timeline import DoseTimeline
+
+TZ = ZoneInfo("Europe/Berlin")
+NOW = datetime(2025, 3, 10, 7, 0, tzinfo=TZ)
+
+
+def _medication(medication_id: str, times: list[str]) -> Medication:
+    """Create a daily medication whose first pending dose is today."""
+    medication = Medication.create(
+        display_name=medication_id,
+        schedule=ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=times,
+            default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+        ),
+    )
+    medication.medication_id = medication_id
+    hour, minute = map(int, times[0].split(":"))
+    medication.state.next_due = NOW.replace(hour=hour, minute=minute)
+    medication.state.next_slot_key = times[0]
+    medication.state.status = MedicationStatus.OK
+    return medication
+
+
+def _profile() -> Profile:
+    """Create a profile with a morning/evening and a noon medication."""
+    profile = Profile.create(name="Test", timezone="Europe/Berlin")
+    profile.add_medication(_medication("a", ["08:00", "20:00"]))
+    profile.add_medication(_medication("b", ["12:00"]))
+    return profile
+
+
+class TestDoseTimeline:
+    """Tests for DoseTimeline."""
+
+    def test_merges_medications_in_order(self):
+        """Test that the doses of all medications come out sorted."""
+        timeline = DoseTimeline(_profile())
+
+        entries = timeline.get(NOW, NOW + timedelta(hours=24))
+
+        assert [(e.due.hour, e.medication_id) for e in entries] == [
+            (8, "a"),
+            (12, "b"),
+            (20, "a"),
+        ]
+        assert entries[0].status == MedicationStatus.OK
+        assert entries[1].status == MedicationStatus.OK
+        assert entries[2].status is None
+
+    def test_queries_slice_cached_list(self):
+        """Test that queries inside the horizon do not expand schedules again."""
+        timeline = DoseTimeline(_profile(), horizon=timedelta(days=7))
+        timeline.get(NOW, NOW + timedelta(hours=1))
+
+        with patch(
+            "custom_components.med_expert.domain.timeline.compute_occurrences"
+        ) as compute:
+            entries = timeline.get(NOW + timedelta(days=2), NOW + timedelta(days=3))
+
+        compute.assert_not_called()
+        assert len(entries) == 3
+
+    def test_extends_horizon_lazily(self):
+        """Test that a query past the horizon expands the missing range only."""
+        timeline = DoseTimeline(_profile(), horizon=timedelta(days=1))
+        timeline.get(NOW, NOW + timedelta(hours=1))
+        assert timeline.until == NOW + timedelta(days=1)
+
+        entries = timeline.get(NOW, NOW + timedelta(days=3))
+
+        assert timeline.until == NOW + timedelta(days=3)
+        assert len(entries) == 9
+        dues = [entry.due for entry in entries]
+        assert dues == sorted(dues)
+        assert len(set(dues)) == len(dues)
+
+    def test_invalidate_reexpands_medication(self):
+        """Test that a taken dose leaves the timeline after invalidation."""
+        profile = _profile()
+        timeline = DoseTimeline(profile)
+        timeline.get(NOW, NOW + timedelta(hours=24))
+        medication = profile.medications["a"]
+        medication.state.next_due = NOW.replace(hour=20)
+        medication.state.next_slot_key = "20:00"
+
+        assert timeline.get(NOW, NOW + timedelta(hours=24))[0].medication_id == "a"
+        timeline.invalidate("a")
+        entries = timeline.get(NOW, NOW + timedelta(hours=24))
+
+        assert [(e.due.hour, e.medication_id) for e in entries] == [
+            (12, "b"),
+            (20, "a"),
+        ]
+        assert entries[1].status == MedicationStatus.OK
+
+    def test_snoozed_dose_and_removed_medication(self):
+        """Test snoozed pending doses and medications no longer in the profile."""
+        profile = _profile()
+        timeline = DoseTimeline(profile)
+        timeline.get(NOW, NOW + timedelta(hours=24))
+        medication = profile.medications["a"]
+        medication.state.next_due = NOW.replace(hour=8, minute=10)
+        medication.state.status = MedicationStatus.SNOOZED
+        timeline.invalidate("a")
+        profile.remove_medication("b")
+
+        entries = timeline.get(NOW, NOW + timedelta(hours=24))
+
+        assert [(e.due.hour, e.due.minute) for e in entries] == [(8, 10), (20, 0)]
+        assert entries[0].status == MedicationStatus.SNOOZED
@@ -0,0 +1,191 @@
+"""
+Tests for resolving local wall times around DST changes.
+
+Every DST change of 2025 in a set of zones is checked minute by minute
+against zoneinfo's own fold=0 conversion, which resolves gaps forward
+and folds to their first occurrence like the transition cache does.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    ScheduleKind,
+    ScheduleSpec,
+)
+from custom_components.med_expert.domain.schedule import compute_occurrences
+from custom_components.med_expert.domain.timezones import (
+    TransitionCache,
+    transition_cache,
+)
+
+DST_ZONES = [
+    "Europe/Berlin",  # +1/+2, changes at 02:00 and 03:00
+    "Europe/London",  # 0/+1, changes at 01:00 and 02:00
+    "America/New_York",  # -5/-4
+    "America/St_Johns",  # -3:30/-2:30
+    "America/Santiago",  # southern hemisphere, changes at midnight
+    "Australia/Sydney",  # southern hemisphere, +10/+11
+    "Australia/Lord_Howe",  # DST of 30 minutes
+]
+
+
+def _changes(timezone: str, year: int = 2025) -> list[date]:
+    """Find the local days of a year on which the UTC offset changes."""
+    tz = ZoneInfo(timezone)
+    days = []
+    day = date(year, 1, 1)
+    previous = datetime.combine(day, time(12), tzinfo=tz).utcoffset()
+    while day.year == year:
+        day += timedelta(days=1)
+        offset = datetime.combine(day, time(12), tzinfo=tz).utcoffset()
+        if offset != previous:
+            # The change happened on this day or in the night before noon
+            days.append(day if _changes_on(tz, day) else day - timedelta(days=1))
+        previous = offset
+    return days
+
+
+def _changes_on(tz: ZoneInfo, day: date) -> bool:
+    """Check whether the offset changes between a day's midnight and noon."""
+    midnight = datetime.combine(day, time(), tzinfo=tz)
+    return (
+        midnight.utcoffset() != datetime.combine(day, time(12), tzinfo=tz).utcoffset()
+    )
+
+
+def _wall_times(day: date) -> list[datetime]:
+    """Every minute of a local day and of the days around it."""
+    start = datetime.combine(day - timedelta(days=1), time())
+    return [start + timedelta(minutes=minute) for minute in range(3 * 24 * 60)]
+
+
+def _expected_utc(tz: ZoneInfo, naive: datetime) -> datetime:
+    """Resolve a wall time with zoneinfo, gaps forward and folds first."""
+    return naive.replace(tzinfo=tz, fold=0).astimezone(UTC)
+
+
+@pytest.mark.parametrize("timezone", DST_ZONES)
+class TestTransitionMatrix:
+    """Tests across the DST changes of several zones."""
+
+    def test_finds_both_changes(self, timezone: str):
+        """Test that each zone has a spring and an autumn change in 2025."""
+        cache = TransitionCache(ZoneInfo(timezone))
+
+        changes = _changes(timezone)
+
+        assert len(changes) == 2
+        assert all(cache.day(day).switch_at is not None for day in changes)
+        assert {cache.day(day).gap > timedelta(0) for day in changes} == {True, False}
+
+    def test_to_utc_matches_zoneinfo(self, timezone: str):
+        """Test every minute around each change against zoneinfo."""
+        tz = ZoneInfo(timezone)
+        cache = TransitionCache(tz)
+
+        for day in _changes(timezone):
+            wall_times = _wall_times(day)
+            expected = [_expected_utc(tz, naive) for naive in wall_times]
+
+            assert cache.to_utc_many(wall_times) == expected
+            assert [cache.to_utc(naive) for naive in wall_times] == expected
+
+    def test_localize_gives_valid_wall_times(self, timezone: str):
+        """Test that gap times shift forward and fold times come first."""
+        tz = ZoneInfo(timezone)
+        cache = TransitionCache(tz)
+
+        for day in _changes(timezone):
+            offsets = cache.day(day)
+            for naive in _wall_times(day):
+                local = cache.localize(naive)
+                instant = cache.to_utc(naive)
+
+                # Aware datetimes in a fold never compare equal across zones
+                assert local.astimezone(UTC) == instant
+                # Round trips through UTC, so the wall time exists
+                round_trip = instant.astimezone(tz)
+                assert local.replace(tzinfo=None) == round_trip.replace(tzinfo=None)
+                shift = local.replace(tzinfo=None) - naive
+                if offsets.gap > timedelta(0) and shift:
+                    assert shift == offsets.gap
+                else:
+                    assert shift == timedelta(0)
+
+    def test_daily_occurrences_resolve_gap_and_fold(self, timezone: str):
+        """Test range expansion of a slot every 15 minutes across each change."""
+        tz = ZoneInfo(timezone)
+        times = [
+            f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(0, 1440, 15)
+        ]
+        schedule = ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=times,
+            default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+        )
+
+        for day in _changes(timezone):
+            start = datetime.combine(day, time(), tzinfo=tz).astimezone(UTC)
+            end = start + timedelta(days=1)
+
+            occurrences = compute_occurrences(schedule, start, end, timezone)
+
+            # Slots in a gap land on the same instants as later slots
+            expected = sorted(
+                [
+                    _expected_utc(tz, datetime.combine(slot_day, time()) + step)
+                    for slot_day in (
+                        day - timedelta(days=1),
+                        day,
+                        day + timedelta(days=1),
+                    )
+                    for step in (timedelta(minutes=m) for m in range(0, 1440, 15))
+                ]
+            )
+            expected = [instant for instant in expected if start <= instant < end]
+            assert [o.scheduled_for.astimezone(UTC) for o in occurrences] == expected
+            # All occurrences are valid wall times of the zone
+            for occurrence in occurrences:
+                instant = occurrence.scheduled_for.astimezone(UTC)
+                assert instant.astimezone(tz).replace(
+                    tzinfo=None
+                ) == occurrence.scheduled_for.replace(tzinfo=None)
+
+
+class TestTransitionCache:
+    """Tests for the per-timezone cache itself."""
+
+    def test_shared_per_timezone(self):
+        """Test that schedules of one timezone share one cache."""
+        assert transition_cache("Europe/Berlin") is transition_cache("Europe/Berlin")
+        assert transition_cache("Europe/Berlin") is not transition_cache("UTC")
+
+    def test_plain_day_has_no_switch(self):
+        """Test that a day without DST change has a single offset."""
+        offsets = TransitionCache(ZoneInfo("Europe/Berlin")).day(date(2025, 7, 1))
+
+        assert offsets.switch_at is None
+        assert offsets.before == offsets.after == timedelta(hours=2)
+
+    def test_spring_gap_shifts_forward(self):
+        """Test the Berlin spring change: 02:30 does not exist and becomes 03:30."""
+        cache = TransitionCache(ZoneInfo("Europe/Berlin"))
+
+        local = cache.localize(datetime(2025, 3, 30, 2, 30))  # noqa: DTZ001
+
+        assert (local.hour, local.minute) == (3, 30)
+        assert local.utcoffset() == timedelta(hours=2)
+
+    def test_autumn_fold_takes_first(self):
+        """Test the Berlin autumn change: 02:30 happens twice, the first counts."""
+        cache = TransitionCache(ZoneInfo("Europe/Berlin"))
+
+        instant = cache.to_utc(datetime(2025, 10, 26, 2, 30))  # noqa: DTZ001
+
+        assert instant == datetime(2025, 10, 26, 0, 30, tzinfo=UTC)
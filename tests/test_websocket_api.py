@@ -0,0 +1,261 @@
+"""Tests for the websocket commands of the panel."""
+
+from __future__ import annotations
+
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import homeassistant.core
+import pytest
+from homeassistant.components import websocket_api as ha_websocket_api
+
+from custom_components.med_expert import websocket_api
+from custom_components.med_expert.domain.models import (
+    DoseQuantity,
+    Inventory,
+    LogAction,
+    LogRecord,
+    Medication,
+    MedicationStatus,
+    Profile,
+    ScheduleKind,
+    ScheduleSpec,
+)
+from custom_components.med_expert.runtime.manager import ProfileManager
+
+TZ = ZoneInfo("Europe/Berlin")
+
+
+@pytest.fixture
+def ws_module():
+    """Load the commands with pass-through decorators."""
+    with (
+        patch.object(homeassistant.core, "callback", lambda func: func),
+        patch.object(
+            ha_websocket_api, "websocket_command", lambda _schema: lambda func: func
+        ),
+    ):
+        module = importlib.reload(websocket_api)
+    yield module
+    importlib.reload(websocket_api)
+
+
+@pytest.fixture
+def manager() -> ProfileManager:
+    """Create a manager of a profile with one medication."""
+    profile = Profile.create(name="Test", timezone="Europe/Berlin")
+    medication = Medication.create(
+        display_name="Aspirin",
+        schedule=ScheduleSpec(
+            kind=ScheduleKind.TIMES_PER_DAY,
+            times=["08:00"],
+            default_dose=DoseQuantity.normalize(1, 1, "tablet"),
+        ),
+    )
+    medication.medication_id = "a"
+    medication.inventory = Inventory(current_quantity=30, unit="tablet")
+    medication.state.next_due = datetime(2025, 3, 10, 8, 0, tzinfo=TZ)
+    profile.add_medication(medication)
+    return ProfileManager(MagicMock(), "entry", profile, MagicMock())
+
+
+def _hass(ws_module, manager: ProfileManager) -> MagicMock:
+    """Create a hass whose only loaded config entry is the manager's."""
+    hass = MagicMock()
+    hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            domain="med_expert",
+            entry_id="entry",
+            state=ws_module.ConfigEntryState.LOADED,
+            runtime_data=SimpleNamespace(manager=manager),
+        )
+    ]
+    return hass
+
+
+class TestProfileSnapshot:
+    """Tests for med_expert/profile_snapshot."""
+
+    def test_returns_profiles_in_one_payload(self, ws_module, manager):
+        """Test that the profile and its medications come in one result."""
+        connection = MagicMock()
+
+        ws_module.websocket_profile_snapshot(
+            _hass(ws_module, manager), connection, {"id": 1}
+        )
+
+        result = connection.send_result.call_args.args[1]
+        (profile,) = result["profiles"]
+        assert profile["entry_id"] == "entry"
+        assert profile["name"] == "Test"
+        (medication,) = profile["medications"]
+        assert medication["medication_id"] == "a"
+        assert medication["next_due"] == "2025-03-10T08:00:00+01:00"
+        assert medication["next_dose"] == "1 tablet"
+        assert medication["inventory"]["current_quantity"] == 30
+
+    def test_unknown_profile(self, ws_module, manager):
+        """Test that an unknown entry ID is an error."""
+        connection = MagicMock()
+
+        ws_module.websocket_profile_snapshot(
+            _hass(ws_module, manager), connection, {"id": 1, "entry_id": "other"}
+        )
+
+        connection.send_result.assert_not_called()
+        connection.send_error.assert_called_once()
+
+
+class TestSubscribe:
+    """Tests for med_expert/subscribe."""
+
+    def test_pushes_snapshot_then_deltas(self, ws_module, manager):
+        """Test that updated medications are pushed after the snapshot."""
+        connection = MagicMock()
+        connection.subscriptions = {}
+        handlers = {}
+        unsubscribe = MagicMock()
+
+        def connect(_hass, signal, target):
+            handlers[signal] = target
+            return unsubscribe
+
+        with (
+            patch.object(ws_module, "async_dispatcher_connect", side_effect=connect),
+            patch.object(
+                ws_module.websocket_api,
+                "event_message",
+                side_effect=lambda msg_id, event: (msg_id, event),
+            ),
+        ):
+            ws_module.websocket_subscribe(
+                _hass(ws_module, manager), connection, {"id": 7}
+            )
+            manager.get_medication("a").state.status = MedicationStatus.DUE
+            manager._snapshots.refresh("a")
+            handlers["med_expert_profile_updated_entry"](["a", "gone"])
+
+        events = [call.args[0] for call in connection.send_message.call_args_list]
+        assert events[0][0] == 7
+        assert events[0][1]["type"] == "snapshot"
+        assert events[0][1]["profiles"][0]["medications"][0]["status"] == "ok"
+        delta = events[1][1]
+        assert delta["type"] == "medications"
+        assert [m["status"] for m in delta["medications"]] == ["due"]
+        assert delta["removed"] == ["gone"]
+
+        connection.subscriptions[7]()
+        assert unsubscribe.call_count == 4
+
+    def test_follows_reloaded_profile(self, ws_module, manager):
+        """Test that a reloaded profile is pushed from its new manager."""
+        connection = MagicMock()
+        connection.subscriptions = {}
+        handlers = {}
+        hass = _hass(ws_module, manager)
+        (entry,) = hass.config_entries.async_entries.return_value
+        reloaded = ProfileManager(
+            MagicMock(),
+            "entry",
+            Profile.from_dict(manager.profile.to_dict()),
+            MagicMock(),
+        )
+        reloaded.profile.name = "Reloaded"
+
+        def connect(_hass, signal, target):
+            handlers[signal] = target
+            return MagicMock()
+
+        with (
+            patch.object(ws_module, "async_dispatcher_connect", side_effect=connect),
+            patch.object(
+                ws_module.websocket_api,
+                "event_message",
+                side_effect=lambda msg_id, event: (msg_id, event),
+            ),
+        ):
+            ws_module.websocket_subscribe(hass, connection, {"id": 7})
+            entry_changed = handlers[ws_module.SIGNAL_CONFIG_ENTRY_CHANGED]
+
+            entry.state = ws_module.ConfigEntryState.NOT_LOADED
+            entry_changed(MagicMock(), entry)
+            entry.runtime_data = SimpleNamespace(manager=reloaded)
+            entry.state = ws_module.ConfigEntryState.LOADED
+            entry_changed(MagicMock(), entry)
+            # Further state changes without a new profile push nothing
+            entry_changed(MagicMock(), entry)
+
+            reloaded.get_medication("a").state.status = MedicationStatus.DUE
+            reloaded._snapshots.refresh("a")
+            handlers["med_expert_profile_updated_entry"](["a"])
+
+        events = [call.args[0][1] for call in connection.send_message.call_args_list]
+        assert [event["type"] for event in events] == [
+            "snapshot",
+            "snapshot",
+            "snapshot",
+            "medications",
+        ]
+        assert events[1]["profiles"] == []
+        assert events[2]["profiles"][0]["name"] == "Reloaded"
+        assert events[3]["medications"][0]["status"] == "due"
+
+
+class TestHistory:
+    """Tests for med_expert/history."""
+
+    def _msg(self, **fields: object) -> dict:
+        """Build a message with the schema's defaults."""
+        return {
+            "id": 1,
+            "entry_id": "entry",
+            "limit": 50,
+            "order": "desc",
+            "by_day": False,
+            **fields,
+        }
+
+    def test_returns_page_and_day_counts(self, ws_module, manager):
+        """Test that filters, paging and counts reach the query."""
+        for hour in (8, 12, 20):
+            manager.profile.add_log(
+                LogRecord(
+                    action=LogAction.SKIPPED if hour == 12 else LogAction.TAKEN,
+                    taken_at=datetime(2025, 3, 10, hour, 0, tzinfo=TZ),
+                    medication_id="a",
+                )
+            )
+        connection = MagicMock()
+
+        ws_module.websocket_history(
+            _hass(ws_module, manager),
+            connection,
+            self._msg(actions=["taken"], limit=1, by_day=True),
+        )
+
+        result = connection.send_result.call_args.args[1]
+        assert [r["taken_at"] for r in result["records"]] == [
+            "2025-03-10T20:00:00+01:00"
+        ]
+        assert result["next_cursor"] is not None
+        assert result["days"] == [
+            {
+                "day": "2025-03-10",
+                **dict.fromkeys((action.value for action in LogAction), 0),
+                "taken": 2,
+            }
+        ]
+
+    def test_invalid_cursor(self, ws_module, manager):
+        """Test that a malformed cursor is an error."""
+        connection = MagicMock()
+
+        ws_module.websocket_history(
+            _hass(ws_module, manager), connection, self._msg(cursor="nope")
+        )
+
+        connection.send_result.assert_not_called()
+        connection.send_error.assert_called_once()